@@ -37,7 +37,8 @@ from cogent.util.table import Table as _Table
 from cogent.parse.table import load_delimited, autogen_reader
 from cogent.core.tree import TreeBuilder, TreeError
 from cogent.parse.tree_xml import parse_string as tree_xml_parse_string
-from cogent.parse.newick import parse_string as newick_parse_string
+from cogent.parse.newick import parse_string as newick_parse_string, \
+        fast_parse_string as newick_fast_parse_string, TreeParseError
 from cogent.core.alignment import SequenceCollection
 from cogent.core.alignment import Alignment
 from cogent.parse.sequence import FromFilenameParser
@@ -212,16 +213,18 @@ def LoadTree(filename=None, treestring=None, tip_names=None, format=None, \
         if format is None and treestring.startswith('<'):
             format = "xml"
         if format == "xml":
-            parser = tree_xml_parse_string
+            tree = tree_xml_parse_string(treestring, TreeBuilder().createEdge)
         else:
-            parser = newick_parse_string
-        tree_builder = TreeBuilder().createEdge
-        #FIXME: More general strategy for underscore_unmunge
-        if parser is newick_parse_string:
-            tree = parser(treestring, tree_builder, \
-                    underscore_unmunge=underscore_unmunge)
-        else:
-            tree = parser(treestring, tree_builder)
+            #FIXME: More general strategy for underscore_unmunge
+            try:
+                tree = newick_fast_parse_string(treestring,
+                        TreeBuilder().createParsedEdge,
+                        underscore_unmunge=underscore_unmunge)
+            except TreeParseError:
+                # the forgiving parser, with more helpful error messages
+                tree = newick_parse_string(treestring,
+                        TreeBuilder().createEdge,
+                        underscore_unmunge=underscore_unmunge)
         if not tree.NameLoaded:
             tree.Name = 'root'
     elif tip_names:
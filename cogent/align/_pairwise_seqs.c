@@ -835,14 +835,6 @@ static int __Pyx_ParseOptionalKeywords(PyObject *kwds, PyObject **argnames[],\
     PyObject *kwds2, PyObject *values[], Py_ssize_t num_pos_args,\
     const char* function_name);
 
-static CYTHON_INLINE void __Pyx_RaiseTooManyValuesError(Py_ssize_t expected);
-
-static CYTHON_INLINE void __Pyx_RaiseNeedMoreValuesError(Py_ssize_t index);
-
-static CYTHON_INLINE int __Pyx_IterFinish(void);
-
-static int __Pyx_IternextUnpackEndCheck(PyObject *retval, Py_ssize_t expected);
-
 static CYTHON_INLINE int  __Pyx_GetBufferAndValidate(Py_buffer* buf, PyObject* obj,
     __Pyx_TypeInfo* dtype, int flags, int nd, int cast, __Pyx_BufFmt_StackElem* stack);
 static CYTHON_INLINE void __Pyx_SafeReleaseBuffer(Py_buffer* info);
@@ -872,6 +864,14 @@ static CYTHON_INLINE int __pyx_sub_acquisition_count_locked(
 static CYTHON_INLINE void __Pyx_INC_MEMVIEW(__Pyx_memviewslice *, int, int);
 static CYTHON_INLINE void __Pyx_XDEC_MEMVIEW(__Pyx_memviewslice *, int, int);
 
+static CYTHON_INLINE void __Pyx_RaiseTooManyValuesError(Py_ssize_t expected);
+
+static CYTHON_INLINE void __Pyx_RaiseNeedMoreValuesError(Py_ssize_t index);
+
+static CYTHON_INLINE int __Pyx_IterFinish(void);
+
+static int __Pyx_IternextUnpackEndCheck(PyObject *retval, Py_ssize_t expected);
+
 static CYTHON_INLINE PyObject *__Pyx_GetModuleGlobalName(PyObject *name);
 
 static CYTHON_INLINE int __Pyx_ArgTypeTest(PyObject *obj, PyTypeObject *type, int none_allowed,
@@ -1250,6 +1250,7 @@ static char __pyx_k_state[] = "state";
 static char __pyx_k_track[] = "track";
 static char __pyx_k_a_high[] = "a_high";
 static char __pyx_k_b_high[] = "b_high";
+static char __pyx_k_banded[] = "banded";
 static char __pyx_k_encode[] = "encode";
 static char __pyx_k_format[] = "format";
 static char __pyx_k_i_high[] = "i_high";
@@ -1266,6 +1267,7 @@ static char __pyx_k_a_count[] = "a_count";
 static char __pyx_k_b_count[] = "b_count";
 static char __pyx_k_d_score[] = "d_score";
 static char __pyx_k_fortran[] = "fortran";
+static char __pyx_k_in_band[] = "in_band";
 static char __pyx_k_memview[] = "memview";
 static char __pyx_k_tcode_s[] = "tcode_s";
 static char __pyx_k_tcode_x[] = "tcode_x";
@@ -1281,6 +1283,7 @@ static char __pyx_k_tmp_rows[] = "tmp_rows";
 static char __pyx_k_use_logs[] = "use_logs";
 static char __pyx_k_1_5_3_dev[] = "('1', '5', '3-dev')";
 static char __pyx_k_TypeError[] = "TypeError";
+static char __pyx_k_band_lows[] = "band_lows";
 static char __pyx_k_bin_count[] = "bin_count";
 static char __pyx_k_calc_rows[] = "calc_rows";
 static char __pyx_k_enumerate[] = "enumerate";
@@ -1289,15 +1292,18 @@ static char __pyx_k_mantissas[] = "mantissas";
 static char __pyx_k_pointer_a[] = "pointer_a";
 static char __pyx_k_pointer_b[] = "pointer_b";
 static char __pyx_k_row_count[] = "row_count";
+static char __pyx_k_row_j_low[] = "row_j_low";
 static char __pyx_k_track_enc[] = "track_enc";
 static char __pyx_k_IndexError[] = "IndexError";
 static char __pyx_k_ValueError[] = "ValueError";
+static char __pyx_k_band_highs[] = "band_highs";
 static char __pyx_k_dest_state[] = "dest_state";
 static char __pyx_k_impossible[] = "impossible";
 static char __pyx_k_last_state[] = "last_state";
 static char __pyx_k_prev_state[] = "prev_state";
 static char __pyx_k_pyx_vtable[] = "__pyx_vtable__";
 static char __pyx_k_row_count1[] = "row_count1";
+static char __pyx_k_row_j_high[] = "row_j_high";
 static char __pyx_k_row_length[] = "row_length";
 static char __pyx_k_seq1_index[] = "seq1_index";
 static char __pyx_k_seq2_index[] = "seq2_index";
@@ -1306,12 +1312,14 @@ static char __pyx_k_MemoryError[] = "MemoryError";
 static char __pyx_k_dest_states[] = "dest_states";
 static char __pyx_k_partial_sum[] = "partial_sum";
 static char __pyx_k_row_length1[] = "row_length1";
+static char __pyx_k_track_width[] = "track_width";
 static char __pyx_k_use_scaling[] = "use_scaling";
 static char __pyx_k_xgap_scores[] = "xgap_scores";
 static char __pyx_k_ygap_scores[] = "ygap_scores";
 static char __pyx_k_match_scores[] = "match_scores";
 static char __pyx_k_max_exponent[] = "max_exponent";
 static char __pyx_k_max_mantissa[] = "max_mantissa";
+static char __pyx_k_track_offset[] = "track_offset";
 static char __pyx_k_version_info[] = "version_info";
 static char __pyx_k_pointer_state[] = "pointer_state";
 static char __pyx_k_pyx_getbuffer[] = "__pyx_getbuffer";
@@ -1346,7 +1354,7 @@ static char __pyx_k_itemsize_0_for_cython_array[] = "itemsize <= 0 for cython.ar
 static char __pyx_k_s_dimension_is_s_expected_s[] = "%s dimension is %s, expected %s";
 static char __pyx_k_unable_to_allocate_array_data[] = "unable to allocate array data.";
 static char __pyx_k_strided_and_direct_or_indirect[] = "<strided and direct or indirect>";
-static char __pyx_k_Users_cu3alibre_Developer_pycog[] = "/Users/cu3alibre/Developer/pycogent/cogent/align/_pairwise_seqs.pyx";
+static char __pyx_k_root_package_cogent_align__pair[] = "/root/package/cogent/align/_pairwise_seqs.pyx";
 static char __pyx_k_All_dimensions_preceding_dimensi[] = "All dimensions preceding dimension %d must be indexed and not sliced";
 static char __pyx_k_Buffer_view_does_not_expose_stri[] = "Buffer view does not expose strides";
 static char __pyx_k_Can_only_create_a_buffer_that_is[] = "Can only create a buffer that is contiguous in memory.";
@@ -1385,7 +1393,6 @@ static PyObject *__pyx_kp_s_Out_of_bounds_on_buffer_access_a;
 static PyObject *__pyx_n_s_T;
 static PyObject *__pyx_n_s_TypeError;
 static PyObject *__pyx_kp_s_Unable_to_convert_item_to_object;
-static PyObject *__pyx_kp_s_Users_cu3alibre_Developer_pycog;
 static PyObject *__pyx_n_s_ValueError;
 static PyObject *__pyx_kp_s__7;
 static PyObject *__pyx_n_s_a;
@@ -1397,6 +1404,9 @@ static PyObject *__pyx_n_s_b;
 static PyObject *__pyx_n_s_b_count;
 static PyObject *__pyx_n_s_b_high;
 static PyObject *__pyx_n_s_b_low;
+static PyObject *__pyx_n_s_band_highs;
+static PyObject *__pyx_n_s_band_lows;
+static PyObject *__pyx_n_s_banded;
 static PyObject *__pyx_n_s_base;
 static PyObject *__pyx_n_s_bin;
 static PyObject *__pyx_n_s_bin_count;
@@ -1432,6 +1442,7 @@ static PyObject *__pyx_n_s_i_low;
 static PyObject *__pyx_n_s_id;
 static PyObject *__pyx_n_s_import;
 static PyObject *__pyx_n_s_impossible;
+static PyObject *__pyx_n_s_in_band;
 static PyObject *__pyx_kp_s_is_unexpectedly_large;
 static PyObject *__pyx_n_s_itemsize;
 static PyObject *__pyx_kp_s_itemsize_0_for_cython_array;
@@ -1474,8 +1485,11 @@ static PyObject *__pyx_kp_s_product_is_a_negative_probabilit;
 static PyObject *__pyx_n_s_pyx_getbuffer;
 static PyObject *__pyx_n_s_pyx_vtable;
 static PyObject *__pyx_n_s_range;
+static PyObject *__pyx_kp_s_root_package_cogent_align__pair;
 static PyObject *__pyx_n_s_row_count;
 static PyObject *__pyx_n_s_row_count1;
+static PyObject *__pyx_n_s_row_j_high;
+static PyObject *__pyx_n_s_row_j_low;
 static PyObject *__pyx_n_s_row_length;
 static PyObject *__pyx_n_s_row_length1;
 static PyObject *__pyx_n_s_rows;
@@ -1506,6 +1520,8 @@ static PyObject *__pyx_n_s_test;
 static PyObject *__pyx_n_s_tmp_rows;
 static PyObject *__pyx_n_s_track;
 static PyObject *__pyx_n_s_track_enc;
+static PyObject *__pyx_n_s_track_offset;
+static PyObject *__pyx_n_s_track_width;
 static PyObject *__pyx_kp_s_transition_is_a_negative_probabi;
 static PyObject *__pyx_kp_s_unable_to_allocate_array_data;
 static PyObject *__pyx_kp_s_unable_to_allocate_shape_and_str;
@@ -1521,7 +1537,7 @@ static PyObject *__pyx_n_s_xgap_scores;
 static PyObject *__pyx_n_s_y;
 static PyObject *__pyx_n_s_ygap_scores;
 static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_fmpt(CYTHON_UNUSED PyObject *__pyx_self, PyObject *__pyx_v_mantissa, PyObject *__pyx_v_exponent, PyObject *__pyx_v_msg); /* proto */
-static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUSED PyObject *__pyx_self, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_plan, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq1_index, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq2_index, int __pyx_v_i_low, int __pyx_v_i_high, int __pyx_v_j_low, int __pyx_v_j_high, CYTHON_UNUSED PyObject *__pyx_v_preds, __pyx_t_6cogent_5align_14_pairwise_seqs_Long2D __pyx_v_state_directions, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_T, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_xgap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_ygap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double3D __pyx_v_match_scores, PyObject *__pyx_v_rows, __pyx_t_6cogent_5align_14_pairwise_seqs_UChar3D __pyx_v_track, PyObject *__pyx_v_track_enc, int __pyx_v_viterbi, int __pyx_v_use_logs, int __pyx_v_local, int __pyx_v_use_scaling); /* proto */
+static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUSED PyObject *__pyx_self, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_plan, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq1_index, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq2_index, int __pyx_v_i_low, int __pyx_v_i_high, int __pyx_v_j_low, int __pyx_v_j_high, CYTHON_UNUSED PyObject *__pyx_v_preds, __pyx_t_6cogent_5align_14_pairwise_seqs_Long2D __pyx_v_state_directions, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_T, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_xgap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_ygap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double3D __pyx_v_match_scores, PyObject *__pyx_v_rows, __pyx_t_6cogent_5align_14_pairwise_seqs_UChar3D __pyx_v_track, PyObject *__pyx_v_track_enc, int __pyx_v_viterbi, int __pyx_v_use_logs, int __pyx_v_local, int __pyx_v_use_scaling, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_band_lows, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_band_highs); /* proto */
 static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array___cinit__(struct __pyx_array_obj *__pyx_v_self, PyObject *__pyx_v_shape, Py_ssize_t __pyx_v_itemsize, PyObject *__pyx_v_format, PyObject *__pyx_v_mode, int __pyx_v_allocate_buffer); /* proto */
 static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array_2__getbuffer__(struct __pyx_array_obj *__pyx_v_self, Py_buffer *__pyx_v_info, int __pyx_v_flags); /* proto */
 static void __pyx_array___pyx_pf_15View_dot_MemoryView_5array_4__dealloc__(struct __pyx_array_obj *__pyx_v_self); /* proto */
@@ -1560,20 +1576,19 @@ static PyObject *__pyx_tp_new_memoryview(PyTypeObject *t, PyObject *a, PyObject
 static PyObject *__pyx_tp_new__memoryviewslice(PyTypeObject *t, PyObject *a, PyObject *k); /*proto*/
 static PyObject *__pyx_int_0;
 static PyObject *__pyx_int_1;
-static PyObject *__pyx_int_2;
 static PyObject *__pyx_int_3;
 static PyObject *__pyx_int_neg_1;
+static __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_k__8;
+static __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_k__9;
 static PyObject *__pyx_tuple_;
 static PyObject *__pyx_tuple__2;
 static PyObject *__pyx_tuple__3;
 static PyObject *__pyx_tuple__4;
 static PyObject *__pyx_tuple__5;
 static PyObject *__pyx_tuple__6;
-static PyObject *__pyx_tuple__8;
-static PyObject *__pyx_tuple__9;
-static PyObject *__pyx_slice__17;
-static PyObject *__pyx_slice__18;
 static PyObject *__pyx_slice__19;
+static PyObject *__pyx_slice__20;
+static PyObject *__pyx_slice__21;
 static PyObject *__pyx_tuple__10;
 static PyObject *__pyx_tuple__11;
 static PyObject *__pyx_tuple__12;
@@ -1581,17 +1596,19 @@ static PyObject *__pyx_tuple__13;
 static PyObject *__pyx_tuple__14;
 static PyObject *__pyx_tuple__15;
 static PyObject *__pyx_tuple__16;
-static PyObject *__pyx_tuple__20;
-static PyObject *__pyx_tuple__21;
+static PyObject *__pyx_tuple__17;
+static PyObject *__pyx_tuple__18;
 static PyObject *__pyx_tuple__22;
+static PyObject *__pyx_tuple__23;
 static PyObject *__pyx_tuple__24;
 static PyObject *__pyx_tuple__26;
-static PyObject *__pyx_tuple__27;
 static PyObject *__pyx_tuple__28;
 static PyObject *__pyx_tuple__29;
 static PyObject *__pyx_tuple__30;
-static PyObject *__pyx_codeobj__23;
+static PyObject *__pyx_tuple__31;
+static PyObject *__pyx_tuple__32;
 static PyObject *__pyx_codeobj__25;
+static PyObject *__pyx_codeobj__27;
 
 /* "include/numerical_pyrex.pyx":39
  * 
@@ -2790,7 +2807,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_fmpt(CYTHON_UNUSED PyO
 
 /* Python wrapper */
 static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds); /*proto*/
-static char __pyx_doc_6cogent_5align_14_pairwise_seqs_2calc_rows[] = "The faster, sequence only (no POG) version.  Forward or Viterbi \n    algorithm, with doubles or with slower but practically unoverflowable \n    (double, long) GMP-like numbers.  Viterbi is also available in the ever \n    popular addition-of-logs version.  All this with any possible pair HMM \n    transition matrix.\n        \n    Limitations\n       - HMM states must be in a sensible order: M and X, then Y, then END.\n    ";
+static char __pyx_doc_6cogent_5align_14_pairwise_seqs_2calc_rows[] = "The faster, sequence only (no POG) version.  Forward or Viterbi \n    algorithm, with doubles or with slower but practically unoverflowable \n    (double, long) GMP-like numbers.  Viterbi is also available in the ever \n    popular addition-of-logs version.  All this with any possible pair HMM \n    transition matrix.\n    \n    If band_lows and band_highs are given then row i is only calculated\n    for band_lows[i] <= j < band_highs[i], cells outside the band are\n    treated as impossible, and track is indexed by j - band_lows[i].\n        \n    Limitations\n       - HMM states must be in a sensible order: M and X, then Y, then END.\n    ";
 static PyMethodDef __pyx_mdef_6cogent_5align_14_pairwise_seqs_3calc_rows = {"calc_rows", (PyCFunction)__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows, METH_VARARGS|METH_KEYWORDS, __pyx_doc_6cogent_5align_14_pairwise_seqs_2calc_rows};
 static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *__pyx_self, PyObject *__pyx_args, PyObject *__pyx_kwds) {
   __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_plan = { 0, 0, { 0 }, { 0 }, { 0 } };
@@ -2813,6 +2830,8 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
   int __pyx_v_use_logs;
   int __pyx_v_local;
   int __pyx_v_use_scaling;
+  __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_band_lows = { 0, 0, { 0 }, { 0 }, { 0 } };
+  __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_band_highs = { 0, 0, { 0 }, { 0 }, { 0 } };
   int __pyx_lineno = 0;
   const char *__pyx_filename = NULL;
   int __pyx_clineno = 0;
@@ -2820,12 +2839,14 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
   __Pyx_RefNannyDeclarations
   __Pyx_RefNannySetupContext("calc_rows (wrapper)", 0);
   {
-    static PyObject **__pyx_pyargnames[] = {&__pyx_n_s_plan,&__pyx_n_s_seq1_index,&__pyx_n_s_seq2_index,&__pyx_n_s_i_low,&__pyx_n_s_i_high,&__pyx_n_s_j_low,&__pyx_n_s_j_high,&__pyx_n_s_preds,&__pyx_n_s_state_directions,&__pyx_n_s_T,&__pyx_n_s_xgap_scores,&__pyx_n_s_ygap_scores,&__pyx_n_s_match_scores,&__pyx_n_s_rows,&__pyx_n_s_track,&__pyx_n_s_track_enc,&__pyx_n_s_viterbi,&__pyx_n_s_use_logs,&__pyx_n_s_local,&__pyx_n_s_use_scaling,0};
-    PyObject* values[20] = {0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0};
+    static PyObject **__pyx_pyargnames[] = {&__pyx_n_s_plan,&__pyx_n_s_seq1_index,&__pyx_n_s_seq2_index,&__pyx_n_s_i_low,&__pyx_n_s_i_high,&__pyx_n_s_j_low,&__pyx_n_s_j_high,&__pyx_n_s_preds,&__pyx_n_s_state_directions,&__pyx_n_s_T,&__pyx_n_s_xgap_scores,&__pyx_n_s_ygap_scores,&__pyx_n_s_match_scores,&__pyx_n_s_rows,&__pyx_n_s_track,&__pyx_n_s_track_enc,&__pyx_n_s_viterbi,&__pyx_n_s_use_logs,&__pyx_n_s_local,&__pyx_n_s_use_scaling,&__pyx_n_s_band_lows,&__pyx_n_s_band_highs,0};
+    PyObject* values[22] = {0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0};
     if (unlikely(__pyx_kwds)) {
       Py_ssize_t kw_args;
       const Py_ssize_t pos_args = PyTuple_GET_SIZE(__pyx_args);
       switch (pos_args) {
+        case 22: values[21] = PyTuple_GET_ITEM(__pyx_args, 21);
+        case 21: values[20] = PyTuple_GET_ITEM(__pyx_args, 20);
         case 20: values[19] = PyTuple_GET_ITEM(__pyx_args, 19);
         case 19: values[18] = PyTuple_GET_ITEM(__pyx_args, 18);
         case 18: values[17] = PyTuple_GET_ITEM(__pyx_args, 17);
@@ -2857,82 +2878,82 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
         case  1:
         if (likely((values[1] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_seq1_index)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 1); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 1); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  2:
         if (likely((values[2] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_seq2_index)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 2); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 2); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  3:
         if (likely((values[3] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_i_low)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 3); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 3); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  4:
         if (likely((values[4] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_i_high)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 4); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 4); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  5:
         if (likely((values[5] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_j_low)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 5); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 5); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  6:
         if (likely((values[6] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_j_high)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 6); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 6); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  7:
         if (likely((values[7] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_preds)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 7); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 7); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  8:
         if (likely((values[8] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_state_directions)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 8); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 8); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case  9:
         if (likely((values[9] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_T)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 9); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 9); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 10:
         if (likely((values[10] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_xgap_scores)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 10); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 10); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 11:
         if (likely((values[11] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_ygap_scores)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 11); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 11); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 12:
         if (likely((values[12] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_match_scores)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 12); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 12); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 13:
         if (likely((values[13] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_rows)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 13); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 13); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 14:
         if (likely((values[14] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_track)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 14); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 14); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 15:
         if (likely((values[15] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_track_enc)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 15); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 15); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 16:
         if (likely((values[16] = PyDict_GetItem(__pyx_kwds, __pyx_n_s_viterbi)) != 0)) kw_args--;
         else {
-          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, 16); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+          __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, 16); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
         }
         case 17:
         if (kw_args > 0) {
@@ -2949,12 +2970,24 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
           PyObject* value = PyDict_GetItem(__pyx_kwds, __pyx_n_s_use_scaling);
           if (value) { values[19] = value; kw_args--; }
         }
+        case 20:
+        if (kw_args > 0) {
+          PyObject* value = PyDict_GetItem(__pyx_kwds, __pyx_n_s_band_lows);
+          if (value) { values[20] = value; kw_args--; }
+        }
+        case 21:
+        if (kw_args > 0) {
+          PyObject* value = PyDict_GetItem(__pyx_kwds, __pyx_n_s_band_highs);
+          if (value) { values[21] = value; kw_args--; }
+        }
       }
       if (unlikely(kw_args > 0)) {
         if (unlikely(__Pyx_ParseOptionalKeywords(__pyx_kwds, __pyx_pyargnames, 0, values, pos_args, "calc_rows") < 0)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
       }
     } else {
       switch (PyTuple_GET_SIZE(__pyx_args)) {
+        case 22: values[21] = PyTuple_GET_ITEM(__pyx_args, 21);
+        case 21: values[20] = PyTuple_GET_ITEM(__pyx_args, 20);
         case 20: values[19] = PyTuple_GET_ITEM(__pyx_args, 19);
         case 19: values[18] = PyTuple_GET_ITEM(__pyx_args, 18);
         case 18: values[17] = PyTuple_GET_ITEM(__pyx_args, 17);
@@ -3009,7 +3042,7 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
  *         Long2D state_directions, Double2D T,
  *         Double2D xgap_scores, Double2D ygap_scores, Double3D match_scores,
  *         rows, UChar3D track, track_enc, int viterbi, int use_logs=0, int local=False,             # <<<<<<<<<<<<<<
- *         int use_scaling=True):
+ *         int use_scaling=True, Long1D band_lows=None, Long1D band_highs=None):
  * 
  */
       __pyx_v_local = ((int)0);
@@ -3021,22 +3054,34 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
       /* "cogent/align/_pairwise_seqs.pyx":40
  *         Double2D xgap_scores, Double2D ygap_scores, Double3D match_scores,
  *         rows, UChar3D track, track_enc, int viterbi, int use_logs=0, int local=False,
- *         int use_scaling=True):             # <<<<<<<<<<<<<<
+ *         int use_scaling=True, Long1D band_lows=None, Long1D band_highs=None):             # <<<<<<<<<<<<<<
  * 
  *     """The faster, sequence only (no POG) version.  Forward or Viterbi
  */
       __pyx_v_use_scaling = ((int)1);
     }
+    if (values[20]) {
+      __pyx_v_band_lows = __Pyx_PyObject_to_MemoryviewSlice_dc_long(values[20]); if (unlikely(!__pyx_v_band_lows.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 40; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    } else {
+      __pyx_v_band_lows = __pyx_k__8;
+      __PYX_INC_MEMVIEW(&__pyx_v_band_lows, 1);
+    }
+    if (values[21]) {
+      __pyx_v_band_highs = __Pyx_PyObject_to_MemoryviewSlice_dc_long(values[21]); if (unlikely(!__pyx_v_band_highs.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 40; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+    } else {
+      __pyx_v_band_highs = __pyx_k__9;
+      __PYX_INC_MEMVIEW(&__pyx_v_band_highs, 1);
+    }
   }
   goto __pyx_L4_argument_unpacking_done;
   __pyx_L5_argtuple_error:;
-  __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 20, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
+  __Pyx_RaiseArgtupleInvalid("calc_rows", 0, 17, 22, PyTuple_GET_SIZE(__pyx_args)); {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L3_error;}
   __pyx_L3_error:;
   __Pyx_AddTraceback("cogent.align._pairwise_seqs.calc_rows", __pyx_clineno, __pyx_lineno, __pyx_filename);
   __Pyx_RefNannyFinishContext();
   return NULL;
   __pyx_L4_argument_unpacking_done:;
-  __pyx_r = __pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(__pyx_self, __pyx_v_plan, __pyx_v_seq1_index, __pyx_v_seq2_index, __pyx_v_i_low, __pyx_v_i_high, __pyx_v_j_low, __pyx_v_j_high, __pyx_v_preds, __pyx_v_state_directions, __pyx_v_T, __pyx_v_xgap_scores, __pyx_v_ygap_scores, __pyx_v_match_scores, __pyx_v_rows, __pyx_v_track, __pyx_v_track_enc, __pyx_v_viterbi, __pyx_v_use_logs, __pyx_v_local, __pyx_v_use_scaling);
+  __pyx_r = __pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(__pyx_self, __pyx_v_plan, __pyx_v_seq1_index, __pyx_v_seq2_index, __pyx_v_i_low, __pyx_v_i_high, __pyx_v_j_low, __pyx_v_j_high, __pyx_v_preds, __pyx_v_state_directions, __pyx_v_T, __pyx_v_xgap_scores, __pyx_v_ygap_scores, __pyx_v_match_scores, __pyx_v_rows, __pyx_v_track, __pyx_v_track_enc, __pyx_v_viterbi, __pyx_v_use_logs, __pyx_v_local, __pyx_v_use_scaling, __pyx_v_band_lows, __pyx_v_band_highs);
 
   /* "cogent/align/_pairwise_seqs.pyx":35
  * ctypedef unsigned char [:,:,::1] UChar3D
@@ -3051,7 +3096,7 @@ static PyObject *__pyx_pw_6cogent_5align_14_pairwise_seqs_3calc_rows(PyObject *_
   return __pyx_r;
 }
 
-static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUSED PyObject *__pyx_self, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_plan, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq1_index, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq2_index, int __pyx_v_i_low, int __pyx_v_i_high, int __pyx_v_j_low, int __pyx_v_j_high, CYTHON_UNUSED PyObject *__pyx_v_preds, __pyx_t_6cogent_5align_14_pairwise_seqs_Long2D __pyx_v_state_directions, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_T, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_xgap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_ygap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double3D __pyx_v_match_scores, PyObject *__pyx_v_rows, __pyx_t_6cogent_5align_14_pairwise_seqs_UChar3D __pyx_v_track, PyObject *__pyx_v_track_enc, int __pyx_v_viterbi, int __pyx_v_use_logs, int __pyx_v_local, int __pyx_v_use_scaling) {
+static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUSED PyObject *__pyx_self, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_plan, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq1_index, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_seq2_index, int __pyx_v_i_low, int __pyx_v_i_high, int __pyx_v_j_low, int __pyx_v_j_high, CYTHON_UNUSED PyObject *__pyx_v_preds, __pyx_t_6cogent_5align_14_pairwise_seqs_Long2D __pyx_v_state_directions, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_T, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_xgap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double2D __pyx_v_ygap_scores, __pyx_t_6cogent_5align_14_pairwise_seqs_Double3D __pyx_v_match_scores, PyObject *__pyx_v_rows, __pyx_t_6cogent_5align_14_pairwise_seqs_UChar3D __pyx_v_track, PyObject *__pyx_v_track_enc, int __pyx_v_viterbi, int __pyx_v_use_logs, int __pyx_v_local, int __pyx_v_use_scaling, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_band_lows, __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_v_band_highs) {
   int __pyx_v_prev_j;
   int __pyx_v_state;
   int __pyx_v_prev_state;
@@ -3079,6 +3124,12 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   int __pyx_v_current_row_index;
   int __pyx_v_source_row_index;
   int __pyx_v_source_i;
+  int __pyx_v_banded;
+  int __pyx_v_track_width;
+  int __pyx_v_track_offset;
+  int __pyx_v_row_j_low;
+  int __pyx_v_row_j_high;
+  int __pyx_v_in_band;
   int __pyx_v_dx;
   int __pyx_v_dy;
   int __pyx_v_tcode_x;
@@ -3108,22 +3159,22 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   Py_ssize_t __pyx_t_4;
   long __pyx_t_5;
   Py_ssize_t __pyx_t_6;
-  PyObject *__pyx_t_7 = NULL;
-  PyObject *__pyx_t_8 = NULL;
-  PyObject *__pyx_t_9 = NULL;
-  PyObject *(*__pyx_t_10)(PyObject *);
-  __pyx_t_6cogent_5align_14_pairwise_seqs_Double3D __pyx_t_11 = { 0, 0, { 0 }, { 0 }, { 0 } };
-  __pyx_t_6cogent_5align_14_pairwise_seqs_Long3D __pyx_t_12 = { 0, 0, { 0 }, { 0 }, { 0 } };
-  int __pyx_t_13;
-  PyObject *__pyx_t_14 = NULL;
-  int __pyx_t_15;
+  Py_ssize_t __pyx_t_7;
+  Py_ssize_t __pyx_t_8;
+  long __pyx_t_9;
+  PyObject *__pyx_t_10 = NULL;
+  PyObject *__pyx_t_11 = NULL;
+  PyObject *__pyx_t_12 = NULL;
+  PyObject *(*__pyx_t_13)(PyObject *);
+  __pyx_t_6cogent_5align_14_pairwise_seqs_Double3D __pyx_t_14 = { 0, 0, { 0 }, { 0 }, { 0 } };
+  __pyx_t_6cogent_5align_14_pairwise_seqs_Long3D __pyx_t_15 = { 0, 0, { 0 }, { 0 }, { 0 } };
   int __pyx_t_16;
-  __pyx_t_6cogent_5align_14_pairwise_seqs_UChar3D __pyx_t_17 = { 0, 0, { 0 }, { 0 }, { 0 } };
+  Py_ssize_t __pyx_t_17;
   Py_ssize_t __pyx_t_18;
-  Py_ssize_t __pyx_t_19;
-  Py_ssize_t __pyx_t_20;
-  Py_ssize_t __pyx_t_21;
-  Py_ssize_t __pyx_t_22;
+  PyObject *__pyx_t_19 = NULL;
+  int __pyx_t_20;
+  int __pyx_t_21;
+  __pyx_t_6cogent_5align_14_pairwise_seqs_UChar3D __pyx_t_22 = { 0, 0, { 0 }, { 0 }, { 0 } };
   Py_ssize_t __pyx_t_23;
   Py_ssize_t __pyx_t_24;
   Py_ssize_t __pyx_t_25;
@@ -3132,21 +3183,21 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   Py_ssize_t __pyx_t_28;
   Py_ssize_t __pyx_t_29;
   Py_ssize_t __pyx_t_30;
-  double __pyx_t_31;
-  int __pyx_t_32;
+  Py_ssize_t __pyx_t_31;
+  Py_ssize_t __pyx_t_32;
   Py_ssize_t __pyx_t_33;
   Py_ssize_t __pyx_t_34;
   Py_ssize_t __pyx_t_35;
   Py_ssize_t __pyx_t_36;
-  Py_ssize_t __pyx_t_37;
+  int __pyx_t_37;
   Py_ssize_t __pyx_t_38;
   Py_ssize_t __pyx_t_39;
   Py_ssize_t __pyx_t_40;
   Py_ssize_t __pyx_t_41;
-  Py_ssize_t __pyx_t_42;
-  PyObject *__pyx_t_43 = NULL;
+  double __pyx_t_42;
+  Py_ssize_t __pyx_t_43;
   Py_ssize_t __pyx_t_44;
-  PyObject *__pyx_t_45 = NULL;
+  Py_ssize_t __pyx_t_45;
   Py_ssize_t __pyx_t_46;
   Py_ssize_t __pyx_t_47;
   Py_ssize_t __pyx_t_48;
@@ -3154,9 +3205,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   Py_ssize_t __pyx_t_50;
   Py_ssize_t __pyx_t_51;
   Py_ssize_t __pyx_t_52;
-  Py_ssize_t __pyx_t_53;
+  PyObject *__pyx_t_53 = NULL;
   Py_ssize_t __pyx_t_54;
-  Py_ssize_t __pyx_t_55;
+  PyObject *__pyx_t_55 = NULL;
   Py_ssize_t __pyx_t_56;
   Py_ssize_t __pyx_t_57;
   Py_ssize_t __pyx_t_58;
@@ -3171,12 +3222,22 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   Py_ssize_t __pyx_t_67;
   Py_ssize_t __pyx_t_68;
   Py_ssize_t __pyx_t_69;
+  Py_ssize_t __pyx_t_70;
+  Py_ssize_t __pyx_t_71;
+  Py_ssize_t __pyx_t_72;
+  Py_ssize_t __pyx_t_73;
+  Py_ssize_t __pyx_t_74;
+  Py_ssize_t __pyx_t_75;
+  Py_ssize_t __pyx_t_76;
+  Py_ssize_t __pyx_t_77;
+  Py_ssize_t __pyx_t_78;
+  Py_ssize_t __pyx_t_79;
   int __pyx_lineno = 0;
   const char *__pyx_filename = NULL;
   int __pyx_clineno = 0;
   __Pyx_RefNannySetupContext("calc_rows", 0);
 
-  /* "cogent/align/_pairwise_seqs.pyx":70
+  /* "cogent/align/_pairwise_seqs.pyx":75
  *     cdef long pointer_a, pointer_b, pointer_state
  * 
  *     assert not (use_logs and not viterbi)             # <<<<<<<<<<<<<<
@@ -3196,12 +3257,12 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     __pyx_L3_bool_binop_done:;
     if (unlikely(!((!__pyx_t_1) != 0))) {
       PyErr_SetNone(PyExc_AssertionError);
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 70; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 75; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
   }
   #endif
 
-  /* "cogent/align/_pairwise_seqs.pyx":71
+  /* "cogent/align/_pairwise_seqs.pyx":76
  * 
  *     assert not (use_logs and not viterbi)
  *     assert not (use_logs and use_scaling)             # <<<<<<<<<<<<<<
@@ -3221,12 +3282,12 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     __pyx_L5_bool_binop_done:;
     if (unlikely(!((!__pyx_t_1) != 0))) {
       PyErr_SetNone(PyExc_AssertionError);
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 71; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 76; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
   }
   #endif
 
-  /* "cogent/align/_pairwise_seqs.pyx":72
+  /* "cogent/align/_pairwise_seqs.pyx":77
  *     assert not (use_logs and not viterbi)
  *     assert not (use_logs and use_scaling)
  *     assert not (local and not viterbi)             # <<<<<<<<<<<<<<
@@ -3246,12 +3307,12 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     __pyx_L7_bool_binop_done:;
     if (unlikely(!((!__pyx_t_1) != 0))) {
       PyErr_SetNone(PyExc_AssertionError);
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 72; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 77; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
   }
   #endif
 
-  /* "cogent/align/_pairwise_seqs.pyx":74
+  /* "cogent/align/_pairwise_seqs.pyx":79
  *     assert not (local and not viterbi)
  * 
  *     N = 0             # <<<<<<<<<<<<<<
@@ -3260,16 +3321,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_N = 0;
 
-  /* "cogent/align/_pairwise_seqs.pyx":75
+  /* "cogent/align/_pairwise_seqs.pyx":80
  * 
  *     N = 0
  *     checkArray2D(T, &N, &N)             # <<<<<<<<<<<<<<
  *     row_length = 0
  *     row_count = 0
  */
-  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_T, (&__pyx_v_N), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 75; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_T, (&__pyx_v_N), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 80; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":76
+  /* "cogent/align/_pairwise_seqs.pyx":81
  *     N = 0
  *     checkArray2D(T, &N, &N)
  *     row_length = 0             # <<<<<<<<<<<<<<
@@ -3278,7 +3339,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_row_length = 0;
 
-  /* "cogent/align/_pairwise_seqs.pyx":77
+  /* "cogent/align/_pairwise_seqs.pyx":82
  *     checkArray2D(T, &N, &N)
  *     row_length = 0
  *     row_count = 0             # <<<<<<<<<<<<<<
@@ -3287,16 +3348,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_row_count = 0;
 
-  /* "cogent/align/_pairwise_seqs.pyx":78
+  /* "cogent/align/_pairwise_seqs.pyx":83
  *     row_length = 0
  *     row_count = 0
  *     checkArray1D(plan, &row_count)             # <<<<<<<<<<<<<<
  * 
  *     dest_states = 0
  */
-  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_plan, (&__pyx_v_row_count)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 78; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_plan, (&__pyx_v_row_count)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 83; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":80
+  /* "cogent/align/_pairwise_seqs.pyx":85
  *     checkArray1D(plan, &row_count)
  * 
  *     dest_states = 0             # <<<<<<<<<<<<<<
@@ -3305,7 +3366,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_dest_states = 0;
 
-  /* "cogent/align/_pairwise_seqs.pyx":81
+  /* "cogent/align/_pairwise_seqs.pyx":86
  * 
  *     dest_states = 0
  *     d4 = 4             # <<<<<<<<<<<<<<
@@ -3314,34 +3375,34 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_d4 = 4;
 
-  /* "cogent/align/_pairwise_seqs.pyx":83
+  /* "cogent/align/_pairwise_seqs.pyx":88
  *     d4 = 4
  *     # Array of (state, bin, dx, dy) tuples describing the HMM states.
  *     checkArray2D(state_directions, &dest_states, &d4)             # <<<<<<<<<<<<<<
  * 
  *     checkArray1D(seq1_index, &row_count)
  */
-  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_state_directions, (&__pyx_v_dest_states), (&__pyx_v_d4)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 83; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_state_directions, (&__pyx_v_dest_states), (&__pyx_v_d4)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 88; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":85
+  /* "cogent/align/_pairwise_seqs.pyx":90
  *     checkArray2D(state_directions, &dest_states, &d4)
  * 
  *     checkArray1D(seq1_index, &row_count)             # <<<<<<<<<<<<<<
  *     checkArray1D(seq2_index, &row_length)
  * 
  */
-  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_seq1_index, (&__pyx_v_row_count)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 85; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_seq1_index, (&__pyx_v_row_count)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 90; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":86
+  /* "cogent/align/_pairwise_seqs.pyx":91
  * 
  *     checkArray1D(seq1_index, &row_count)
  *     checkArray1D(seq2_index, &row_length)             # <<<<<<<<<<<<<<
  * 
  *     max_x = max_y = bin_count = 0
  */
-  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_seq2_index, (&__pyx_v_row_length)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 86; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_seq2_index, (&__pyx_v_row_length)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 91; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":88
+  /* "cogent/align/_pairwise_seqs.pyx":93
  *     checkArray1D(seq2_index, &row_length)
  * 
  *     max_x = max_y = bin_count = 0             # <<<<<<<<<<<<<<
@@ -3352,34 +3413,34 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_v_max_y = 0;
   __pyx_v_bin_count = 0;
 
-  /* "cogent/align/_pairwise_seqs.pyx":89
+  /* "cogent/align/_pairwise_seqs.pyx":94
  * 
  *     max_x = max_y = bin_count = 0
  *     checkArray3D(match_scores, &bin_count, &max_x, &max_y)             # <<<<<<<<<<<<<<
  *     checkArray2D(xgap_scores, &bin_count, &max_x)
  *     checkArray2D(ygap_scores, &bin_count, &max_y)
  */
-  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_match_scores, (&__pyx_v_bin_count), (&__pyx_v_max_x), (&__pyx_v_max_y)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 89; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_match_scores, (&__pyx_v_bin_count), (&__pyx_v_max_x), (&__pyx_v_max_y)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":90
+  /* "cogent/align/_pairwise_seqs.pyx":95
  *     max_x = max_y = bin_count = 0
  *     checkArray3D(match_scores, &bin_count, &max_x, &max_y)
  *     checkArray2D(xgap_scores, &bin_count, &max_x)             # <<<<<<<<<<<<<<
  *     checkArray2D(ygap_scores, &bin_count, &max_y)
  * 
  */
-  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_xgap_scores, (&__pyx_v_bin_count), (&__pyx_v_max_x)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 90; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_xgap_scores, (&__pyx_v_bin_count), (&__pyx_v_max_x)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 95; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":91
+  /* "cogent/align/_pairwise_seqs.pyx":96
  *     checkArray3D(match_scores, &bin_count, &max_x, &max_y)
  *     checkArray2D(xgap_scores, &bin_count, &max_x)
  *     checkArray2D(ygap_scores, &bin_count, &max_y)             # <<<<<<<<<<<<<<
  * 
  *     for i from 0 <= i < row_count:
  */
-  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_ygap_scores, (&__pyx_v_bin_count), (&__pyx_v_max_y)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 91; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray2D(__pyx_v_ygap_scores, (&__pyx_v_bin_count), (&__pyx_v_max_y)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 96; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":93
+  /* "cogent/align/_pairwise_seqs.pyx":98
  *     checkArray2D(ygap_scores, &bin_count, &max_y)
  * 
  *     for i from 0 <= i < row_count:             # <<<<<<<<<<<<<<
@@ -3389,7 +3450,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_3 = __pyx_v_row_count;
   for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_3; __pyx_v_i++) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":94
+    /* "cogent/align/_pairwise_seqs.pyx":99
  * 
  *     for i from 0 <= i < row_count:
  *         assert 0 <= seq1_index[i] < max_x             # <<<<<<<<<<<<<<
@@ -3406,13 +3467,13 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
       }
       if (unlikely(!(__pyx_t_1 != 0))) {
         PyErr_SetNone(PyExc_AssertionError);
-        {__pyx_filename = __pyx_f[1]; __pyx_lineno = 94; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        {__pyx_filename = __pyx_f[1]; __pyx_lineno = 99; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       }
     }
     #endif
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":95
+  /* "cogent/align/_pairwise_seqs.pyx":100
  *     for i from 0 <= i < row_count:
  *         assert 0 <= seq1_index[i] < max_x
  *     for j from 0 <= j < row_length:             # <<<<<<<<<<<<<<
@@ -3422,7 +3483,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_3 = __pyx_v_row_length;
   for (__pyx_v_j = 0; __pyx_v_j < __pyx_t_3; __pyx_v_j++) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":96
+    /* "cogent/align/_pairwise_seqs.pyx":101
  *         assert 0 <= seq1_index[i] < max_x
  *     for j from 0 <= j < row_length:
  *         assert 0 <= seq2_index[j] < max_y             # <<<<<<<<<<<<<<
@@ -3439,18 +3500,18 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
       }
       if (unlikely(!(__pyx_t_1 != 0))) {
         PyErr_SetNone(PyExc_AssertionError);
-        {__pyx_filename = __pyx_f[1]; __pyx_lineno = 96; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        {__pyx_filename = __pyx_f[1]; __pyx_lineno = 101; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       }
     }
     #endif
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":98
+  /* "cogent/align/_pairwise_seqs.pyx":103
  *         assert 0 <= seq2_index[j] < max_y
  * 
  *     assert j_low >= 0 and j_high > j_low and j_high <= row_length             # <<<<<<<<<<<<<<
  * 
- *     (mantissas, exponents) = rows
+ *     banded = band_lows is not None
  */
   #ifndef CYTHON_WITHOUT_ASSERTIONS
   if (unlikely(!Py_OptimizeFlag)) {
@@ -3471,14 +3532,98 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     __pyx_L13_bool_binop_done:;
     if (unlikely(!__pyx_t_1)) {
       PyErr_SetNone(PyExc_AssertionError);
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 98; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 103; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
   }
   #endif
 
-  /* "cogent/align/_pairwise_seqs.pyx":100
+  /* "cogent/align/_pairwise_seqs.pyx":105
  *     assert j_low >= 0 and j_high > j_low and j_high <= row_length
  * 
+ *     banded = band_lows is not None             # <<<<<<<<<<<<<<
+ *     if banded:
+ *         checkArray1D(band_lows, &row_count)
+ */
+  __pyx_v_banded = (((PyObject *) __pyx_v_band_lows.memview) != Py_None);
+
+  /* "cogent/align/_pairwise_seqs.pyx":106
+ * 
+ *     banded = band_lows is not None
+ *     if banded:             # <<<<<<<<<<<<<<
+ *         checkArray1D(band_lows, &row_count)
+ *         checkArray1D(band_highs, &row_count)
+ */
+  __pyx_t_1 = (__pyx_v_banded != 0);
+  if (__pyx_t_1) {
+
+    /* "cogent/align/_pairwise_seqs.pyx":107
+ *     banded = band_lows is not None
+ *     if banded:
+ *         checkArray1D(band_lows, &row_count)             # <<<<<<<<<<<<<<
+ *         checkArray1D(band_highs, &row_count)
+ *         for i from 0 <= i < row_count:
+ */
+    __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_band_lows, (&__pyx_v_row_count)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 107; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+    /* "cogent/align/_pairwise_seqs.pyx":108
+ *     if banded:
+ *         checkArray1D(band_lows, &row_count)
+ *         checkArray1D(band_highs, &row_count)             # <<<<<<<<<<<<<<
+ *         for i from 0 <= i < row_count:
+ *             assert 0 <= band_lows[i] <= band_highs[i] <= row_length
+ */
+    __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray1D(__pyx_v_band_highs, (&__pyx_v_row_count)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 108; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+    /* "cogent/align/_pairwise_seqs.pyx":109
+ *         checkArray1D(band_lows, &row_count)
+ *         checkArray1D(band_highs, &row_count)
+ *         for i from 0 <= i < row_count:             # <<<<<<<<<<<<<<
+ *             assert 0 <= band_lows[i] <= band_highs[i] <= row_length
+ * 
+ */
+    __pyx_t_3 = __pyx_v_row_count;
+    for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_3; __pyx_v_i++) {
+
+      /* "cogent/align/_pairwise_seqs.pyx":110
+ *         checkArray1D(band_highs, &row_count)
+ *         for i from 0 <= i < row_count:
+ *             assert 0 <= band_lows[i] <= band_highs[i] <= row_length             # <<<<<<<<<<<<<<
+ * 
+ *     (mantissas, exponents) = rows
+ */
+      #ifndef CYTHON_WITHOUT_ASSERTIONS
+      if (unlikely(!Py_OptimizeFlag)) {
+        __pyx_t_7 = __pyx_v_i;
+        __pyx_t_5 = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_lows.data) + __pyx_t_7)) )));
+        __pyx_t_1 = (0 <= __pyx_t_5);
+        if (__pyx_t_1) {
+          __pyx_t_8 = __pyx_v_i;
+          __pyx_t_9 = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_highs.data) + __pyx_t_8)) )));
+          __pyx_t_1 = (__pyx_t_5 <= __pyx_t_9);
+          if (__pyx_t_1) {
+            __pyx_t_1 = (__pyx_t_9 <= __pyx_v_row_length);
+          }
+        }
+        if (unlikely(!(__pyx_t_1 != 0))) {
+          PyErr_SetNone(PyExc_AssertionError);
+          {__pyx_filename = __pyx_f[1]; __pyx_lineno = 110; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        }
+      }
+      #endif
+    }
+
+    /* "cogent/align/_pairwise_seqs.pyx":106
+ * 
+ *     banded = band_lows is not None
+ *     if banded:             # <<<<<<<<<<<<<<
+ *         checkArray1D(band_lows, &row_count)
+ *         checkArray1D(band_highs, &row_count)
+ */
+  }
+
+  /* "cogent/align/_pairwise_seqs.pyx":112
+ *             assert 0 <= band_lows[i] <= band_highs[i] <= row_length
+ * 
  *     (mantissas, exponents) = rows             # <<<<<<<<<<<<<<
  *     tmp_rows = 0
  *     checkArray3D(mantissas, &tmp_rows, &row_length, &N)
@@ -3493,58 +3638,58 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     if (unlikely(size != 2)) {
       if (size > 2) __Pyx_RaiseTooManyValuesError(2);
       else if (size >= 0) __Pyx_RaiseNeedMoreValuesError(size);
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     }
     #if CYTHON_COMPILING_IN_CPYTHON
     if (likely(PyTuple_CheckExact(sequence))) {
-      __pyx_t_7 = PyTuple_GET_ITEM(sequence, 0); 
-      __pyx_t_8 = PyTuple_GET_ITEM(sequence, 1); 
+      __pyx_t_10 = PyTuple_GET_ITEM(sequence, 0); 
+      __pyx_t_11 = PyTuple_GET_ITEM(sequence, 1); 
     } else {
-      __pyx_t_7 = PyList_GET_ITEM(sequence, 0); 
-      __pyx_t_8 = PyList_GET_ITEM(sequence, 1); 
+      __pyx_t_10 = PyList_GET_ITEM(sequence, 0); 
+      __pyx_t_11 = PyList_GET_ITEM(sequence, 1); 
     }
-    __Pyx_INCREF(__pyx_t_7);
-    __Pyx_INCREF(__pyx_t_8);
+    __Pyx_INCREF(__pyx_t_10);
+    __Pyx_INCREF(__pyx_t_11);
     #else
-    __pyx_t_7 = PySequence_ITEM(sequence, 0); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_7);
-    __pyx_t_8 = PySequence_ITEM(sequence, 1); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_8);
+    __pyx_t_10 = PySequence_ITEM(sequence, 0); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_10);
+    __pyx_t_11 = PySequence_ITEM(sequence, 1); if (unlikely(!__pyx_t_11)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_11);
     #endif
   } else {
     Py_ssize_t index = -1;
-    __pyx_t_9 = PyObject_GetIter(__pyx_v_rows); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_GOTREF(__pyx_t_9);
-    __pyx_t_10 = Py_TYPE(__pyx_t_9)->tp_iternext;
-    index = 0; __pyx_t_7 = __pyx_t_10(__pyx_t_9); if (unlikely(!__pyx_t_7)) goto __pyx_L16_unpacking_failed;
-    __Pyx_GOTREF(__pyx_t_7);
-    index = 1; __pyx_t_8 = __pyx_t_10(__pyx_t_9); if (unlikely(!__pyx_t_8)) goto __pyx_L16_unpacking_failed;
-    __Pyx_GOTREF(__pyx_t_8);
-    if (__Pyx_IternextUnpackEndCheck(__pyx_t_10(__pyx_t_9), 2) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __pyx_t_10 = NULL;
-    __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-    goto __pyx_L17_unpacking_done;
-    __pyx_L16_unpacking_failed:;
-    __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-    __pyx_t_10 = NULL;
+    __pyx_t_12 = PyObject_GetIter(__pyx_v_rows); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_GOTREF(__pyx_t_12);
+    __pyx_t_13 = Py_TYPE(__pyx_t_12)->tp_iternext;
+    index = 0; __pyx_t_10 = __pyx_t_13(__pyx_t_12); if (unlikely(!__pyx_t_10)) goto __pyx_L19_unpacking_failed;
+    __Pyx_GOTREF(__pyx_t_10);
+    index = 1; __pyx_t_11 = __pyx_t_13(__pyx_t_12); if (unlikely(!__pyx_t_11)) goto __pyx_L19_unpacking_failed;
+    __Pyx_GOTREF(__pyx_t_11);
+    if (__Pyx_IternextUnpackEndCheck(__pyx_t_13(__pyx_t_12), 2) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_13 = NULL;
+    __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+    goto __pyx_L20_unpacking_done;
+    __pyx_L19_unpacking_failed:;
+    __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+    __pyx_t_13 = NULL;
     if (__Pyx_IterFinish() == 0) __Pyx_RaiseNeedMoreValuesError(index);
-    {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __pyx_L17_unpacking_done:;
+    {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_L20_unpacking_done:;
   }
-  __pyx_t_11 = __Pyx_PyObject_to_MemoryviewSlice_d_d_dc_double(__pyx_t_7);
-  if (unlikely(!__pyx_t_11.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-  __pyx_t_12 = __Pyx_PyObject_to_MemoryviewSlice_d_d_dc_long(__pyx_t_8);
-  if (unlikely(!__pyx_t_12.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 100; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_DECREF(__pyx_t_8); __pyx_t_8 = 0;
-  __pyx_v_mantissas = __pyx_t_11;
-  __pyx_t_11.memview = NULL;
-  __pyx_t_11.data = NULL;
-  __pyx_v_exponents = __pyx_t_12;
-  __pyx_t_12.memview = NULL;
-  __pyx_t_12.data = NULL;
-
-  /* "cogent/align/_pairwise_seqs.pyx":101
+  __pyx_t_14 = __Pyx_PyObject_to_MemoryviewSlice_d_d_dc_double(__pyx_t_10);
+  if (unlikely(!__pyx_t_14.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+  __pyx_t_15 = __Pyx_PyObject_to_MemoryviewSlice_d_d_dc_long(__pyx_t_11);
+  if (unlikely(!__pyx_t_15.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 112; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_DECREF(__pyx_t_11); __pyx_t_11 = 0;
+  __pyx_v_mantissas = __pyx_t_14;
+  __pyx_t_14.memview = NULL;
+  __pyx_t_14.data = NULL;
+  __pyx_v_exponents = __pyx_t_15;
+  __pyx_t_15.memview = NULL;
+  __pyx_t_15.data = NULL;
+
+  /* "cogent/align/_pairwise_seqs.pyx":113
  * 
  *     (mantissas, exponents) = rows
  *     tmp_rows = 0             # <<<<<<<<<<<<<<
@@ -3553,16 +3698,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_tmp_rows = 0;
 
-  /* "cogent/align/_pairwise_seqs.pyx":102
+  /* "cogent/align/_pairwise_seqs.pyx":114
  *     (mantissas, exponents) = rows
  *     tmp_rows = 0
  *     checkArray3D(mantissas, &tmp_rows, &row_length, &N)             # <<<<<<<<<<<<<<
  *     if use_scaling:
  *         checkArray3D(exponents, &tmp_rows, &row_length, &N)
  */
-  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_mantissas, (&__pyx_v_tmp_rows), (&__pyx_v_row_length), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 102; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_3 = __pyx_fuse_0_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_mantissas, (&__pyx_v_tmp_rows), (&__pyx_v_row_length), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-  /* "cogent/align/_pairwise_seqs.pyx":103
+  /* "cogent/align/_pairwise_seqs.pyx":115
  *     tmp_rows = 0
  *     checkArray3D(mantissas, &tmp_rows, &row_length, &N)
  *     if use_scaling:             # <<<<<<<<<<<<<<
@@ -3572,16 +3717,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_1 = (__pyx_v_use_scaling != 0);
   if (__pyx_t_1) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":104
+    /* "cogent/align/_pairwise_seqs.pyx":116
  *     checkArray3D(mantissas, &tmp_rows, &row_length, &N)
  *     if use_scaling:
  *         checkArray3D(exponents, &tmp_rows, &row_length, &N)             # <<<<<<<<<<<<<<
  * 
  *     cdef double impossible
  */
-    __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_exponents, (&__pyx_v_tmp_rows), (&__pyx_v_row_length), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 104; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_3 = __pyx_fuse_1_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_exponents, (&__pyx_v_tmp_rows), (&__pyx_v_row_length), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 116; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-    /* "cogent/align/_pairwise_seqs.pyx":103
+    /* "cogent/align/_pairwise_seqs.pyx":115
  *     tmp_rows = 0
  *     checkArray3D(mantissas, &tmp_rows, &row_length, &N)
  *     if use_scaling:             # <<<<<<<<<<<<<<
@@ -3590,7 +3735,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":107
+  /* "cogent/align/_pairwise_seqs.pyx":119
  * 
  *     cdef double impossible
  *     if use_logs:             # <<<<<<<<<<<<<<
@@ -3600,7 +3745,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_1 = (__pyx_v_use_logs != 0);
   if (__pyx_t_1) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":108
+    /* "cogent/align/_pairwise_seqs.pyx":120
  *     cdef double impossible
  *     if use_logs:
  *         impossible = log(0.0) # -inf             # <<<<<<<<<<<<<<
@@ -3609,17 +3754,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_impossible = log(0.0);
 
-    /* "cogent/align/_pairwise_seqs.pyx":107
+    /* "cogent/align/_pairwise_seqs.pyx":119
  * 
  *     cdef double impossible
  *     if use_logs:             # <<<<<<<<<<<<<<
  *         impossible = log(0.0) # -inf
  *     else:
  */
-    goto __pyx_L19;
+    goto __pyx_L22;
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":110
+  /* "cogent/align/_pairwise_seqs.pyx":122
  *         impossible = log(0.0) # -inf
  *     else:
  *         impossible = 0.0             # <<<<<<<<<<<<<<
@@ -3629,45 +3774,130 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   /*else*/ {
     __pyx_v_impossible = 0.0;
   }
-  __pyx_L19:;
+  __pyx_L22:;
 
-  /* "cogent/align/_pairwise_seqs.pyx":112
+  /* "cogent/align/_pairwise_seqs.pyx":124
  *         impossible = 0.0
  * 
  *     if viterbi and track is not None and track_enc is not None:             # <<<<<<<<<<<<<<
- *         checkArray3D(track, &row_count, &row_length, &N)
- *         (tcode_x, tcode_y, tcode_s) = track_enc
+ *         track_width = row_length
+ *         if banded:
  */
   __pyx_t_2 = (__pyx_v_viterbi != 0);
   if (__pyx_t_2) {
   } else {
     __pyx_t_1 = __pyx_t_2;
-    goto __pyx_L21_bool_binop_done;
+    goto __pyx_L24_bool_binop_done;
   }
   __pyx_t_2 = ((((PyObject *) __pyx_v_track.memview) != Py_None) != 0);
   if (__pyx_t_2) {
   } else {
     __pyx_t_1 = __pyx_t_2;
-    goto __pyx_L21_bool_binop_done;
+    goto __pyx_L24_bool_binop_done;
   }
   __pyx_t_2 = (__pyx_v_track_enc != Py_None);
-  __pyx_t_13 = (__pyx_t_2 != 0);
-  __pyx_t_1 = __pyx_t_13;
-  __pyx_L21_bool_binop_done:;
+  __pyx_t_16 = (__pyx_t_2 != 0);
+  __pyx_t_1 = __pyx_t_16;
+  __pyx_L24_bool_binop_done:;
   if (__pyx_t_1) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":113
+    /* "cogent/align/_pairwise_seqs.pyx":125
  * 
  *     if viterbi and track is not None and track_enc is not None:
- *         checkArray3D(track, &row_count, &row_length, &N)             # <<<<<<<<<<<<<<
+ *         track_width = row_length             # <<<<<<<<<<<<<<
+ *         if banded:
+ *             track_width = 0
+ */
+    __pyx_v_track_width = __pyx_v_row_length;
+
+    /* "cogent/align/_pairwise_seqs.pyx":126
+ *     if viterbi and track is not None and track_enc is not None:
+ *         track_width = row_length
+ *         if banded:             # <<<<<<<<<<<<<<
+ *             track_width = 0
+ *         checkArray3D(track, &row_count, &track_width, &N)
+ */
+    __pyx_t_1 = (__pyx_v_banded != 0);
+    if (__pyx_t_1) {
+
+      /* "cogent/align/_pairwise_seqs.pyx":127
+ *         track_width = row_length
+ *         if banded:
+ *             track_width = 0             # <<<<<<<<<<<<<<
+ *         checkArray3D(track, &row_count, &track_width, &N)
+ *         if banded:
+ */
+      __pyx_v_track_width = 0;
+
+      /* "cogent/align/_pairwise_seqs.pyx":126
+ *     if viterbi and track is not None and track_enc is not None:
+ *         track_width = row_length
+ *         if banded:             # <<<<<<<<<<<<<<
+ *             track_width = 0
+ *         checkArray3D(track, &row_count, &track_width, &N)
+ */
+    }
+
+    /* "cogent/align/_pairwise_seqs.pyx":128
+ *         if banded:
+ *             track_width = 0
+ *         checkArray3D(track, &row_count, &track_width, &N)             # <<<<<<<<<<<<<<
+ *         if banded:
+ *             for i from 0 <= i < row_count:
+ */
+    __pyx_t_3 = __pyx_fuse_2_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_track, (&__pyx_v_row_count), (&__pyx_v_track_width), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 128; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+    /* "cogent/align/_pairwise_seqs.pyx":129
+ *             track_width = 0
+ *         checkArray3D(track, &row_count, &track_width, &N)
+ *         if banded:             # <<<<<<<<<<<<<<
+ *             for i from 0 <= i < row_count:
+ *                 assert band_highs[i] - band_lows[i] <= track_width
+ */
+    __pyx_t_1 = (__pyx_v_banded != 0);
+    if (__pyx_t_1) {
+
+      /* "cogent/align/_pairwise_seqs.pyx":130
+ *         checkArray3D(track, &row_count, &track_width, &N)
+ *         if banded:
+ *             for i from 0 <= i < row_count:             # <<<<<<<<<<<<<<
+ *                 assert band_highs[i] - band_lows[i] <= track_width
+ *         (tcode_x, tcode_y, tcode_s) = track_enc
+ */
+      __pyx_t_3 = __pyx_v_row_count;
+      for (__pyx_v_i = 0; __pyx_v_i < __pyx_t_3; __pyx_v_i++) {
+
+        /* "cogent/align/_pairwise_seqs.pyx":131
+ *         if banded:
+ *             for i from 0 <= i < row_count:
+ *                 assert band_highs[i] - band_lows[i] <= track_width             # <<<<<<<<<<<<<<
  *         (tcode_x, tcode_y, tcode_s) = track_enc
  *     else:
  */
-    __pyx_t_3 = __pyx_fuse_2_2__pyx_f_6cogent_5align_14_pairwise_seqs_checkArray3D(__pyx_v_track, (&__pyx_v_row_count), (&__pyx_v_row_length), (&__pyx_v_N)); if (unlikely(__pyx_t_3 == 1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 113; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        #ifndef CYTHON_WITHOUT_ASSERTIONS
+        if (unlikely(!Py_OptimizeFlag)) {
+          __pyx_t_17 = __pyx_v_i;
+          __pyx_t_18 = __pyx_v_i;
+          if (unlikely(!((((*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_highs.data) + __pyx_t_17)) ))) - (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_lows.data) + __pyx_t_18)) )))) <= __pyx_v_track_width) != 0))) {
+            PyErr_SetNone(PyExc_AssertionError);
+            {__pyx_filename = __pyx_f[1]; __pyx_lineno = 131; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+          }
+        }
+        #endif
+      }
+
+      /* "cogent/align/_pairwise_seqs.pyx":129
+ *             track_width = 0
+ *         checkArray3D(track, &row_count, &track_width, &N)
+ *         if banded:             # <<<<<<<<<<<<<<
+ *             for i from 0 <= i < row_count:
+ *                 assert band_highs[i] - band_lows[i] <= track_width
+ */
+    }
 
-    /* "cogent/align/_pairwise_seqs.pyx":114
- *     if viterbi and track is not None and track_enc is not None:
- *         checkArray3D(track, &row_count, &row_length, &N)
+    /* "cogent/align/_pairwise_seqs.pyx":132
+ *             for i from 0 <= i < row_count:
+ *                 assert band_highs[i] - band_lows[i] <= track_width
  *         (tcode_x, tcode_y, tcode_s) = track_enc             # <<<<<<<<<<<<<<
  *     else:
  *         track = None
@@ -3682,72 +3912,72 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
       if (unlikely(size != 3)) {
         if (size > 3) __Pyx_RaiseTooManyValuesError(3);
         else if (size >= 0) __Pyx_RaiseNeedMoreValuesError(size);
-        {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       }
       #if CYTHON_COMPILING_IN_CPYTHON
       if (likely(PyTuple_CheckExact(sequence))) {
-        __pyx_t_8 = PyTuple_GET_ITEM(sequence, 0); 
-        __pyx_t_7 = PyTuple_GET_ITEM(sequence, 1); 
-        __pyx_t_9 = PyTuple_GET_ITEM(sequence, 2); 
+        __pyx_t_11 = PyTuple_GET_ITEM(sequence, 0); 
+        __pyx_t_10 = PyTuple_GET_ITEM(sequence, 1); 
+        __pyx_t_12 = PyTuple_GET_ITEM(sequence, 2); 
       } else {
-        __pyx_t_8 = PyList_GET_ITEM(sequence, 0); 
-        __pyx_t_7 = PyList_GET_ITEM(sequence, 1); 
-        __pyx_t_9 = PyList_GET_ITEM(sequence, 2); 
+        __pyx_t_11 = PyList_GET_ITEM(sequence, 0); 
+        __pyx_t_10 = PyList_GET_ITEM(sequence, 1); 
+        __pyx_t_12 = PyList_GET_ITEM(sequence, 2); 
       }
-      __Pyx_INCREF(__pyx_t_8);
-      __Pyx_INCREF(__pyx_t_7);
-      __Pyx_INCREF(__pyx_t_9);
+      __Pyx_INCREF(__pyx_t_11);
+      __Pyx_INCREF(__pyx_t_10);
+      __Pyx_INCREF(__pyx_t_12);
       #else
-      __pyx_t_8 = PySequence_ITEM(sequence, 0); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_8);
-      __pyx_t_7 = PySequence_ITEM(sequence, 1); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_7);
-      __pyx_t_9 = PySequence_ITEM(sequence, 2); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_9);
+      __pyx_t_11 = PySequence_ITEM(sequence, 0); if (unlikely(!__pyx_t_11)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __Pyx_GOTREF(__pyx_t_11);
+      __pyx_t_10 = PySequence_ITEM(sequence, 1); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __Pyx_GOTREF(__pyx_t_10);
+      __pyx_t_12 = PySequence_ITEM(sequence, 2); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __Pyx_GOTREF(__pyx_t_12);
       #endif
     } else {
       Py_ssize_t index = -1;
-      __pyx_t_14 = PyObject_GetIter(__pyx_v_track_enc); if (unlikely(!__pyx_t_14)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_14);
-      __pyx_t_10 = Py_TYPE(__pyx_t_14)->tp_iternext;
-      index = 0; __pyx_t_8 = __pyx_t_10(__pyx_t_14); if (unlikely(!__pyx_t_8)) goto __pyx_L24_unpacking_failed;
-      __Pyx_GOTREF(__pyx_t_8);
-      index = 1; __pyx_t_7 = __pyx_t_10(__pyx_t_14); if (unlikely(!__pyx_t_7)) goto __pyx_L24_unpacking_failed;
-      __Pyx_GOTREF(__pyx_t_7);
-      index = 2; __pyx_t_9 = __pyx_t_10(__pyx_t_14); if (unlikely(!__pyx_t_9)) goto __pyx_L24_unpacking_failed;
-      __Pyx_GOTREF(__pyx_t_9);
-      if (__Pyx_IternextUnpackEndCheck(__pyx_t_10(__pyx_t_14), 3) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __pyx_t_10 = NULL;
-      __Pyx_DECREF(__pyx_t_14); __pyx_t_14 = 0;
-      goto __pyx_L25_unpacking_done;
-      __pyx_L24_unpacking_failed:;
-      __Pyx_DECREF(__pyx_t_14); __pyx_t_14 = 0;
-      __pyx_t_10 = NULL;
+      __pyx_t_19 = PyObject_GetIter(__pyx_v_track_enc); if (unlikely(!__pyx_t_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __Pyx_GOTREF(__pyx_t_19);
+      __pyx_t_13 = Py_TYPE(__pyx_t_19)->tp_iternext;
+      index = 0; __pyx_t_11 = __pyx_t_13(__pyx_t_19); if (unlikely(!__pyx_t_11)) goto __pyx_L31_unpacking_failed;
+      __Pyx_GOTREF(__pyx_t_11);
+      index = 1; __pyx_t_10 = __pyx_t_13(__pyx_t_19); if (unlikely(!__pyx_t_10)) goto __pyx_L31_unpacking_failed;
+      __Pyx_GOTREF(__pyx_t_10);
+      index = 2; __pyx_t_12 = __pyx_t_13(__pyx_t_19); if (unlikely(!__pyx_t_12)) goto __pyx_L31_unpacking_failed;
+      __Pyx_GOTREF(__pyx_t_12);
+      if (__Pyx_IternextUnpackEndCheck(__pyx_t_13(__pyx_t_19), 3) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_13 = NULL;
+      __Pyx_DECREF(__pyx_t_19); __pyx_t_19 = 0;
+      goto __pyx_L32_unpacking_done;
+      __pyx_L31_unpacking_failed:;
+      __Pyx_DECREF(__pyx_t_19); __pyx_t_19 = 0;
+      __pyx_t_13 = NULL;
       if (__Pyx_IterFinish() == 0) __Pyx_RaiseNeedMoreValuesError(index);
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __pyx_L25_unpacking_done:;
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_L32_unpacking_done:;
     }
-    __pyx_t_3 = __Pyx_PyInt_As_int(__pyx_t_8); if (unlikely((__pyx_t_3 == (int)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_DECREF(__pyx_t_8); __pyx_t_8 = 0;
-    __pyx_t_15 = __Pyx_PyInt_As_int(__pyx_t_7); if (unlikely((__pyx_t_15 == (int)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-    __pyx_t_16 = __Pyx_PyInt_As_int(__pyx_t_9); if (unlikely((__pyx_t_16 == (int)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 114; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-    __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
+    __pyx_t_3 = __Pyx_PyInt_As_int(__pyx_t_11); if (unlikely((__pyx_t_3 == (int)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_DECREF(__pyx_t_11); __pyx_t_11 = 0;
+    __pyx_t_20 = __Pyx_PyInt_As_int(__pyx_t_10); if (unlikely((__pyx_t_20 == (int)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+    __pyx_t_21 = __Pyx_PyInt_As_int(__pyx_t_12); if (unlikely((__pyx_t_21 == (int)-1) && PyErr_Occurred())) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
     __pyx_v_tcode_x = __pyx_t_3;
-    __pyx_v_tcode_y = __pyx_t_15;
-    __pyx_v_tcode_s = __pyx_t_16;
+    __pyx_v_tcode_y = __pyx_t_20;
+    __pyx_v_tcode_s = __pyx_t_21;
 
-    /* "cogent/align/_pairwise_seqs.pyx":112
+    /* "cogent/align/_pairwise_seqs.pyx":124
  *         impossible = 0.0
  * 
  *     if viterbi and track is not None and track_enc is not None:             # <<<<<<<<<<<<<<
- *         checkArray3D(track, &row_count, &row_length, &N)
- *         (tcode_x, tcode_y, tcode_s) = track_enc
+ *         track_width = row_length
+ *         if banded:
  */
-    goto __pyx_L20;
+    goto __pyx_L23;
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":116
+  /* "cogent/align/_pairwise_seqs.pyx":134
  *         (tcode_x, tcode_y, tcode_s) = track_enc
  *     else:
  *         track = None             # <<<<<<<<<<<<<<
@@ -3755,14 +3985,14 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  * 
  */
   /*else*/ {
-    __pyx_t_17 = __Pyx_PyObject_to_MemoryviewSlice_d_d_dc_unsigned_char(Py_None);
-    if (unlikely(!__pyx_t_17.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 116; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_22 = __Pyx_PyObject_to_MemoryviewSlice_d_d_dc_unsigned_char(Py_None);
+    if (unlikely(!__pyx_t_22.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 134; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __PYX_XDEC_MEMVIEW(&__pyx_v_track, 1);
-    __pyx_v_track = __pyx_t_17;
-    __pyx_t_17.memview = NULL;
-    __pyx_t_17.data = NULL;
+    __pyx_v_track = __pyx_t_22;
+    __pyx_t_22.memview = NULL;
+    __pyx_t_22.data = NULL;
 
-    /* "cogent/align/_pairwise_seqs.pyx":117
+    /* "cogent/align/_pairwise_seqs.pyx":135
  *     else:
  *         track = None
  *         tcode_x = tcode_y = tcode_s = 0             # <<<<<<<<<<<<<<
@@ -3773,9 +4003,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     __pyx_v_tcode_y = 0;
     __pyx_v_tcode_s = 0;
   }
-  __pyx_L20:;
+  __pyx_L23:;
 
-  /* "cogent/align/_pairwise_seqs.pyx":120
+  /* "cogent/align/_pairwise_seqs.pyx":138
  * 
  *     # For local
  *     overall_max_exponent = MIN_SCALE             # <<<<<<<<<<<<<<
@@ -3784,47 +4014,56 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
   __pyx_v_overall_max_exponent = __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_SCALE;
 
-  /* "cogent/align/_pairwise_seqs.pyx":121
+  /* "cogent/align/_pairwise_seqs.pyx":139
  *     # For local
  *     overall_max_exponent = MIN_SCALE
  *     overall_max_mantissa = impossible             # <<<<<<<<<<<<<<
  *     last_i = last_j = last_state = -1
- * 
+ *     track_offset = 0
  */
   __pyx_v_overall_max_mantissa = __pyx_v_impossible;
 
-  /* "cogent/align/_pairwise_seqs.pyx":122
+  /* "cogent/align/_pairwise_seqs.pyx":140
  *     overall_max_exponent = MIN_SCALE
  *     overall_max_mantissa = impossible
  *     last_i = last_j = last_state = -1             # <<<<<<<<<<<<<<
+ *     track_offset = 0
  * 
- *     for i from i_low <= i < i_high:
  */
   __pyx_v_last_i = -1;
   __pyx_v_last_j = -1;
   __pyx_v_last_state = -1;
 
-  /* "cogent/align/_pairwise_seqs.pyx":124
+  /* "cogent/align/_pairwise_seqs.pyx":141
+ *     overall_max_mantissa = impossible
  *     last_i = last_j = last_state = -1
+ *     track_offset = 0             # <<<<<<<<<<<<<<
+ * 
+ *     for i from i_low <= i < i_high:
+ */
+  __pyx_v_track_offset = 0;
+
+  /* "cogent/align/_pairwise_seqs.pyx":143
+ *     track_offset = 0
  * 
  *     for i from i_low <= i < i_high:             # <<<<<<<<<<<<<<
  *         x = seq1_index[i]
  * 
  */
-  __pyx_t_16 = __pyx_v_i_high;
-  for (__pyx_v_i = __pyx_v_i_low; __pyx_v_i < __pyx_t_16; __pyx_v_i++) {
+  __pyx_t_21 = __pyx_v_i_high;
+  for (__pyx_v_i = __pyx_v_i_low; __pyx_v_i < __pyx_t_21; __pyx_v_i++) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":125
+    /* "cogent/align/_pairwise_seqs.pyx":144
  * 
  *     for i from i_low <= i < i_high:
  *         x = seq1_index[i]             # <<<<<<<<<<<<<<
  * 
  *         if PyErr_CheckSignals():
  */
-    __pyx_t_18 = __pyx_v_i;
-    __pyx_v_x = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_seq1_index.data) + __pyx_t_18)) )));
+    __pyx_t_23 = __pyx_v_i;
+    __pyx_v_x = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_seq1_index.data) + __pyx_t_23)) )));
 
-    /* "cogent/align/_pairwise_seqs.pyx":127
+    /* "cogent/align/_pairwise_seqs.pyx":146
  *         x = seq1_index[i]
  * 
  *         if PyErr_CheckSignals():             # <<<<<<<<<<<<<<
@@ -3834,20 +4073,20 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
     __pyx_t_1 = (PyErr_CheckSignals() != 0);
     if (__pyx_t_1) {
 
-      /* "cogent/align/_pairwise_seqs.pyx":128
+      /* "cogent/align/_pairwise_seqs.pyx":147
  * 
  *         if PyErr_CheckSignals():
  *             raise PyErr_Occurred()             # <<<<<<<<<<<<<<
  * 
  *         current_row_index = plan[i]
  */
-      __pyx_t_9 = PyErr_Occurred(); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 128; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-      __Pyx_GOTREF(__pyx_t_9);
-      __Pyx_Raise(__pyx_t_9, 0, 0, 0);
-      __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 128; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_12 = PyErr_Occurred(); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 147; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __Pyx_GOTREF(__pyx_t_12);
+      __Pyx_Raise(__pyx_t_12, 0, 0, 0);
+      __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+      {__pyx_filename = __pyx_f[1]; __pyx_lineno = 147; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
-      /* "cogent/align/_pairwise_seqs.pyx":127
+      /* "cogent/align/_pairwise_seqs.pyx":146
  *         x = seq1_index[i]
  * 
  *         if PyErr_CheckSignals():             # <<<<<<<<<<<<<<
@@ -3856,28 +4095,109 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     }
 
-    /* "cogent/align/_pairwise_seqs.pyx":130
+    /* "cogent/align/_pairwise_seqs.pyx":149
  *             raise PyErr_Occurred()
  * 
  *         current_row_index = plan[i]             # <<<<<<<<<<<<<<
  * 
  *         #for prev_state from 1 <= prev_state < N:
  */
-    __pyx_t_19 = __pyx_v_i;
-    __pyx_v_current_row_index = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_plan.data) + __pyx_t_19)) )));
+    __pyx_t_24 = __pyx_v_i;
+    __pyx_v_current_row_index = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_plan.data) + __pyx_t_24)) )));
 
-    /* "cogent/align/_pairwise_seqs.pyx":135
+    /* "cogent/align/_pairwise_seqs.pyx":154
  *         #    current_row_data[0, prev_state] = impossible
  * 
- *         for j from j_low <= j < j_high:             # <<<<<<<<<<<<<<
+ *         row_j_low = j_low             # <<<<<<<<<<<<<<
+ *         row_j_high = j_high
+ *         if banded:
+ */
+    __pyx_v_row_j_low = __pyx_v_j_low;
+
+    /* "cogent/align/_pairwise_seqs.pyx":155
+ * 
+ *         row_j_low = j_low
+ *         row_j_high = j_high             # <<<<<<<<<<<<<<
+ *         if banded:
+ *             row_j_low = max(j_low, band_lows[i])
+ */
+    __pyx_v_row_j_high = __pyx_v_j_high;
+
+    /* "cogent/align/_pairwise_seqs.pyx":156
+ *         row_j_low = j_low
+ *         row_j_high = j_high
+ *         if banded:             # <<<<<<<<<<<<<<
+ *             row_j_low = max(j_low, band_lows[i])
+ *             row_j_high = min(j_high, band_highs[i])
+ */
+    __pyx_t_1 = (__pyx_v_banded != 0);
+    if (__pyx_t_1) {
+
+      /* "cogent/align/_pairwise_seqs.pyx":157
+ *         row_j_high = j_high
+ *         if banded:
+ *             row_j_low = max(j_low, band_lows[i])             # <<<<<<<<<<<<<<
+ *             row_j_high = min(j_high, band_highs[i])
+ *             track_offset = band_lows[i]
+ */
+      __pyx_t_25 = __pyx_v_i;
+      __pyx_t_5 = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_lows.data) + __pyx_t_25)) )));
+      __pyx_t_20 = __pyx_v_j_low;
+      if (((__pyx_t_5 > __pyx_t_20) != 0)) {
+        __pyx_t_9 = __pyx_t_5;
+      } else {
+        __pyx_t_9 = __pyx_t_20;
+      }
+      __pyx_v_row_j_low = __pyx_t_9;
+
+      /* "cogent/align/_pairwise_seqs.pyx":158
+ *         if banded:
+ *             row_j_low = max(j_low, band_lows[i])
+ *             row_j_high = min(j_high, band_highs[i])             # <<<<<<<<<<<<<<
+ *             track_offset = band_lows[i]
+ * 
+ */
+      __pyx_t_26 = __pyx_v_i;
+      __pyx_t_9 = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_highs.data) + __pyx_t_26)) )));
+      __pyx_t_20 = __pyx_v_j_high;
+      if (((__pyx_t_9 < __pyx_t_20) != 0)) {
+        __pyx_t_5 = __pyx_t_9;
+      } else {
+        __pyx_t_5 = __pyx_t_20;
+      }
+      __pyx_v_row_j_high = __pyx_t_5;
+
+      /* "cogent/align/_pairwise_seqs.pyx":159
+ *             row_j_low = max(j_low, band_lows[i])
+ *             row_j_high = min(j_high, band_highs[i])
+ *             track_offset = band_lows[i]             # <<<<<<<<<<<<<<
+ * 
+ *         for j from row_j_low <= j < row_j_high:
+ */
+      __pyx_t_27 = __pyx_v_i;
+      __pyx_v_track_offset = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_lows.data) + __pyx_t_27)) )));
+
+      /* "cogent/align/_pairwise_seqs.pyx":156
+ *         row_j_low = j_low
+ *         row_j_high = j_high
+ *         if banded:             # <<<<<<<<<<<<<<
+ *             row_j_low = max(j_low, band_lows[i])
+ *             row_j_high = min(j_high, band_highs[i])
+ */
+    }
+
+    /* "cogent/align/_pairwise_seqs.pyx":161
+ *             track_offset = band_lows[i]
+ * 
+ *         for j from row_j_low <= j < row_j_high:             # <<<<<<<<<<<<<<
  * 
  *             for dest_state from 0 <= dest_state < dest_states:
  */
-    __pyx_t_15 = __pyx_v_j_high;
-    for (__pyx_v_j = __pyx_v_j_low; __pyx_v_j < __pyx_t_15; __pyx_v_j++) {
+    __pyx_t_20 = __pyx_v_row_j_high;
+    for (__pyx_v_j = __pyx_v_row_j_low; __pyx_v_j < __pyx_t_20; __pyx_v_j++) {
 
-      /* "cogent/align/_pairwise_seqs.pyx":137
- *         for j from j_low <= j < j_high:
+      /* "cogent/align/_pairwise_seqs.pyx":163
+ *         for j from row_j_low <= j < row_j_high:
  * 
  *             for dest_state from 0 <= dest_state < dest_states:             # <<<<<<<<<<<<<<
  *                 state = state_directions[dest_state, 0]
@@ -3886,51 +4206,51 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
       __pyx_t_3 = __pyx_v_dest_states;
       for (__pyx_v_dest_state = 0; __pyx_v_dest_state < __pyx_t_3; __pyx_v_dest_state++) {
 
-        /* "cogent/align/_pairwise_seqs.pyx":138
+        /* "cogent/align/_pairwise_seqs.pyx":164
  * 
  *             for dest_state from 0 <= dest_state < dest_states:
  *                 state = state_directions[dest_state, 0]             # <<<<<<<<<<<<<<
  *                 bin = state_directions[dest_state, 1]
  *                 dx = state_directions[dest_state, 2]
  */
-        __pyx_t_20 = __pyx_v_dest_state;
-        __pyx_t_21 = 0;
-        __pyx_v_state = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_20 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_21)) )));
+        __pyx_t_28 = __pyx_v_dest_state;
+        __pyx_t_29 = 0;
+        __pyx_v_state = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_28 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_29)) )));
 
-        /* "cogent/align/_pairwise_seqs.pyx":139
+        /* "cogent/align/_pairwise_seqs.pyx":165
  *             for dest_state from 0 <= dest_state < dest_states:
  *                 state = state_directions[dest_state, 0]
  *                 bin = state_directions[dest_state, 1]             # <<<<<<<<<<<<<<
  *                 dx = state_directions[dest_state, 2]
  *                 dy = state_directions[dest_state, 3]
  */
-        __pyx_t_22 = __pyx_v_dest_state;
-        __pyx_t_23 = 1;
-        __pyx_v_bin = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_22 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_23)) )));
+        __pyx_t_30 = __pyx_v_dest_state;
+        __pyx_t_31 = 1;
+        __pyx_v_bin = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_30 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_31)) )));
 
-        /* "cogent/align/_pairwise_seqs.pyx":140
+        /* "cogent/align/_pairwise_seqs.pyx":166
  *                 state = state_directions[dest_state, 0]
  *                 bin = state_directions[dest_state, 1]
  *                 dx = state_directions[dest_state, 2]             # <<<<<<<<<<<<<<
  *                 dy = state_directions[dest_state, 3]
  * 
  */
-        __pyx_t_24 = __pyx_v_dest_state;
-        __pyx_t_25 = 2;
-        __pyx_v_dx = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_24 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_25)) )));
+        __pyx_t_32 = __pyx_v_dest_state;
+        __pyx_t_33 = 2;
+        __pyx_v_dx = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_32 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_33)) )));
 
-        /* "cogent/align/_pairwise_seqs.pyx":141
+        /* "cogent/align/_pairwise_seqs.pyx":167
  *                 bin = state_directions[dest_state, 1]
  *                 dx = state_directions[dest_state, 2]
  *                 dy = state_directions[dest_state, 3]             # <<<<<<<<<<<<<<
  * 
  *                 max_mantissa = impossible
  */
-        __pyx_t_26 = __pyx_v_dest_state;
-        __pyx_t_27 = 3;
-        __pyx_v_dy = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_26 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_27)) )));
+        __pyx_t_34 = __pyx_v_dest_state;
+        __pyx_t_35 = 3;
+        __pyx_v_dy = (*((long *) ( /* dim=1 */ ((char *) (((long *) ( /* dim=0 */ (__pyx_v_state_directions.data + __pyx_t_34 * __pyx_v_state_directions.strides[0]) )) + __pyx_t_35)) )));
 
-        /* "cogent/align/_pairwise_seqs.pyx":143
+        /* "cogent/align/_pairwise_seqs.pyx":169
  *                 dy = state_directions[dest_state, 3]
  * 
  *                 max_mantissa = impossible             # <<<<<<<<<<<<<<
@@ -3939,7 +4259,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_max_mantissa = __pyx_v_impossible;
 
-        /* "cogent/align/_pairwise_seqs.pyx":144
+        /* "cogent/align/_pairwise_seqs.pyx":170
  * 
  *                 max_mantissa = impossible
  *                 max_exponent = MIN_SCALE             # <<<<<<<<<<<<<<
@@ -3948,7 +4268,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_max_exponent = __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_SCALE;
 
-        /* "cogent/align/_pairwise_seqs.pyx":145
+        /* "cogent/align/_pairwise_seqs.pyx":171
  *                 max_mantissa = impossible
  *                 max_exponent = MIN_SCALE
  *                 partial_sum = 0.0             # <<<<<<<<<<<<<<
@@ -3957,7 +4277,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_partial_sum = 0.0;
 
-        /* "cogent/align/_pairwise_seqs.pyx":146
+        /* "cogent/align/_pairwise_seqs.pyx":172
  *                 max_exponent = MIN_SCALE
  *                 partial_sum = 0.0
  *                 pointer_state = N  # ie ERROR             # <<<<<<<<<<<<<<
@@ -3966,7 +4286,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_pointer_state = __pyx_v_N;
 
-        /* "cogent/align/_pairwise_seqs.pyx":148
+        /* "cogent/align/_pairwise_seqs.pyx":174
  *                 pointer_state = N  # ie ERROR
  * 
  *                 source_i = i - dx             # <<<<<<<<<<<<<<
@@ -3975,7 +4295,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_source_i = (__pyx_v_i - __pyx_v_dx);
 
-        /* "cogent/align/_pairwise_seqs.pyx":149
+        /* "cogent/align/_pairwise_seqs.pyx":175
  * 
  *                 source_i = i - dx
  *                 if source_i < 0:             # <<<<<<<<<<<<<<
@@ -3985,16 +4305,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = ((__pyx_v_source_i < 0) != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":150
+          /* "cogent/align/_pairwise_seqs.pyx":176
  *                 source_i = i - dx
  *                 if source_i < 0:
  *                     continue             # <<<<<<<<<<<<<<
  *                 source_row_index = plan[source_i]
  * 
  */
-          goto __pyx_L31_continue;
+          goto __pyx_L39_continue;
 
-          /* "cogent/align/_pairwise_seqs.pyx":149
+          /* "cogent/align/_pairwise_seqs.pyx":175
  * 
  *                 source_i = i - dx
  *                 if source_i < 0:             # <<<<<<<<<<<<<<
@@ -4003,17 +4323,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":151
+        /* "cogent/align/_pairwise_seqs.pyx":177
  *                 if source_i < 0:
  *                     continue
  *                 source_row_index = plan[source_i]             # <<<<<<<<<<<<<<
  * 
  *                 prev_j = j - dy
  */
-        __pyx_t_28 = __pyx_v_source_i;
-        __pyx_v_source_row_index = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_plan.data) + __pyx_t_28)) )));
+        __pyx_t_36 = __pyx_v_source_i;
+        __pyx_v_source_row_index = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_plan.data) + __pyx_t_36)) )));
 
-        /* "cogent/align/_pairwise_seqs.pyx":153
+        /* "cogent/align/_pairwise_seqs.pyx":179
  *                 source_row_index = plan[source_i]
  * 
  *                 prev_j = j - dy             # <<<<<<<<<<<<<<
@@ -4022,7 +4342,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_prev_j = (__pyx_v_j - __pyx_v_dy);
 
-        /* "cogent/align/_pairwise_seqs.pyx":154
+        /* "cogent/align/_pairwise_seqs.pyx":180
  * 
  *                 prev_j = j - dy
  *                 if prev_j < 0:             # <<<<<<<<<<<<<<
@@ -4032,16 +4352,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = ((__pyx_v_prev_j < 0) != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":155
+          /* "cogent/align/_pairwise_seqs.pyx":181
  *                 prev_j = j - dy
  *                 if prev_j < 0:
  *                     continue             # <<<<<<<<<<<<<<
  * 
- *                 min_prev_state = 1
+ *                 # Stale values from an earlier row may lie outside the band
  */
-          goto __pyx_L31_continue;
+          goto __pyx_L39_continue;
 
-          /* "cogent/align/_pairwise_seqs.pyx":154
+          /* "cogent/align/_pairwise_seqs.pyx":180
  * 
  *                 prev_j = j - dy
  *                 if prev_j < 0:             # <<<<<<<<<<<<<<
@@ -4050,8 +4370,39 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":157
- *                     continue
+        /* "cogent/align/_pairwise_seqs.pyx":184
+ * 
+ *                 # Stale values from an earlier row may lie outside the band
+ *                 in_band = not banded or (band_lows[source_i] <= prev_j <             # <<<<<<<<<<<<<<
+ *                         band_highs[source_i])
+ * 
+ */
+        __pyx_t_1 = (!(__pyx_v_banded != 0));
+        if (!__pyx_t_1) {
+        } else {
+          __pyx_t_37 = __pyx_t_1;
+          goto __pyx_L43_bool_binop_done;
+        }
+        __pyx_t_38 = __pyx_v_source_i;
+        __pyx_t_1 = ((*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_lows.data) + __pyx_t_38)) ))) <= __pyx_v_prev_j);
+        if (__pyx_t_1) {
+
+          /* "cogent/align/_pairwise_seqs.pyx":185
+ *                 # Stale values from an earlier row may lie outside the band
+ *                 in_band = not banded or (band_lows[source_i] <= prev_j <
+ *                         band_highs[source_i])             # <<<<<<<<<<<<<<
+ * 
+ *                 min_prev_state = 1
+ */
+          __pyx_t_39 = __pyx_v_source_i;
+          __pyx_t_1 = (__pyx_v_prev_j < (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_band_highs.data) + __pyx_t_39)) ))));
+        }
+        __pyx_t_37 = __pyx_t_1;
+        __pyx_L43_bool_binop_done:;
+        __pyx_v_in_band = __pyx_t_37;
+
+        /* "cogent/align/_pairwise_seqs.pyx":187
+ *                         band_highs[source_i])
  * 
  *                 min_prev_state = 1             # <<<<<<<<<<<<<<
  *                 a = dx
@@ -4059,7 +4410,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_min_prev_state = 1;
 
-        /* "cogent/align/_pairwise_seqs.pyx":158
+        /* "cogent/align/_pairwise_seqs.pyx":188
  * 
  *                 min_prev_state = 1
  *                 a = dx             # <<<<<<<<<<<<<<
@@ -4068,7 +4419,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_a = __pyx_v_dx;
 
-        /* "cogent/align/_pairwise_seqs.pyx":159
+        /* "cogent/align/_pairwise_seqs.pyx":189
  *                 min_prev_state = 1
  *                 a = dx
  *                 b = dy             # <<<<<<<<<<<<<<
@@ -4077,55 +4428,55 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         __pyx_v_b = __pyx_v_dy;
 
-        /* "cogent/align/_pairwise_seqs.pyx":161
+        /* "cogent/align/_pairwise_seqs.pyx":191
  *                 b = dy
  * 
  *                 if (local and dx and dy) or (prev_j == 0 and source_i == 0):             # <<<<<<<<<<<<<<
  *                     partial_sum = max_mantissa = T[0, state]
  *                     max_exponent = 0
  */
-        __pyx_t_13 = (__pyx_v_local != 0);
-        if (!__pyx_t_13) {
-          goto __pyx_L37_next_or;
+        __pyx_t_16 = (__pyx_v_local != 0);
+        if (!__pyx_t_16) {
+          goto __pyx_L47_next_or;
         } else {
         }
-        __pyx_t_13 = (__pyx_v_dx != 0);
-        if (!__pyx_t_13) {
-          goto __pyx_L37_next_or;
+        __pyx_t_16 = (__pyx_v_dx != 0);
+        if (!__pyx_t_16) {
+          goto __pyx_L47_next_or;
         } else {
         }
-        __pyx_t_13 = (__pyx_v_dy != 0);
-        if (!__pyx_t_13) {
+        __pyx_t_16 = (__pyx_v_dy != 0);
+        if (!__pyx_t_16) {
         } else {
-          __pyx_t_1 = __pyx_t_13;
-          goto __pyx_L36_bool_binop_done;
+          __pyx_t_1 = __pyx_t_16;
+          goto __pyx_L46_bool_binop_done;
         }
-        __pyx_L37_next_or:;
-        __pyx_t_13 = ((__pyx_v_prev_j == 0) != 0);
-        if (__pyx_t_13) {
+        __pyx_L47_next_or:;
+        __pyx_t_16 = ((__pyx_v_prev_j == 0) != 0);
+        if (__pyx_t_16) {
         } else {
-          __pyx_t_1 = __pyx_t_13;
-          goto __pyx_L36_bool_binop_done;
+          __pyx_t_1 = __pyx_t_16;
+          goto __pyx_L46_bool_binop_done;
         }
-        __pyx_t_13 = ((__pyx_v_source_i == 0) != 0);
-        __pyx_t_1 = __pyx_t_13;
-        __pyx_L36_bool_binop_done:;
+        __pyx_t_16 = ((__pyx_v_source_i == 0) != 0);
+        __pyx_t_1 = __pyx_t_16;
+        __pyx_L46_bool_binop_done:;
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":162
+          /* "cogent/align/_pairwise_seqs.pyx":192
  * 
  *                 if (local and dx and dy) or (prev_j == 0 and source_i == 0):
  *                     partial_sum = max_mantissa = T[0, state]             # <<<<<<<<<<<<<<
  *                     max_exponent = 0
  *                     pointer_state = 0
  */
-          __pyx_t_29 = 0;
-          __pyx_t_30 = __pyx_v_state;
-          __pyx_t_31 = (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_29 * __pyx_v_T.strides[0]) )) + __pyx_t_30)) )));
-          __pyx_v_partial_sum = __pyx_t_31;
-          __pyx_v_max_mantissa = __pyx_t_31;
+          __pyx_t_40 = 0;
+          __pyx_t_41 = __pyx_v_state;
+          __pyx_t_42 = (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_40 * __pyx_v_T.strides[0]) )) + __pyx_t_41)) )));
+          __pyx_v_partial_sum = __pyx_t_42;
+          __pyx_v_max_mantissa = __pyx_t_42;
 
-          /* "cogent/align/_pairwise_seqs.pyx":163
+          /* "cogent/align/_pairwise_seqs.pyx":193
  *                 if (local and dx and dy) or (prev_j == 0 and source_i == 0):
  *                     partial_sum = max_mantissa = T[0, state]
  *                     max_exponent = 0             # <<<<<<<<<<<<<<
@@ -4134,7 +4485,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           __pyx_v_max_exponent = 0;
 
-          /* "cogent/align/_pairwise_seqs.pyx":164
+          /* "cogent/align/_pairwise_seqs.pyx":194
  *                     partial_sum = max_mantissa = T[0, state]
  *                     max_exponent = 0
  *                     pointer_state = 0             # <<<<<<<<<<<<<<
@@ -4143,7 +4494,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           __pyx_v_pointer_state = 0;
 
-          /* "cogent/align/_pairwise_seqs.pyx":165
+          /* "cogent/align/_pairwise_seqs.pyx":195
  *                     max_exponent = 0
  *                     pointer_state = 0
  *                     pointer_a = a             # <<<<<<<<<<<<<<
@@ -4152,16 +4503,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           __pyx_v_pointer_a = __pyx_v_a;
 
-          /* "cogent/align/_pairwise_seqs.pyx":166
+          /* "cogent/align/_pairwise_seqs.pyx":196
  *                     pointer_state = 0
  *                     pointer_a = a
  *                     pointer_b = b             # <<<<<<<<<<<<<<
  * 
- *                 if use_scaling:
+ *                 if not in_band:
  */
           __pyx_v_pointer_b = __pyx_v_b;
 
-          /* "cogent/align/_pairwise_seqs.pyx":161
+          /* "cogent/align/_pairwise_seqs.pyx":191
  *                 b = dy
  * 
  *                 if (local and dx and dy) or (prev_j == 0 and source_i == 0):             # <<<<<<<<<<<<<<
@@ -4170,48 +4521,60 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":168
+        /* "cogent/align/_pairwise_seqs.pyx":198
  *                     pointer_b = b
  * 
- *                 if use_scaling:             # <<<<<<<<<<<<<<
+ *                 if not in_band:             # <<<<<<<<<<<<<<
+ *                     pass
+ *                 elif use_scaling:
+ */
+        __pyx_t_1 = ((!(__pyx_v_in_band != 0)) != 0);
+        if (__pyx_t_1) {
+          goto __pyx_L51;
+        }
+
+        /* "cogent/align/_pairwise_seqs.pyx":200
+ *                 if not in_band:
+ *                     pass
+ *                 elif use_scaling:             # <<<<<<<<<<<<<<
  *                             sub_partial_sum = 0.0
  *                             for prev_state from min_prev_state <= prev_state < N:
  */
         __pyx_t_1 = (__pyx_v_use_scaling != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":169
- * 
- *                 if use_scaling:
+          /* "cogent/align/_pairwise_seqs.pyx":201
+ *                     pass
+ *                 elif use_scaling:
  *                             sub_partial_sum = 0.0             # <<<<<<<<<<<<<<
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 exponent = exponents[source_row_index, prev_j, prev_state]
  */
           __pyx_v_sub_partial_sum = 0.0;
 
-          /* "cogent/align/_pairwise_seqs.pyx":170
- *                 if use_scaling:
+          /* "cogent/align/_pairwise_seqs.pyx":202
+ *                 elif use_scaling:
  *                             sub_partial_sum = 0.0
  *                             for prev_state from min_prev_state <= prev_state < N:             # <<<<<<<<<<<<<<
  *                                 exponent = exponents[source_row_index, prev_j, prev_state]
  *                                 if exponent == MIN_SCALE:
  */
-          __pyx_t_32 = __pyx_v_N;
-          for (__pyx_v_prev_state = __pyx_v_min_prev_state; __pyx_v_prev_state < __pyx_t_32; __pyx_v_prev_state++) {
+          __pyx_t_37 = __pyx_v_N;
+          for (__pyx_v_prev_state = __pyx_v_min_prev_state; __pyx_v_prev_state < __pyx_t_37; __pyx_v_prev_state++) {
 
-            /* "cogent/align/_pairwise_seqs.pyx":171
+            /* "cogent/align/_pairwise_seqs.pyx":203
  *                             sub_partial_sum = 0.0
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 exponent = exponents[source_row_index, prev_j, prev_state]             # <<<<<<<<<<<<<<
  *                                 if exponent == MIN_SCALE:
  *                                     continue
  */
-            __pyx_t_33 = __pyx_v_source_row_index;
-            __pyx_t_34 = __pyx_v_prev_j;
-            __pyx_t_35 = __pyx_v_prev_state;
-            __pyx_v_exponent = (*((long *) ( /* dim=2 */ ((char *) (((long *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_exponents.data + __pyx_t_33 * __pyx_v_exponents.strides[0]) ) + __pyx_t_34 * __pyx_v_exponents.strides[1]) )) + __pyx_t_35)) )));
+            __pyx_t_43 = __pyx_v_source_row_index;
+            __pyx_t_44 = __pyx_v_prev_j;
+            __pyx_t_45 = __pyx_v_prev_state;
+            __pyx_v_exponent = (*((long *) ( /* dim=2 */ ((char *) (((long *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_exponents.data + __pyx_t_43 * __pyx_v_exponents.strides[0]) ) + __pyx_t_44 * __pyx_v_exponents.strides[1]) )) + __pyx_t_45)) )));
 
-            /* "cogent/align/_pairwise_seqs.pyx":172
+            /* "cogent/align/_pairwise_seqs.pyx":204
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 exponent = exponents[source_row_index, prev_j, prev_state]
  *                                 if exponent == MIN_SCALE:             # <<<<<<<<<<<<<<
@@ -4221,16 +4584,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = ((__pyx_v_exponent == __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_SCALE) != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":173
+              /* "cogent/align/_pairwise_seqs.pyx":205
  *                                 exponent = exponents[source_row_index, prev_j, prev_state]
  *                                 if exponent == MIN_SCALE:
  *                                     continue             # <<<<<<<<<<<<<<
  * 
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]
  */
-              goto __pyx_L42_continue;
+              goto __pyx_L52_continue;
 
-              /* "cogent/align/_pairwise_seqs.pyx":172
+              /* "cogent/align/_pairwise_seqs.pyx":204
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 exponent = exponents[source_row_index, prev_j, prev_state]
  *                                 if exponent == MIN_SCALE:             # <<<<<<<<<<<<<<
@@ -4239,30 +4602,30 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             }
 
-            /* "cogent/align/_pairwise_seqs.pyx":175
+            /* "cogent/align/_pairwise_seqs.pyx":207
  *                                     continue
  * 
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]             # <<<<<<<<<<<<<<
  *                                 mantissa = mantissa * T[prev_state, state]
  * 
  */
-            __pyx_t_36 = __pyx_v_source_row_index;
-            __pyx_t_37 = __pyx_v_prev_j;
-            __pyx_t_38 = __pyx_v_prev_state;
-            __pyx_v_mantissa = (*((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_mantissas.data + __pyx_t_36 * __pyx_v_mantissas.strides[0]) ) + __pyx_t_37 * __pyx_v_mantissas.strides[1]) )) + __pyx_t_38)) )));
+            __pyx_t_46 = __pyx_v_source_row_index;
+            __pyx_t_47 = __pyx_v_prev_j;
+            __pyx_t_48 = __pyx_v_prev_state;
+            __pyx_v_mantissa = (*((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_mantissas.data + __pyx_t_46 * __pyx_v_mantissas.strides[0]) ) + __pyx_t_47 * __pyx_v_mantissas.strides[1]) )) + __pyx_t_48)) )));
 
-            /* "cogent/align/_pairwise_seqs.pyx":176
+            /* "cogent/align/_pairwise_seqs.pyx":208
  * 
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]
  *                                 mantissa = mantissa * T[prev_state, state]             # <<<<<<<<<<<<<<
  * 
  *                                 if mantissa < MIN_FLOAT_VALUE:
  */
-            __pyx_t_39 = __pyx_v_prev_state;
-            __pyx_t_40 = __pyx_v_state;
-            __pyx_v_mantissa = (__pyx_v_mantissa * (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_39 * __pyx_v_T.strides[0]) )) + __pyx_t_40)) ))));
+            __pyx_t_49 = __pyx_v_prev_state;
+            __pyx_t_50 = __pyx_v_state;
+            __pyx_v_mantissa = (__pyx_v_mantissa * (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_49 * __pyx_v_T.strides[0]) )) + __pyx_t_50)) ))));
 
-            /* "cogent/align/_pairwise_seqs.pyx":178
+            /* "cogent/align/_pairwise_seqs.pyx":210
  *                                 mantissa = mantissa * T[prev_state, state]
  * 
  *                                 if mantissa < MIN_FLOAT_VALUE:             # <<<<<<<<<<<<<<
@@ -4272,7 +4635,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = ((__pyx_v_mantissa < __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_FLOAT_VALUE) != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":179
+              /* "cogent/align/_pairwise_seqs.pyx":211
  * 
  *                                 if mantissa < MIN_FLOAT_VALUE:
  *                                     if mantissa == 0.0:             # <<<<<<<<<<<<<<
@@ -4282,16 +4645,16 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
               __pyx_t_1 = ((__pyx_v_mantissa == 0.0) != 0);
               if (__pyx_t_1) {
 
-                /* "cogent/align/_pairwise_seqs.pyx":180
+                /* "cogent/align/_pairwise_seqs.pyx":212
  *                                 if mantissa < MIN_FLOAT_VALUE:
  *                                     if mantissa == 0.0:
  *                                         continue             # <<<<<<<<<<<<<<
  *                                     if mantissa < 0.0:
  *                                         if T[prev_state, state] < 0.0:
  */
-                goto __pyx_L42_continue;
+                goto __pyx_L52_continue;
 
-                /* "cogent/align/_pairwise_seqs.pyx":179
+                /* "cogent/align/_pairwise_seqs.pyx":211
  * 
  *                                 if mantissa < MIN_FLOAT_VALUE:
  *                                     if mantissa == 0.0:             # <<<<<<<<<<<<<<
@@ -4300,7 +4663,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               }
 
-              /* "cogent/align/_pairwise_seqs.pyx":181
+              /* "cogent/align/_pairwise_seqs.pyx":213
  *                                     if mantissa == 0.0:
  *                                         continue
  *                                     if mantissa < 0.0:             # <<<<<<<<<<<<<<
@@ -4310,74 +4673,74 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
               __pyx_t_1 = ((__pyx_v_mantissa < 0.0) != 0);
               if (__pyx_t_1) {
 
-                /* "cogent/align/_pairwise_seqs.pyx":182
+                /* "cogent/align/_pairwise_seqs.pyx":214
  *                                         continue
  *                                     if mantissa < 0.0:
  *                                         if T[prev_state, state] < 0.0:             # <<<<<<<<<<<<<<
  *                                             raise ArithmeticError(fmpt(mantissa, exponent,
  *                                                     "transition is a negative probability"))
  */
-                __pyx_t_41 = __pyx_v_prev_state;
-                __pyx_t_42 = __pyx_v_state;
-                __pyx_t_1 = (((*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_41 * __pyx_v_T.strides[0]) )) + __pyx_t_42)) ))) < 0.0) != 0);
+                __pyx_t_51 = __pyx_v_prev_state;
+                __pyx_t_52 = __pyx_v_state;
+                __pyx_t_1 = (((*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_51 * __pyx_v_T.strides[0]) )) + __pyx_t_52)) ))) < 0.0) != 0);
                 if (__pyx_t_1) {
 
-                  /* "cogent/align/_pairwise_seqs.pyx":183
+                  /* "cogent/align/_pairwise_seqs.pyx":215
  *                                     if mantissa < 0.0:
  *                                         if T[prev_state, state] < 0.0:
  *                                             raise ArithmeticError(fmpt(mantissa, exponent,             # <<<<<<<<<<<<<<
  *                                                     "transition is a negative probability"))
  *                                         raise ArithmeticError(fmpt(mantissa, exponent,
  */
-                  __pyx_t_7 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_7);
-                  __pyx_t_8 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_8);
-                  __pyx_t_14 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_14)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_14);
-                  __pyx_t_43 = NULL;
-                  __pyx_t_44 = 0;
-                  if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_7))) {
-                    __pyx_t_43 = PyMethod_GET_SELF(__pyx_t_7);
-                    if (likely(__pyx_t_43)) {
-                      PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_7);
-                      __Pyx_INCREF(__pyx_t_43);
+                  __pyx_t_10 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_10);
+                  __pyx_t_11 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_11)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_11);
+                  __pyx_t_19 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_19);
+                  __pyx_t_53 = NULL;
+                  __pyx_t_54 = 0;
+                  if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_10))) {
+                    __pyx_t_53 = PyMethod_GET_SELF(__pyx_t_10);
+                    if (likely(__pyx_t_53)) {
+                      PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_10);
+                      __Pyx_INCREF(__pyx_t_53);
                       __Pyx_INCREF(function);
-                      __Pyx_DECREF_SET(__pyx_t_7, function);
-                      __pyx_t_44 = 1;
+                      __Pyx_DECREF_SET(__pyx_t_10, function);
+                      __pyx_t_54 = 1;
                     }
                   }
-                  __pyx_t_45 = PyTuple_New(3+__pyx_t_44); if (unlikely(!__pyx_t_45)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_45);
-                  if (__pyx_t_43) {
-                    __Pyx_GIVEREF(__pyx_t_43); PyTuple_SET_ITEM(__pyx_t_45, 0, __pyx_t_43); __pyx_t_43 = NULL;
+                  __pyx_t_55 = PyTuple_New(3+__pyx_t_54); if (unlikely(!__pyx_t_55)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_55);
+                  if (__pyx_t_53) {
+                    __Pyx_GIVEREF(__pyx_t_53); PyTuple_SET_ITEM(__pyx_t_55, 0, __pyx_t_53); __pyx_t_53 = NULL;
                   }
-                  __Pyx_GIVEREF(__pyx_t_8);
-                  PyTuple_SET_ITEM(__pyx_t_45, 0+__pyx_t_44, __pyx_t_8);
-                  __Pyx_GIVEREF(__pyx_t_14);
-                  PyTuple_SET_ITEM(__pyx_t_45, 1+__pyx_t_44, __pyx_t_14);
+                  __Pyx_GIVEREF(__pyx_t_11);
+                  PyTuple_SET_ITEM(__pyx_t_55, 0+__pyx_t_54, __pyx_t_11);
+                  __Pyx_GIVEREF(__pyx_t_19);
+                  PyTuple_SET_ITEM(__pyx_t_55, 1+__pyx_t_54, __pyx_t_19);
                   __Pyx_INCREF(__pyx_kp_s_transition_is_a_negative_probabi);
                   __Pyx_GIVEREF(__pyx_kp_s_transition_is_a_negative_probabi);
-                  PyTuple_SET_ITEM(__pyx_t_45, 2+__pyx_t_44, __pyx_kp_s_transition_is_a_negative_probabi);
-                  __pyx_t_8 = 0;
-                  __pyx_t_14 = 0;
-                  __pyx_t_9 = __Pyx_PyObject_Call(__pyx_t_7, __pyx_t_45, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_9);
-                  __Pyx_DECREF(__pyx_t_45); __pyx_t_45 = 0;
-                  __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                  __pyx_t_7 = PyTuple_New(1); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_7);
-                  __Pyx_GIVEREF(__pyx_t_9);
-                  PyTuple_SET_ITEM(__pyx_t_7, 0, __pyx_t_9);
-                  __pyx_t_9 = 0;
-                  __pyx_t_9 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_7, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_9);
-                  __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                  __Pyx_Raise(__pyx_t_9, 0, 0, 0);
-                  __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-                  {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-
-                  /* "cogent/align/_pairwise_seqs.pyx":182
+                  PyTuple_SET_ITEM(__pyx_t_55, 2+__pyx_t_54, __pyx_kp_s_transition_is_a_negative_probabi);
+                  __pyx_t_11 = 0;
+                  __pyx_t_19 = 0;
+                  __pyx_t_12 = __Pyx_PyObject_Call(__pyx_t_10, __pyx_t_55, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_12);
+                  __Pyx_DECREF(__pyx_t_55); __pyx_t_55 = 0;
+                  __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                  __pyx_t_10 = PyTuple_New(1); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_10);
+                  __Pyx_GIVEREF(__pyx_t_12);
+                  PyTuple_SET_ITEM(__pyx_t_10, 0, __pyx_t_12);
+                  __pyx_t_12 = 0;
+                  __pyx_t_12 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_10, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_12);
+                  __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                  __Pyx_Raise(__pyx_t_12, 0, 0, 0);
+                  __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+                  {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+                  /* "cogent/align/_pairwise_seqs.pyx":214
  *                                         continue
  *                                     if mantissa < 0.0:
  *                                         if T[prev_state, state] < 0.0:             # <<<<<<<<<<<<<<
@@ -4386,62 +4749,62 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 }
 
-                /* "cogent/align/_pairwise_seqs.pyx":185
+                /* "cogent/align/_pairwise_seqs.pyx":217
  *                                             raise ArithmeticError(fmpt(mantissa, exponent,
  *                                                     "transition is a negative probability"))
  *                                         raise ArithmeticError(fmpt(mantissa, exponent,             # <<<<<<<<<<<<<<
  *                                                 "product is a negative probability"))
  *                                     while mantissa < MIN_FLOAT_VALUE:
  */
-                __pyx_t_7 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_7);
-                __pyx_t_45 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_45)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_45);
-                __pyx_t_14 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_14)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_14);
-                __pyx_t_8 = NULL;
-                __pyx_t_44 = 0;
-                if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_7))) {
-                  __pyx_t_8 = PyMethod_GET_SELF(__pyx_t_7);
-                  if (likely(__pyx_t_8)) {
-                    PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_7);
-                    __Pyx_INCREF(__pyx_t_8);
+                __pyx_t_10 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_10);
+                __pyx_t_55 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_55)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_55);
+                __pyx_t_19 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_19);
+                __pyx_t_11 = NULL;
+                __pyx_t_54 = 0;
+                if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_10))) {
+                  __pyx_t_11 = PyMethod_GET_SELF(__pyx_t_10);
+                  if (likely(__pyx_t_11)) {
+                    PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_10);
+                    __Pyx_INCREF(__pyx_t_11);
                     __Pyx_INCREF(function);
-                    __Pyx_DECREF_SET(__pyx_t_7, function);
-                    __pyx_t_44 = 1;
+                    __Pyx_DECREF_SET(__pyx_t_10, function);
+                    __pyx_t_54 = 1;
                   }
                 }
-                __pyx_t_43 = PyTuple_New(3+__pyx_t_44); if (unlikely(!__pyx_t_43)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_43);
-                if (__pyx_t_8) {
-                  __Pyx_GIVEREF(__pyx_t_8); PyTuple_SET_ITEM(__pyx_t_43, 0, __pyx_t_8); __pyx_t_8 = NULL;
+                __pyx_t_53 = PyTuple_New(3+__pyx_t_54); if (unlikely(!__pyx_t_53)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_53);
+                if (__pyx_t_11) {
+                  __Pyx_GIVEREF(__pyx_t_11); PyTuple_SET_ITEM(__pyx_t_53, 0, __pyx_t_11); __pyx_t_11 = NULL;
                 }
-                __Pyx_GIVEREF(__pyx_t_45);
-                PyTuple_SET_ITEM(__pyx_t_43, 0+__pyx_t_44, __pyx_t_45);
-                __Pyx_GIVEREF(__pyx_t_14);
-                PyTuple_SET_ITEM(__pyx_t_43, 1+__pyx_t_44, __pyx_t_14);
+                __Pyx_GIVEREF(__pyx_t_55);
+                PyTuple_SET_ITEM(__pyx_t_53, 0+__pyx_t_54, __pyx_t_55);
+                __Pyx_GIVEREF(__pyx_t_19);
+                PyTuple_SET_ITEM(__pyx_t_53, 1+__pyx_t_54, __pyx_t_19);
                 __Pyx_INCREF(__pyx_kp_s_product_is_a_negative_probabilit);
                 __Pyx_GIVEREF(__pyx_kp_s_product_is_a_negative_probabilit);
-                PyTuple_SET_ITEM(__pyx_t_43, 2+__pyx_t_44, __pyx_kp_s_product_is_a_negative_probabilit);
-                __pyx_t_45 = 0;
-                __pyx_t_14 = 0;
-                __pyx_t_9 = __Pyx_PyObject_Call(__pyx_t_7, __pyx_t_43, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_9);
-                __Pyx_DECREF(__pyx_t_43); __pyx_t_43 = 0;
-                __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                __pyx_t_7 = PyTuple_New(1); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_7);
-                __Pyx_GIVEREF(__pyx_t_9);
-                PyTuple_SET_ITEM(__pyx_t_7, 0, __pyx_t_9);
-                __pyx_t_9 = 0;
-                __pyx_t_9 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_7, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_9);
-                __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                __Pyx_Raise(__pyx_t_9, 0, 0, 0);
-                __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-                {__pyx_filename = __pyx_f[1]; __pyx_lineno = 185; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-
-                /* "cogent/align/_pairwise_seqs.pyx":181
+                PyTuple_SET_ITEM(__pyx_t_53, 2+__pyx_t_54, __pyx_kp_s_product_is_a_negative_probabilit);
+                __pyx_t_55 = 0;
+                __pyx_t_19 = 0;
+                __pyx_t_12 = __Pyx_PyObject_Call(__pyx_t_10, __pyx_t_53, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_12);
+                __Pyx_DECREF(__pyx_t_53); __pyx_t_53 = 0;
+                __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                __pyx_t_10 = PyTuple_New(1); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_10);
+                __Pyx_GIVEREF(__pyx_t_12);
+                PyTuple_SET_ITEM(__pyx_t_10, 0, __pyx_t_12);
+                __pyx_t_12 = 0;
+                __pyx_t_12 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_10, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_12);
+                __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                __Pyx_Raise(__pyx_t_12, 0, 0, 0);
+                __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+                {__pyx_filename = __pyx_f[1]; __pyx_lineno = 217; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+                /* "cogent/align/_pairwise_seqs.pyx":213
  *                                     if mantissa == 0.0:
  *                                         continue
  *                                     if mantissa < 0.0:             # <<<<<<<<<<<<<<
@@ -4450,7 +4813,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               }
 
-              /* "cogent/align/_pairwise_seqs.pyx":187
+              /* "cogent/align/_pairwise_seqs.pyx":219
  *                                         raise ArithmeticError(fmpt(mantissa, exponent,
  *                                                 "product is a negative probability"))
  *                                     while mantissa < MIN_FLOAT_VALUE:             # <<<<<<<<<<<<<<
@@ -4461,7 +4824,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
                 __pyx_t_1 = ((__pyx_v_mantissa < __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_FLOAT_VALUE) != 0);
                 if (!__pyx_t_1) break;
 
-                /* "cogent/align/_pairwise_seqs.pyx":188
+                /* "cogent/align/_pairwise_seqs.pyx":220
  *                                                 "product is a negative probability"))
  *                                     while mantissa < MIN_FLOAT_VALUE:
  *                                         mantissa *= SCALE_STEP             # <<<<<<<<<<<<<<
@@ -4470,7 +4833,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_mantissa = (__pyx_v_mantissa * __pyx_v_6cogent_5align_14_pairwise_seqs_SCALE_STEP);
 
-                /* "cogent/align/_pairwise_seqs.pyx":189
+                /* "cogent/align/_pairwise_seqs.pyx":221
  *                                     while mantissa < MIN_FLOAT_VALUE:
  *                                         mantissa *= SCALE_STEP
  *                                         exponent += -1             # <<<<<<<<<<<<<<
@@ -4479,7 +4842,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_exponent = (__pyx_v_exponent + -1L);
 
-                /* "cogent/align/_pairwise_seqs.pyx":190
+                /* "cogent/align/_pairwise_seqs.pyx":222
  *                                         mantissa *= SCALE_STEP
  *                                         exponent += -1
  *                                         if exponent <= MIN_SCALE:             # <<<<<<<<<<<<<<
@@ -4489,62 +4852,62 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
                 __pyx_t_1 = ((__pyx_v_exponent <= __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_SCALE) != 0);
                 if (__pyx_t_1) {
 
-                  /* "cogent/align/_pairwise_seqs.pyx":191
+                  /* "cogent/align/_pairwise_seqs.pyx":223
  *                                         exponent += -1
  *                                         if exponent <= MIN_SCALE:
  *                                           raise ArithmeticError(fmpt(mantissa, exponent,             # <<<<<<<<<<<<<<
  *                                                 "underflows"))
  * 
  */
-                  __pyx_t_7 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_7);
-                  __pyx_t_43 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_43)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_43);
-                  __pyx_t_14 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_14)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_14);
-                  __pyx_t_45 = NULL;
-                  __pyx_t_44 = 0;
-                  if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_7))) {
-                    __pyx_t_45 = PyMethod_GET_SELF(__pyx_t_7);
-                    if (likely(__pyx_t_45)) {
-                      PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_7);
-                      __Pyx_INCREF(__pyx_t_45);
+                  __pyx_t_10 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_10);
+                  __pyx_t_53 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_53)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_53);
+                  __pyx_t_19 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_19);
+                  __pyx_t_55 = NULL;
+                  __pyx_t_54 = 0;
+                  if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_10))) {
+                    __pyx_t_55 = PyMethod_GET_SELF(__pyx_t_10);
+                    if (likely(__pyx_t_55)) {
+                      PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_10);
+                      __Pyx_INCREF(__pyx_t_55);
                       __Pyx_INCREF(function);
-                      __Pyx_DECREF_SET(__pyx_t_7, function);
-                      __pyx_t_44 = 1;
+                      __Pyx_DECREF_SET(__pyx_t_10, function);
+                      __pyx_t_54 = 1;
                     }
                   }
-                  __pyx_t_8 = PyTuple_New(3+__pyx_t_44); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_8);
-                  if (__pyx_t_45) {
-                    __Pyx_GIVEREF(__pyx_t_45); PyTuple_SET_ITEM(__pyx_t_8, 0, __pyx_t_45); __pyx_t_45 = NULL;
+                  __pyx_t_11 = PyTuple_New(3+__pyx_t_54); if (unlikely(!__pyx_t_11)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_11);
+                  if (__pyx_t_55) {
+                    __Pyx_GIVEREF(__pyx_t_55); PyTuple_SET_ITEM(__pyx_t_11, 0, __pyx_t_55); __pyx_t_55 = NULL;
                   }
-                  __Pyx_GIVEREF(__pyx_t_43);
-                  PyTuple_SET_ITEM(__pyx_t_8, 0+__pyx_t_44, __pyx_t_43);
-                  __Pyx_GIVEREF(__pyx_t_14);
-                  PyTuple_SET_ITEM(__pyx_t_8, 1+__pyx_t_44, __pyx_t_14);
+                  __Pyx_GIVEREF(__pyx_t_53);
+                  PyTuple_SET_ITEM(__pyx_t_11, 0+__pyx_t_54, __pyx_t_53);
+                  __Pyx_GIVEREF(__pyx_t_19);
+                  PyTuple_SET_ITEM(__pyx_t_11, 1+__pyx_t_54, __pyx_t_19);
                   __Pyx_INCREF(__pyx_n_s_underflows);
                   __Pyx_GIVEREF(__pyx_n_s_underflows);
-                  PyTuple_SET_ITEM(__pyx_t_8, 2+__pyx_t_44, __pyx_n_s_underflows);
-                  __pyx_t_43 = 0;
-                  __pyx_t_14 = 0;
-                  __pyx_t_9 = __Pyx_PyObject_Call(__pyx_t_7, __pyx_t_8, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_9);
-                  __Pyx_DECREF(__pyx_t_8); __pyx_t_8 = 0;
-                  __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                  __pyx_t_7 = PyTuple_New(1); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_7);
-                  __Pyx_GIVEREF(__pyx_t_9);
-                  PyTuple_SET_ITEM(__pyx_t_7, 0, __pyx_t_9);
-                  __pyx_t_9 = 0;
-                  __pyx_t_9 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_7, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                  __Pyx_GOTREF(__pyx_t_9);
-                  __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                  __Pyx_Raise(__pyx_t_9, 0, 0, 0);
-                  __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-                  {__pyx_filename = __pyx_f[1]; __pyx_lineno = 191; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-
-                  /* "cogent/align/_pairwise_seqs.pyx":190
+                  PyTuple_SET_ITEM(__pyx_t_11, 2+__pyx_t_54, __pyx_n_s_underflows);
+                  __pyx_t_53 = 0;
+                  __pyx_t_19 = 0;
+                  __pyx_t_12 = __Pyx_PyObject_Call(__pyx_t_10, __pyx_t_11, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_12);
+                  __Pyx_DECREF(__pyx_t_11); __pyx_t_11 = 0;
+                  __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                  __pyx_t_10 = PyTuple_New(1); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_10);
+                  __Pyx_GIVEREF(__pyx_t_12);
+                  PyTuple_SET_ITEM(__pyx_t_10, 0, __pyx_t_12);
+                  __pyx_t_12 = 0;
+                  __pyx_t_12 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_10, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                  __Pyx_GOTREF(__pyx_t_12);
+                  __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                  __Pyx_Raise(__pyx_t_12, 0, 0, 0);
+                  __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+                  {__pyx_filename = __pyx_f[1]; __pyx_lineno = 223; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+                  /* "cogent/align/_pairwise_seqs.pyx":222
  *                                         mantissa *= SCALE_STEP
  *                                         exponent += -1
  *                                         if exponent <= MIN_SCALE:             # <<<<<<<<<<<<<<
@@ -4554,17 +4917,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
                 }
               }
 
-              /* "cogent/align/_pairwise_seqs.pyx":178
+              /* "cogent/align/_pairwise_seqs.pyx":210
  *                                 mantissa = mantissa * T[prev_state, state]
  * 
  *                                 if mantissa < MIN_FLOAT_VALUE:             # <<<<<<<<<<<<<<
  *                                     if mantissa == 0.0:
  *                                         continue
  */
-              goto __pyx_L45;
+              goto __pyx_L55;
             }
 
-            /* "cogent/align/_pairwise_seqs.pyx":194
+            /* "cogent/align/_pairwise_seqs.pyx":226
  *                                                 "underflows"))
  * 
  *                                 elif mantissa > 1.0:             # <<<<<<<<<<<<<<
@@ -4574,7 +4937,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = ((__pyx_v_mantissa > 1.0) != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":195
+              /* "cogent/align/_pairwise_seqs.pyx":227
  * 
  *                                 elif mantissa > 1.0:
  *                                     mantissa *= MIN_FLOAT_VALUE             # <<<<<<<<<<<<<<
@@ -4583,7 +4946,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_mantissa = (__pyx_v_mantissa * __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_FLOAT_VALUE);
 
-              /* "cogent/align/_pairwise_seqs.pyx":196
+              /* "cogent/align/_pairwise_seqs.pyx":228
  *                                 elif mantissa > 1.0:
  *                                     mantissa *= MIN_FLOAT_VALUE
  *                                     exponent += 1             # <<<<<<<<<<<<<<
@@ -4592,7 +4955,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_exponent = (__pyx_v_exponent + 1);
 
-              /* "cogent/align/_pairwise_seqs.pyx":197
+              /* "cogent/align/_pairwise_seqs.pyx":229
  *                                     mantissa *= MIN_FLOAT_VALUE
  *                                     exponent += 1
  *                                     if exponent > MAX_SCALE:             # <<<<<<<<<<<<<<
@@ -4602,62 +4965,62 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
               __pyx_t_1 = ((__pyx_v_exponent > __pyx_v_6cogent_5align_14_pairwise_seqs_MAX_SCALE) != 0);
               if (__pyx_t_1) {
 
-                /* "cogent/align/_pairwise_seqs.pyx":198
+                /* "cogent/align/_pairwise_seqs.pyx":230
  *                                     exponent += 1
  *                                     if exponent > MAX_SCALE:
  *                                         raise ArithmeticError(fmpt(mantissa, exponent,             # <<<<<<<<<<<<<<
  *                                             "is unexpectedly large"))
  * 
  */
-                __pyx_t_7 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_7);
-                __pyx_t_8 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_8)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_8);
-                __pyx_t_14 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_14)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_14);
-                __pyx_t_43 = NULL;
-                __pyx_t_44 = 0;
-                if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_7))) {
-                  __pyx_t_43 = PyMethod_GET_SELF(__pyx_t_7);
-                  if (likely(__pyx_t_43)) {
-                    PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_7);
-                    __Pyx_INCREF(__pyx_t_43);
+                __pyx_t_10 = __Pyx_GetModuleGlobalName(__pyx_n_s_fmpt); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_10);
+                __pyx_t_11 = PyFloat_FromDouble(__pyx_v_mantissa); if (unlikely(!__pyx_t_11)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_11);
+                __pyx_t_19 = __Pyx_PyInt_From_long(__pyx_v_exponent); if (unlikely(!__pyx_t_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_19);
+                __pyx_t_53 = NULL;
+                __pyx_t_54 = 0;
+                if (CYTHON_COMPILING_IN_CPYTHON && unlikely(PyMethod_Check(__pyx_t_10))) {
+                  __pyx_t_53 = PyMethod_GET_SELF(__pyx_t_10);
+                  if (likely(__pyx_t_53)) {
+                    PyObject* function = PyMethod_GET_FUNCTION(__pyx_t_10);
+                    __Pyx_INCREF(__pyx_t_53);
                     __Pyx_INCREF(function);
-                    __Pyx_DECREF_SET(__pyx_t_7, function);
-                    __pyx_t_44 = 1;
+                    __Pyx_DECREF_SET(__pyx_t_10, function);
+                    __pyx_t_54 = 1;
                   }
                 }
-                __pyx_t_45 = PyTuple_New(3+__pyx_t_44); if (unlikely(!__pyx_t_45)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_45);
-                if (__pyx_t_43) {
-                  __Pyx_GIVEREF(__pyx_t_43); PyTuple_SET_ITEM(__pyx_t_45, 0, __pyx_t_43); __pyx_t_43 = NULL;
+                __pyx_t_55 = PyTuple_New(3+__pyx_t_54); if (unlikely(!__pyx_t_55)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_55);
+                if (__pyx_t_53) {
+                  __Pyx_GIVEREF(__pyx_t_53); PyTuple_SET_ITEM(__pyx_t_55, 0, __pyx_t_53); __pyx_t_53 = NULL;
                 }
-                __Pyx_GIVEREF(__pyx_t_8);
-                PyTuple_SET_ITEM(__pyx_t_45, 0+__pyx_t_44, __pyx_t_8);
-                __Pyx_GIVEREF(__pyx_t_14);
-                PyTuple_SET_ITEM(__pyx_t_45, 1+__pyx_t_44, __pyx_t_14);
+                __Pyx_GIVEREF(__pyx_t_11);
+                PyTuple_SET_ITEM(__pyx_t_55, 0+__pyx_t_54, __pyx_t_11);
+                __Pyx_GIVEREF(__pyx_t_19);
+                PyTuple_SET_ITEM(__pyx_t_55, 1+__pyx_t_54, __pyx_t_19);
                 __Pyx_INCREF(__pyx_kp_s_is_unexpectedly_large);
                 __Pyx_GIVEREF(__pyx_kp_s_is_unexpectedly_large);
-                PyTuple_SET_ITEM(__pyx_t_45, 2+__pyx_t_44, __pyx_kp_s_is_unexpectedly_large);
-                __pyx_t_8 = 0;
-                __pyx_t_14 = 0;
-                __pyx_t_9 = __Pyx_PyObject_Call(__pyx_t_7, __pyx_t_45, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_9);
-                __Pyx_DECREF(__pyx_t_45); __pyx_t_45 = 0;
-                __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                __pyx_t_7 = PyTuple_New(1); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_7);
-                __Pyx_GIVEREF(__pyx_t_9);
-                PyTuple_SET_ITEM(__pyx_t_7, 0, __pyx_t_9);
-                __pyx_t_9 = 0;
-                __pyx_t_9 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_7, NULL); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-                __Pyx_GOTREF(__pyx_t_9);
-                __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
-                __Pyx_Raise(__pyx_t_9, 0, 0, 0);
-                __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
-                {__pyx_filename = __pyx_f[1]; __pyx_lineno = 198; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-
-                /* "cogent/align/_pairwise_seqs.pyx":197
+                PyTuple_SET_ITEM(__pyx_t_55, 2+__pyx_t_54, __pyx_kp_s_is_unexpectedly_large);
+                __pyx_t_11 = 0;
+                __pyx_t_19 = 0;
+                __pyx_t_12 = __Pyx_PyObject_Call(__pyx_t_10, __pyx_t_55, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_12);
+                __Pyx_DECREF(__pyx_t_55); __pyx_t_55 = 0;
+                __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                __pyx_t_10 = PyTuple_New(1); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_10);
+                __Pyx_GIVEREF(__pyx_t_12);
+                PyTuple_SET_ITEM(__pyx_t_10, 0, __pyx_t_12);
+                __pyx_t_12 = 0;
+                __pyx_t_12 = __Pyx_PyObject_Call(__pyx_builtin_ArithmeticError, __pyx_t_10, NULL); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+                __Pyx_GOTREF(__pyx_t_12);
+                __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+                __Pyx_Raise(__pyx_t_12, 0, 0, 0);
+                __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+                {__pyx_filename = __pyx_f[1]; __pyx_lineno = 230; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+
+                /* "cogent/align/_pairwise_seqs.pyx":229
  *                                     mantissa *= MIN_FLOAT_VALUE
  *                                     exponent += 1
  *                                     if exponent > MAX_SCALE:             # <<<<<<<<<<<<<<
@@ -4666,7 +5029,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               }
 
-              /* "cogent/align/_pairwise_seqs.pyx":194
+              /* "cogent/align/_pairwise_seqs.pyx":226
  *                                                 "underflows"))
  * 
  *                                 elif mantissa > 1.0:             # <<<<<<<<<<<<<<
@@ -4674,9 +5037,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  *                                     exponent += 1
  */
             }
-            __pyx_L45:;
+            __pyx_L55:;
 
-            /* "cogent/align/_pairwise_seqs.pyx":201
+            /* "cogent/align/_pairwise_seqs.pyx":233
  *                                             "is unexpectedly large"))
  * 
  *                                 if exponent > max_exponent:             # <<<<<<<<<<<<<<
@@ -4686,7 +5049,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = ((__pyx_v_exponent > __pyx_v_max_exponent) != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":202
+              /* "cogent/align/_pairwise_seqs.pyx":234
  * 
  *                                 if exponent > max_exponent:
  *                                     if exponent == max_exponent + 1:             # <<<<<<<<<<<<<<
@@ -4696,7 +5059,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
               __pyx_t_1 = ((__pyx_v_exponent == (__pyx_v_max_exponent + 1)) != 0);
               if (__pyx_t_1) {
 
-                /* "cogent/align/_pairwise_seqs.pyx":203
+                /* "cogent/align/_pairwise_seqs.pyx":235
  *                                 if exponent > max_exponent:
  *                                     if exponent == max_exponent + 1:
  *                                         sub_partial_sum = partial_sum             # <<<<<<<<<<<<<<
@@ -4705,17 +5068,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_sub_partial_sum = __pyx_v_partial_sum;
 
-                /* "cogent/align/_pairwise_seqs.pyx":202
+                /* "cogent/align/_pairwise_seqs.pyx":234
  * 
  *                                 if exponent > max_exponent:
  *                                     if exponent == max_exponent + 1:             # <<<<<<<<<<<<<<
  *                                         sub_partial_sum = partial_sum
  *                                     else:
  */
-                goto __pyx_L54;
+                goto __pyx_L64;
               }
 
-              /* "cogent/align/_pairwise_seqs.pyx":205
+              /* "cogent/align/_pairwise_seqs.pyx":237
  *                                         sub_partial_sum = partial_sum
  *                                     else:
  *                                         sub_partial_sum = 0.0             # <<<<<<<<<<<<<<
@@ -4725,9 +5088,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
               /*else*/ {
                 __pyx_v_sub_partial_sum = 0.0;
               }
-              __pyx_L54:;
+              __pyx_L64:;
 
-              /* "cogent/align/_pairwise_seqs.pyx":206
+              /* "cogent/align/_pairwise_seqs.pyx":238
  *                                     else:
  *                                         sub_partial_sum = 0.0
  *                                     partial_sum = 0.0             # <<<<<<<<<<<<<<
@@ -4736,7 +5099,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_partial_sum = 0.0;
 
-              /* "cogent/align/_pairwise_seqs.pyx":207
+              /* "cogent/align/_pairwise_seqs.pyx":239
  *                                         sub_partial_sum = 0.0
  *                                     partial_sum = 0.0
  *                                     max_mantissa = 0.0             # <<<<<<<<<<<<<<
@@ -4745,7 +5108,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_max_mantissa = 0.0;
 
-              /* "cogent/align/_pairwise_seqs.pyx":208
+              /* "cogent/align/_pairwise_seqs.pyx":240
  *                                     partial_sum = 0.0
  *                                     max_mantissa = 0.0
  *                                     max_exponent = exponent             # <<<<<<<<<<<<<<
@@ -4754,7 +5117,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_max_exponent = __pyx_v_exponent;
 
-              /* "cogent/align/_pairwise_seqs.pyx":201
+              /* "cogent/align/_pairwise_seqs.pyx":233
  *                                             "is unexpectedly large"))
  * 
  *                                 if exponent > max_exponent:             # <<<<<<<<<<<<<<
@@ -4763,7 +5126,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             }
 
-            /* "cogent/align/_pairwise_seqs.pyx":210
+            /* "cogent/align/_pairwise_seqs.pyx":242
  *                                     max_exponent = exponent
  * 
  *                                 if exponent == max_exponent:             # <<<<<<<<<<<<<<
@@ -4773,7 +5136,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = ((__pyx_v_exponent == __pyx_v_max_exponent) != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":211
+              /* "cogent/align/_pairwise_seqs.pyx":243
  * 
  *                                 if exponent == max_exponent:
  *                                     partial_sum += mantissa             # <<<<<<<<<<<<<<
@@ -4782,25 +5145,25 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_partial_sum = (__pyx_v_partial_sum + __pyx_v_mantissa);
 
-              /* "cogent/align/_pairwise_seqs.pyx":212
+              /* "cogent/align/_pairwise_seqs.pyx":244
  *                                 if exponent == max_exponent:
  *                                     partial_sum += mantissa
  *                                     if viterbi and mantissa > max_mantissa:             # <<<<<<<<<<<<<<
  *                                         max_mantissa = mantissa
  *                                         pointer_state = prev_state
  */
-              __pyx_t_13 = (__pyx_v_viterbi != 0);
-              if (__pyx_t_13) {
+              __pyx_t_16 = (__pyx_v_viterbi != 0);
+              if (__pyx_t_16) {
               } else {
-                __pyx_t_1 = __pyx_t_13;
-                goto __pyx_L57_bool_binop_done;
+                __pyx_t_1 = __pyx_t_16;
+                goto __pyx_L67_bool_binop_done;
               }
-              __pyx_t_13 = ((__pyx_v_mantissa > __pyx_v_max_mantissa) != 0);
-              __pyx_t_1 = __pyx_t_13;
-              __pyx_L57_bool_binop_done:;
+              __pyx_t_16 = ((__pyx_v_mantissa > __pyx_v_max_mantissa) != 0);
+              __pyx_t_1 = __pyx_t_16;
+              __pyx_L67_bool_binop_done:;
               if (__pyx_t_1) {
 
-                /* "cogent/align/_pairwise_seqs.pyx":213
+                /* "cogent/align/_pairwise_seqs.pyx":245
  *                                     partial_sum += mantissa
  *                                     if viterbi and mantissa > max_mantissa:
  *                                         max_mantissa = mantissa             # <<<<<<<<<<<<<<
@@ -4809,7 +5172,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_max_mantissa = __pyx_v_mantissa;
 
-                /* "cogent/align/_pairwise_seqs.pyx":214
+                /* "cogent/align/_pairwise_seqs.pyx":246
  *                                     if viterbi and mantissa > max_mantissa:
  *                                         max_mantissa = mantissa
  *                                         pointer_state = prev_state             # <<<<<<<<<<<<<<
@@ -4818,7 +5181,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_pointer_state = __pyx_v_prev_state;
 
-                /* "cogent/align/_pairwise_seqs.pyx":215
+                /* "cogent/align/_pairwise_seqs.pyx":247
  *                                         max_mantissa = mantissa
  *                                         pointer_state = prev_state
  *                                         pointer_a = a             # <<<<<<<<<<<<<<
@@ -4827,7 +5190,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_pointer_a = __pyx_v_a;
 
-                /* "cogent/align/_pairwise_seqs.pyx":216
+                /* "cogent/align/_pairwise_seqs.pyx":248
  *                                         pointer_state = prev_state
  *                                         pointer_a = a
  *                                         pointer_b = b             # <<<<<<<<<<<<<<
@@ -4836,7 +5199,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
                 __pyx_v_pointer_b = __pyx_v_b;
 
-                /* "cogent/align/_pairwise_seqs.pyx":212
+                /* "cogent/align/_pairwise_seqs.pyx":244
  *                                 if exponent == max_exponent:
  *                                     partial_sum += mantissa
  *                                     if viterbi and mantissa > max_mantissa:             # <<<<<<<<<<<<<<
@@ -4845,17 +5208,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               }
 
-              /* "cogent/align/_pairwise_seqs.pyx":210
+              /* "cogent/align/_pairwise_seqs.pyx":242
  *                                     max_exponent = exponent
  * 
  *                                 if exponent == max_exponent:             # <<<<<<<<<<<<<<
  *                                     partial_sum += mantissa
  *                                     if viterbi and mantissa > max_mantissa:
  */
-              goto __pyx_L55;
+              goto __pyx_L65;
             }
 
-            /* "cogent/align/_pairwise_seqs.pyx":218
+            /* "cogent/align/_pairwise_seqs.pyx":250
  *                                         pointer_b = b
  * 
  *                                 elif exponent == max_exponent - 1:             # <<<<<<<<<<<<<<
@@ -4865,7 +5228,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = ((__pyx_v_exponent == (__pyx_v_max_exponent - 1)) != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":219
+              /* "cogent/align/_pairwise_seqs.pyx":251
  * 
  *                                 elif exponent == max_exponent - 1:
  *                                     sub_partial_sum += mantissa             # <<<<<<<<<<<<<<
@@ -4874,7 +5237,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_sub_partial_sum = (__pyx_v_sub_partial_sum + __pyx_v_mantissa);
 
-              /* "cogent/align/_pairwise_seqs.pyx":218
+              /* "cogent/align/_pairwise_seqs.pyx":250
  *                                         pointer_b = b
  * 
  *                                 elif exponent == max_exponent - 1:             # <<<<<<<<<<<<<<
@@ -4882,11 +5245,11 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  * 
  */
             }
-            __pyx_L55:;
-            __pyx_L42_continue:;
+            __pyx_L65:;
+            __pyx_L52_continue:;
           }
 
-          /* "cogent/align/_pairwise_seqs.pyx":221
+          /* "cogent/align/_pairwise_seqs.pyx":253
  *                                     sub_partial_sum += mantissa
  * 
  *                             partial_sum += sub_partial_sum * MIN_FLOAT_VALUE             # <<<<<<<<<<<<<<
@@ -4895,17 +5258,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           __pyx_v_partial_sum = (__pyx_v_partial_sum + (__pyx_v_sub_partial_sum * __pyx_v_6cogent_5align_14_pairwise_seqs_MIN_FLOAT_VALUE));
 
-          /* "cogent/align/_pairwise_seqs.pyx":168
- *                     pointer_b = b
- * 
- *                 if use_scaling:             # <<<<<<<<<<<<<<
+          /* "cogent/align/_pairwise_seqs.pyx":200
+ *                 if not in_band:
+ *                     pass
+ *                 elif use_scaling:             # <<<<<<<<<<<<<<
  *                             sub_partial_sum = 0.0
  *                             for prev_state from min_prev_state <= prev_state < N:
  */
-          goto __pyx_L41;
+          goto __pyx_L51;
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":223
+        /* "cogent/align/_pairwise_seqs.pyx":255
  *                             partial_sum += sub_partial_sum * MIN_FLOAT_VALUE
  *                 else:
  *                             for prev_state from min_prev_state <= prev_state < N:             # <<<<<<<<<<<<<<
@@ -4913,22 +5276,22 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  *                                 if use_logs:
  */
         /*else*/ {
-          __pyx_t_32 = __pyx_v_N;
-          for (__pyx_v_prev_state = __pyx_v_min_prev_state; __pyx_v_prev_state < __pyx_t_32; __pyx_v_prev_state++) {
+          __pyx_t_37 = __pyx_v_N;
+          for (__pyx_v_prev_state = __pyx_v_min_prev_state; __pyx_v_prev_state < __pyx_t_37; __pyx_v_prev_state++) {
 
-            /* "cogent/align/_pairwise_seqs.pyx":224
+            /* "cogent/align/_pairwise_seqs.pyx":256
  *                 else:
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]             # <<<<<<<<<<<<<<
  *                                 if use_logs:
  *                                     mantissa = mantissa + T[prev_state, state]
  */
-            __pyx_t_46 = __pyx_v_source_row_index;
-            __pyx_t_47 = __pyx_v_prev_j;
-            __pyx_t_48 = __pyx_v_prev_state;
-            __pyx_v_mantissa = (*((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_mantissas.data + __pyx_t_46 * __pyx_v_mantissas.strides[0]) ) + __pyx_t_47 * __pyx_v_mantissas.strides[1]) )) + __pyx_t_48)) )));
+            __pyx_t_56 = __pyx_v_source_row_index;
+            __pyx_t_57 = __pyx_v_prev_j;
+            __pyx_t_58 = __pyx_v_prev_state;
+            __pyx_v_mantissa = (*((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_mantissas.data + __pyx_t_56 * __pyx_v_mantissas.strides[0]) ) + __pyx_t_57 * __pyx_v_mantissas.strides[1]) )) + __pyx_t_58)) )));
 
-            /* "cogent/align/_pairwise_seqs.pyx":225
+            /* "cogent/align/_pairwise_seqs.pyx":257
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]
  *                                 if use_logs:             # <<<<<<<<<<<<<<
@@ -4938,28 +5301,28 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             __pyx_t_1 = (__pyx_v_use_logs != 0);
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":226
+              /* "cogent/align/_pairwise_seqs.pyx":258
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]
  *                                 if use_logs:
  *                                     mantissa = mantissa + T[prev_state, state]             # <<<<<<<<<<<<<<
  *                                 else:
  *                                     mantissa = mantissa * T[prev_state, state]
  */
-              __pyx_t_49 = __pyx_v_prev_state;
-              __pyx_t_50 = __pyx_v_state;
-              __pyx_v_mantissa = (__pyx_v_mantissa + (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_49 * __pyx_v_T.strides[0]) )) + __pyx_t_50)) ))));
+              __pyx_t_59 = __pyx_v_prev_state;
+              __pyx_t_60 = __pyx_v_state;
+              __pyx_v_mantissa = (__pyx_v_mantissa + (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_59 * __pyx_v_T.strides[0]) )) + __pyx_t_60)) ))));
 
-              /* "cogent/align/_pairwise_seqs.pyx":225
+              /* "cogent/align/_pairwise_seqs.pyx":257
  *                             for prev_state from min_prev_state <= prev_state < N:
  *                                 mantissa = mantissas[source_row_index, prev_j, prev_state]
  *                                 if use_logs:             # <<<<<<<<<<<<<<
  *                                     mantissa = mantissa + T[prev_state, state]
  *                                 else:
  */
-              goto __pyx_L61;
+              goto __pyx_L71;
             }
 
-            /* "cogent/align/_pairwise_seqs.pyx":228
+            /* "cogent/align/_pairwise_seqs.pyx":260
  *                                     mantissa = mantissa + T[prev_state, state]
  *                                 else:
  *                                     mantissa = mantissa * T[prev_state, state]             # <<<<<<<<<<<<<<
@@ -4967,11 +5330,11 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  *                                 if viterbi and mantissa > max_mantissa:
  */
             /*else*/ {
-              __pyx_t_51 = __pyx_v_prev_state;
-              __pyx_t_52 = __pyx_v_state;
-              __pyx_v_mantissa = (__pyx_v_mantissa * (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_51 * __pyx_v_T.strides[0]) )) + __pyx_t_52)) ))));
+              __pyx_t_61 = __pyx_v_prev_state;
+              __pyx_t_62 = __pyx_v_state;
+              __pyx_v_mantissa = (__pyx_v_mantissa * (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_T.data + __pyx_t_61 * __pyx_v_T.strides[0]) )) + __pyx_t_62)) ))));
 
-              /* "cogent/align/_pairwise_seqs.pyx":229
+              /* "cogent/align/_pairwise_seqs.pyx":261
  *                                 else:
  *                                     mantissa = mantissa * T[prev_state, state]
  *                                     partial_sum += mantissa             # <<<<<<<<<<<<<<
@@ -4980,27 +5343,27 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_partial_sum = (__pyx_v_partial_sum + __pyx_v_mantissa);
             }
-            __pyx_L61:;
+            __pyx_L71:;
 
-            /* "cogent/align/_pairwise_seqs.pyx":230
+            /* "cogent/align/_pairwise_seqs.pyx":262
  *                                     mantissa = mantissa * T[prev_state, state]
  *                                     partial_sum += mantissa
  *                                 if viterbi and mantissa > max_mantissa:             # <<<<<<<<<<<<<<
  *                                     max_mantissa = mantissa
  *                                     pointer_state = prev_state
  */
-            __pyx_t_13 = (__pyx_v_viterbi != 0);
-            if (__pyx_t_13) {
+            __pyx_t_16 = (__pyx_v_viterbi != 0);
+            if (__pyx_t_16) {
             } else {
-              __pyx_t_1 = __pyx_t_13;
-              goto __pyx_L63_bool_binop_done;
+              __pyx_t_1 = __pyx_t_16;
+              goto __pyx_L73_bool_binop_done;
             }
-            __pyx_t_13 = ((__pyx_v_mantissa > __pyx_v_max_mantissa) != 0);
-            __pyx_t_1 = __pyx_t_13;
-            __pyx_L63_bool_binop_done:;
+            __pyx_t_16 = ((__pyx_v_mantissa > __pyx_v_max_mantissa) != 0);
+            __pyx_t_1 = __pyx_t_16;
+            __pyx_L73_bool_binop_done:;
             if (__pyx_t_1) {
 
-              /* "cogent/align/_pairwise_seqs.pyx":231
+              /* "cogent/align/_pairwise_seqs.pyx":263
  *                                     partial_sum += mantissa
  *                                 if viterbi and mantissa > max_mantissa:
  *                                     max_mantissa = mantissa             # <<<<<<<<<<<<<<
@@ -5009,7 +5372,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_max_mantissa = __pyx_v_mantissa;
 
-              /* "cogent/align/_pairwise_seqs.pyx":232
+              /* "cogent/align/_pairwise_seqs.pyx":264
  *                                 if viterbi and mantissa > max_mantissa:
  *                                     max_mantissa = mantissa
  *                                     pointer_state = prev_state             # <<<<<<<<<<<<<<
@@ -5018,7 +5381,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_pointer_state = __pyx_v_prev_state;
 
-              /* "cogent/align/_pairwise_seqs.pyx":233
+              /* "cogent/align/_pairwise_seqs.pyx":265
  *                                     max_mantissa = mantissa
  *                                     pointer_state = prev_state
  *                                     pointer_a = a             # <<<<<<<<<<<<<<
@@ -5027,7 +5390,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_pointer_a = __pyx_v_a;
 
-              /* "cogent/align/_pairwise_seqs.pyx":234
+              /* "cogent/align/_pairwise_seqs.pyx":266
  *                                     pointer_state = prev_state
  *                                     pointer_a = a
  *                                     pointer_b = b             # <<<<<<<<<<<<<<
@@ -5036,7 +5399,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
               __pyx_v_pointer_b = __pyx_v_b;
 
-              /* "cogent/align/_pairwise_seqs.pyx":230
+              /* "cogent/align/_pairwise_seqs.pyx":262
  *                                     mantissa = mantissa * T[prev_state, state]
  *                                     partial_sum += mantissa
  *                                 if viterbi and mantissa > max_mantissa:             # <<<<<<<<<<<<<<
@@ -5046,9 +5409,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
             }
           }
         }
-        __pyx_L41:;
+        __pyx_L51:;
 
-        /* "cogent/align/_pairwise_seqs.pyx":236
+        /* "cogent/align/_pairwise_seqs.pyx":268
  *                                     pointer_b = b
  * 
  *                 if viterbi:             # <<<<<<<<<<<<<<
@@ -5058,57 +5421,57 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = (__pyx_v_viterbi != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":237
+          /* "cogent/align/_pairwise_seqs.pyx":269
  * 
  *                 if viterbi:
  *                     mantissa = max_mantissa             # <<<<<<<<<<<<<<
  *                     if track is not None:
- *                         track[i, j, state] = (
+ *                         track[i, j - track_offset, state] = (
  */
           __pyx_v_mantissa = __pyx_v_max_mantissa;
 
-          /* "cogent/align/_pairwise_seqs.pyx":238
+          /* "cogent/align/_pairwise_seqs.pyx":270
  *                 if viterbi:
  *                     mantissa = max_mantissa
  *                     if track is not None:             # <<<<<<<<<<<<<<
- *                         track[i, j, state] = (
+ *                         track[i, j - track_offset, state] = (
  *                             (pointer_a << tcode_x) |
  */
           __pyx_t_1 = ((((PyObject *) __pyx_v_track.memview) != Py_None) != 0);
           if (__pyx_t_1) {
 
-            /* "cogent/align/_pairwise_seqs.pyx":239
+            /* "cogent/align/_pairwise_seqs.pyx":271
  *                     mantissa = max_mantissa
  *                     if track is not None:
- *                         track[i, j, state] = (             # <<<<<<<<<<<<<<
+ *                         track[i, j - track_offset, state] = (             # <<<<<<<<<<<<<<
  *                             (pointer_a << tcode_x) |
  *                             (pointer_b << tcode_y) |
  */
-            __pyx_t_53 = __pyx_v_i;
-            __pyx_t_54 = __pyx_v_j;
-            __pyx_t_55 = __pyx_v_state;
-            *((unsigned char *) ( /* dim=2 */ ((char *) (((unsigned char *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_track.data + __pyx_t_53 * __pyx_v_track.strides[0]) ) + __pyx_t_54 * __pyx_v_track.strides[1]) )) + __pyx_t_55)) )) = (((__pyx_v_pointer_a << __pyx_v_tcode_x) | (__pyx_v_pointer_b << __pyx_v_tcode_y)) | (__pyx_v_pointer_state << __pyx_v_tcode_s));
+            __pyx_t_63 = __pyx_v_i;
+            __pyx_t_64 = (__pyx_v_j - __pyx_v_track_offset);
+            __pyx_t_65 = __pyx_v_state;
+            *((unsigned char *) ( /* dim=2 */ ((char *) (((unsigned char *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_track.data + __pyx_t_63 * __pyx_v_track.strides[0]) ) + __pyx_t_64 * __pyx_v_track.strides[1]) )) + __pyx_t_65)) )) = (((__pyx_v_pointer_a << __pyx_v_tcode_x) | (__pyx_v_pointer_b << __pyx_v_tcode_y)) | (__pyx_v_pointer_state << __pyx_v_tcode_s));
 
-            /* "cogent/align/_pairwise_seqs.pyx":238
+            /* "cogent/align/_pairwise_seqs.pyx":270
  *                 if viterbi:
  *                     mantissa = max_mantissa
  *                     if track is not None:             # <<<<<<<<<<<<<<
- *                         track[i, j, state] = (
+ *                         track[i, j - track_offset, state] = (
  *                             (pointer_a << tcode_x) |
  */
           }
 
-          /* "cogent/align/_pairwise_seqs.pyx":236
+          /* "cogent/align/_pairwise_seqs.pyx":268
  *                                     pointer_b = b
  * 
  *                 if viterbi:             # <<<<<<<<<<<<<<
  *                     mantissa = max_mantissa
  *                     if track is not None:
  */
-          goto __pyx_L65;
+          goto __pyx_L75;
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":244
+        /* "cogent/align/_pairwise_seqs.pyx":276
  *                             (pointer_state << tcode_s))
  *                 else:
  *                     mantissa = partial_sum             # <<<<<<<<<<<<<<
@@ -5118,9 +5481,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         /*else*/ {
           __pyx_v_mantissa = __pyx_v_partial_sum;
         }
-        __pyx_L65:;
+        __pyx_L75:;
 
-        /* "cogent/align/_pairwise_seqs.pyx":246
+        /* "cogent/align/_pairwise_seqs.pyx":278
  *                     mantissa = partial_sum
  * 
  *                 if dy:             # <<<<<<<<<<<<<<
@@ -5130,17 +5493,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = (__pyx_v_dy != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":247
+          /* "cogent/align/_pairwise_seqs.pyx":279
  * 
  *                 if dy:
  *                     y = seq2_index[j]             # <<<<<<<<<<<<<<
  *                     if dx:
  *                         d_score = match_scores[bin, x, y]
  */
-          __pyx_t_56 = __pyx_v_j;
-          __pyx_v_y = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_seq2_index.data) + __pyx_t_56)) )));
+          __pyx_t_66 = __pyx_v_j;
+          __pyx_v_y = (*((long *) ( /* dim=0 */ ((char *) (((long *) __pyx_v_seq2_index.data) + __pyx_t_66)) )));
 
-          /* "cogent/align/_pairwise_seqs.pyx":248
+          /* "cogent/align/_pairwise_seqs.pyx":280
  *                 if dy:
  *                     y = seq2_index[j]
  *                     if dx:             # <<<<<<<<<<<<<<
@@ -5150,29 +5513,29 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
           __pyx_t_1 = (__pyx_v_dx != 0);
           if (__pyx_t_1) {
 
-            /* "cogent/align/_pairwise_seqs.pyx":249
+            /* "cogent/align/_pairwise_seqs.pyx":281
  *                     y = seq2_index[j]
  *                     if dx:
  *                         d_score = match_scores[bin, x, y]             # <<<<<<<<<<<<<<
  *                     else:
  *                         d_score = ygap_scores[bin, y]
  */
-            __pyx_t_57 = __pyx_v_bin;
-            __pyx_t_58 = __pyx_v_x;
-            __pyx_t_59 = __pyx_v_y;
-            __pyx_v_d_score = (*((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_match_scores.data + __pyx_t_57 * __pyx_v_match_scores.strides[0]) ) + __pyx_t_58 * __pyx_v_match_scores.strides[1]) )) + __pyx_t_59)) )));
+            __pyx_t_67 = __pyx_v_bin;
+            __pyx_t_68 = __pyx_v_x;
+            __pyx_t_69 = __pyx_v_y;
+            __pyx_v_d_score = (*((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_match_scores.data + __pyx_t_67 * __pyx_v_match_scores.strides[0]) ) + __pyx_t_68 * __pyx_v_match_scores.strides[1]) )) + __pyx_t_69)) )));
 
-            /* "cogent/align/_pairwise_seqs.pyx":248
+            /* "cogent/align/_pairwise_seqs.pyx":280
  *                 if dy:
  *                     y = seq2_index[j]
  *                     if dx:             # <<<<<<<<<<<<<<
  *                         d_score = match_scores[bin, x, y]
  *                     else:
  */
-            goto __pyx_L68;
+            goto __pyx_L78;
           }
 
-          /* "cogent/align/_pairwise_seqs.pyx":251
+          /* "cogent/align/_pairwise_seqs.pyx":283
  *                         d_score = match_scores[bin, x, y]
  *                     else:
  *                         d_score = ygap_scores[bin, y]             # <<<<<<<<<<<<<<
@@ -5180,23 +5543,23 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  *                     d_score = xgap_scores[bin, x]
  */
           /*else*/ {
-            __pyx_t_60 = __pyx_v_bin;
-            __pyx_t_61 = __pyx_v_y;
-            __pyx_v_d_score = (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_ygap_scores.data + __pyx_t_60 * __pyx_v_ygap_scores.strides[0]) )) + __pyx_t_61)) )));
+            __pyx_t_70 = __pyx_v_bin;
+            __pyx_t_71 = __pyx_v_y;
+            __pyx_v_d_score = (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_ygap_scores.data + __pyx_t_70 * __pyx_v_ygap_scores.strides[0]) )) + __pyx_t_71)) )));
           }
-          __pyx_L68:;
+          __pyx_L78:;
 
-          /* "cogent/align/_pairwise_seqs.pyx":246
+          /* "cogent/align/_pairwise_seqs.pyx":278
  *                     mantissa = partial_sum
  * 
  *                 if dy:             # <<<<<<<<<<<<<<
  *                     y = seq2_index[j]
  *                     if dx:
  */
-          goto __pyx_L67;
+          goto __pyx_L77;
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":252
+        /* "cogent/align/_pairwise_seqs.pyx":284
  *                     else:
  *                         d_score = ygap_scores[bin, y]
  *                 elif dx:             # <<<<<<<<<<<<<<
@@ -5206,28 +5569,28 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = (__pyx_v_dx != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":253
+          /* "cogent/align/_pairwise_seqs.pyx":285
  *                         d_score = ygap_scores[bin, y]
  *                 elif dx:
  *                     d_score = xgap_scores[bin, x]             # <<<<<<<<<<<<<<
  *                 elif use_logs:
  *                     d_score = 0.0
  */
-          __pyx_t_62 = __pyx_v_bin;
-          __pyx_t_63 = __pyx_v_x;
-          __pyx_v_d_score = (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_xgap_scores.data + __pyx_t_62 * __pyx_v_xgap_scores.strides[0]) )) + __pyx_t_63)) )));
+          __pyx_t_72 = __pyx_v_bin;
+          __pyx_t_73 = __pyx_v_x;
+          __pyx_v_d_score = (*((double *) ( /* dim=1 */ ((char *) (((double *) ( /* dim=0 */ (__pyx_v_xgap_scores.data + __pyx_t_72 * __pyx_v_xgap_scores.strides[0]) )) + __pyx_t_73)) )));
 
-          /* "cogent/align/_pairwise_seqs.pyx":252
+          /* "cogent/align/_pairwise_seqs.pyx":284
  *                     else:
  *                         d_score = ygap_scores[bin, y]
  *                 elif dx:             # <<<<<<<<<<<<<<
  *                     d_score = xgap_scores[bin, x]
  *                 elif use_logs:
  */
-          goto __pyx_L67;
+          goto __pyx_L77;
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":254
+        /* "cogent/align/_pairwise_seqs.pyx":286
  *                 elif dx:
  *                     d_score = xgap_scores[bin, x]
  *                 elif use_logs:             # <<<<<<<<<<<<<<
@@ -5237,7 +5600,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = (__pyx_v_use_logs != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":255
+          /* "cogent/align/_pairwise_seqs.pyx":287
  *                     d_score = xgap_scores[bin, x]
  *                 elif use_logs:
  *                     d_score = 0.0             # <<<<<<<<<<<<<<
@@ -5246,17 +5609,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           __pyx_v_d_score = 0.0;
 
-          /* "cogent/align/_pairwise_seqs.pyx":254
+          /* "cogent/align/_pairwise_seqs.pyx":286
  *                 elif dx:
  *                     d_score = xgap_scores[bin, x]
  *                 elif use_logs:             # <<<<<<<<<<<<<<
  *                     d_score = 0.0
  *                 else:
  */
-          goto __pyx_L67;
+          goto __pyx_L77;
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":257
+        /* "cogent/align/_pairwise_seqs.pyx":289
  *                     d_score = 0.0
  *                 else:
  *                     d_score = 1.0             # <<<<<<<<<<<<<<
@@ -5266,9 +5629,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         /*else*/ {
           __pyx_v_d_score = 1.0;
         }
-        __pyx_L67:;
+        __pyx_L77:;
 
-        /* "cogent/align/_pairwise_seqs.pyx":259
+        /* "cogent/align/_pairwise_seqs.pyx":291
  *                     d_score = 1.0
  * 
  *                 if use_logs:             # <<<<<<<<<<<<<<
@@ -5278,7 +5641,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = (__pyx_v_use_logs != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":260
+          /* "cogent/align/_pairwise_seqs.pyx":292
  * 
  *                 if use_logs:
  *                     mantissa += d_score             # <<<<<<<<<<<<<<
@@ -5287,17 +5650,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           __pyx_v_mantissa = (__pyx_v_mantissa + __pyx_v_d_score);
 
-          /* "cogent/align/_pairwise_seqs.pyx":259
+          /* "cogent/align/_pairwise_seqs.pyx":291
  *                     d_score = 1.0
  * 
  *                 if use_logs:             # <<<<<<<<<<<<<<
  *                     mantissa += d_score
  *                 else:
  */
-          goto __pyx_L69;
+          goto __pyx_L79;
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":262
+        /* "cogent/align/_pairwise_seqs.pyx":294
  *                     mantissa += d_score
  *                 else:
  *                     mantissa *= d_score             # <<<<<<<<<<<<<<
@@ -5307,21 +5670,21 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         /*else*/ {
           __pyx_v_mantissa = (__pyx_v_mantissa * __pyx_v_d_score);
         }
-        __pyx_L69:;
+        __pyx_L79:;
 
-        /* "cogent/align/_pairwise_seqs.pyx":264
+        /* "cogent/align/_pairwise_seqs.pyx":296
  *                     mantissa *= d_score
  * 
  *                 mantissas[current_row_index, j, state] = mantissa             # <<<<<<<<<<<<<<
  *                 if use_scaling:
  *                     exponents[current_row_index, j, state] = max_exponent
  */
-        __pyx_t_64 = __pyx_v_current_row_index;
-        __pyx_t_65 = __pyx_v_j;
-        __pyx_t_66 = __pyx_v_state;
-        *((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_mantissas.data + __pyx_t_64 * __pyx_v_mantissas.strides[0]) ) + __pyx_t_65 * __pyx_v_mantissas.strides[1]) )) + __pyx_t_66)) )) = __pyx_v_mantissa;
+        __pyx_t_74 = __pyx_v_current_row_index;
+        __pyx_t_75 = __pyx_v_j;
+        __pyx_t_76 = __pyx_v_state;
+        *((double *) ( /* dim=2 */ ((char *) (((double *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_mantissas.data + __pyx_t_74 * __pyx_v_mantissas.strides[0]) ) + __pyx_t_75 * __pyx_v_mantissas.strides[1]) )) + __pyx_t_76)) )) = __pyx_v_mantissa;
 
-        /* "cogent/align/_pairwise_seqs.pyx":265
+        /* "cogent/align/_pairwise_seqs.pyx":297
  * 
  *                 mantissas[current_row_index, j, state] = mantissa
  *                 if use_scaling:             # <<<<<<<<<<<<<<
@@ -5331,19 +5694,19 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
         __pyx_t_1 = (__pyx_v_use_scaling != 0);
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":266
+          /* "cogent/align/_pairwise_seqs.pyx":298
  *                 mantissas[current_row_index, j, state] = mantissa
  *                 if use_scaling:
  *                     exponents[current_row_index, j, state] = max_exponent             # <<<<<<<<<<<<<<
  * 
  *                 if local and dx and dy:
  */
-          __pyx_t_67 = __pyx_v_current_row_index;
-          __pyx_t_68 = __pyx_v_j;
-          __pyx_t_69 = __pyx_v_state;
-          *((long *) ( /* dim=2 */ ((char *) (((long *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_exponents.data + __pyx_t_67 * __pyx_v_exponents.strides[0]) ) + __pyx_t_68 * __pyx_v_exponents.strides[1]) )) + __pyx_t_69)) )) = __pyx_v_max_exponent;
+          __pyx_t_77 = __pyx_v_current_row_index;
+          __pyx_t_78 = __pyx_v_j;
+          __pyx_t_79 = __pyx_v_state;
+          *((long *) ( /* dim=2 */ ((char *) (((long *) ( /* dim=1 */ (( /* dim=0 */ (__pyx_v_exponents.data + __pyx_t_77 * __pyx_v_exponents.strides[0]) ) + __pyx_t_78 * __pyx_v_exponents.strides[1]) )) + __pyx_t_79)) )) = __pyx_v_max_exponent;
 
-          /* "cogent/align/_pairwise_seqs.pyx":265
+          /* "cogent/align/_pairwise_seqs.pyx":297
  * 
  *                 mantissas[current_row_index, j, state] = mantissa
  *                 if use_scaling:             # <<<<<<<<<<<<<<
@@ -5352,82 +5715,82 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
         }
 
-        /* "cogent/align/_pairwise_seqs.pyx":268
+        /* "cogent/align/_pairwise_seqs.pyx":300
  *                     exponents[current_row_index, j, state] = max_exponent
  * 
  *                 if local and dx and dy:             # <<<<<<<<<<<<<<
  *                     if (use_scaling and max_exponent > overall_max_exponent) or (
  *                             (not use_scaling or max_exponent == overall_max_exponent) and (
  */
-        __pyx_t_13 = (__pyx_v_local != 0);
-        if (__pyx_t_13) {
+        __pyx_t_16 = (__pyx_v_local != 0);
+        if (__pyx_t_16) {
         } else {
-          __pyx_t_1 = __pyx_t_13;
-          goto __pyx_L72_bool_binop_done;
+          __pyx_t_1 = __pyx_t_16;
+          goto __pyx_L82_bool_binop_done;
         }
-        __pyx_t_13 = (__pyx_v_dx != 0);
-        if (__pyx_t_13) {
+        __pyx_t_16 = (__pyx_v_dx != 0);
+        if (__pyx_t_16) {
         } else {
-          __pyx_t_1 = __pyx_t_13;
-          goto __pyx_L72_bool_binop_done;
+          __pyx_t_1 = __pyx_t_16;
+          goto __pyx_L82_bool_binop_done;
         }
-        __pyx_t_13 = (__pyx_v_dy != 0);
-        __pyx_t_1 = __pyx_t_13;
-        __pyx_L72_bool_binop_done:;
+        __pyx_t_16 = (__pyx_v_dy != 0);
+        __pyx_t_1 = __pyx_t_16;
+        __pyx_L82_bool_binop_done:;
         if (__pyx_t_1) {
 
-          /* "cogent/align/_pairwise_seqs.pyx":269
+          /* "cogent/align/_pairwise_seqs.pyx":301
  * 
  *                 if local and dx and dy:
  *                     if (use_scaling and max_exponent > overall_max_exponent) or (             # <<<<<<<<<<<<<<
  *                             (not use_scaling or max_exponent == overall_max_exponent) and (
  *                             mantissa > overall_max_mantissa)):
  */
-          __pyx_t_13 = (__pyx_v_use_scaling != 0);
-          if (!__pyx_t_13) {
-            goto __pyx_L77_next_or;
+          __pyx_t_16 = (__pyx_v_use_scaling != 0);
+          if (!__pyx_t_16) {
+            goto __pyx_L87_next_or;
           } else {
           }
-          __pyx_t_13 = ((__pyx_v_max_exponent > __pyx_v_overall_max_exponent) != 0);
-          if (!__pyx_t_13) {
+          __pyx_t_16 = ((__pyx_v_max_exponent > __pyx_v_overall_max_exponent) != 0);
+          if (!__pyx_t_16) {
           } else {
-            __pyx_t_1 = __pyx_t_13;
-            goto __pyx_L76_bool_binop_done;
+            __pyx_t_1 = __pyx_t_16;
+            goto __pyx_L86_bool_binop_done;
           }
-          __pyx_L77_next_or:;
+          __pyx_L87_next_or:;
 
-          /* "cogent/align/_pairwise_seqs.pyx":270
+          /* "cogent/align/_pairwise_seqs.pyx":302
  *                 if local and dx and dy:
  *                     if (use_scaling and max_exponent > overall_max_exponent) or (
  *                             (not use_scaling or max_exponent == overall_max_exponent) and (             # <<<<<<<<<<<<<<
  *                             mantissa > overall_max_mantissa)):
  *                         overall_max_exponent = max_exponent
  */
-          __pyx_t_13 = ((!(__pyx_v_use_scaling != 0)) != 0);
-          if (!__pyx_t_13) {
+          __pyx_t_16 = ((!(__pyx_v_use_scaling != 0)) != 0);
+          if (!__pyx_t_16) {
           } else {
-            goto __pyx_L79_next_and;
+            goto __pyx_L89_next_and;
           }
-          __pyx_t_13 = ((__pyx_v_max_exponent == __pyx_v_overall_max_exponent) != 0);
-          if (__pyx_t_13) {
+          __pyx_t_16 = ((__pyx_v_max_exponent == __pyx_v_overall_max_exponent) != 0);
+          if (__pyx_t_16) {
           } else {
-            __pyx_t_1 = __pyx_t_13;
-            goto __pyx_L76_bool_binop_done;
+            __pyx_t_1 = __pyx_t_16;
+            goto __pyx_L86_bool_binop_done;
           }
-          __pyx_L79_next_and:;
+          __pyx_L89_next_and:;
 
-          /* "cogent/align/_pairwise_seqs.pyx":271
+          /* "cogent/align/_pairwise_seqs.pyx":303
  *                     if (use_scaling and max_exponent > overall_max_exponent) or (
  *                             (not use_scaling or max_exponent == overall_max_exponent) and (
  *                             mantissa > overall_max_mantissa)):             # <<<<<<<<<<<<<<
  *                         overall_max_exponent = max_exponent
  *                         overall_max_mantissa = mantissa
  */
-          __pyx_t_13 = ((__pyx_v_mantissa > __pyx_v_overall_max_mantissa) != 0);
-          __pyx_t_1 = __pyx_t_13;
-          __pyx_L76_bool_binop_done:;
+          __pyx_t_16 = ((__pyx_v_mantissa > __pyx_v_overall_max_mantissa) != 0);
+          __pyx_t_1 = __pyx_t_16;
+          __pyx_L86_bool_binop_done:;
 
-          /* "cogent/align/_pairwise_seqs.pyx":269
+          /* "cogent/align/_pairwise_seqs.pyx":301
  * 
  *                 if local and dx and dy:
  *                     if (use_scaling and max_exponent > overall_max_exponent) or (             # <<<<<<<<<<<<<<
@@ -5436,7 +5799,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           if (__pyx_t_1) {
 
-            /* "cogent/align/_pairwise_seqs.pyx":272
+            /* "cogent/align/_pairwise_seqs.pyx":304
  *                             (not use_scaling or max_exponent == overall_max_exponent) and (
  *                             mantissa > overall_max_mantissa)):
  *                         overall_max_exponent = max_exponent             # <<<<<<<<<<<<<<
@@ -5445,7 +5808,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             __pyx_v_overall_max_exponent = __pyx_v_max_exponent;
 
-            /* "cogent/align/_pairwise_seqs.pyx":273
+            /* "cogent/align/_pairwise_seqs.pyx":305
  *                             mantissa > overall_max_mantissa)):
  *                         overall_max_exponent = max_exponent
  *                         overall_max_mantissa = mantissa             # <<<<<<<<<<<<<<
@@ -5454,7 +5817,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             __pyx_v_overall_max_mantissa = __pyx_v_mantissa;
 
-            /* "cogent/align/_pairwise_seqs.pyx":274
+            /* "cogent/align/_pairwise_seqs.pyx":306
  *                         overall_max_exponent = max_exponent
  *                         overall_max_mantissa = mantissa
  *                         last_i = i             # <<<<<<<<<<<<<<
@@ -5463,7 +5826,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             __pyx_v_last_i = __pyx_v_i;
 
-            /* "cogent/align/_pairwise_seqs.pyx":275
+            /* "cogent/align/_pairwise_seqs.pyx":307
  *                         overall_max_mantissa = mantissa
  *                         last_i = i
  *                         last_j = j             # <<<<<<<<<<<<<<
@@ -5472,7 +5835,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             __pyx_v_last_j = __pyx_v_j;
 
-            /* "cogent/align/_pairwise_seqs.pyx":276
+            /* "cogent/align/_pairwise_seqs.pyx":308
  *                         last_i = i
  *                         last_j = j
  *                         last_state = state             # <<<<<<<<<<<<<<
@@ -5481,7 +5844,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
             __pyx_v_last_state = __pyx_v_state;
 
-            /* "cogent/align/_pairwise_seqs.pyx":269
+            /* "cogent/align/_pairwise_seqs.pyx":301
  * 
  *                 if local and dx and dy:
  *                     if (use_scaling and max_exponent > overall_max_exponent) or (             # <<<<<<<<<<<<<<
@@ -5490,7 +5853,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
           }
 
-          /* "cogent/align/_pairwise_seqs.pyx":268
+          /* "cogent/align/_pairwise_seqs.pyx":300
  *                     exponents[current_row_index, j, state] = max_exponent
  * 
  *                 if local and dx and dy:             # <<<<<<<<<<<<<<
@@ -5498,12 +5861,12 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  *                             (not use_scaling or max_exponent == overall_max_exponent) and (
  */
         }
-        __pyx_L31_continue:;
+        __pyx_L39_continue:;
       }
     }
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":277
+  /* "cogent/align/_pairwise_seqs.pyx":309
  *                         last_j = j
  *                         last_state = state
  *     if not local:             # <<<<<<<<<<<<<<
@@ -5513,7 +5876,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_1 = ((!(__pyx_v_local != 0)) != 0);
   if (__pyx_t_1) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":278
+    /* "cogent/align/_pairwise_seqs.pyx":310
  *                         last_state = state
  *     if not local:
  *         last_i = i_high - 1             # <<<<<<<<<<<<<<
@@ -5522,7 +5885,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_last_i = (__pyx_v_i_high - 1);
 
-    /* "cogent/align/_pairwise_seqs.pyx":279
+    /* "cogent/align/_pairwise_seqs.pyx":311
  *     if not local:
  *         last_i = i_high - 1
  *         last_j = j_high - 1             # <<<<<<<<<<<<<<
@@ -5531,7 +5894,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_last_j = (__pyx_v_j_high - 1);
 
-    /* "cogent/align/_pairwise_seqs.pyx":280
+    /* "cogent/align/_pairwise_seqs.pyx":312
  *         last_i = i_high - 1
  *         last_j = j_high - 1
  *         last_state = state             # <<<<<<<<<<<<<<
@@ -5540,17 +5903,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_last_state = __pyx_v_state;
 
-    /* "cogent/align/_pairwise_seqs.pyx":277
+    /* "cogent/align/_pairwise_seqs.pyx":309
  *                         last_j = j
  *                         last_state = state
  *     if not local:             # <<<<<<<<<<<<<<
  *         last_i = i_high - 1
  *         last_j = j_high - 1
  */
-    goto __pyx_L81;
+    goto __pyx_L91;
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":282
+  /* "cogent/align/_pairwise_seqs.pyx":314
  *         last_state = state
  *     else:
  *         mantissa = overall_max_mantissa             # <<<<<<<<<<<<<<
@@ -5560,7 +5923,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   /*else*/ {
     __pyx_v_mantissa = __pyx_v_overall_max_mantissa;
 
-    /* "cogent/align/_pairwise_seqs.pyx":283
+    /* "cogent/align/_pairwise_seqs.pyx":315
  *     else:
  *         mantissa = overall_max_mantissa
  *         max_exponent = overall_max_exponent             # <<<<<<<<<<<<<<
@@ -5569,9 +5932,9 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_max_exponent = __pyx_v_overall_max_exponent;
   }
-  __pyx_L81:;
+  __pyx_L91:;
 
-  /* "cogent/align/_pairwise_seqs.pyx":285
+  /* "cogent/align/_pairwise_seqs.pyx":317
  *         max_exponent = overall_max_exponent
  * 
  *     if use_scaling:             # <<<<<<<<<<<<<<
@@ -5581,7 +5944,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_1 = (__pyx_v_use_scaling != 0);
   if (__pyx_t_1) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":286
+    /* "cogent/align/_pairwise_seqs.pyx":318
  * 
  *     if use_scaling:
  *         score = log(mantissa) + log(SCALE_STEP) * max_exponent             # <<<<<<<<<<<<<<
@@ -5590,17 +5953,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_score = (log(__pyx_v_mantissa) + (log(__pyx_v_6cogent_5align_14_pairwise_seqs_SCALE_STEP) * __pyx_v_max_exponent));
 
-    /* "cogent/align/_pairwise_seqs.pyx":285
+    /* "cogent/align/_pairwise_seqs.pyx":317
  *         max_exponent = overall_max_exponent
  * 
  *     if use_scaling:             # <<<<<<<<<<<<<<
  *         score = log(mantissa) + log(SCALE_STEP) * max_exponent
  *     elif use_logs:
  */
-    goto __pyx_L82;
+    goto __pyx_L92;
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":287
+  /* "cogent/align/_pairwise_seqs.pyx":319
  *     if use_scaling:
  *         score = log(mantissa) + log(SCALE_STEP) * max_exponent
  *     elif use_logs:             # <<<<<<<<<<<<<<
@@ -5610,7 +5973,7 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __pyx_t_1 = (__pyx_v_use_logs != 0);
   if (__pyx_t_1) {
 
-    /* "cogent/align/_pairwise_seqs.pyx":288
+    /* "cogent/align/_pairwise_seqs.pyx":320
  *         score = log(mantissa) + log(SCALE_STEP) * max_exponent
  *     elif use_logs:
  *         score = mantissa             # <<<<<<<<<<<<<<
@@ -5619,17 +5982,17 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
  */
     __pyx_v_score = __pyx_v_mantissa;
 
-    /* "cogent/align/_pairwise_seqs.pyx":287
+    /* "cogent/align/_pairwise_seqs.pyx":319
  *     if use_scaling:
  *         score = log(mantissa) + log(SCALE_STEP) * max_exponent
  *     elif use_logs:             # <<<<<<<<<<<<<<
  *         score = mantissa
  *     else:
  */
-    goto __pyx_L82;
+    goto __pyx_L92;
   }
 
-  /* "cogent/align/_pairwise_seqs.pyx":290
+  /* "cogent/align/_pairwise_seqs.pyx":322
  *         score = mantissa
  *     else:
  *         score = log(mantissa)             # <<<<<<<<<<<<<<
@@ -5638,43 +6001,43 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   /*else*/ {
     __pyx_v_score = log(__pyx_v_mantissa);
   }
-  __pyx_L82:;
+  __pyx_L92:;
 
-  /* "cogent/align/_pairwise_seqs.pyx":291
+  /* "cogent/align/_pairwise_seqs.pyx":323
  *     else:
  *         score = log(mantissa)
  *     return ((last_i, last_j), last_state, score)             # <<<<<<<<<<<<<<
  */
   __Pyx_XDECREF(__pyx_r);
-  __pyx_t_9 = __Pyx_PyInt_From_int(__pyx_v_last_i); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 291; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_9);
-  __pyx_t_7 = __Pyx_PyInt_From_int(__pyx_v_last_j); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 291; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_7);
-  __pyx_t_45 = PyTuple_New(2); if (unlikely(!__pyx_t_45)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 291; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_45);
-  __Pyx_GIVEREF(__pyx_t_9);
-  PyTuple_SET_ITEM(__pyx_t_45, 0, __pyx_t_9);
-  __Pyx_GIVEREF(__pyx_t_7);
-  PyTuple_SET_ITEM(__pyx_t_45, 1, __pyx_t_7);
-  __pyx_t_9 = 0;
-  __pyx_t_7 = 0;
-  __pyx_t_7 = __Pyx_PyInt_From_int(__pyx_v_last_state); if (unlikely(!__pyx_t_7)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 291; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_7);
-  __pyx_t_9 = PyFloat_FromDouble(__pyx_v_score); if (unlikely(!__pyx_t_9)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 291; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_9);
-  __pyx_t_14 = PyTuple_New(3); if (unlikely(!__pyx_t_14)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 291; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_t_14);
-  __Pyx_GIVEREF(__pyx_t_45);
-  PyTuple_SET_ITEM(__pyx_t_14, 0, __pyx_t_45);
-  __Pyx_GIVEREF(__pyx_t_7);
-  PyTuple_SET_ITEM(__pyx_t_14, 1, __pyx_t_7);
-  __Pyx_GIVEREF(__pyx_t_9);
-  PyTuple_SET_ITEM(__pyx_t_14, 2, __pyx_t_9);
-  __pyx_t_45 = 0;
-  __pyx_t_7 = 0;
-  __pyx_t_9 = 0;
-  __pyx_r = __pyx_t_14;
-  __pyx_t_14 = 0;
+  __pyx_t_12 = __Pyx_PyInt_From_int(__pyx_v_last_i); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_12);
+  __pyx_t_10 = __Pyx_PyInt_From_int(__pyx_v_last_j); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_10);
+  __pyx_t_55 = PyTuple_New(2); if (unlikely(!__pyx_t_55)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_55);
+  __Pyx_GIVEREF(__pyx_t_12);
+  PyTuple_SET_ITEM(__pyx_t_55, 0, __pyx_t_12);
+  __Pyx_GIVEREF(__pyx_t_10);
+  PyTuple_SET_ITEM(__pyx_t_55, 1, __pyx_t_10);
+  __pyx_t_12 = 0;
+  __pyx_t_10 = 0;
+  __pyx_t_10 = __Pyx_PyInt_From_int(__pyx_v_last_state); if (unlikely(!__pyx_t_10)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_10);
+  __pyx_t_12 = PyFloat_FromDouble(__pyx_v_score); if (unlikely(!__pyx_t_12)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_12);
+  __pyx_t_19 = PyTuple_New(3); if (unlikely(!__pyx_t_19)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 323; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_t_19);
+  __Pyx_GIVEREF(__pyx_t_55);
+  PyTuple_SET_ITEM(__pyx_t_19, 0, __pyx_t_55);
+  __Pyx_GIVEREF(__pyx_t_10);
+  PyTuple_SET_ITEM(__pyx_t_19, 1, __pyx_t_10);
+  __Pyx_GIVEREF(__pyx_t_12);
+  PyTuple_SET_ITEM(__pyx_t_19, 2, __pyx_t_12);
+  __pyx_t_55 = 0;
+  __pyx_t_10 = 0;
+  __pyx_t_12 = 0;
+  __pyx_r = __pyx_t_19;
+  __pyx_t_19 = 0;
   goto __pyx_L0;
 
   /* "cogent/align/_pairwise_seqs.pyx":35
@@ -5687,15 +6050,15 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
 
   /* function exit code */
   __pyx_L1_error:;
-  __Pyx_XDECREF(__pyx_t_7);
-  __Pyx_XDECREF(__pyx_t_8);
-  __Pyx_XDECREF(__pyx_t_9);
-  __PYX_XDEC_MEMVIEW(&__pyx_t_11, 1);
-  __PYX_XDEC_MEMVIEW(&__pyx_t_12, 1);
-  __Pyx_XDECREF(__pyx_t_14);
-  __PYX_XDEC_MEMVIEW(&__pyx_t_17, 1);
-  __Pyx_XDECREF(__pyx_t_43);
-  __Pyx_XDECREF(__pyx_t_45);
+  __Pyx_XDECREF(__pyx_t_10);
+  __Pyx_XDECREF(__pyx_t_11);
+  __Pyx_XDECREF(__pyx_t_12);
+  __PYX_XDEC_MEMVIEW(&__pyx_t_14, 1);
+  __PYX_XDEC_MEMVIEW(&__pyx_t_15, 1);
+  __Pyx_XDECREF(__pyx_t_19);
+  __PYX_XDEC_MEMVIEW(&__pyx_t_22, 1);
+  __Pyx_XDECREF(__pyx_t_53);
+  __Pyx_XDECREF(__pyx_t_55);
   __Pyx_AddTraceback("cogent.align._pairwise_seqs.calc_rows", __pyx_clineno, __pyx_lineno, __pyx_filename);
   __pyx_r = NULL;
   __pyx_L0:;
@@ -5710,6 +6073,8 @@ static PyObject *__pyx_pf_6cogent_5align_14_pairwise_seqs_2calc_rows(CYTHON_UNUS
   __PYX_XDEC_MEMVIEW(&__pyx_v_ygap_scores, 1);
   __PYX_XDEC_MEMVIEW(&__pyx_v_match_scores, 1);
   __PYX_XDEC_MEMVIEW(&__pyx_v_track, 1);
+  __PYX_XDEC_MEMVIEW(&__pyx_v_band_lows, 1);
+  __PYX_XDEC_MEMVIEW(&__pyx_v_band_highs, 1);
   __Pyx_XGIVEREF(__pyx_r);
   __Pyx_RefNannyFinishContext();
   return __pyx_r;
@@ -5906,7 +6271,7 @@ static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array___cinit__(struct __
  * 
  *         if itemsize <= 0:
  */
-    __pyx_t_3 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__8, NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 129; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_3 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__10, NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 129; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_3);
     __Pyx_Raise(__pyx_t_3, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
@@ -5938,7 +6303,7 @@ static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array___cinit__(struct __
  * 
  *         if not isinstance(format, bytes):
  */
-    __pyx_t_3 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__9, NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_3 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__11, NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_3);
     __Pyx_Raise(__pyx_t_3, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
@@ -5973,7 +6338,7 @@ static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array___cinit__(struct __
  */
     __pyx_t_3 = __Pyx_PyObject_GetAttrStr(__pyx_v_format, __pyx_n_s_encode); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 135; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_3);
-    __pyx_t_5 = __Pyx_PyObject_Call(__pyx_t_3, __pyx_tuple__10, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 135; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_5 = __Pyx_PyObject_Call(__pyx_t_3, __pyx_tuple__12, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 135; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_5);
     __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
     __Pyx_DECREF_SET(__pyx_v_format, __pyx_t_5);
@@ -6049,7 +6414,7 @@ static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array___cinit__(struct __
  * 
  * 
  */
-    __pyx_t_5 = __Pyx_PyObject_Call(__pyx_builtin_MemoryError, __pyx_tuple__11, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 144; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_5 = __Pyx_PyObject_Call(__pyx_builtin_MemoryError, __pyx_tuple__13, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 144; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_5);
     __Pyx_Raise(__pyx_t_5, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
@@ -6333,7 +6698,7 @@ static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array___cinit__(struct __
  * 
  *             if self.dtype_is_object:
  */
-      __pyx_t_5 = __Pyx_PyObject_Call(__pyx_builtin_MemoryError, __pyx_tuple__12, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 172; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_5 = __Pyx_PyObject_Call(__pyx_builtin_MemoryError, __pyx_tuple__14, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 172; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(__pyx_t_5);
       __Pyx_Raise(__pyx_t_5, 0, 0, 0);
       __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
@@ -6574,7 +6939,7 @@ static int __pyx_array___pyx_pf_15View_dot_MemoryView_5array_2__getbuffer__(stru
  *         info.buf = self.data
  *         info.len = self.len
  */
-    __pyx_t_3 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__13, NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 188; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_3 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__15, NULL); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 188; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_3);
     __Pyx_Raise(__pyx_t_3, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
@@ -9360,7 +9725,7 @@ static PyObject *__pyx_memoryview_convert_item_to_object(struct __pyx_memoryview
  *         else:
  *             if len(self.view.format) == 1:
  */
-      __pyx_t_6 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__14, NULL); if (unlikely(!__pyx_t_6)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 447; __pyx_clineno = __LINE__; goto __pyx_L5_except_error;}
+      __pyx_t_6 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__16, NULL); if (unlikely(!__pyx_t_6)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 447; __pyx_clineno = __LINE__; goto __pyx_L5_except_error;}
       __Pyx_GOTREF(__pyx_t_6);
       __Pyx_Raise(__pyx_t_6, 0, 0, 0);
       __Pyx_DECREF(__pyx_t_6); __pyx_t_6 = 0;
@@ -10190,7 +10555,7 @@ static PyObject *__pyx_pf_15View_dot_MemoryView_10memoryview_7strides___get__(st
  * 
  *             return tuple([stride for stride in self.view.strides[:self.view.ndim]])
  */
-    __pyx_t_2 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__15, NULL); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 523; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_2 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__17, NULL); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 523; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_2);
     __Pyx_Raise(__pyx_t_2, 0, 0, 0);
     __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
@@ -10307,7 +10672,7 @@ static PyObject *__pyx_pf_15View_dot_MemoryView_10memoryview_10suboffsets___get_
     __Pyx_XDECREF(__pyx_r);
     __pyx_t_2 = __Pyx_PyInt_From_int(__pyx_v_self->view.ndim); if (unlikely(!__pyx_t_2)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 531; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_2);
-    __pyx_t_3 = PyNumber_Multiply(__pyx_tuple__16, __pyx_t_2); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 531; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+    __pyx_t_3 = PyNumber_Multiply(__pyx_tuple__18, __pyx_t_2); if (unlikely(!__pyx_t_3)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 531; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
     __Pyx_GOTREF(__pyx_t_3);
     __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
     __pyx_r = __pyx_t_3;
@@ -11647,9 +12012,9 @@ static PyObject *_unellipsify(PyObject *__pyx_v_index, int __pyx_v_ndim) {
         __Pyx_GOTREF(__pyx_t_7);
         { Py_ssize_t __pyx_temp;
           for (__pyx_temp=0; __pyx_temp < ((__pyx_v_ndim - __pyx_t_8) + 1); __pyx_temp++) {
-            __Pyx_INCREF(__pyx_slice__17);
-            __Pyx_GIVEREF(__pyx_slice__17);
-            PyList_SET_ITEM(__pyx_t_7, __pyx_temp, __pyx_slice__17);
+            __Pyx_INCREF(__pyx_slice__19);
+            __Pyx_GIVEREF(__pyx_slice__19);
+            PyList_SET_ITEM(__pyx_t_7, __pyx_temp, __pyx_slice__19);
           }
         }
         __pyx_t_9 = __Pyx_PyList_Extend(__pyx_v_result, __pyx_t_7); if (unlikely(__pyx_t_9 == -1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 640; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
@@ -11682,7 +12047,7 @@ static PyObject *_unellipsify(PyObject *__pyx_v_index, int __pyx_v_ndim) {
  *         else:
  */
       /*else*/ {
-        __pyx_t_9 = __Pyx_PyList_Append(__pyx_v_result, __pyx_slice__18); if (unlikely(__pyx_t_9 == -1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 643; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+        __pyx_t_9 = __Pyx_PyList_Append(__pyx_v_result, __pyx_slice__20); if (unlikely(__pyx_t_9 == -1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 643; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       }
       __pyx_L7:;
 
@@ -11827,9 +12192,9 @@ static PyObject *_unellipsify(PyObject *__pyx_v_index, int __pyx_v_ndim) {
     __Pyx_GOTREF(__pyx_t_3);
     { Py_ssize_t __pyx_temp;
       for (__pyx_temp=0; __pyx_temp < __pyx_v_nslices; __pyx_temp++) {
-        __Pyx_INCREF(__pyx_slice__19);
-        __Pyx_GIVEREF(__pyx_slice__19);
-        PyList_SET_ITEM(__pyx_t_3, __pyx_temp, __pyx_slice__19);
+        __Pyx_INCREF(__pyx_slice__21);
+        __Pyx_GIVEREF(__pyx_slice__21);
+        PyList_SET_ITEM(__pyx_t_3, __pyx_temp, __pyx_slice__21);
       }
     }
     __pyx_t_9 = __Pyx_PyList_Extend(__pyx_v_result, __pyx_t_3); if (unlikely(__pyx_t_9 == -1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 654; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
@@ -11956,7 +12321,7 @@ static PyObject *assert_direct_dimensions(Py_ssize_t *__pyx_v_suboffsets, int __
  * 
  * 
  */
-      __pyx_t_5 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__20, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 661; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+      __pyx_t_5 = __Pyx_PyObject_Call(__pyx_builtin_ValueError, __pyx_tuple__22, NULL); if (unlikely(!__pyx_t_5)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 661; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
       __Pyx_GOTREF(__pyx_t_5);
       __Pyx_Raise(__pyx_t_5, 0, 0, 0);
       __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
@@ -17943,7 +18308,6 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
   {&__pyx_n_s_T, __pyx_k_T, sizeof(__pyx_k_T), 0, 0, 1, 1},
   {&__pyx_n_s_TypeError, __pyx_k_TypeError, sizeof(__pyx_k_TypeError), 0, 0, 1, 1},
   {&__pyx_kp_s_Unable_to_convert_item_to_object, __pyx_k_Unable_to_convert_item_to_object, sizeof(__pyx_k_Unable_to_convert_item_to_object), 0, 0, 1, 0},
-  {&__pyx_kp_s_Users_cu3alibre_Developer_pycog, __pyx_k_Users_cu3alibre_Developer_pycog, sizeof(__pyx_k_Users_cu3alibre_Developer_pycog), 0, 0, 1, 0},
   {&__pyx_n_s_ValueError, __pyx_k_ValueError, sizeof(__pyx_k_ValueError), 0, 0, 1, 1},
   {&__pyx_kp_s__7, __pyx_k__7, sizeof(__pyx_k__7), 0, 0, 1, 0},
   {&__pyx_n_s_a, __pyx_k_a, sizeof(__pyx_k_a), 0, 0, 1, 1},
@@ -17955,6 +18319,9 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
   {&__pyx_n_s_b_count, __pyx_k_b_count, sizeof(__pyx_k_b_count), 0, 0, 1, 1},
   {&__pyx_n_s_b_high, __pyx_k_b_high, sizeof(__pyx_k_b_high), 0, 0, 1, 1},
   {&__pyx_n_s_b_low, __pyx_k_b_low, sizeof(__pyx_k_b_low), 0, 0, 1, 1},
+  {&__pyx_n_s_band_highs, __pyx_k_band_highs, sizeof(__pyx_k_band_highs), 0, 0, 1, 1},
+  {&__pyx_n_s_band_lows, __pyx_k_band_lows, sizeof(__pyx_k_band_lows), 0, 0, 1, 1},
+  {&__pyx_n_s_banded, __pyx_k_banded, sizeof(__pyx_k_banded), 0, 0, 1, 1},
   {&__pyx_n_s_base, __pyx_k_base, sizeof(__pyx_k_base), 0, 0, 1, 1},
   {&__pyx_n_s_bin, __pyx_k_bin, sizeof(__pyx_k_bin), 0, 0, 1, 1},
   {&__pyx_n_s_bin_count, __pyx_k_bin_count, sizeof(__pyx_k_bin_count), 0, 0, 1, 1},
@@ -17990,6 +18357,7 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
   {&__pyx_n_s_id, __pyx_k_id, sizeof(__pyx_k_id), 0, 0, 1, 1},
   {&__pyx_n_s_import, __pyx_k_import, sizeof(__pyx_k_import), 0, 0, 1, 1},
   {&__pyx_n_s_impossible, __pyx_k_impossible, sizeof(__pyx_k_impossible), 0, 0, 1, 1},
+  {&__pyx_n_s_in_band, __pyx_k_in_band, sizeof(__pyx_k_in_band), 0, 0, 1, 1},
   {&__pyx_kp_s_is_unexpectedly_large, __pyx_k_is_unexpectedly_large, sizeof(__pyx_k_is_unexpectedly_large), 0, 0, 1, 0},
   {&__pyx_n_s_itemsize, __pyx_k_itemsize, sizeof(__pyx_k_itemsize), 0, 0, 1, 1},
   {&__pyx_kp_s_itemsize_0_for_cython_array, __pyx_k_itemsize_0_for_cython_array, sizeof(__pyx_k_itemsize_0_for_cython_array), 0, 0, 1, 0},
@@ -18032,8 +18400,11 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
   {&__pyx_n_s_pyx_getbuffer, __pyx_k_pyx_getbuffer, sizeof(__pyx_k_pyx_getbuffer), 0, 0, 1, 1},
   {&__pyx_n_s_pyx_vtable, __pyx_k_pyx_vtable, sizeof(__pyx_k_pyx_vtable), 0, 0, 1, 1},
   {&__pyx_n_s_range, __pyx_k_range, sizeof(__pyx_k_range), 0, 0, 1, 1},
+  {&__pyx_kp_s_root_package_cogent_align__pair, __pyx_k_root_package_cogent_align__pair, sizeof(__pyx_k_root_package_cogent_align__pair), 0, 0, 1, 0},
   {&__pyx_n_s_row_count, __pyx_k_row_count, sizeof(__pyx_k_row_count), 0, 0, 1, 1},
   {&__pyx_n_s_row_count1, __pyx_k_row_count1, sizeof(__pyx_k_row_count1), 0, 0, 1, 1},
+  {&__pyx_n_s_row_j_high, __pyx_k_row_j_high, sizeof(__pyx_k_row_j_high), 0, 0, 1, 1},
+  {&__pyx_n_s_row_j_low, __pyx_k_row_j_low, sizeof(__pyx_k_row_j_low), 0, 0, 1, 1},
   {&__pyx_n_s_row_length, __pyx_k_row_length, sizeof(__pyx_k_row_length), 0, 0, 1, 1},
   {&__pyx_n_s_row_length1, __pyx_k_row_length1, sizeof(__pyx_k_row_length1), 0, 0, 1, 1},
   {&__pyx_n_s_rows, __pyx_k_rows, sizeof(__pyx_k_rows), 0, 0, 1, 1},
@@ -18064,6 +18435,8 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
   {&__pyx_n_s_tmp_rows, __pyx_k_tmp_rows, sizeof(__pyx_k_tmp_rows), 0, 0, 1, 1},
   {&__pyx_n_s_track, __pyx_k_track, sizeof(__pyx_k_track), 0, 0, 1, 1},
   {&__pyx_n_s_track_enc, __pyx_k_track_enc, sizeof(__pyx_k_track_enc), 0, 0, 1, 1},
+  {&__pyx_n_s_track_offset, __pyx_k_track_offset, sizeof(__pyx_k_track_offset), 0, 0, 1, 1},
+  {&__pyx_n_s_track_width, __pyx_k_track_width, sizeof(__pyx_k_track_width), 0, 0, 1, 1},
   {&__pyx_kp_s_transition_is_a_negative_probabi, __pyx_k_transition_is_a_negative_probabi, sizeof(__pyx_k_transition_is_a_negative_probabi), 0, 0, 1, 0},
   {&__pyx_kp_s_unable_to_allocate_array_data, __pyx_k_unable_to_allocate_array_data, sizeof(__pyx_k_unable_to_allocate_array_data), 0, 0, 1, 0},
   {&__pyx_kp_s_unable_to_allocate_shape_and_str, __pyx_k_unable_to_allocate_shape_and_str, sizeof(__pyx_k_unable_to_allocate_shape_and_str), 0, 0, 1, 0},
@@ -18082,7 +18455,7 @@ static __Pyx_StringTabEntry __pyx_string_tab[] = {
 };
 static int __Pyx_InitCachedBuiltins(void) {
   __pyx_builtin_ValueError = __Pyx_GetBuiltinName(__pyx_n_s_ValueError); if (!__pyx_builtin_ValueError) {__pyx_filename = __pyx_f[0]; __pyx_lineno = 55; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __pyx_builtin_ArithmeticError = __Pyx_GetBuiltinName(__pyx_n_s_ArithmeticError); if (!__pyx_builtin_ArithmeticError) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 183; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_builtin_ArithmeticError = __Pyx_GetBuiltinName(__pyx_n_s_ArithmeticError); if (!__pyx_builtin_ArithmeticError) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 215; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_builtin_MemoryError = __Pyx_GetBuiltinName(__pyx_n_s_MemoryError); if (!__pyx_builtin_MemoryError) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 144; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_builtin_enumerate = __Pyx_GetBuiltinName(__pyx_n_s_enumerate); if (!__pyx_builtin_enumerate) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 147; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_builtin_range = __Pyx_GetBuiltinName(__pyx_n_s_range); if (!__pyx_builtin_range) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 176; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
@@ -18148,9 +18521,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *         if itemsize <= 0:
  */
-  __pyx_tuple__8 = PyTuple_Pack(1, __pyx_kp_s_Empty_shape_tuple_for_cython_arr); if (unlikely(!__pyx_tuple__8)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 129; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__8);
-  __Pyx_GIVEREF(__pyx_tuple__8);
+  __pyx_tuple__10 = PyTuple_Pack(1, __pyx_kp_s_Empty_shape_tuple_for_cython_arr); if (unlikely(!__pyx_tuple__10)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 129; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__10);
+  __Pyx_GIVEREF(__pyx_tuple__10);
 
   /* "View.MemoryView":132
  * 
@@ -18159,9 +18532,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *         if not isinstance(format, bytes):
  */
-  __pyx_tuple__9 = PyTuple_Pack(1, __pyx_kp_s_itemsize_0_for_cython_array); if (unlikely(!__pyx_tuple__9)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__9);
-  __Pyx_GIVEREF(__pyx_tuple__9);
+  __pyx_tuple__11 = PyTuple_Pack(1, __pyx_kp_s_itemsize_0_for_cython_array); if (unlikely(!__pyx_tuple__11)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 132; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__11);
+  __Pyx_GIVEREF(__pyx_tuple__11);
 
   /* "View.MemoryView":135
  * 
@@ -18170,9 +18543,9 @@ static int __Pyx_InitCachedConstants(void) {
  *         self._format = format  # keep a reference to the byte string
  *         self.format = self._format
  */
-  __pyx_tuple__10 = PyTuple_Pack(1, __pyx_n_s_ASCII); if (unlikely(!__pyx_tuple__10)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 135; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__10);
-  __Pyx_GIVEREF(__pyx_tuple__10);
+  __pyx_tuple__12 = PyTuple_Pack(1, __pyx_n_s_ASCII); if (unlikely(!__pyx_tuple__12)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 135; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__12);
+  __Pyx_GIVEREF(__pyx_tuple__12);
 
   /* "View.MemoryView":144
  * 
@@ -18181,9 +18554,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  * 
  */
-  __pyx_tuple__11 = PyTuple_Pack(1, __pyx_kp_s_unable_to_allocate_shape_and_str); if (unlikely(!__pyx_tuple__11)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 144; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__11);
-  __Pyx_GIVEREF(__pyx_tuple__11);
+  __pyx_tuple__13 = PyTuple_Pack(1, __pyx_kp_s_unable_to_allocate_shape_and_str); if (unlikely(!__pyx_tuple__13)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 144; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__13);
+  __Pyx_GIVEREF(__pyx_tuple__13);
 
   /* "View.MemoryView":172
  *             self.data = <char *>malloc(self.len)
@@ -18192,9 +18565,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *             if self.dtype_is_object:
  */
-  __pyx_tuple__12 = PyTuple_Pack(1, __pyx_kp_s_unable_to_allocate_array_data); if (unlikely(!__pyx_tuple__12)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 172; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__12);
-  __Pyx_GIVEREF(__pyx_tuple__12);
+  __pyx_tuple__14 = PyTuple_Pack(1, __pyx_kp_s_unable_to_allocate_array_data); if (unlikely(!__pyx_tuple__14)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 172; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__14);
+  __Pyx_GIVEREF(__pyx_tuple__14);
 
   /* "View.MemoryView":188
  *             bufmode = PyBUF_F_CONTIGUOUS | PyBUF_ANY_CONTIGUOUS
@@ -18203,9 +18576,9 @@ static int __Pyx_InitCachedConstants(void) {
  *         info.buf = self.data
  *         info.len = self.len
  */
-  __pyx_tuple__13 = PyTuple_Pack(1, __pyx_kp_s_Can_only_create_a_buffer_that_is); if (unlikely(!__pyx_tuple__13)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 188; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__13);
-  __Pyx_GIVEREF(__pyx_tuple__13);
+  __pyx_tuple__15 = PyTuple_Pack(1, __pyx_kp_s_Can_only_create_a_buffer_that_is); if (unlikely(!__pyx_tuple__15)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 188; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__15);
+  __Pyx_GIVEREF(__pyx_tuple__15);
 
   /* "View.MemoryView":447
  *             result = struct.unpack(self.view.format, bytesitem)
@@ -18214,9 +18587,9 @@ static int __Pyx_InitCachedConstants(void) {
  *         else:
  *             if len(self.view.format) == 1:
  */
-  __pyx_tuple__14 = PyTuple_Pack(1, __pyx_kp_s_Unable_to_convert_item_to_object); if (unlikely(!__pyx_tuple__14)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 447; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__14);
-  __Pyx_GIVEREF(__pyx_tuple__14);
+  __pyx_tuple__16 = PyTuple_Pack(1, __pyx_kp_s_Unable_to_convert_item_to_object); if (unlikely(!__pyx_tuple__16)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 447; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__16);
+  __Pyx_GIVEREF(__pyx_tuple__16);
 
   /* "View.MemoryView":523
  *             if self.view.strides == NULL:
@@ -18225,9 +18598,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *             return tuple([stride for stride in self.view.strides[:self.view.ndim]])
  */
-  __pyx_tuple__15 = PyTuple_Pack(1, __pyx_kp_s_Buffer_view_does_not_expose_stri); if (unlikely(!__pyx_tuple__15)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 523; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__15);
-  __Pyx_GIVEREF(__pyx_tuple__15);
+  __pyx_tuple__17 = PyTuple_Pack(1, __pyx_kp_s_Buffer_view_does_not_expose_stri); if (unlikely(!__pyx_tuple__17)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 523; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__17);
+  __Pyx_GIVEREF(__pyx_tuple__17);
 
   /* "View.MemoryView":531
  *         def __get__(self):
@@ -18236,12 +18609,12 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *             return tuple([suboffset for suboffset in self.view.suboffsets[:self.view.ndim]])
  */
-  __pyx_tuple__16 = PyTuple_New(1); if (unlikely(!__pyx_tuple__16)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 531; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__16);
+  __pyx_tuple__18 = PyTuple_New(1); if (unlikely(!__pyx_tuple__18)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 531; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__18);
   __Pyx_INCREF(__pyx_int_neg_1);
   __Pyx_GIVEREF(__pyx_int_neg_1);
-  PyTuple_SET_ITEM(__pyx_tuple__16, 0, __pyx_int_neg_1);
-  __Pyx_GIVEREF(__pyx_tuple__16);
+  PyTuple_SET_ITEM(__pyx_tuple__18, 0, __pyx_int_neg_1);
+  __Pyx_GIVEREF(__pyx_tuple__18);
 
   /* "View.MemoryView":640
  *         if item is Ellipsis:
@@ -18250,9 +18623,9 @@ static int __Pyx_InitCachedConstants(void) {
  *                 seen_ellipsis = True
  *             else:
  */
-  __pyx_slice__17 = PySlice_New(Py_None, Py_None, Py_None); if (unlikely(!__pyx_slice__17)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 640; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_slice__17);
-  __Pyx_GIVEREF(__pyx_slice__17);
+  __pyx_slice__19 = PySlice_New(Py_None, Py_None, Py_None); if (unlikely(!__pyx_slice__19)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 640; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_slice__19);
+  __Pyx_GIVEREF(__pyx_slice__19);
 
   /* "View.MemoryView":643
  *                 seen_ellipsis = True
@@ -18261,9 +18634,9 @@ static int __Pyx_InitCachedConstants(void) {
  *             have_slices = True
  *         else:
  */
-  __pyx_slice__18 = PySlice_New(Py_None, Py_None, Py_None); if (unlikely(!__pyx_slice__18)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 643; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_slice__18);
-  __Pyx_GIVEREF(__pyx_slice__18);
+  __pyx_slice__20 = PySlice_New(Py_None, Py_None, Py_None); if (unlikely(!__pyx_slice__20)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 643; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_slice__20);
+  __Pyx_GIVEREF(__pyx_slice__20);
 
   /* "View.MemoryView":654
  *     nslices = ndim - len(result)
@@ -18272,9 +18645,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  *     return have_slices or nslices, tuple(result)
  */
-  __pyx_slice__19 = PySlice_New(Py_None, Py_None, Py_None); if (unlikely(!__pyx_slice__19)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 654; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_slice__19);
-  __Pyx_GIVEREF(__pyx_slice__19);
+  __pyx_slice__21 = PySlice_New(Py_None, Py_None, Py_None); if (unlikely(!__pyx_slice__21)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 654; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_slice__21);
+  __Pyx_GIVEREF(__pyx_slice__21);
 
   /* "View.MemoryView":661
  *     for suboffset in suboffsets[:ndim]:
@@ -18283,20 +18656,20 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  * 
  */
-  __pyx_tuple__20 = PyTuple_Pack(1, __pyx_kp_s_Indirect_dimensions_not_supporte); if (unlikely(!__pyx_tuple__20)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 661; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__20);
-  __Pyx_GIVEREF(__pyx_tuple__20);
+  __pyx_tuple__22 = PyTuple_Pack(1, __pyx_kp_s_Indirect_dimensions_not_supporte); if (unlikely(!__pyx_tuple__22)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 661; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__22);
+  __Pyx_GIVEREF(__pyx_tuple__22);
 
   /* "cogent/align/_pairwise_seqs.pyx":16
  *     double log (double x)
  * 
- * version_info = (3, 2)             # <<<<<<<<<<<<<<
+ * version_info = (3, 3)             # <<<<<<<<<<<<<<
  * __version__ = "('1', '5', '3-dev')"
  * 
  */
-  __pyx_tuple__21 = PyTuple_Pack(2, __pyx_int_3, __pyx_int_2); if (unlikely(!__pyx_tuple__21)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 16; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__21);
-  __Pyx_GIVEREF(__pyx_tuple__21);
+  __pyx_tuple__23 = PyTuple_Pack(2, __pyx_int_3, __pyx_int_3); if (unlikely(!__pyx_tuple__23)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 16; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__23);
+  __Pyx_GIVEREF(__pyx_tuple__23);
 
   /* "cogent/align/_pairwise_seqs.pyx":30
  * MAX_SCALE = +10000  # or 0 if all numbers should be probabilities
@@ -18305,10 +18678,10 @@ static int __Pyx_InitCachedConstants(void) {
  *     return "%s * SCALE_STEP ** %s %s" % (mantissa, exponent, msg)
  * 
  */
-  __pyx_tuple__22 = PyTuple_Pack(3, __pyx_n_s_mantissa, __pyx_n_s_exponent, __pyx_n_s_msg); if (unlikely(!__pyx_tuple__22)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 30; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__22);
-  __Pyx_GIVEREF(__pyx_tuple__22);
-  __pyx_codeobj__23 = (PyObject*)__Pyx_PyCode_New(3, 0, 3, 0, 0, __pyx_empty_bytes, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_tuple__22, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_kp_s_Users_cu3alibre_Developer_pycog, __pyx_n_s_fmpt, 30, __pyx_empty_bytes); if (unlikely(!__pyx_codeobj__23)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 30; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_tuple__24 = PyTuple_Pack(3, __pyx_n_s_mantissa, __pyx_n_s_exponent, __pyx_n_s_msg); if (unlikely(!__pyx_tuple__24)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 30; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__24);
+  __Pyx_GIVEREF(__pyx_tuple__24);
+  __pyx_codeobj__25 = (PyObject*)__Pyx_PyCode_New(3, 0, 3, 0, 0, __pyx_empty_bytes, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_tuple__24, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_kp_s_root_package_cogent_align__pair, __pyx_n_s_fmpt, 30, __pyx_empty_bytes); if (unlikely(!__pyx_codeobj__25)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 30; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
   /* "cogent/align/_pairwise_seqs.pyx":35
  * ctypedef unsigned char [:,:,::1] UChar3D
@@ -18317,10 +18690,10 @@ static int __Pyx_InitCachedConstants(void) {
  *         int i_low, int i_high, int j_low, int j_high, preds,
  *         Long2D state_directions, Double2D T,
  */
-  __pyx_tuple__24 = PyTuple_Pack(77, __pyx_n_s_plan, __pyx_n_s_seq1_index, __pyx_n_s_seq2_index, __pyx_n_s_i_low, __pyx_n_s_i_high, __pyx_n_s_j_low, __pyx_n_s_j_high, __pyx_n_s_preds, __pyx_n_s_state_directions, __pyx_n_s_T, __pyx_n_s_xgap_scores, __pyx_n_s_ygap_scores, __pyx_n_s_match_scores, __pyx_n_s_rows, __pyx_n_s_track, __pyx_n_s_track_enc, __pyx_n_s_viterbi, __pyx_n_s_use_logs, __pyx_n_s_local, __pyx_n_s_use_scaling, __pyx_n_s_prev_i, __pyx_n_s_prev_j, __pyx_n_s_state, __pyx_n_s_prev_state, __pyx_n_s_min_prev_state, __pyx_n_s_N, __pyx_n_s_row_length, __pyx_n_s_row_length1, __pyx_n_s_row_count, __pyx_n_s_row_count1, __pyx_n_s_tmp_rows, __pyx_n_s_a_count, __pyx_n_s_b_count, __pyx_n_s_a, __pyx_n_s_b, __pyx_n_s_a_low, __pyx_n_s_a_high, __pyx_n_s_b_low, __pyx_n_s_b_high, __pyx_n_s_dest_states, __pyx_n_s_dest_state, __pyx_n_s_d4, __pyx_n_s_j, __pyx_n_s_i, __pyx_n_s_last_i, __pyx_n_s_last_j, __pyx_n_s_last_state, __pyx_n_s_bin, __pyx_n_s_x, __pyx_n_s_y, __pyx_n_s_bin_count, __pyx_n_s_max_x, __pyx_n_s_max_y, __pyx_n_s_current_row_index, __pyx_n_s_source_row_index, __pyx_n_s_source_i, __pyx_n_s_dx, __pyx_n_s_dy, __pyx_n_s_tcode_x, __pyx_n_s_tcode_y, __pyx_n_s_tcode_s, __pyx_n_s_d_score, __pyx_n_s_mantissa, __pyx_n_s_partial_sum, __pyx_n_s_sub_partial_sum, __pyx_n_s_max_mantissa, __pyx_n_s_overall_max_mantissa, __pyx_n_s_exponent, __pyx_n_s_max_exponent, __pyx_n_s_overall_max_exponent, __pyx_n_s_mantissas, __pyx_n_s_exponents, __pyx_n_s_pointer_a, __pyx_n_s_pointer_b, __pyx_n_s_pointer_state, __pyx_n_s_impossible, __pyx_n_s_score); if (unlikely(!__pyx_tuple__24)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__24);
-  __Pyx_GIVEREF(__pyx_tuple__24);
-  __pyx_codeobj__25 = (PyObject*)__Pyx_PyCode_New(20, 0, 77, 0, 0, __pyx_empty_bytes, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_tuple__24, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_kp_s_Users_cu3alibre_Developer_pycog, __pyx_n_s_calc_rows, 35, __pyx_empty_bytes); if (unlikely(!__pyx_codeobj__25)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_tuple__26 = PyTuple_Pack(85, __pyx_n_s_plan, __pyx_n_s_seq1_index, __pyx_n_s_seq2_index, __pyx_n_s_i_low, __pyx_n_s_i_high, __pyx_n_s_j_low, __pyx_n_s_j_high, __pyx_n_s_preds, __pyx_n_s_state_directions, __pyx_n_s_T, __pyx_n_s_xgap_scores, __pyx_n_s_ygap_scores, __pyx_n_s_match_scores, __pyx_n_s_rows, __pyx_n_s_track, __pyx_n_s_track_enc, __pyx_n_s_viterbi, __pyx_n_s_use_logs, __pyx_n_s_local, __pyx_n_s_use_scaling, __pyx_n_s_band_lows, __pyx_n_s_band_highs, __pyx_n_s_prev_i, __pyx_n_s_prev_j, __pyx_n_s_state, __pyx_n_s_prev_state, __pyx_n_s_min_prev_state, __pyx_n_s_N, __pyx_n_s_row_length, __pyx_n_s_row_length1, __pyx_n_s_row_count, __pyx_n_s_row_count1, __pyx_n_s_tmp_rows, __pyx_n_s_a_count, __pyx_n_s_b_count, __pyx_n_s_a, __pyx_n_s_b, __pyx_n_s_a_low, __pyx_n_s_a_high, __pyx_n_s_b_low, __pyx_n_s_b_high, __pyx_n_s_dest_states, __pyx_n_s_dest_state, __pyx_n_s_d4, __pyx_n_s_j, __pyx_n_s_i, __pyx_n_s_last_i, __pyx_n_s_last_j, __pyx_n_s_last_state, __pyx_n_s_bin, __pyx_n_s_x, __pyx_n_s_y, __pyx_n_s_bin_count, __pyx_n_s_max_x, __pyx_n_s_max_y, __pyx_n_s_current_row_index, __pyx_n_s_source_row_index, __pyx_n_s_source_i, __pyx_n_s_banded, __pyx_n_s_track_width, __pyx_n_s_track_offset, __pyx_n_s_row_j_low, __pyx_n_s_row_j_high, __pyx_n_s_in_band, __pyx_n_s_dx, __pyx_n_s_dy, __pyx_n_s_tcode_x, __pyx_n_s_tcode_y, __pyx_n_s_tcode_s, __pyx_n_s_d_score, __pyx_n_s_mantissa, __pyx_n_s_partial_sum, __pyx_n_s_sub_partial_sum, __pyx_n_s_max_mantissa, __pyx_n_s_overall_max_mantissa, __pyx_n_s_exponent, __pyx_n_s_max_exponent, __pyx_n_s_overall_max_exponent, __pyx_n_s_mantissas, __pyx_n_s_exponents, __pyx_n_s_pointer_a, __pyx_n_s_pointer_b, __pyx_n_s_pointer_state, __pyx_n_s_impossible, __pyx_n_s_score); if (unlikely(!__pyx_tuple__26)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__26);
+  __Pyx_GIVEREF(__pyx_tuple__26);
+  __pyx_codeobj__27 = (PyObject*)__Pyx_PyCode_New(22, 0, 85, 0, 0, __pyx_empty_bytes, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_tuple__26, __pyx_empty_tuple, __pyx_empty_tuple, __pyx_kp_s_root_package_cogent_align__pair, __pyx_n_s_calc_rows, 35, __pyx_empty_bytes); if (unlikely(!__pyx_codeobj__27)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 35; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
   /* "View.MemoryView":278
  *         return self.name
@@ -18329,9 +18702,9 @@ static int __Pyx_InitCachedConstants(void) {
  * cdef strided = Enum("<strided and direct>") # default
  * cdef indirect = Enum("<strided and indirect>")
  */
-  __pyx_tuple__26 = PyTuple_Pack(1, __pyx_kp_s_strided_and_direct_or_indirect); if (unlikely(!__pyx_tuple__26)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 278; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__26);
-  __Pyx_GIVEREF(__pyx_tuple__26);
+  __pyx_tuple__28 = PyTuple_Pack(1, __pyx_kp_s_strided_and_direct_or_indirect); if (unlikely(!__pyx_tuple__28)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 278; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__28);
+  __Pyx_GIVEREF(__pyx_tuple__28);
 
   /* "View.MemoryView":279
  * 
@@ -18340,9 +18713,9 @@ static int __Pyx_InitCachedConstants(void) {
  * cdef indirect = Enum("<strided and indirect>")
  * 
  */
-  __pyx_tuple__27 = PyTuple_Pack(1, __pyx_kp_s_strided_and_direct); if (unlikely(!__pyx_tuple__27)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 279; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__27);
-  __Pyx_GIVEREF(__pyx_tuple__27);
+  __pyx_tuple__29 = PyTuple_Pack(1, __pyx_kp_s_strided_and_direct); if (unlikely(!__pyx_tuple__29)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 279; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__29);
+  __Pyx_GIVEREF(__pyx_tuple__29);
 
   /* "View.MemoryView":280
  * cdef generic = Enum("<strided and direct or indirect>")
@@ -18351,9 +18724,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  * 
  */
-  __pyx_tuple__28 = PyTuple_Pack(1, __pyx_kp_s_strided_and_indirect); if (unlikely(!__pyx_tuple__28)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 280; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__28);
-  __Pyx_GIVEREF(__pyx_tuple__28);
+  __pyx_tuple__30 = PyTuple_Pack(1, __pyx_kp_s_strided_and_indirect); if (unlikely(!__pyx_tuple__30)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 280; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__30);
+  __Pyx_GIVEREF(__pyx_tuple__30);
 
   /* "View.MemoryView":283
  * 
@@ -18362,9 +18735,9 @@ static int __Pyx_InitCachedConstants(void) {
  * cdef indirect_contiguous = Enum("<contiguous and indirect>")
  * 
  */
-  __pyx_tuple__29 = PyTuple_Pack(1, __pyx_kp_s_contiguous_and_direct); if (unlikely(!__pyx_tuple__29)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 283; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__29);
-  __Pyx_GIVEREF(__pyx_tuple__29);
+  __pyx_tuple__31 = PyTuple_Pack(1, __pyx_kp_s_contiguous_and_direct); if (unlikely(!__pyx_tuple__31)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 283; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__31);
+  __Pyx_GIVEREF(__pyx_tuple__31);
 
   /* "View.MemoryView":284
  * 
@@ -18373,9 +18746,9 @@ static int __Pyx_InitCachedConstants(void) {
  * 
  * 
  */
-  __pyx_tuple__30 = PyTuple_Pack(1, __pyx_kp_s_contiguous_and_indirect); if (unlikely(!__pyx_tuple__30)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 284; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __Pyx_GOTREF(__pyx_tuple__30);
-  __Pyx_GIVEREF(__pyx_tuple__30);
+  __pyx_tuple__32 = PyTuple_Pack(1, __pyx_kp_s_contiguous_and_indirect); if (unlikely(!__pyx_tuple__32)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 284; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __Pyx_GOTREF(__pyx_tuple__32);
+  __Pyx_GIVEREF(__pyx_tuple__32);
   __Pyx_RefNannyFinishContext();
   return 0;
   __pyx_L1_error:;
@@ -18387,7 +18760,6 @@ static int __Pyx_InitGlobals(void) {
   if (__Pyx_InitStrings(__pyx_string_tab) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 1; __pyx_clineno = __LINE__; goto __pyx_L1_error;};
   __pyx_int_0 = PyInt_FromLong(0); if (unlikely(!__pyx_int_0)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 1; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_int_1 = PyInt_FromLong(1); if (unlikely(!__pyx_int_1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 1; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
-  __pyx_int_2 = PyInt_FromLong(2); if (unlikely(!__pyx_int_2)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 1; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_int_3 = PyInt_FromLong(3); if (unlikely(!__pyx_int_3)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 1; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __pyx_int_neg_1 = PyInt_FromLong(-1); if (unlikely(!__pyx_int_neg_1)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 1; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   return 0;
@@ -18404,6 +18776,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
 #endif
 {
   PyObject *__pyx_t_1 = NULL;
+  __pyx_t_6cogent_5align_14_pairwise_seqs_Long1D __pyx_t_2 = { 0, 0, { 0 }, { 0 }, { 0 } };
   int __pyx_lineno = 0;
   const char *__pyx_filename = NULL;
   int __pyx_clineno = 0;
@@ -18533,15 +18906,15 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
   /* "cogent/align/_pairwise_seqs.pyx":16
  *     double log (double x)
  * 
- * version_info = (3, 2)             # <<<<<<<<<<<<<<
+ * version_info = (3, 3)             # <<<<<<<<<<<<<<
  * __version__ = "('1', '5', '3-dev')"
  * 
  */
-  if (PyDict_SetItem(__pyx_d, __pyx_n_s_version_info, __pyx_tuple__21) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 16; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  if (PyDict_SetItem(__pyx_d, __pyx_n_s_version_info, __pyx_tuple__23) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 16; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
 
   /* "cogent/align/_pairwise_seqs.pyx":17
  * 
- * version_info = (3, 2)
+ * version_info = (3, 3)
  * __version__ = "('1', '5', '3-dev')"             # <<<<<<<<<<<<<<
  * 
  * cdef double SCALE_STEP, MIN_FLOAT_VALUE
@@ -18609,6 +18982,24 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
   if (PyDict_SetItem(__pyx_d, __pyx_n_s_fmpt, __pyx_t_1) < 0) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 30; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
 
+  /* "cogent/align/_pairwise_seqs.pyx":40
+ *         Double2D xgap_scores, Double2D ygap_scores, Double3D match_scores,
+ *         rows, UChar3D track, track_enc, int viterbi, int use_logs=0, int local=False,
+ *         int use_scaling=True, Long1D band_lows=None, Long1D band_highs=None):             # <<<<<<<<<<<<<<
+ * 
+ *     """The faster, sequence only (no POG) version.  Forward or Viterbi
+ */
+  __pyx_t_2 = __Pyx_PyObject_to_MemoryviewSlice_dc_long(Py_None);
+  if (unlikely(!__pyx_t_2.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 40; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_k__8 = __pyx_t_2;
+  __pyx_t_2.memview = NULL;
+  __pyx_t_2.data = NULL;
+  __pyx_t_2 = __Pyx_PyObject_to_MemoryviewSlice_dc_long(Py_None);
+  if (unlikely(!__pyx_t_2.memview)) {__pyx_filename = __pyx_f[1]; __pyx_lineno = 40; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_k__9 = __pyx_t_2;
+  __pyx_t_2.memview = NULL;
+  __pyx_t_2.data = NULL;
+
   /* "cogent/align/_pairwise_seqs.pyx":35
  * ctypedef unsigned char [:,:,::1] UChar3D
  * 
@@ -18651,7 +19042,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
  * cdef strided = Enum("<strided and direct>") # default
  * cdef indirect = Enum("<strided and indirect>")
  */
-  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__26, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 278; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__28, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 278; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __Pyx_XGOTREF(generic);
   __Pyx_DECREF_SET(generic, __pyx_t_1);
@@ -18665,7 +19056,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
  * cdef indirect = Enum("<strided and indirect>")
  * 
  */
-  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__27, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 279; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__29, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 279; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __Pyx_XGOTREF(strided);
   __Pyx_DECREF_SET(strided, __pyx_t_1);
@@ -18679,7 +19070,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
  * 
  * 
  */
-  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__28, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 280; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__30, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 280; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __Pyx_XGOTREF(indirect);
   __Pyx_DECREF_SET(indirect, __pyx_t_1);
@@ -18693,7 +19084,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
  * cdef indirect_contiguous = Enum("<contiguous and indirect>")
  * 
  */
-  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__29, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 283; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__31, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 283; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __Pyx_XGOTREF(contiguous);
   __Pyx_DECREF_SET(contiguous, __pyx_t_1);
@@ -18707,7 +19098,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
  * 
  * 
  */
-  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__30, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 284; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
+  __pyx_t_1 = __Pyx_PyObject_Call(((PyObject *)__pyx_MemviewEnum_type), __pyx_tuple__32, NULL); if (unlikely(!__pyx_t_1)) {__pyx_filename = __pyx_f[2]; __pyx_lineno = 284; __pyx_clineno = __LINE__; goto __pyx_L1_error;}
   __Pyx_GOTREF(__pyx_t_1);
   __Pyx_XGOTREF(indirect_contiguous);
   __Pyx_DECREF_SET(indirect_contiguous, __pyx_t_1);
@@ -18753,6 +19144,7 @@ PyMODINIT_FUNC PyInit__pairwise_seqs(void)
   goto __pyx_L0;
   __pyx_L1_error:;
   __Pyx_XDECREF(__pyx_t_1);
+  __PYX_XDEC_MEMVIEW(&__pyx_t_2, 1);
   if (__pyx_m) {
     if (__pyx_d) {
       __Pyx_AddTraceback("init cogent.align._pairwise_seqs", __pyx_clineno, __pyx_lineno, __pyx_filename);
@@ -19149,62 +19541,6 @@ bad:
     return -1;
 }
 
-static CYTHON_INLINE void __Pyx_RaiseTooManyValuesError(Py_ssize_t expected) {
-    PyErr_Format(PyExc_ValueError,
-                 "too many values to unpack (expected %" CYTHON_FORMAT_SSIZE_T "d)", expected);
-}
-
-static CYTHON_INLINE void __Pyx_RaiseNeedMoreValuesError(Py_ssize_t index) {
-    PyErr_Format(PyExc_ValueError,
-                 "need more than %" CYTHON_FORMAT_SSIZE_T "d value%.1s to unpack",
-                 index, (index == 1) ? "" : "s");
-}
-
-static CYTHON_INLINE int __Pyx_IterFinish(void) {
-#if CYTHON_COMPILING_IN_CPYTHON
-    PyThreadState *tstate = PyThreadState_GET();
-    PyObject* exc_type = tstate->curexc_type;
-    if (unlikely(exc_type)) {
-        if (likely(exc_type == PyExc_StopIteration) || PyErr_GivenExceptionMatches(exc_type, PyExc_StopIteration)) {
-            PyObject *exc_value, *exc_tb;
-            exc_value = tstate->curexc_value;
-            exc_tb = tstate->curexc_traceback;
-            tstate->curexc_type = 0;
-            tstate->curexc_value = 0;
-            tstate->curexc_traceback = 0;
-            Py_DECREF(exc_type);
-            Py_XDECREF(exc_value);
-            Py_XDECREF(exc_tb);
-            return 0;
-        } else {
-            return -1;
-        }
-    }
-    return 0;
-#else
-    if (unlikely(PyErr_Occurred())) {
-        if (likely(PyErr_ExceptionMatches(PyExc_StopIteration))) {
-            PyErr_Clear();
-            return 0;
-        } else {
-            return -1;
-        }
-    }
-    return 0;
-#endif
-}
-
-static int __Pyx_IternextUnpackEndCheck(PyObject *retval, Py_ssize_t expected) {
-    if (unlikely(retval)) {
-        Py_DECREF(retval);
-        __Pyx_RaiseTooManyValuesError(expected);
-        return -1;
-    } else {
-        return __Pyx_IterFinish();
-    }
-    return 0;
-}
-
 static CYTHON_INLINE int __Pyx_IsLittleEndian(void) {
   unsigned int n = 1;
   return *(unsigned char*)(&n) != 0;
@@ -19888,6 +20224,62 @@ static CYTHON_INLINE void __Pyx_XDEC_MEMVIEW(__Pyx_memviewslice *memslice,
     }
 }
 
+static CYTHON_INLINE void __Pyx_RaiseTooManyValuesError(Py_ssize_t expected) {
+    PyErr_Format(PyExc_ValueError,
+                 "too many values to unpack (expected %" CYTHON_FORMAT_SSIZE_T "d)", expected);
+}
+
+static CYTHON_INLINE void __Pyx_RaiseNeedMoreValuesError(Py_ssize_t index) {
+    PyErr_Format(PyExc_ValueError,
+                 "need more than %" CYTHON_FORMAT_SSIZE_T "d value%.1s to unpack",
+                 index, (index == 1) ? "" : "s");
+}
+
+static CYTHON_INLINE int __Pyx_IterFinish(void) {
+#if CYTHON_COMPILING_IN_CPYTHON
+    PyThreadState *tstate = PyThreadState_GET();
+    PyObject* exc_type = tstate->curexc_type;
+    if (unlikely(exc_type)) {
+        if (likely(exc_type == PyExc_StopIteration) || PyErr_GivenExceptionMatches(exc_type, PyExc_StopIteration)) {
+            PyObject *exc_value, *exc_tb;
+            exc_value = tstate->curexc_value;
+            exc_tb = tstate->curexc_traceback;
+            tstate->curexc_type = 0;
+            tstate->curexc_value = 0;
+            tstate->curexc_traceback = 0;
+            Py_DECREF(exc_type);
+            Py_XDECREF(exc_value);
+            Py_XDECREF(exc_tb);
+            return 0;
+        } else {
+            return -1;
+        }
+    }
+    return 0;
+#else
+    if (unlikely(PyErr_Occurred())) {
+        if (likely(PyErr_ExceptionMatches(PyExc_StopIteration))) {
+            PyErr_Clear();
+            return 0;
+        } else {
+            return -1;
+        }
+    }
+    return 0;
+#endif
+}
+
+static int __Pyx_IternextUnpackEndCheck(PyObject *retval, Py_ssize_t expected) {
+    if (unlikely(retval)) {
+        Py_DECREF(retval);
+        __Pyx_RaiseTooManyValuesError(expected);
+        return -1;
+    } else {
+        return __Pyx_IterFinish();
+    }
+    return 0;
+}
+
 static CYTHON_INLINE PyObject *__Pyx_GetModuleGlobalName(PyObject *name) {
     PyObject *result;
 #if CYTHON_COMPILING_IN_CPYTHON
@@ -13,7 +13,7 @@ cdef extern from "Python.h":
 cdef extern from "math.h":
     double log (double x)
 
-version_info = (3, 2)
+version_info = (3, 3)
 __version__ = "('1', '5', '3-dev')"
 
 cdef double SCALE_STEP, MIN_FLOAT_VALUE
@@ -37,13 +37,17 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
         Long2D state_directions, Double2D T, 
         Double2D xgap_scores, Double2D ygap_scores, Double3D match_scores, 
         rows, UChar3D track, track_enc, int viterbi, int use_logs=0, int local=False, 
-        int use_scaling=True):
+        int use_scaling=True, Long1D band_lows=None, Long1D band_highs=None):
     
     """The faster, sequence only (no POG) version.  Forward or Viterbi 
     algorithm, with doubles or with slower but practically unoverflowable 
     (double, long) GMP-like numbers.  Viterbi is also available in the ever 
     popular addition-of-logs version.  All this with any possible pair HMM 
     transition matrix.
+    
+    If band_lows and band_highs are given then row i is only calculated
+    for band_lows[i] <= j < band_highs[i], cells outside the band are
+    treated as impossible, and track is indexed by j - band_lows[i].
         
     Limitations
        - HMM states must be in a sensible order: M and X, then Y, then END.
@@ -58,6 +62,7 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
     cdef int bin, x, y, bin_count, max_x, max_y
     cdef int current_row_index, source_row_index
     cdef int source_i
+    cdef int banded, track_width, track_offset, row_j_low, row_j_high, in_band
 
     cdef int dx, dy
     cdef int tcode_x, tcode_y, tcode_s
@@ -97,6 +102,13 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
     
     assert j_low >= 0 and j_high > j_low and j_high <= row_length
     
+    banded = band_lows is not None
+    if banded:
+        checkArray1D(band_lows, &row_count)
+        checkArray1D(band_highs, &row_count)
+        for i from 0 <= i < row_count:
+            assert 0 <= band_lows[i] <= band_highs[i] <= row_length
+    
     (mantissas, exponents) = rows
     tmp_rows = 0
     checkArray3D(mantissas, &tmp_rows, &row_length, &N)
@@ -110,7 +122,13 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
         impossible = 0.0
 
     if viterbi and track is not None and track_enc is not None:
-        checkArray3D(track, &row_count, &row_length, &N)
+        track_width = row_length
+        if banded:
+            track_width = 0
+        checkArray3D(track, &row_count, &track_width, &N)
+        if banded:
+            for i from 0 <= i < row_count:
+                assert band_highs[i] - band_lows[i] <= track_width
         (tcode_x, tcode_y, tcode_s) = track_enc
     else:
         track = None
@@ -120,6 +138,7 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
     overall_max_exponent = MIN_SCALE
     overall_max_mantissa = impossible
     last_i = last_j = last_state = -1
+    track_offset = 0
     
     for i from i_low <= i < i_high:
         x = seq1_index[i]
@@ -132,7 +151,14 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
         #for prev_state from 1 <= prev_state < N:
         #    current_row_data[0, prev_state] = impossible
         
-        for j from j_low <= j < j_high:
+        row_j_low = j_low
+        row_j_high = j_high
+        if banded:
+            row_j_low = max(j_low, band_lows[i])
+            row_j_high = min(j_high, band_highs[i])
+            track_offset = band_lows[i]
+        
+        for j from row_j_low <= j < row_j_high:
             
             for dest_state from 0 <= dest_state < dest_states:
                 state = state_directions[dest_state, 0]
@@ -154,6 +180,10 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
                 if prev_j < 0:
                     continue
                 
+                # Stale values from an earlier row may lie outside the band
+                in_band = not banded or (band_lows[source_i] <= prev_j < 
+                        band_highs[source_i])
+                
                 min_prev_state = 1
                 a = dx
                 b = dy
@@ -165,7 +195,9 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
                     pointer_a = a
                     pointer_b = b
                     
-                if use_scaling:
+                if not in_band:
+                    pass
+                elif use_scaling:
                             sub_partial_sum = 0.0
                             for prev_state from min_prev_state <= prev_state < N:
                                 exponent = exponents[source_row_index, prev_j, prev_state]
@@ -236,7 +268,7 @@ def calc_rows(Long1D plan, Long1D seq1_index, Long1D seq2_index,
                 if viterbi:
                     mantissa = max_mantissa
                     if track is not None:
-                        track[i, j, state] = (        
+                        track[i, j - track_offset, state] = (        
                             (pointer_a << tcode_x) |  
                             (pointer_b << tcode_y) |
                             (pointer_state << tcode_s))
@@ -11,6 +11,8 @@ __maintainer__ = "Rob Knight"
 __email__ = "rob@spot.colorado.edu"
 __status__ = "Development"
 
+import numpy
+
 class ScoreCell(object):
     """Cell in a ScoreMatrix object. Contains score and pointer."""
     __slots__ = ['Score', 'Pointer']
@@ -60,6 +62,16 @@ equality_scorer = MatchScorer(1, -1)
 default_gap = -1
 default_gap_symbol = '-'
 
+def _as_seq_class(seq, aligned):
+    """Returns aligned (a list of items) converted to the class of seq."""
+    #Remember to return sequences that are the correct class. If the class
+    #subclasses str, you probably want ''.join rather than str to feed into
+    #the constructor, since str() on a list prints the brackets and commas.
+    if isinstance(seq, str):
+        return seq.__class__(''.join(aligned))
+    else:
+        return seq.__class__(aligned)
+
 class ScoreMatrix(list):
     """Matrix that contains (score, pointer) pairs for sequence alignment."""
     
@@ -144,20 +156,7 @@ class ScoreMatrix(list):
             self.fill()
             self.traceback()
             aln1, aln2 = self.FirstAlign, self.SecondAlign
-        #Remember to return sequences that are the correct class. If the class
-        #subclasses str, you probably want ''.join rather than str to feed into
-        #the constructor, since str() on a list prints the brackets and commas.
-        if isinstance(seq1, str):
-            first_result = seq1.__class__(''.join(aln1))
-        else:
-            first_result = seq1.__class__(aln1)
-            
-        if isinstance(seq2, str):
-            second_result = seq2.__class__(''.join(aln2))
-        else:
-            second_result = seq2.__class__(aln2)
-
-        return first_result, second_result
+        return _as_seq_class(seq1, aln1), _as_seq_class(seq2, aln2)
     
 
 class NeedlemanWunschMatrix(ScoreMatrix):
@@ -316,21 +315,252 @@ class SmithWatermanMatrix(ScoreMatrix):
         align_2.reverse()
         self.FirstAlign, self.SecondAlign = align_1, align_2
 
-def nw_align(seq1, seq2, scorer=equality_scorer, gap=default_gap, return_score=False):
-    """Returns globally optimal alignment of seq1 and seq2."""
-    N = NeedlemanWunschMatrix(seq1, seq2, scorer, gap)
-    if return_score:
-        return N.alignment(), N.MaxScore[0]
+# Array engine.  The matrix classes above keep a ScoreCell object per cell
+# and call the scorer once per cell; the functions below encode the
+# sequences as integer indices into a substitution array and fill a whole
+# row of the matrix at a time with numpy.  Gaps are affine (Gotoh): a gap
+# of length L scores gap + (L-1) * gap_extend.  Within a row the
+# horizontal gap scores depend on their left neighbours, but because
+# opening a gap costs at least as much as extending one they can be found
+# with a running maximum (numpy.maximum.accumulate) instead of a loop.
+# Ties are broken like ScoreCell.update: up, then diag, then left.
+
+_STOP, _DIAG, _UP, _LEFT = 0, 1, 2, 3
+_UP_EXTENDED = 4    # vertical gap at this cell extends the one above
+_LEFT_EXTENDED = 8  # horizontal gap at this cell extends the one to the left
+
+def _substitution_array(scorer, seqs):
+    """Returns ({symbol:index}, array) tabulating scorer over symbols in seqs.
+
+    scorer is either a function f(x,y) -> number or a dict keyed by
+    (x,y) symbol pairs, like that from cogent.align.align.make_dna_scoring_dict.
+    array[i,j] is the score of symbol i in the first sequence against
+    symbol j in the second.
+    """
+    index = {}
+    symbols = []
+    for seq in seqs:
+        for item in seq:
+            if item not in index:
+                index[item] = len(symbols)
+                symbols.append(item)
+    if not callable(scorer):
+        scorer = scorer.__getitem__
+        table = [[scorer((x, y)) for y in symbols] for x in symbols]
     else:
-        return N.alignment()
+        table = [[scorer(x, y) for y in symbols] for x in symbols]
+    return index, numpy.array(table).reshape((len(symbols), len(symbols)))
+
+def _gap_penalties(gap, gap_extend):
+    """Returns (open, extend) penalties from gap and gap_extend scores."""
+    if gap_extend is None:
+        gap_extend = gap
+    if gap > gap_extend:
+        raise ValueError("gap (%s) can't score better than gap_extend (%s)"
+            % (gap, gap_extend))
+    return -gap, -gap_extend
+
+def _array_fill(sub, first, seconds, lengths, gap_open, gap_extend, local,
+        trace=True):
+    """Fills score matrices of first against each of seconds, row by row.
+
+    sub is the substitution array; first is an index array (the columns)
+    and seconds a 2D index array with one row per second sequence, padded
+    on the right to a common length (the rows); lengths are their unpadded
+    lengths.
+
+    Returns (scores, ends, pointers): the best score for each pair, the
+    (row, col) it was found at and, if trace is True, an array of pointer
+    flags for each pair and cell.
+    """
+    (K, R) = seconds.shape
+    C = len(first)
+    dtype = numpy.result_type(sub.dtype, numpy.asarray(gap_open).dtype,
+        numpy.asarray(gap_extend).dtype)
+    if dtype.kind in 'iub':
+        dtype = numpy.dtype(numpy.int64)
+        neg = numpy.iinfo(dtype).min // 4
+    else:
+        neg = -numpy.inf
+    cols = numpy.arange(C+1)
+    sub = sub.T.astype(dtype)   # indexed [second symbol, first symbol]
+    if trace:
+        pointers = numpy.zeros([K, R+1, C+1], numpy.uint8)
+    else:
+        pointers = None
 
-def sw_align(seq1, seq2, scorer=equality_scorer, gap=default_gap, return_score=False):
-    """Returns locally optimal alignment of seq1 and seq2."""
-    S = SmithWatermanMatrix(seq1, seq2, scorer, gap)
-    if return_score:
-        return S.alignment(), S.MaxScore[0]
+    if local:
+        H = numpy.zeros([K, C+1], dtype)
     else:
-        return S.alignment()
+        edge = -(gap_open + (cols-1) * gap_extend)
+        edge[0] = 0
+        H = numpy.tile(edge.astype(dtype), (K, 1))
+        if trace:
+            pointers[:, 0, 1:] = _LEFT
+            pointers[:, 0, 2:] |= _LEFT_EXTENDED
+            pointers[:, 1:, 0] = _UP
+            pointers[:, 2:, 0] |= _UP_EXTENDED
+    F = numpy.empty([K, C+1], dtype)
+    F.fill(neg)
+    E = numpy.empty([K, C+1], dtype)
+    E[:, 0] = neg
+    extend_offsets = (cols * gap_extend).astype(dtype)
+
+    if local:
+        scores = numpy.zeros([K], dtype)
+        ends = numpy.zeros([K, 2], int)
+    else:
+        scores = H[:, C].copy()
+        ends = numpy.zeros([K, 2], int)
+        ends[:, 1] = C
+    for i in range(1, R+1):
+        diag = H[:, :-1] + sub[seconds[:, i-1]][:, first]
+        opened = H - gap_open
+        extended = F - gap_extend
+        up_extended = extended > opened
+        F = numpy.where(up_extended, extended, opened)
+        if local:
+            F[:, 0] = neg
+        else:
+            F[:, 0] = -(gap_open + (i-1) * gap_extend)
+        up = F[:, 1:] >= diag
+        best = numpy.empty([K, C+1], dtype)
+        best[:, 1:] = numpy.where(up, F[:, 1:], diag)
+        if local:
+            best[:, 0] = 0
+            numpy.maximum(best, 0, best)
+        else:
+            best[:, 0] = F[:, 0]
+        # E[j] = max over k < j of best[k] - gap_open - (j-k-1) * gap_extend
+        run = numpy.maximum.accumulate(best + extend_offsets, axis=1)
+        E[:, 1:] = run[:, :-1] - gap_open - extend_offsets[:-1]
+        left = E > best
+        H = numpy.where(left, E, best)
+        if local:
+            stop = H <= 0
+            H[stop] = 0
+        if trace:
+            p = numpy.where(up, _UP, _DIAG).astype(numpy.uint8)
+            p[left[:, 1:]] = _LEFT
+            p[up_extended[:, 1:]] |= _UP_EXTENDED
+            left_extended = E[:, :-1] - gap_extend > best[:, :-1] - gap_open
+            p[left_extended] |= _LEFT_EXTENDED
+            if local:
+                p[stop[:, 1:]] &= ~numpy.uint8(3)
+            pointers[:, i, 1:] = p
+        if local:
+            if C:
+                row_best = H[:, 1:].argmax(axis=1)
+                row_score = H[numpy.arange(K), row_best+1]
+                better = (row_score > scores) & (i <= lengths)
+                scores[better] = row_score[better]
+                ends[better, 0] = i
+                ends[better, 1] = row_best[better] + 1
+        else:
+            done = lengths == i
+            scores[done] = H[done, C]
+            ends[done, 0] = i
+    return scores, ends, pointers
+
+def _array_traceback(pointers, first, second, row, col):
+    """Returns aligned (first, second) as lists, from pointer flags."""
+    gap = default_gap_symbol
+    align_1 = []
+    align_2 = []
+    state = _STOP   # in the best-path matrix, rather than a gap matrix
+    while 1:
+        p = pointers[row, col]
+        if state == _STOP:
+            state = p & 3
+            if state == _STOP:
+                break
+            if state == _DIAG:
+                align_1.append(first[col-1])
+                align_2.append(second[row-1])
+                row -= 1
+                col -= 1
+                state = _STOP
+        elif state == _UP:
+            align_1.append(gap)
+            align_2.append(second[row-1])
+            row -= 1
+            if not p & _UP_EXTENDED:
+                state = _STOP
+        else:
+            align_1.append(first[col-1])
+            align_2.append(gap)
+            col -= 1
+            if not p & _LEFT_EXTENDED:
+                state = _STOP
+    align_1.reverse()
+    align_2.reverse()
+    return align_1, align_2
+
+def _array_align(query, targets, scorer, gap, gap_extend, local,
+        return_score, score_only=False):
+    """Aligns query against each of targets, returning a list of results."""
+    (gap_open, gap_extend) = _gap_penalties(gap, gap_extend)
+    targets = list(targets)
+    (index, sub) = _substitution_array(scorer, [query] + targets)
+    first = numpy.array([index[c] for c in query], int)
+    lengths = numpy.array([len(t) for t in targets], int)
+    seconds = numpy.zeros([len(targets), max([0] + list(lengths))], int)
+    for (k, target) in enumerate(targets):
+        seconds[k, :lengths[k]] = [index[c] for c in target]
+    (scores, ends, pointers) = _array_fill(sub, first, seconds, lengths,
+        gap_open, gap_extend, local, trace=not score_only)
+    if score_only:
+        return scores
+    results = []
+    for (k, target) in enumerate(targets):
+        (aln1, aln2) = _array_traceback(pointers[k], query, target, *ends[k])
+        alignment = (_as_seq_class(query, aln1), _as_seq_class(target, aln2))
+        if return_score:
+            results.append((alignment, scores[k].item()))
+        else:
+            results.append(alignment)
+    return results
+
+def nw_align(seq1, seq2, scorer=equality_scorer, gap=default_gap,
+        return_score=False, gap_extend=None):
+    """Returns globally optimal alignment of seq1 and seq2.
+
+    scorer is a function f(x,y) -> number or a dict keyed by (x,y) pairs.
+    gap is the score of the first position of a gap, gap_extend (default
+    gap) that of each later position.
+    """
+    return _array_align(seq1, [seq2], scorer, gap, gap_extend, False,
+        return_score)[0]
+
+def sw_align(seq1, seq2, scorer=equality_scorer, gap=default_gap,
+        return_score=False, gap_extend=None):
+    """Returns locally optimal alignment of seq1 and seq2.
+
+    Arguments are as for nw_align.
+    """
+    return _array_align(seq1, [seq2], scorer, gap, gap_extend, True,
+        return_score)[0]
+
+def nw_align_many(query, targets, scorer=equality_scorer, gap=default_gap,
+        return_score=False, gap_extend=None, score_only=False):
+    """Returns a list of global alignments of query against each target.
+
+    The targets are filled together, one row per target position, so this
+    is much quicker than calling nw_align for each.  Each result is as
+    from nw_align(query, target, ...).  If score_only, just returns an
+    array of the scores and saves the memory used for traceback.
+    """
+    return _array_align(query, targets, scorer, gap, gap_extend, False,
+        return_score, score_only)
+
+def sw_align_many(query, targets, scorer=equality_scorer, gap=default_gap,
+        return_score=False, gap_extend=None, score_only=False):
+    """Returns a list of local alignments of query against each target.
+
+    Arguments are as for nw_align_many.
+    """
+    return _array_align(query, targets, scorer, gap, gap_extend, True,
+        return_score, score_only)
 
 def demo(seq1, seq2):
     result = []
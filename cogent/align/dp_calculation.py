@@ -87,16 +87,23 @@ class FwdDefn(CalculationDefn):
         return edge.getForwardScore(use_cost_function=False)
 
 
+def getViterbiAlignable(edge, length1, length2):
+    """The alignment of the two children of 'edge', as an alignable whose 
+    partial likelihoods are for the point dividing 'edge' into 'length1' and
+    'length2'"""
+    try:
+        ratio = length1/(length1+length2)
+    except (ZeroDivisionError, FloatingPointError):
+        ratio = 1.
+    return edge.getViterbiPath().getAlignable(ratio)
+
+
 class EdgeSumAndAlignDefn(CalculationDefn):
     name = 'pair'
     def calc(self, pog1, pog2, length1, length2, bin):
         edge = Edge(pog1, pog2, length1+length2, [bin])
         def _getaln():
-            try:
-                ratio = length1/(length1+length2)
-            except (ZeroDivisionError, FloatingPointError):
-                ratio = 1.
-            return edge.getViterbiPath().getAlignable(ratio)
+            return getViterbiAlignable(edge, length1, length2)
         edge.getaln = _getaln
         return edge
 
@@ -7,6 +7,7 @@ produced by the same code."""
 # Should probably set to about half of physical memory / PointerEncoder.bytes
 HIRSCHBERG_LIMIT = 10**8
 
+import bisect
 import numpy
 
 # setting global state on module load is bad practice and can be ineffective,
@@ -48,6 +49,14 @@ elif max(versions) < (3, 2):
 else:
     raise ImportError('Incompatible _pairwise_*.pyx module versions. Recompile them')
 
+# Banded DP arrived with _pairwise_seqs.pyx version 3.3.  Until older
+# compiled modules are rebuilt banded alignment falls back to Python.
+if pyrex_seq_align_module is not None and \
+        pyrex_seq_align_module.version_info >= (3, 3):
+    banded_seq_aligner = pyrex_seq_align_module.calc_rows
+else:
+    banded_seq_aligner = None
+
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -92,9 +101,14 @@ DEBUG = False
 def py_calc_rows(plan, x_index, y_index, i_low, i_high, j_low, j_high,
         preds, state_directions, T,
         xgap_scores, ygap_scores, match_scores, rows, track, track_enc, 
-        viterbi, local=False, use_scaling=False, use_logs=False):
+        viterbi, local=False, use_scaling=False, use_logs=False,
+        band_lows=None, band_highs=None):
     """Pure python version of the dynamic programming algorithms
-    Forward and Viterbi.  Works on sequences and POGs.  Unli"""
+    Forward and Viterbi.  Works on sequences and POGs.  Unli
+    
+    If band_lows and band_highs are given only columns
+    band_lows[i] <= j < band_highs[i] of row i are calculated, and track
+    is indexed by j - band_lows[i]."""
     if use_scaling:
         warnings.warn("Pure python version of DP code can suffer underflows")
         # because it ignores 'exponents', the Pyrex version doesn't.
@@ -117,7 +131,13 @@ def py_calc_rows(plan, x_index, y_index, i_low, i_high, j_low, j_high,
         current_row[:,0] = impossible
         if i == 0 and not local:
             current_row[0,0] = neutral_score
-        for j in range(j_low, j_high):
+        if band_lows is None:
+            (row_j_low, row_j_high, track_offset) = (j_low, j_high, 0)
+        else:
+            row_j_low = max(j_low, band_lows[i])
+            row_j_high = min(j_high, band_highs[i])
+            track_offset = band_lows[i]
+        for j in range(row_j_low, row_j_high):
             y = y_index[j]
             j_sources = preds[1][j]
             for (state, bin, dx, dy) in state_directions:
@@ -130,6 +150,9 @@ def py_calc_rows(plan, x_index, y_index, i_low, i_high, j_low, j_high,
                 for (a, prev_i) in enumerate([[i], i_sources][dx]):
                     source_row = rows[plan[prev_i]]
                     for (b, prev_j) in enumerate([[j], j_sources][dy]):
+                        if band_lows is not None and not (
+                                band_lows[prev_i] <= prev_j < band_highs[prev_i]):
+                            continue  # stale value from an earlier row
                         source_posn = source_row[prev_j]
                         for prev_state in source_states:
                             prev_value = source_posn[prev_state]
@@ -161,7 +184,8 @@ def py_calc_rows(plan, x_index, y_index, i_low, i_high, j_low, j_high,
                 else:
                     current_row[j, state] = cumulative_score * d_score
                 if track is not None:
-                    track[i,j,state] = (numpy.array(pointer) << track_enc).sum()
+                    track[i,j-track_offset,state] = (
+                            numpy.array(pointer) << track_enc).sum()
                 if (i==i_high-1 and j==j_high-1 and not local) or (
                         local and dx and dy and current_row[j, state] > best_score):
                     (best, best_score) = (((i, j), state), current_row[j, state])
@@ -202,6 +226,119 @@ class TrackBack(object):
         return result
     
 
+class Band(object):
+    """The part of a pair's DP lattice which banded alignment calculates.
+    
+    The band follows a path from the start of the lattice through the anchor
+    points (lattice positions believed to be aligned) to the end, straight 
+    between anchors, and extends 'width' columns to either side of it.  
+    Row i covers columns lows[i] <= j < highs[i]."""
+    
+    def __init__(self, shape, anchors, width):
+        (M, N) = shape
+        assert M >= 2 and N >= 2, shape
+        assert width >= 0, width
+        self.shape = (M, N)
+        self.width = width
+        # Keep only anchors which continue the path forward in both dims,
+        # from the START cell to the END cell
+        path = [(0, 0)]
+        for (i, j) in sorted(anchors):
+            if path[-1][0] < i <= M-2 and path[-1][1] < j <= N-2:
+                path.append((i, j))
+        path.append((M-1, N-1))
+        self.anchors = tuple(path[1:-1])
+        
+        (xs, ys) = numpy.transpose(path)
+        j = numpy.interp(numpy.arange(M+1), xs, ys)
+        # Row i must reach the path where it leaves for row i+1
+        lows = numpy.floor(j[:-1]).astype(int) - width
+        highs = numpy.ceil(j[1:]).astype(int) + width + 1
+        self.lows = numpy.clip(lows, 0, N-1)
+        self.highs = numpy.clip(highs, 1, N-1)
+        # Only the last row has the END column
+        self.highs[-1] = N
+    
+    @classmethod
+    def fromDiagonal(cls, shape, width, diagonal=0):
+        """A band around the diagonal on which residue i of the first
+        sequence is aligned to residue i+diagonal of the second"""
+        (M, N) = shape
+        start = max(0, -diagonal)
+        end = min(M-2, N-2-diagonal)
+        anchors = [(i+1, i+diagonal+1) for i in [start, end-1] if 
+                0 <= i < end]
+        return cls(shape, anchors, width)
+    
+    def __repr__(self):
+        return 'Band(width=%s, %s anchors, %s of %s cells)' % (self.width,
+                len(self.anchors), self.getCellCount(), 
+                self.shape[0]*self.shape[1])
+    
+    def __eq__(self, other):
+        return isinstance(other, Band) and self._key() == other._key()
+    
+    def __ne__(self, other):
+        return not self == other
+    
+    def __hash__(self):
+        return hash(self._key())
+    
+    def _key(self):
+        return (self.shape, self.anchors, self.width)
+    
+    def getCellCount(self):
+        """How many cells of the lattice are calculated"""
+        return int((self.highs - self.lows).sum())
+    
+    def getFraction(self):
+        """The proportion of the full lattice which is calculated"""
+        return self.getCellCount() / float(self.shape[0] * self.shape[1])
+    
+    def getTrackWidth(self):
+        return int((self.highs - self.lows).max())
+    
+    def backward(self):
+        (M, N) = self.shape
+        anchors = [(M-1-i, N-1-j) for (i, j) in self.anchors]
+        return Band(self.shape, anchors, self.width)
+    
+
+def _kmer_anchors(seq1, seq2, k, word_length=1):
+    """Lattice positions of the longest co-linear chain of k-mers which
+    occur just once in each sequence"""
+    def unique_kmers(seq):
+        seq = str(seq)
+        positions = {}
+        for p in range(len(seq) // word_length - k + 1):
+            kmer = seq[p*word_length:(p+k)*word_length]
+            positions[kmer] = None if kmer in positions else p
+        return dict((kmer, p) for (kmer, p) in list(positions.items())
+                if p is not None)
+    kmers2 = unique_kmers(seq2)
+    matches = sorted((p1, kmers2[kmer]) for (kmer, p1) in 
+            list(unique_kmers(seq1).items()) if kmer in kmers2)
+    # Longest chain increasing in the second sequence too
+    (tails, tail_match, previous) = ([], [], [])
+    for (n, (p1, p2)) in enumerate(matches):
+        length = bisect.bisect_left(tails, p2)
+        previous.append(tail_match[length-1] if length else None)
+        if length == len(tails):
+            tails.append(p2)
+            tail_match.append(n)
+        else:
+            tails[length] = p2
+            tail_match[length] = n
+    chain = []
+    n = tail_match[-1] if tail_match else None
+    while n is not None:
+        (p1, p2) = matches[n]
+        chain.append((p1+1, p2+1))
+        n = previous[n]
+    chain.reverse()
+    return chain
+    
+
 class Pair(object):
     def __init__(self, alignable1, alignable2, backward=False):
         alignables = [alignable1, alignable2]
@@ -223,6 +360,11 @@ class Pair(object):
         else:
             aligner = py_calc_rows
         
+        if (not some_pogs) and banded_seq_aligner is not None:
+            self.banded_aligner = banded_seq_aligner
+        else:
+            self.banded_aligner = py_calc_rows
+        
         self.both_seqs = not some_pogs
         self.aligner = aligner
         
@@ -242,6 +384,18 @@ class Pair(object):
     def getSeqNamePairs(self):
         return [(a.leaf.edge_name, a.leaf.sequence) for a in self.children]
     
+    def getBand(self, width, diagonal=None, k=11):
+        """A Band for banded alignment of this pair, either around the
+        given diagonal or, by default, through co-linear k-mer seeds which
+        are unique in each sequence"""
+        if diagonal is not None:
+            return Band.fromDiagonal(self.size, width, diagonal)
+        if not self.both_seqs:
+            raise ValueError('k-mer seeds need two sequences, give a diagonal')
+        (seq1, seq2) = [child.seq for child in self.children]
+        anchors = _kmer_anchors(seq1, seq2, k, self.alphabet.getMotifLen())
+        return Band(self.size, anchors, width)
+    
     def makeSimpleEmissionProbs(self, mprobs, psubs1):
         psubs2 = [numpy.identity(len(psub)) for psub in psubs1]
         bins = [PairBinData(mprobs, *ppsubs) for ppsubs in zip(
@@ -265,8 +419,9 @@ class Pair(object):
                 self.children, index)]
         return Pair(*children)
         
-    def _decode_state(self, track, encoding, posn, pstate):
-        coded = int(track[posn[0], posn[1], pstate])
+    def _decode_state(self, track, encoding, posn, pstate, band=None):
+        offset = 0 if band is None else band.lows[posn[0]]
+        coded = int(track[posn[0], posn[1] - offset, pstate])
         (a, b, state) = encoding.decode(coded)
         if state >= track.shape[-1]:
             raise ArithmeticError('Error state in traceback')
@@ -279,12 +434,13 @@ class Pair(object):
             next = numpy.array([x,y], int)
         return (next, (a, b), state)
     
-    def traceback(self, track, encoding, posn, state, skip_last=False):
+    def traceback(self, track, encoding, posn, state, skip_last=False,
+            band=None):
         result = []
         started = False
         while 1:
             (nposn, (a, b), nstate) = self._decode_state(track, encoding, 
-                    posn, state)
+                    posn, state, band)
             if state:
                 result.append((state, posn, (a>0, b>0)))
             if started and state == 0:
@@ -328,11 +484,15 @@ class Pair(object):
         return (mantissas, exponents)
     
     def calcRows(self, i_low, i_high, j_low, j_high, state_directions,
-            T, scores, rows, track, track_encoding, viterbi, **kw):
+            T, scores, rows, track, track_encoding, viterbi, band=None, **kw):
         (match_scores, (xscores, yscores)) = scores
         track_enc = track_encoding and track_encoding.positions
+        aligner = self.aligner
+        if band is not None:
+            aligner = self.banded_aligner
+            kw.update(band_lows=band.lows, band_highs=band.highs)
         #print T
-        return self.aligner(self.plan, self.x_index, self.y_index,
+        return aligner(self.plan, self.x_index, self.y_index,
                 i_low, i_high, j_low, j_high, self.children, state_directions,
                 T, xscores, yscores, match_scores, rows, track, 
                 track_enc, viterbi, **kw)
@@ -715,15 +875,23 @@ class PairEmissionProbs(object):
         backward - run algorithm in reverse order.
         """
         (state_directions, T) = TM
+        # Posterior probs are always from the full lattice
+        band = None if cells is not None else dp_options.band
         if dp_options.viterbi and cells is None:
             encoder = self.pair.getPointerEncoding(len(T))
-            problem_dimensions = self.pair.size + [len(T)]
+            if band is None:
+                problem_dimensions = self.pair.size + [len(T)]
+            else:
+                problem_dimensions = [self.pair.size[0], 
+                        band.getTrackWidth(), len(T)]
             problem_size = numpy.product(problem_dimensions)
             memory = problem_size * encoder.bytes / 10**6
             if dp_options.local:
                 msg = 'Local alignment'
             elif cells is not None:
                 msg = 'Posterior probs'
+            elif band is not None:
+                msg = 'Banded alignment'
             elif self.pair.size[0]-2 >= 3 and not backward and (
                     problem_size > HIRSCHBERG_LIMIT or 
                     parallel.getCommunicator().Get_size() > 1):
@@ -736,14 +904,20 @@ class PairEmissionProbs(object):
         else:
             track = encoder = None
         
+        if dp_options.backward:
+            backward = not backward
+        
+        if backward and band is not None:
+            band = band.backward()
+        if DEBUG and band is not None:
+            print(band)
+        
         kw = dict(
                 use_scaling=dp_options.use_scaling,
                 use_logs=dp_options.use_logs,
                 viterbi=dp_options.viterbi,
-                local=dp_options.local)
-        
-        if dp_options.backward:
-            backward = not backward
+                local=dp_options.local,
+                band=band)
         
         if backward:
             pair = self.pair.backward()
@@ -765,6 +939,7 @@ class PairEmissionProbs(object):
         
         if cells is not None:
             assert not dp_options.local
+            del kw['band']
             result = self._calc_global_probs(
                     pair, scores, kw, state_directions, T, rows, cells,
                     backward)
@@ -784,7 +959,7 @@ class PairEmissionProbs(object):
                 result = score
             else:
                 tb = self.pair.traceback(track, encoder, maxpos, state,
-                    skip_last = not dp_options.local)
+                    skip_last = not dp_options.local, band=band)
                 result = (score, tb)
         return result
     
@@ -859,7 +1034,8 @@ class ReversiblePairEmissionProbs(object):
 
 class DPFlags(object):
     def __init__(self, viterbi, local=False, use_logs=None,
-            use_cost_function=True, use_scaling=None, backward=False):
+            use_cost_function=True, use_scaling=None, backward=False,
+            band=None):
         if use_logs is None:
             use_logs = viterbi and not use_scaling
         if use_scaling is None:
@@ -873,12 +1049,16 @@ class DPFlags(object):
         self.use_scaling = bool(use_scaling)
         self.viterbi = bool(viterbi)
         self.backward = bool(backward)
+        self.band = band
         self.as_tuple = tuple(n for n in 
                 ['viterbi', 'local', 'use_logs', 'use_cost_function', 'use_scaling', 'backward']
                 if getattr(self, n))
+        if band is not None:
+            self.as_tuple += (band,)
                 
     def __repr__(self):
-        return '%s(%s)' % (type(self).__name__, ', '.join(self.as_tuple))
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+                str(f) for f in self.as_tuple))
     
     def __hash__(self):
         return hash(self.as_tuple)
@@ -896,6 +1076,10 @@ class PairHMM(object):
         self.results = {}
     
     def _getDPResult(self, **kw):
+        band = kw.get('band', None)
+        if band is not None and not isinstance(band, Band):
+            # Just a width, so place the band with k-mer seeds
+            kw['band'] = self.emission_probs.pair.getBand(band)
         dp_options = DPFlags(**kw)
         if dp_options not in self.results:
             self.results[dp_options] = \
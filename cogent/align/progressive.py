@@ -5,7 +5,8 @@ from cogent import LoadTree
 from cogent.phylo import nj as NJ
 from cogent.phylo.distance import EstimateDistances
 from cogent.core.info import Info
-from cogent.util import progress_display as UI
+from cogent.align import dp_calculation
+from cogent.util import parallel, progress_display as UI
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -16,17 +17,51 @@ __maintainer__ = "Peter Maxwell"
 __email__ = "pm67nz@gmail.com"
 __status__ = "Production"
 
+@UI.display_wrap
+def _align_up_tree(tree, pogs, lengths, bin_data, ui=None):
+    """The alignment of the alignables 'pogs' progressively up the
+    bifurcating 'tree'.  Each round aligns, in parallel, every node whose
+    children have both been aligned, so sibling clades are done at the
+    same time."""
+    def align_children(job):
+        (pog1, pog2, length1, length2) = job
+        edge = dp_calculation.Edge(pog1, pog2, length1+length2, [bin_data])
+        return dp_calculation.getViterbiAlignable(edge, length1, length2)
+    
+    done = dict(pogs)
+    waiting = [node for node in tree.postorder() if node.Children][:-1]
+    total = len(waiting)
+    while waiting:
+        ready = [node for node in waiting 
+                if all(child.Name in done for child in node.Children)]
+        ui.display('%s of %s subtrees aligned' % (total-len(waiting), total),
+                progress=1.0 - len(waiting) / float(total+1))
+        jobs = []
+        for node in ready:
+            (child1, child2) = node.Children
+            jobs.append((done[child1.Name], done[child2.Name],
+                    lengths[child1.Name], lengths[child2.Name]))
+        for (node, pog) in zip(ready, parallel.map(align_children, jobs)):
+            done[node.Name] = pog
+        waiting = [node for node in waiting if node.Name not in done]
+    
+    (child1, child2) = tree.Children
+    edge = dp_calculation.Edge(done[child1.Name], done[child2.Name],
+            lengths[child1.Name] + lengths[child2.Name], [bin_data])
+    return edge.getViterbiPath().getAlignment()
+
 @UI.display_wrap
 def TreeAlign(model, seqs, tree=None, indel_rate=0.01, indel_length=0.01,
-    ui = None, ests_from_pairwise=True, param_vals=None):
+    ui = None, ests_from_pairwise=True, param_vals=None,
+    parallel_subtrees=None):
     """Returns a multiple alignment and tree.
     
     Uses the provided substitution model and a tree for determining the
     progressive order. If a tree is not provided a Neighbour Joining tree is
     constructed from pairwise distances estimated from pairwise aligning the
-    sequences. If running in parallel, only the distance estimation is
-    parallelised and only the master CPU returns the alignment and tree, other
-    CPU's return None, None.
+    sequences. If running in parallel the distance estimation is
+    parallelised, and so, with parallel_subtrees, is the progressive 
+    alignment.
     
     Arguments:
         - model: a substitution model
@@ -36,6 +71,9 @@ def TreeAlign(model, seqs, tree=None, indel_rate=0.01, indel_length=0.01,
           of the substitution model parameters are used
         - param_vals: named key, value pairs for model parameters. These
           override ests_from_pairwise.
+        - parallel_subtrees: align independent subtrees at the same time, 
+          in rounds up the tree.  Defaults to True if more than one CPU is 
+          available.  Not possible for models with bins.
     """
     _exclude_params = ['mprobs', 'rate', 'bin_switch']
     if param_vals:
@@ -74,6 +112,10 @@ def TreeAlign(model, seqs, tree=None, indel_rate=0.01, indel_length=0.01,
         tree = NJ.nj(dists)
     
     LF = model.makeLikelihoodFunction(tree.bifurcating(name_unnamed=True), aligned=False)
+    if parallel_subtrees is None:
+        parallel_subtrees = parallel.getContext().size > 1
+    if len(LF.bin_names) > 1:
+        parallel_subtrees = False
     if ests_from_pairwise and not param_vals:
         # we use the Median to avoid the influence of outlier pairs
         param_vals = {}
@@ -89,9 +131,20 @@ def TreeAlign(model, seqs, tree=None, indel_rate=0.01, indel_length=0.01,
             LF.setParamRule(param, value=val, is_constant=True)
         LF.setParamRule('indel_rate', value=indel_rate, is_constant=True)
         LF.setParamRule('indel_length', value=indel_length, is_constant=True)
-        LF.setSequences(seqs)
-    edge = LF.getLogLikelihood().edge
-    align = edge.getViterbiPath().getAlignment()
+        if parallel_subtrees:
+            # The sequences aren't given to LF, as that would align them
+            pogs = LF.makePogs(seqs)
+            LF.setMotifProbsFromPogs(pogs)
+        else:
+            LF.setSequences(seqs)
+    if parallel_subtrees:
+        lengths = dict((edge.Name, LF.getParamValue('length', edge=edge.Name))
+                for edge in LF.tree.getEdgeVector(include_root=False))
+        align = _align_up_tree(LF.tree, pogs, lengths,
+                LF.getParamValue('BinData'))
+    else:
+        edge = LF.getLogLikelihood().edge
+        align = edge.getViterbiPath().getAlignment()
     info = Info()
     info["AlignParams"] = param_vals
     info["AlignParams"].update(dict(indel_length=indel_length, indel_rate=indel_rate))
@@ -8,6 +8,10 @@ to the array as input. Can also generate this type of input from a Dict2D using
 inputs_from_dict2D function.
 
 Both return a PhyloNode object of the UPGMA cluster
+
+linkage_cluster takes a square or condensed numpy distance array and a list
+of names, and clusters by UPGMA, WPGMA, single or complete linkage without
+ever holding more than the condensed upper triangle of the matrix.
 """
 
 from numpy import array, ravel, argmin, take, sum, average, ma, diag
@@ -48,6 +52,11 @@ def upgma(pairwise_distances):
             ColOrder=items_in_matrix, Pad=True, Default=BIG_NUM)
     matrix_a, node_order = inputs_from_dict2D(dict2d_input)
     tree = UPGMA_cluster(matrix_a, node_order, BIG_NUM)
+    _name_edges(tree)
+    return tree
+
+def _name_edges(tree):
+    """names the root 'root' and the other unnamed nodes 'edge.N'"""
     index = 0
     for node in tree.traverse():
         if not node.Parent:
@@ -55,7 +64,6 @@ def upgma(pairwise_distances):
         elif not node.Name:
             node.Name = 'edge.' + str(index)
             index += 1
-    return tree
 
 def find_smallest_index(matrix):
     """returns the index of the smallest element in a numpy array
@@ -175,3 +183,114 @@ def inputs_from_dict2D(dict2d_matrix):
     for i in row_order:
         PhyloNode_order.append(PhyloNode(Name=i))
     return matrix, PhyloNode_order
+
+def condensed_from_square(matrix):
+    """returns the upper triangle of a square array as a 1D array, row by row
+    
+    This is the layout linkage_cluster works on, and the same as that of
+    scipy.spatial.distance.squareform."""
+    matrix = numpy.asarray(matrix)
+    n = len(matrix)
+    assert matrix.shape == (n, n), matrix.shape
+    return numpy.concatenate([matrix[i, i+1:] for i in range(n)] + \
+            [numpy.zeros(0, Float)]).astype(Float)
+
+def _condensed_row(n, i):
+    """positions in an n x n condensed array of the distances from i to
+    each of 0..n-1.  Position i itself points one past the end."""
+    j = numpy.arange(n)
+    idx = numpy.empty(n, int)
+    before = j[:i]
+    idx[:i] = before*n - before*(before+1)//2 + i - before - 1
+    idx[i+1:] = i*n - i*(i+1)//2 + j[i+1:] - i - 1
+    idx[i] = n*(n-1)//2
+    return idx
+
+def _upgma_update(da, db, na, nb):
+    return (na*da + nb*db) / (na + nb)
+
+LINKAGE_UPDATES = {
+    'upgma': _upgma_update,
+    'wpgma': lambda da, db, na, nb: (da + db) / 2.0,
+    'single': lambda da, db, na, nb: numpy.minimum(da, db),
+    'complete': lambda da, db, na, nb: numpy.maximum(da, db),
+    }
+
+def linkage_cluster(distances, names, method='upgma'):
+    """cluster by UPGMA, WPGMA, single or complete linkage
+    
+    distances is a square numpy array, or the condensed upper triangle of
+    one as from condensed_from_square, which for large inputs avoids ever
+    building the square array.  The diagonal is ignored.
+    names is a list of tip names in the order of the array.
+    method is one of 'upgma' (average linkage weighted by cluster size),
+    'wpgma' (unweighted average, as UPGMA_cluster does), 'single' or
+    'complete'.
+    
+    Uses the nearest neighbour chain algorithm, so takes O(N^2) time and
+    keeps only the N(N-1)/2 distances in memory.
+    Returns a PhyloNode object, named as by upgma.
+    """
+    if method not in LINKAGE_UPDATES:
+        raise ValueError('unknown linkage method %r, not one of %s' % \
+                (method, sorted(LINKAGE_UPDATES)))
+    update = LINKAGE_UPDATES[method]
+    distances = numpy.asarray(distances)
+    if distances.ndim == 2:
+        distances = condensed_from_square(distances)
+    n = len(names)
+    if n < 2:
+        raise ValueError('need at least 2 names, not %s' % n)
+    if len(distances) != n*(n-1)//2:
+        raise ValueError('%s distances do not fit %s names' % \
+                (len(distances), n))
+    
+    # one extra element, always inf, stands for each cluster's own distance
+    d = numpy.empty(len(distances)+1, Float)
+    d[:-1] = distances
+    d[-1] = numpy.inf
+    sizes = numpy.ones(n, Float)
+    heights = numpy.zeros(n, Float)
+    nodes = [PhyloNode(Name=name) for name in names]
+    active = list(range(n-1, -1, -1))
+    is_active = numpy.ones(n, bool)
+    chain = []
+    for merge in range(n-1):
+        while True:
+            if not chain:
+                while not is_active[active[-1]]:
+                    active.pop()
+                chain.append(active[-1])
+            c = chain[-1]
+            row = d[_condensed_row(n, c)]
+            nearest = argmin(row)
+            # ties go to the previous link, so the chain always terminates
+            if len(chain) > 1 and row[chain[-2]] <= row[nearest]:
+                nearest = chain[-2]
+                chain.pop()
+                chain.pop()
+                break
+            chain.append(nearest)
+        (a, b) = sorted([c, nearest])
+        height = row[nearest] / 2.0
+        new_node = PhyloNode()
+        for i in [a, b]:
+            nodes[i].Length = height - heights[i]
+            new_node.Children.append(nodes[i])
+            nodes[i].Parent = new_node
+        
+        # the new cluster takes a's place and b is dropped
+        (row_a, row_b) = (_condensed_row(n, a), _condensed_row(n, b))
+        new_row = update(d[row_a], d[row_b], sizes[a], sizes[b])
+        new_row[a] = new_row[b] = numpy.inf
+        d[row_a] = new_row
+        d[row_b] = numpy.inf
+        sizes[a] += sizes[b]
+        heights[a] = height
+        nodes[a] = new_node
+        nodes[b] = None
+        is_active[b] = False
+    
+    tree = nodes[0]
+    _name_edges(tree)
+    return tree
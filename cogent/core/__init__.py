@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 
-__all__ = ['alignment', 'alphabet', 'annotation', 'bitvector', 'entity',
-           'genetic_code', 'info', 'location', 'moltype', 'profile', 'sequence',
-           'tree', 'usage']
+__all__ = ['alignment', 'alphabet', 'annotation', 'array_tree', 'bitvector',
+           'entity', 'genetic_code', 'info', 'location', 'mapped_alignment',
+           'moltype', 'profile', 'sequence', 'tree', 'usage']
 
 __author__ = ""
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -29,7 +29,7 @@ import cogent   #will use to get at cogent.parse.fasta.MinimalFastaParser,
 from cogent.format.alignment import save_to_filename
 from cogent.core.info import Info as InfoClass
 from cogent.core.sequence import frac_same, ModelSequence
-from cogent.core.location import LostSpan, Span
+from cogent.core.location import LostSpan, Span, as_map
 from cogent.maths.stats.util import Freqs
 from cogent.format.fasta import fasta_from_alignment
 from cogent.format.phylip import phylip_from_alignment
@@ -849,7 +849,7 @@ class SequenceCollection(object):
 
 
             '''
-            self.NamedSeqs[seqname].data.addFeature(
+            self.NamedSeqs[seqname].getSeq().addFeature(
                                 feature,
                                 parse_attributes(attributes),
                                 [(start, end)])
@@ -884,9 +884,9 @@ class SequenceCollection(object):
             seq = seqs[label]
             
             if isinstance(seq, Aligned):
-                seq = seq.data
+                seq = seq.getSeq()
             
-            if not aa_to_codon and len(seq) != len(aligned.data):
+            if not aa_to_codon and len(seq) != len(aligned.getSeq()):
                 raise ValueError("seqs have different lengths")
             
             new_seqs.append((label, Aligned(aligned.map * scale, seq)))
@@ -1076,7 +1076,7 @@ class SequenceCollection(object):
         aligned = isinstance(self, Alignment)
         for seq_name in self.Names:
             if aligned:
-                seq = self.NamedSeqs[seq_name].data
+                seq = self.NamedSeqs[seq_name].getSeq()
             else:
                 seq = self.NamedSeqs[seq_name]
             new_seqs.append((seq_name, seq.degap()))
@@ -1106,7 +1106,7 @@ class SequenceCollection(object):
         aligned = isinstance(self, Alignment)
         for seq_name in self.Names:
             if aligned:
-                seq = self.NamedSeqs[seq_name].data
+                seq = self.NamedSeqs[seq_name].getSeq()
             else:
                 seq = self.NamedSeqs[seq_name]
             stops.append(seq.hasTerminalStop(gc=gc, allow_partial=allow_partial))
@@ -1132,7 +1132,7 @@ class SequenceCollection(object):
                 new_seqs.append((seq_name, new_seq))
                 continue
             
-            new_seq = old_seq.data.withoutTerminalStopCodon(gc=gc,
+            new_seq = old_seq.getSeq().withoutTerminalStopCodon(gc=gc,
                                         allow_partial=allow_partial)
             
             diff = len(old_seq.data._seq) - len(new_seq._seq)
@@ -1333,8 +1333,9 @@ class SequenceCollection(object):
             except AttributeError:
                 is_gap = default_gap_f
             
+            row_str = str(row)
             for col in cols_to_delete:
-                if not is_gap(str(row)[col]):
+                if not is_gap(row_str[col]):
                     if key not in bad_cols_per_row:
                         bad_cols_per_row[key] = 1
                     else:
@@ -1461,7 +1462,7 @@ class SequenceCollection(object):
         #for each sequence, pad gaps to end
         for seq_name in self.Names:
             if aligned:
-                seq = self.NamedSeqs[seq_name].data
+                seq = self.NamedSeqs[seq_name].getSeq()
             else:
                 seq = self.NamedSeqs[seq_name]
             padded_seq = seq + '-'*(pad_length-len(seq))
@@ -1473,7 +1474,13 @@ class SequenceCollection(object):
         
 class Aligned(object):
     """One sequence in an alignment, a map between alignment coordinates and
-    sequence coordinates"""
+    sequence coordinates.
+
+    Slicing gives a view sharing the data and the map, so it is cheap however
+    long the alignment is.  The sliced map is only worked out when something
+    needs it."""
+    
+    _slice = None   #pending slice (a Map) of _map, see _get_map
     
     def __init__(self, map, data, length=None):
         #Unlike the normal map constructor, here we take a list of pairs of
@@ -1486,6 +1493,49 @@ class Aligned(object):
             self.Info = data.Info
         if hasattr(data, 'Name'):
             self.Name = data.Name
+    
+    def _get_map(self):
+        if self._slice is not None:
+            (self._map, self._slice) = (self._map[self._slice], None)
+        return self._map
+    
+    def _set_map(self, map):
+        (self._map, self._slice) = (map, None)
+    
+    map = property(_get_map, _set_map)
+    
+    def _coversData(self):
+        """True if the map uses all of data, in order or reverse order"""
+        spans = [span for span in self.map.spans if not span.lost]
+        if sum(span.length for span in spans) != len(self.data):
+            return False
+        if all(not span.Reverse for span in spans):
+            pairs = [(a.End, b.Start) for (a, b) in zip(spans, spans[1:])]
+        elif all(span.Reverse for span in spans):
+            pairs = [(a.Start, b.End) for (a, b) in zip(spans, spans[1:])]
+        else:
+            return False
+        return all(x == y for (x, y) in pairs)
+    
+    def getSeq(self):
+        """Returns the ungapped sequence this aligned sequence covers.
+        
+        A view from slicing or takePositions shares its data with the
+        original, so here it gets its own copy of just the part it covers
+        first.  Use this rather than .data wherever the sequence is wanted.
+        """
+        if not self._coversData():
+            seq = self.data[self.map.withoutGaps()]
+            spans = []
+            offset = 0
+            for span in self.map.spans:
+                if not span.lost:
+                    span = Span(offset, offset+span.length)
+                    offset += span.length
+                spans.append(span)
+            self.map = Map(spans=spans, parent_length=len(seq))
+            self.data = seq
+        return self.data
 
     def _get_moltype(self):
         return self.data.MolType
@@ -1511,13 +1561,13 @@ class Aligned(object):
         return self.__class__(self.map.withTerminiUnknown(), self.data)
     
     def copyAnnotations(self, other):
-        self.data.copyAnnotations(other)
+        self.getSeq().copyAnnotations(other)
     
     def annotateFromGff(self, f):
-        self.data.annotate_from_gff(f)
+        self.getSeq().annotate_from_gff(f)
 
     def addFeature(self, *args, **kwargs):
-        self.data.addFeature(*args, **kwargs)
+        self.getSeq().addFeature(*args, **kwargs)
     
     def __str__(self):
         """Returns string representation of aligned sequence, incl. gaps."""
@@ -1538,7 +1588,9 @@ class Aligned(object):
     def __len__(self):
         # these make it look like Aligned should be a subclass of Map,
         # but then you have to be careful with __getitem__, __init__ and inverse.
-        return len(self.map)
+        if self._slice is not None:
+            return len(self._slice)
+        return len(self._map)
     
     def __add__(self, other):
         if self.data is other.data:
@@ -1549,7 +1601,9 @@ class Aligned(object):
         return Aligned(map, seq)
             
     def __getitem__(self, slice):
-        return Aligned(self.map[slice], self.data)
+        result = Aligned(self.map, self.data)
+        result._slice = as_map(slice, len(self))
+        return result
     
     def rc(self):
         return Aligned(self.map.reversed(), self.data)
@@ -2145,7 +2199,7 @@ class DenseAlignment(AlignmentI, SequenceCollection):
         The result shares data with the original array, so if you change
         the result you change the Alignment.
         """
-        return iter(self.Positions)
+        return map(self.Alphabet.fromIndices, self.ArrayPositions)
     
     def __getitem__(self, item):
         """getitem delegates to self.Positions., returning array slices.
@@ -2156,8 +2210,13 @@ class DenseAlignment(AlignmentI, SequenceCollection):
         
         Result shares data with the original array, so if you change the
         result you change the Alignment.
+
+        Only the positions asked for are converted to symbols.
         """
-        return self.Positions[item]
+        positions = self.ArrayPositions[item]
+        if isinstance(item, slice):
+            return list(map(self.Alphabet.fromIndices, positions))
+        return self.Alphabet.fromIndices(positions)
     
     def _coerce_seqs(self, seqs, is_array):
         """Controls how seqs are coerced in _names_seqs_order.
@@ -2447,6 +2506,20 @@ def make_gap_filter(template, gap_fraction, gap_run):
     
     return result
 
+def _positions_as_map(positions, length):
+    """A Map of the positions, runs of adjacent positions merged into spans"""
+    locations = []
+    for pos in positions:
+        if pos < 0:
+            pos += length
+        if not 0 <= pos < length:
+            raise IndexError(pos)
+        if locations and locations[-1][1] == pos:
+            locations[-1][1] = pos + 1
+        else:
+            locations.append([pos, pos+1])
+    return Map(locations, parent_length=length)
+
 class Alignment(_Annotatable, AlignmentI, SequenceCollection):
     MolType = None  #note: this is reset to ASCII in moltype module
     def __init__(self, *args, **kwargs):
@@ -2633,7 +2706,7 @@ class Alignment(_Annotatable, AlignmentI, SequenceCollection):
 
         Note: always returns Sequence object, not ModelSequence.
         """
-        return self.NamedSeqs[seqname].data
+        return self.NamedSeqs[seqname].getSeq()
     
     def getGappedSeq(self, seq_name, recode_gaps=False):
         """Return a gapped Sequence object for the specified seqname.
@@ -2670,6 +2743,24 @@ class Alignment(_Annotatable, AlignmentI, SequenceCollection):
     
     Positions = property(iterPositions)
     
+    def takePositions(self, cols, negate=False, seq_constructor=None):
+        """Returns new Alignment containing only specified positions.
+        
+        Like slicing, the result shares the sequences of this alignment, with
+        new maps of the positions kept, rather than copying them. Passing a
+        seq_constructor other than the MolType's Sequence makes new sequences
+        from the positions instead.
+        
+        Note that takePositions will fail on ragged positions.
+        """
+        if seq_constructor not in (None, self.MolType.Sequence):
+            return super(Alignment, self).takePositions(cols, negate,
+                    seq_constructor)
+        if negate:
+            excluded = set(cols)
+            cols = [i for i in range(len(self)) if i not in excluded]
+        return self._mapped(_positions_as_map(cols, len(self)))
+    
     def withGapsFrom(self, template):
         """Same alignment but overwritten with the gaps from 'template'"""
         if len(self) != len(template):
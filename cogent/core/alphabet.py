@@ -381,6 +381,13 @@ class JointEnumeration(Enumeration):
         #remember to reset shape after superclass init
         self.Shape = tuple(sub_enum_lengths)
 
+    def __getnewargs__(self):
+        # For unpickling, __new__ wants the subenumerations, not the
+        # joint items that tuple pickling would supply.  Plain tuples
+        # avoid a reference cycle (alphabet._triples); the real
+        # subenumerations come back with the rest of __dict__.
+        return ([tuple(e) for e in self.SubEnumerations],)
+
     def _coerce_enumerations(cls, enums):
         """Coerces putative enumerations into Enumeration objects.
 
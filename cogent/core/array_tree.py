@@ -0,0 +1,504 @@
+#!/usr/bin/env python
+"""A compact, immutable tree stored in NumPy arrays.
+
+PhyloNode trees cost several hundred bytes per node in Python objects,
+which is too much for phylogenies with millions of tips.  An ArrayTree
+keeps the same information in a few flat arrays indexed by node number:
+
+    - parents: index of each node's parent, -1 for the root.
+    - sizes: number of nodes in the subtree rooted at each node.
+    - lengths: branch lengths, NaN where the length is missing.
+    - names: one UTF-8 byte string plus the offset of each name in it.
+
+Nodes are numbered in postorder, so the root is the last node, the children
+of a node precede it and the subtree of node i is the contiguous range
+i-sizes[i]+1 .. i.  That makes postorder traversals, tip lists and subtree
+membership tests simple array slices.  Node arguments and results are node
+indices rather than node objects.
+
+ArrayTrees can't be modified: methods such as getSubTree return new trees.
+Use toPhyloNode() for anything needing the full PhyloNode interface.
+"""
+import re
+import numpy
+from cogent.core.tree import PhyloNode, TreeBuilder, TreeError
+from cogent.parse.newick import parse_string, fast_parse_string, \
+        TreeParseError
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Peter Maxwell"
+__email__ = "pm67nz@gmail.com"
+__status__ = "Production"
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+class ArrayTree(object):
+    """An immutable tree with nodes numbered in postorder.
+
+    parents: sequence of parent indices, each greater than the child's,
+        with -1 for the root, which must be the last node.
+    lengths: branch lengths, None or NaN where missing.
+    names: node names, None for unnamed nodes.
+    """
+
+    def __init__(self, parents, lengths, names):
+        parents = numpy.array(parents, dtype=numpy.int32)
+        num_nodes = len(parents)
+        if not num_nodes or parents[-1] != -1:
+            raise TreeError("the root must be the last node")
+        if len(lengths) != num_nodes or len(names) != num_nodes:
+            raise TreeError("need a length and a name for each node")
+        if not (parents[:-1] > numpy.arange(num_nodes-1)).all():
+            raise TreeError("nodes must be numbered in postorder")
+        sizes = [1] * num_nodes
+        for (node, parent) in enumerate(parents[:-1].tolist()):
+            sizes[parent] += sizes[node]
+        sizes = numpy.array(sizes, dtype=numpy.int32)
+        starts = numpy.arange(num_nodes, dtype=numpy.int32) - sizes + 1
+        if not (starts[parents[:-1]] <= starts[:-1]).all():
+            raise TreeError("nodes must be numbered in postorder")
+
+        self.parents = _frozen(parents)
+        self.sizes = _frozen(sizes)
+        self.lengths = _frozen(numpy.array(
+                [numpy.nan if l is None else l for l in lengths], float))
+        encoded = [(name or '').encode('utf-8') for name in names]
+        offsets = numpy.zeros(num_nodes+1, numpy.int64)
+        numpy.cumsum([len(name) for name in encoded], out=offsets[1:])
+        self._name_offsets = _frozen(offsets)
+        self._name_data = b''.join(encoded)
+        self._node_index = None
+
+    @classmethod
+    def fromPhyloNode(cls, tree):
+        """An ArrayTree copy of a PhyloNode tree.  Names are only kept
+        where NameLoaded is true, so automatic names like 'edge.0' are
+        dropped, as they are by getNewick()."""
+        parents = []
+        lengths = []
+        names = []
+        index = {}
+        for node in tree.postorder(include_self=True):
+            index[id(node)] = len(parents)
+            for child in node.Children:
+                parents[index[id(child)]] = len(parents)
+            parents.append(-1)
+            lengths.append(getattr(node, 'Length', None))
+            names.append(node.Name if node.NameLoaded else None)
+        return cls(parents, lengths, names)
+
+    @classmethod
+    def fromNewick(cls, text, underscore_unmunge=False):
+        """Parses a Newick string directly into an ArrayTree, without
+        making any tree nodes on the way.  Unlike LoadTree, duplicate
+        names are left as they are."""
+        def constructor(children, name, attributes):
+            parents.append(-1)
+            lengths.append(attributes.get('length'))
+            names.append(name)
+            node = len(parents) - 1
+            for child in children or []:
+                parents[child] = node
+            return node
+
+        for parser in [fast_parse_string, parse_string]:
+            parents = []
+            lengths = []
+            names = []
+            try:
+                parser(text, constructor,
+                        underscore_unmunge=underscore_unmunge)
+            except TreeParseError:
+                if parser is parse_string:
+                    raise
+            else:
+                break
+        return cls(parents, lengths, names)
+
+    def toPhyloNode(self):
+        """The equivalent PhyloNode tree"""
+        builder = TreeBuilder(constructor=PhyloNode)
+        made = []   # (index, node) for each finished subtree
+        for (index, (size, length, name)) in enumerate(zip(
+                self.sizes.tolist(), self.lengths.tolist(), self.getNames())):
+            children = None
+            if size > 1:
+                first = len(made)
+                while first and made[first-1][0] > index - size:
+                    first -= 1
+                children = [child for (i, child) in made[first:]]
+                del made[first:]
+            params = {}
+            if length == length:  # not NaN
+                params['length'] = length
+            made.append((index,
+                    builder.createParsedEdge(children, name, params)))
+        return made[0][1]
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __repr__(self):
+        return '%s(%s nodes, %s tips)' % (self.__class__.__name__,
+                len(self), self.getTipCount())
+
+    def __str__(self):
+        return self.getNewick(with_distances=True)
+
+    @property
+    def root(self):
+        """Index of the root node"""
+        return len(self.parents) - 1
+
+    @property
+    def nbytes(self):
+        """Bytes used by the tree's arrays and names"""
+        return (self.parents.nbytes + self.sizes.nbytes +
+                self.lengths.nbytes + self._name_offsets.nbytes +
+                len(self._name_data))
+
+    def _start(self, node):
+        # first node in the subtree rooted at node
+        return node - int(self.sizes[node]) + 1
+
+    def getName(self, node):
+        """Name of node, or None"""
+        (start, end) = self._name_offsets[node:node+2]
+        return self._name_data[start:end].decode('utf-8') or None
+
+    def getNames(self):
+        """Names of all the nodes, in node order"""
+        offsets = self._name_offsets.tolist()
+        data = self._name_data
+        return [data[start:end].decode('utf-8') or None
+                for (start, end) in zip(offsets[:-1], offsets[1:])]
+
+    def getLength(self, node):
+        """Branch length above node, or None"""
+        length = float(self.lengths[node])
+        if length != length:
+            return None
+        return length
+
+    def getNodeIndex(self, name):
+        """Index of the node called name.  The name index is built on the
+        first call and costs much more memory than the tree itself."""
+        if self._node_index is None:
+            self._node_index = dict((name, node)
+                    for (node, name) in enumerate(self.getNames())
+                    if name is not None)
+        try:
+            return self._node_index[name]
+        except KeyError:
+            raise TreeError("No node called '%s'" % name)
+
+    def isTip(self, node):
+        return bool(self.sizes[node] == 1)
+
+    def isRoot(self, node):
+        return bool(self.parents[node] < 0)
+
+    def getParent(self, node):
+        """Index of node's parent, or None for the root"""
+        parent = int(self.parents[node])
+        if parent < 0:
+            return None
+        return parent
+
+    def children(self, node):
+        """Indices of node's children, in order"""
+        start = self._start(node)
+        sizes = self.sizes
+        result = []
+        child = node - 1
+        while child >= start:
+            result.append(child)
+            child -= int(sizes[child])
+        result.reverse()
+        return result
+
+    def ancestors(self, node):
+        """Indices of node's ancestors, nearest first"""
+        parents = self.parents
+        result = []
+        node = int(parents[node])
+        while node >= 0:
+            result.append(node)
+            node = int(parents[node])
+        return result
+
+    def _depths(self):
+        # Each node adds one to the depths of the nodes from its start up
+        # to but not including itself, ie: its strict descendants.
+        num_nodes = len(self)
+        starts = numpy.arange(num_nodes) - self.sizes + 1
+        return numpy.cumsum(numpy.bincount(starts, minlength=num_nodes) - 1)
+
+    def _preorder_ranks(self):
+        # Ancestors come before a subtree in preorder but after it in
+        # postorder, everything else before it is the same in both.
+        num_nodes = len(self)
+        return numpy.arange(num_nodes) - self.sizes + 1 + self._depths()
+
+    def preorder(self, include_self=True, node=None):
+        """Indices of node (the root by default) and its descendants in
+        preorder"""
+        if node is None:
+            node = self.root
+        ranks = self._preorder_ranks()
+        order = numpy.empty(len(self), numpy.int64)
+        order[ranks] = numpy.arange(len(self))
+        first = ranks[node] + (not include_self)
+        return order[first:ranks[node]+self.sizes[node]]
+
+    def postorder(self, include_self=True, node=None):
+        """Indices of node (the root by default) and its descendants in
+        postorder"""
+        if node is None:
+            node = self.root
+        return numpy.arange(self._start(node), node+bool(include_self))
+
+    def pre_and_postorder(self, include_self=True, node=None):
+        """Indices of node (the root by default) and its descendants,
+        internal nodes both before and after their descendants"""
+        if node is None:
+            node = self.root
+        sizes = self.sizes.tolist()
+        result = []
+        open_nodes = []
+        for child in self.preorder(include_self=True, node=node).tolist():
+            while open_nodes and child > open_nodes[-1]:
+                result.append(open_nodes.pop())
+            result.append(child)
+            if sizes[child] > 1:
+                open_nodes.append(child)
+        open_nodes.reverse()
+        result.extend(open_nodes)
+        if not include_self and sizes[node] > 1:
+            result = result[1:-1]
+        elif not include_self:
+            result = []
+        return numpy.array(result, dtype=numpy.int64)
+
+    def traverse(self, self_before=True, self_after=False, include_self=True,
+            node=None):
+        """Array of node indices in the same order TreeNode.traverse
+        would produce the corresponding nodes.  node defaults to the root."""
+        if self_before:
+            if self_after:
+                return self.pre_and_postorder(include_self, node)
+            else:
+                return self.preorder(include_self, node)
+        else:
+            if self_after:
+                return self.postorder(include_self, node)
+            else:
+                return self.tips(node)
+
+    def tips(self, node=None):
+        """Indices of the tips below node (the root by default), in
+        postorder"""
+        if node is None:
+            node = self.root
+        start = self._start(node)
+        return numpy.flatnonzero(self.sizes[start:node+1] == 1) + start
+
+    def getTipCount(self):
+        return int((self.sizes == 1).sum())
+
+    def getTipNames(self, node=None):
+        return [self.getName(tip) for tip in self.tips(node).tolist()]
+
+    def lastCommonAncestor(self, node, other):
+        """Index of the last common ancestor of two nodes"""
+        sizes = self.sizes
+        parents = self.parents
+        (low, high) = sorted([int(node), int(other)])
+        while high - int(sizes[high]) + 1 > low:
+            high = int(parents[high])
+        return high
+
+    def _distancesFromRoot(self, default_length):
+        # A node's length adds to the distances of every node in its
+        # subtree, which is the range of nodes from its start up to itself.
+        num_nodes = len(self)
+        lengths = numpy.where(numpy.isnan(self.lengths), default_length,
+                self.lengths)
+        lengths[-1] = 0.0
+        starts = numpy.arange(num_nodes) - self.sizes + 1
+        entering = numpy.cumsum(numpy.bincount(starts, weights=lengths,
+                minlength=num_nodes))
+        left = numpy.cumsum(lengths) - lengths
+        return entering - left
+
+    def tipToTipDistances(self, endpoints=None, default_length=1):
+        """Returns distance matrix between all pairs of tips, and the tip
+        indices in matrix order.
+
+        endpoints: optional tip names or indices to restrict the matrix to.
+        Missing lengths count as default_length.
+        """
+        all_tips = self.tips()
+        if endpoints is None:
+            tip_order = all_tips
+        else:
+            tip_order = numpy.array([self.getNodeIndex(tip)
+                    if isinstance(tip, str) else tip
+                    for tip in endpoints], dtype=numpy.int64)
+
+        # Tips kept in postorder are still contiguous within each subtree,
+        # so each node needs only one block of the matrix per child: the
+        # distances from that child's tips to those of its later siblings.
+        selected = numpy.zeros(len(self), bool)
+        selected[tip_order] = True
+        ordered = numpy.flatnonzero(selected)
+        preceding = numpy.zeros(len(self)+1, numpy.int64)
+        numpy.cumsum(selected, out=preceding[1:])
+        root_distances = self._distancesFromRoot(default_length)
+        tip_distances = root_distances[ordered]
+        num_tips = len(ordered)
+        result = numpy.zeros((num_tips, num_tips), float)
+        sizes = self.sizes.tolist()
+        parents = self.parents.tolist()
+        for node in range(len(self)-1):
+            parent = parents[node]
+            if node + 1 == parent:
+                continue   # last child
+            first = preceding[node - sizes[node] + 1]
+            after = preceding[node+1]
+            last = preceding[parent]
+            if first == after or after == last:
+                continue
+            result[first:after, after:last] = (
+                    tip_distances[first:after, numpy.newaxis] +
+                    tip_distances[numpy.newaxis, after:last] -
+                    2 * root_distances[parent])
+        result += result.T
+
+        if endpoints is not None:
+            positions = preceding[tip_order]
+            result = result.take(positions, 0).take(positions, 1)
+        return result, tip_order
+
+    def unrooted(self):
+        """A tree with at least 3 children at the root, made by merging
+        the first internal child of the root into the root."""
+        children = self.children(self.root)
+        if len(children) > 2:
+            return self
+        for child in children:
+            if self.sizes[child] > 1:
+                break
+        else:
+            return self
+        parents = self.parents.tolist()
+        lengths = self.lengths.tolist()
+        names = self.getNames()
+        for grandchild in self.children(child):
+            parents[grandchild] = self.root
+            if lengths[child] == lengths[child]:
+                lengths[grandchild] += lengths[child]
+        del parents[child], lengths[child], names[child]
+        parents = [p - (p > child) for p in parents[:-1]] + [-1]
+        return self.__class__(parents, lengths, names)
+
+    def getSubTree(self, name_list, ignore_missing=False, keep_root=False):
+        """A new ArrayTree containing the named nodes and what connects
+        them, as for TreeNode.getSubTree.  Nodes left with a single child
+        are removed, with their lengths added to the child's."""
+        names = self.getNames()
+        wanted = set(name_list)
+        if not ignore_missing:
+            known = set(names)
+            for name in name_list:
+                if name not in known:
+                    raise ValueError("edge %s not found in tree" % name)
+
+        # copied whole: selected nodes and everything below them
+        num_nodes = len(self)
+        sizes = self.sizes.tolist()
+        entering = [0] * (num_nodes + 1)
+        for (node, name) in enumerate(names):
+            if name in wanted:
+                entering[node - sizes[node] + 1] += 1
+                entering[node + 1] -= 1
+
+        new_parents = []
+        new_lengths = []
+        new_names = []
+        stack = []   # (old node, new node) for each finished subtree
+        covered = 0
+        lengths = self.lengths.tolist()
+        for node in range(num_nodes):
+            covered += entering[node]
+            start = node - sizes[node] + 1
+            kept = []
+            while stack and stack[-1][0] >= start:
+                kept.append(stack.pop()[1])
+            kept.reverse()
+            if not (covered or kept):
+                continue
+            if len(kept) == 1 and not covered and not (
+                    keep_root and node == num_nodes - 1):
+                new_lengths[kept[0]] += lengths[node]
+                stack.append((node, kept[0]))
+                continue
+            new_node = len(new_parents)
+            for child in kept:
+                new_parents[child] = new_node
+            new_parents.append(-1)
+            new_lengths.append(lengths[node])
+            new_names.append(names[node])
+            stack.append((node, new_node))
+
+        if not new_parents:
+            raise TreeError("no tree created in make sub tree")
+        elif len(new_parents) == 1:
+            raise TreeError("only a tip was returned from selecting sub tree")
+        if new_names[-1] is not None:
+            new_names[-1] = "root"
+        result = self.__class__(new_parents, new_lengths, new_names)
+        if len(self.children(self.root)) > 2:
+            result = result.unrooted()
+        return result
+
+    def getNewick(self, with_distances=False, semicolon=True,
+            escape_name=True):
+        """Return the newick string for this tree, written the same way
+        as by TreeNode.getNewick"""
+        num_nodes = len(self)
+        sizes = self.sizes.tolist()
+        parents = self.parents.tolist()
+        lengths = self.lengths.tolist()
+        names = self.getNames()
+        starts = numpy.arange(num_nodes) - self.sizes + 1
+        openings = numpy.bincount(starts[self.sizes > 1],
+                minlength=num_nodes).tolist()
+        result = []
+        for node in range(num_nodes):
+            if openings[node]:
+                result.append('(' * openings[node])
+            if sizes[node] > 1:
+                result.append(')')
+            name = names[node]
+            if name is not None:
+                if escape_name and not (name.startswith("'") and \
+                                        name.endswith("'")):
+                    if re.search("""[]['"(),:;_]""", name):
+                        name = "'%s'" % name.replace("'", "''")
+                    else:
+                        name = name.replace(' ','_')
+                result.append(name)
+            if with_distances and lengths[node] == lengths[node]:
+                result.append(":%s" % lengths[node])
+            if parents[node] > node + 1:
+                result.append(',')
+        if semicolon:
+            result.append(';')
+        return ''.join(result)
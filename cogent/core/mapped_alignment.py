@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+"""DenseAlignments kept on disk, for alignments too big for memory.
+
+write_mapped_alignment stores an alignment in a single binary file: a fixed
+size header, then the alignment as a sequences x positions matrix of uint8
+alphabet indices, one sequence after another, then the names, MolType and
+alphabet as JSON.  load_mapped_alignment opens such a file as a
+MappedDenseAlignment, which memory maps the matrix, so only the parts of the
+file that are actually used get read.
+
+The sequences are written one at a time, so a FASTA file can be converted
+without holding the whole alignment in memory:
+
+    write_mapped_alignment('chr1.aln', MinimalFastaParser(open('chr1.fasta')),
+        MolType=DNA)
+    aln = load_mapped_alignment('chr1.aln')
+    region = aln[1000000:1001000]
+"""
+import json
+import struct
+import numpy
+from cogent.core.alignment import DenseAlignment, aln_from_array
+from cogent.core.info import Info as InfoClass
+from cogent.core.moltype import ASCII, DNA, RNA, PROTEIN, \
+        PROTEIN_WITH_STOP, BYTES, AB
+from cogent.maths.stats.util import Freqs
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Peter Maxwell"
+__email__ = "pm67nz@gmail.com"
+__status__ = "Production"
+
+_MAGIC = b'PyCogAln'
+_VERSION = 1
+# magic, version, number of seqs, number of positions, metadata offset and
+# length in bytes.  The matrix starts on the first page after the header.
+_HEADER = struct.Struct('<8sIQQQQ')
+_DATA_OFFSET = 4096
+# roughly how much of the alignment to read at once when iterating
+_BLOCK_SIZE = 2**22
+
+_moltypes = dict((moltype.label, moltype) for moltype in
+        [ASCII, DNA, RNA, PROTEIN, PROTEIN_WITH_STOP, BYTES, AB])
+
+def _candidate_alphabets(moltype):
+    if hasattr(moltype, 'Alphabets'):
+        alphabets = moltype.Alphabets
+        return [alphabets.DegenGapped, alphabets.Gapped, alphabets.Degen,
+                alphabets.Base]
+    return [moltype.Alphabet]
+
+def _seq_encoder(alphabet):
+    """Returns a function converting a sequence to a uint8 index array"""
+    symbols = list(alphabet)
+    if len(symbols) > 256:
+        raise ValueError("Alphabet too big for a uint8 alignment")
+    if not all(len(symbol) == 1 and ord(symbol) < 256 for symbol in symbols):
+        return lambda seq: numpy.asarray(alphabet.toIndices(seq), numpy.uint8)
+    lookup = numpy.zeros(256, numpy.int16) - 1
+    for (index, symbol) in enumerate(symbols):
+        lookup[ord(symbol)] = index
+    def encode(seq):
+        codes = lookup[numpy.frombuffer(str(seq).encode('latin-1'),
+                numpy.uint8)]
+        if (codes < 0).any():
+            # unknown symbols, raise whatever DenseAlignment would
+            alphabet.toIndices(str(seq))
+            raise ValueError("Sequence has symbols not in the alphabet")
+        return codes.astype(numpy.uint8)
+    return encode
+
+def write_mapped_alignment(filename, data, MolType=None, Alphabet=None):
+    """Writes an alignment to filename for use with load_mapped_alignment.
+
+    data: a DenseAlignment, a dict of name:seq or an iterable of (name, seq)
+        pairs such as MinimalFastaParser produces.  Sequences are read and
+        written one at a time and must all have the same length.
+    MolType, Alphabet: as for DenseAlignment, which they default to if data
+        doesn't have its own.  The alphabet can have at most 256 symbols.
+    """
+    if Alphabet is None and MolType is None:
+        Alphabet = getattr(data, 'Alphabet', None) or DenseAlignment.Alphabet
+    if Alphabet is None:
+        Alphabet = _candidate_alphabets(MolType)[0]
+    if Alphabet.MolType is None or Alphabet.MolType.label not in _moltypes:
+        raise ValueError("Can only store alignments of standard MolTypes")
+    if isinstance(data, DenseAlignment) and data.Alphabet is Alphabet:
+        pairs = zip(data.Names, data.ArraySeqs)
+        encode = lambda seq: numpy.asarray(seq, numpy.uint8)
+    else:
+        if isinstance(data, DenseAlignment):
+            pairs = zip(data.Names, [data.Alphabet.toString(seq)
+                    for seq in data.ArraySeqs])
+        elif isinstance(data, dict):
+            pairs = iter(data.items())
+        else:
+            pairs = data
+        encode = _seq_encoder(Alphabet)
+
+    names = []
+    seq_len = None
+    outfile = open(filename, 'wb')
+    try:
+        outfile.write(b'\0' * _DATA_OFFSET)
+        for (name, seq) in pairs:
+            codes = encode(seq)
+            if seq_len is None:
+                seq_len = len(codes)
+            elif len(codes) != seq_len:
+                raise ValueError("Sequence '%s' is %s long, not %s" %
+                        (name, len(codes), seq_len))
+            outfile.write(codes.tobytes())
+            names.append(str(name))
+        if not names or not seq_len:
+            raise ValueError("Cannot create empty alignment.")
+        metadata = json.dumps({'names': names,
+                'moltype': Alphabet.MolType.label,
+                'alphabet': list(Alphabet)}).encode('utf-8')
+        outfile.write(metadata)
+        outfile.seek(0)
+        outfile.write(_HEADER.pack(_MAGIC, _VERSION, len(names), seq_len,
+                _DATA_OFFSET + len(names) * seq_len, len(metadata)))
+    finally:
+        outfile.close()
+
+class _AlignmentFile(object):
+    """The memory map and metadata of an alignment file, which can be
+    shared by several MappedDenseAlignments"""
+
+    def __init__(self, filename):
+        infile = open(filename, 'rb')
+        try:
+            header = infile.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError("%s is not an alignment file" % filename)
+            (magic, version, num_seqs, seq_len, metadata_offset,
+                    metadata_length) = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError("%s is not an alignment file" % filename)
+            if version > _VERSION:
+                raise ValueError("%s needs a newer version of PyCogent" %
+                        filename)
+            infile.seek(metadata_offset)
+            metadata = json.loads(infile.read(metadata_length).decode('utf-8'))
+        finally:
+            infile.close()
+        moltype = _moltypes[metadata['moltype']]
+        for alphabet in _candidate_alphabets(moltype):
+            if list(alphabet) == metadata['alphabet']:
+                break
+        else:
+            raise ValueError("%s has an unknown %s alphabet" %
+                    (filename, moltype.label))
+        self.Filename = filename
+        self.Names = metadata['names']
+        self.MolType = moltype
+        self.Alphabet = alphabet
+        self.data = numpy.memmap(filename, dtype=numpy.uint8, mode='r',
+                offset=_DATA_OFFSET, shape=(num_seqs, seq_len))
+
+def _as_slice(positions):
+    """The slice equivalent to a range"""
+    stop = positions.stop
+    if stop < 0:
+        stop = None
+    return slice(positions.start, stop, positions.step)
+
+def load_mapped_alignment(filename):
+    """A MappedDenseAlignment of the file from write_mapped_alignment"""
+    return MappedDenseAlignment(_AlignmentFile(filename))
+
+class MappedDenseAlignment(DenseAlignment):
+    """A DenseAlignment which leaves its data in a file until needed.
+
+    Use load_mapped_alignment to make one.  Slicing and takeSeqs give more
+    MappedDenseAlignments sharing the same file, without reading anything.
+    iterPositions, columnFreqs and getSubAlignment read only the parts of
+    the file they need, a block at a time.  Anything using ArraySeqs or
+    ArrayPositions works too, but if the sequences have been reordered or
+    subset that reads them into memory.  Other methods that make new
+    alignments make ordinary DenseAlignments.
+
+    Unlike a DenseAlignment, aln[i:j] gives an alignment rather than a list
+    of positions.  A single index still gives a position.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        # Methods inherited from DenseAlignment make new alignments with
+        # self.__class__(data, ...); those get ordinary DenseAlignments.
+        if args and isinstance(args[0], _AlignmentFile):
+            return super(MappedDenseAlignment, cls).__new__(cls)
+        return DenseAlignment(*args, **kwargs)
+
+    def __init__(self, source, rows=None, positions=None, Name=None,
+            Info=None):
+        """source: an _AlignmentFile.
+        rows: indices of the sequences in the file to use, default all.
+        positions: a range of the positions in the file to use, default all.
+        """
+        self._source = source
+        self._rows = rows
+        if positions is None:
+            positions = range(source.data.shape[1])
+        self._positions = positions
+        if rows is None:
+            self.Names = list(source.Names)
+        else:
+            self.Names = [source.Names[row] for row in rows]
+        self.MolType = source.MolType
+        self.Alphabet = source.Alphabet
+        self.Name = Name
+        if not isinstance(Info, InfoClass):
+            Info = InfoClass(Info or {})
+        self.Info = Info
+
+    def _view(self, rows=None, positions=None):
+        if rows is None:
+            rows = self._rows
+        if positions is None:
+            positions = self._positions
+        return self.__class__(self._source, rows, positions, Name=self.Name,
+                Info=self.Info)
+
+    def _get_seq_len(self):
+        return len(self._positions)
+
+    SeqLen = property(_get_seq_len)
+
+    def _get_array_seqs(self):
+        data = self._source.data[:, _as_slice(self._positions)]
+        if self._rows is not None:
+            data = data.take(self._rows, axis=0)
+        return data
+
+    ArraySeqs = SeqData = property(_get_array_seqs)
+
+    def _get_array_positions(self):
+        return self.ArraySeqs.transpose()
+
+    ArrayPositions = property(_get_array_positions)
+
+    def _read(self, positions):
+        """In-memory seqs x positions array for positions (a range of
+        positions in the file)"""
+        data = self._source.data[:, _as_slice(positions)]
+        if self._rows is None:
+            return numpy.array(data)
+        return data.take(self._rows, axis=0)
+
+    def iterPositions(self, pos_order=None):
+        """Iterates over positions in the alignment, as lists of symbols.
+
+        pos_order: optional list of position indices to use instead.
+        """
+        to_symbols = self.Alphabet.fromIndices
+        if pos_order is not None:
+            for pos in pos_order:
+                position = self._positions[pos]
+                data = self._read(range(position, position+1))
+                yield to_symbols(data[:, 0])
+            return
+        block = max(1, _BLOCK_SIZE // len(self.Names))
+        for start in range(0, len(self._positions), block):
+            data = self._read(self._positions[start:start+block])
+            for column in data.transpose():
+                yield to_symbols(column)
+
+    def _get_positions(self):
+        return list(self.iterPositions())
+
+    Positions = property(_get_positions)
+
+    def __iter__(self):
+        return self.iterPositions()
+
+    def __getitem__(self, item):
+        """A position, or for a slice a MappedDenseAlignment of those
+        positions"""
+        if isinstance(item, slice):
+            return self._view(positions=self._positions[item])
+        return next(self.iterPositions([item]))
+
+    def columnFreqs(self, constructor=Freqs):
+        """Returns list of Freqs with item counts for each column.
+        """
+        return list(map(constructor, self.iterPositions()))
+
+    def takeSeqs(self, seqs, negate=False, **kwargs):
+        """Returns a MappedDenseAlignment of only the named seqs."""
+        if kwargs.get('MolType', self.MolType) is not self.MolType:
+            return DenseAlignment(self).takeSeqs(seqs, negate, **kwargs)
+        if negate:
+            excluded = set(seqs)
+            names = [name for name in self.Names if name not in excluded]
+        else:
+            names = list(seqs)
+        if not names:
+            return {}   #safe value; can't construct empty alignment
+        rows = self._rows
+        if rows is None:
+            rows = list(range(len(self.Names)))
+        row_index = dict(zip(self.Names, rows))
+        return self._view(rows=[row_index[name] for name in names])
+
+    def getSubAlignment(self, seqs=None, pos=None, invert_seqs=False, \
+        invert_pos=False):
+        """Returns subalignment of specified sequences and positions.
+
+        As for DenseAlignment.getSubAlignment the result is an ordinary
+        DenseAlignment that does NOT share data with the original alignment.
+        Only the parts of the file with the wanted data are read.
+        """
+        if seqs is None:
+            seqs = list(range(len(self.Names)))
+        elif invert_seqs:
+            excluded = set(seqs)
+            seqs = [i for i in range(len(self.Names)) if i not in excluded]
+        names = [self.Names[i] for i in seqs]
+        rows = seqs
+        if self._rows is not None:
+            rows = [self._rows[i] for i in seqs]
+        data = self._source.data
+        if pos is None:
+            data = data[:, _as_slice(self._positions)].take(rows, axis=0)
+        else:
+            if invert_pos:
+                pos_mask = numpy.ones(len(self._positions), bool)
+                pos_mask[pos] = False
+                pos = numpy.nonzero(pos_mask)[0]
+            positions = [self._positions[p] for p in pos]
+            data = data[numpy.ix_(rows, positions)]
+        return DenseAlignment(data.transpose(), list(map(str, names)),
+                self.Alphabet, conversion_f=aln_from_array)
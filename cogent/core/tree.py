@@ -25,7 +25,8 @@ Definition of relevant terms or abbreviations:
        from a node
     -  stem: the edge immediately preceeding a clade
 """
-from numpy import zeros, argsort, ceil, log
+from numpy import zeros, empty, argsort, ceil, log, array, arange, minimum, \
+        int64, newaxis, memmap
 from copy import deepcopy
 import re
 from cogent.util.transform import comb
@@ -55,9 +56,93 @@ def distance_from_r(m1, m2):
     """Estimates distance as (1-r)/2: neg correl = max distance"""
     return (1-correlation(m1.flat, m2.flat)[0])/2
 
+def make_tip_index(names):
+    """Returns {name: index} numbering names in sorted order, for bitset
+    representations of clades and splits (see TreeNode.cladeBits)."""
+    return dict([(name, i) for (i, name) in enumerate(sorted(names))])
+
+def _fill_tip_distances(rows, first, last, spans, tip_distances):
+    """Sets rows[i-first, j] to the distance between tips i and j, for
+    first <= i < last.
+
+    spans: (child boundaries, distance from the root) for each node with
+    more than one child, the tips below it being numbered consecutively so
+    that its k'th child has tips boundaries[k] to boundaries[k+1]-1.
+    tip_distances: distance from the root to each tip.
+    """
+    # Each tip pair gets filled in once, at their last common ancestor,
+    # as part of a block covering all the tips of one child against those
+    # of its siblings.
+    for (bounds, distance) in spans:
+        (begin, end) = (bounds[0], bounds[-1])
+        if end <= first or begin >= last:
+            continue
+        for (low, high) in zip(bounds[:-1], bounds[1:]):
+            (top, bottom) = (max(low, first), min(high, last))
+            if top >= bottom:
+                continue
+            row_part = tip_distances[top:bottom, newaxis] - 2 * distance
+            if begin < low:
+                rows[top-first:bottom-first, begin:low] = \
+                        row_part + tip_distances[begin:low]
+            if high < end:
+                rows[top-first:bottom-first, high:end] = \
+                        row_part + tip_distances[high:end]
+    rows[arange(last-first), arange(first, last)] = 0.0
+
 class TreeError(Exception):
     pass
 
+class _TreeIndex(object):
+    """Lookups for the nodes of a tree, shared by all of them.
+
+    Nodes are kept in preorder along with their depths.  For nodes at
+    preorder positions i < j the shallowest node in positions i+1 to j is
+    a child of their last common ancestor, so that is a range minimum
+    query, which a sparse table answers in constant time.
+    """
+    
+    def __init__(self, root):
+        nodes = list(root.preorder(include_self=True))
+        positions = dict((id(node), i) for (i, node) in enumerate(nodes))
+        depths = [0] * len(nodes)
+        names = {}
+        for (i, node) in enumerate(nodes):
+            names.setdefault(node.Name, node)
+            if i:
+                depths[i] = depths[positions[id(node._parent)]] + 1
+        # depth and position in one key, so the smallest key in a range
+        # belongs to the shallowest node, and tells us where it is.
+        num_nodes = len(nodes)
+        level = array(depths, int64) * num_nodes + arange(num_nodes)
+        table = [level]
+        width = 1
+        while 2 * width <= num_nodes:
+            level = minimum(level[:-width], level[width:])
+            table.append(level)
+            width *= 2
+        self.nodes = nodes
+        self.positions = positions
+        self.names = names
+        self.table = table
+        self.valid = True
+    
+    def invalidate(self):
+        """Discards the index, which no longer matches the tree"""
+        self.valid = False
+        self.nodes = self.positions = self.names = self.table = None
+    
+    def lastCommonAncestor(self, node, other):
+        if node is other:
+            return node
+        (first, last) = sorted([self.positions[id(node)],
+                self.positions[id(other)]])
+        span = last - first
+        level = span.bit_length() - 1
+        row = self.table[level]
+        key = min(row[first+1], row[last-(1<<level)+1])
+        return self.nodes[int(key % len(self.nodes))]._parent
+
 class TreeNode(object):
     """Store information about a tree node. Mutable.
     
@@ -67,7 +152,8 @@ class TreeNode(object):
         Params: dict containing arbitrary parameters for the node.
         NameLoaded: ?
     """
-    _exclude_from_copy = dict.fromkeys(['_parent','Children'])
+    _exclude_from_copy = dict.fromkeys(['_parent','Children','_index'])
+    _index = None
     
     def __init__(self, Name=None, Children=None, Parent=None, Params=None, \
             NameLoaded=True, **kwargs):
@@ -83,6 +169,21 @@ class TreeNode(object):
         self._parent = Parent
         if (Parent is not None) and not (self in Parent.Children):
             Parent.append(self)
+    
+    @classmethod
+    def fromNewChildren(cls, Children=None, Name=None, Params=None,
+            NameLoaded=True):
+        """Returns a new node, as cls() would, but without checking
+        whether each child already has a parent, so the children must be
+        new parentless nodes.  For building big trees quickly."""
+        if Params is None:
+            Params = {}
+        node = cls(Name=Name, Params=Params, NameLoaded=NameLoaded)
+        if Children is not None:
+            node.Children = list(Children)
+            for child in node.Children:
+                child._parent = node
+        return node
 
 ### built-in methods and list interface support
     def __repr__(self):
@@ -123,10 +224,12 @@ class TreeNode(object):
         """
         c = self.__class__
         if isinstance(i, c):
+            i._indexChanged()
             if i._parent not in (None, self):
                 i._parent.Children.remove(i)
         else:
             i = c(i)
+        self._indexChanged()
         i._parent = self
         return i
     
@@ -145,6 +248,7 @@ class TreeNode(object):
     def pop(self, index=-1):
         """Returns and deletes child of self at index (default: -1)"""
         result = self.Children.pop(index)
+        self._indexChanged()
         result._parent = None
         return result
     
@@ -181,6 +285,7 @@ class TreeNode(object):
     
     def __delitem__(self, i):
         """del node[i] deletes index or slice from self.Children."""
+        self._indexChanged()
         curr = self.Children[i]
         if isinstance(i, slice):
             for c in curr:
@@ -272,6 +377,7 @@ class TreeNode(object):
             self._parent.removeNode(self)
         self._parent = Parent
         if (Parent is not None) and (not self in Parent.Children):
+            Parent._indexChanged()
             Parent.Children.append(self)
     
     Parent = property(_get_parent, _set_parent)
@@ -566,11 +672,38 @@ class TreeNode(object):
         result.append(curr)
         return result
     
+    def buildIndex(self):
+        """Indexes self and its descendants for repeated queries.
+
+        Until the tree is next changed, lastCommonAncestor takes constant
+        time for indexed nodes and getNodeMatchingName (and so
+        getConnectingNode etc.) finds names with a dict lookup.  Changes
+        made through TreeNode methods discard the index; changes made by
+        altering Children or _parent directly aren't noticed, so call
+        buildIndex again after those.  Renaming nodes is safe but loses the
+        speedup for those names.
+        """
+        index = _TreeIndex(self)
+        for node in index.nodes:
+            if node._index is not None and node._index is not index:
+                node._index.invalidate()
+            node._index = index
+    
+    def _indexChanged(self):
+        """Discards any index covering self"""
+        if self._index is not None:
+            self._index.invalidate()
+            self._index = None
+    
     def lastCommonAncestor(self, other):
         """Finds last common ancestor of self and other, or None.
         
-        Always tests by identity.
+        Always tests by identity.  Takes constant time if both are
+        covered by the same index from buildIndex.
         """
+        index = self._index
+        if index is not None and index.valid and other._index is index:
+            return index.lastCommonAncestor(self, other)
         my_lineage = set([id(node) for node in [self] + self.ancestors()])
         curr = other
         while curr is not None:
@@ -690,6 +823,7 @@ class TreeNode(object):
             if node.Name:
                 names_in_use.append(node.Name)
         #assign unique names to the Data property of nodes where Data = None
+        self._indexChanged()
         name_index = 1
         for node in self.traverse():
             if not node.Name:
@@ -1352,6 +1486,13 @@ class TreeNode(object):
         """
         find the edge with the name, or return None
         """
+        index = self._index
+        if index is not None and index.valid:
+            node = index.names.get(name)
+            # the name may have been changed since the index was built
+            if node is not None and node.Name == name and \
+                    index.lastCommonAncestor(self, node) is self:
+                return node
         for node in self.traverse(self_before=True, self_after=False):
             if node.Name == name:
                 return node
@@ -1411,6 +1552,7 @@ class TreeNode(object):
         if nodes is None:
             nodes = self.traverse()
 
+        self._indexChanged()
         for n in nodes:
             if n.Name in mapping:
                 n.Name = mapping[n.Name]
@@ -1500,71 +1642,210 @@ class TreeNode(object):
                 i.__leaf_set = leaf_set
         return frozenset(sets)
                 
+    def cladeBits(self, tip_index):
+        """Returns a list of (node, bits) for self and its descendants in
+        postorder, bits being an int with bit tip_index[name] set for the
+        name of each tip under node.
+
+        Ints make compact sets: a clade of a 1000 tip tree takes 160 bytes
+        and set operations are single &, | and ^ operations.  tip_index is
+        a dict of {tip name: index}, shared between the trees to be
+        compared, see make_tip_index.  Raises KeyError for tips not in it.
+        """
+        bits = {}
+        result = []
+        for node in self.postorder():
+            if node.Children:
+                b = 0
+                for child in node.Children:
+                    b |= bits.pop(id(child))
+            else:
+                b = 1 << tip_index[node.Name]
+            bits[id(node)] = b
+            result.append((node, b))
+        return result
+
+    def subsetBits(self, tip_index):
+        """Returns the subsets() of self as a frozenset of ints, see
+        cladeBits."""
+        return frozenset([b for (node, b) in self.cladeBits(tip_index)[:-1]
+                if b & (b-1)])
+
+    def splitBits(self, tip_index):
+        """Returns {split: length} for the splits of self as an unrooted
+        tree, with lengths from the Length attribute or None.
+
+        Each split, one for every edge including the tips, is an int with
+        bits set for the tips on one side (see cladeBits), always the side
+        without the tip with the smallest index, so equal splits from
+        different trees are equal ints.  The two edges from a bifurcating
+        root are one split, their lengths summed.
+        """
+        clades = self.cladeBits(tip_index)
+        all_tips = clades[-1][1]
+        lowest = all_tips & -all_tips
+        splits = {}
+        for (node, b) in clades[:-1]:
+            if b & lowest:
+                b ^= all_tips
+            length = getattr(node, 'Length', None)
+            if b in splits and length is not None:
+                if splits[b] is not None:
+                    length += splits[b]
+                else:
+                    length = None
+            splits[b] = length
+        return splits
+
+    def robinsonFoulds(self, other, proportion=False):
+        """Returns the Robinson-Foulds distance between self and other as
+        unrooted trees: the number of non-trivial splits found in only one of
+        them.  If proportion, divides that by the number of splits in both.
+
+        The trees must have the same tips.
+        """
+        tip_index = make_tip_index(self.getTipNames())
+        try:
+            if len(other.getTipNames()) != len(tip_index):
+                raise KeyError
+            # not the splits of single tips, which all trees share
+            trivial = (1 << len(tip_index)) - 2
+            self_splits, other_splits = [set([s for s in
+                    t.splitBits(tip_index) if s & (s-1) and s != trivial])
+                    for t in [self, other]]
+        except KeyError:
+            raise TreeError('trees have different tips')
+        distance = len(self_splits ^ other_splits)
+        if proportion:
+            total = len(self_splits) + len(other_splits)
+            return total and distance / float(total)
+        return distance
+
     def compareBySubsets(self, other, exclude_absent_taxa=False):
         """Returns fraction of overlapping subsets where self and other differ.
-            
+
         Other is expected to be a tree object compatible with PhyloNode.
-        
-        Note: names present in only one of the two trees will count as 
+
+        Note: names present in only one of the two trees will count as
         mismatches: if you don't want this behavior, strip out the non-matching
         tips first.
         """
-        self_sets, other_sets = self.subsets(), other.subsets()
+        self_tips, other_tips = self.subset(), other.subset()
+        tip_index = make_tip_index(self_tips | other_tips)
+        self_sets = self.subsetBits(tip_index)
+        other_sets = other.subsetBits(tip_index)
         if exclude_absent_taxa:
-            in_both = self.subset() & other.subset()
+            in_both = 0
+            for name in self_tips & other_tips:
+                in_both |= 1 << tip_index[name]
             self_sets = [i & in_both for i in self_sets]
-            self_sets = frozenset([i for i in self_sets if len(i) > 1])
+            self_sets = frozenset([i for i in self_sets if i & (i-1)])
             other_sets = [i & in_both for i in other_sets]
-            other_sets = frozenset([i for i in other_sets if len(i) > 1])
+            other_sets = frozenset([i for i in other_sets if i & (i-1)])
         total_subsets = len(self_sets) + len(other_sets)
         intersection_length = len(self_sets & other_sets)
         if not total_subsets:   #no common subsets after filtering, so max dist
             return 1
         return 1 - 2*intersection_length/float(total_subsets)
 
-    def tipToTipDistances(self, default_length=1):
+    def _tipToTipDistances(self, endpoints, default_length, dtype,
+            condensed, filename):
+        """Tip to tip distances for tipToTipDistances"""
+        distances = {id(self): 0.0}
+        for node in self.preorder(include_self=False):
+            length = getattr(node, 'Length', None)
+            if length is None:
+                length = default_length
+            distances[id(node)] = distances[id(node._parent)] + length
+
+        # number the tips in postorder, so the tips below any node are
+        # numbered consecutively
+        all_tips = []
+        tip_ranges = {}
+        spans = []
+        for node in self.postorder(include_self=True):
+            if node.Children:
+                bounds = [tip_ranges[id(node.Children[0])][0]] + \
+                        [tip_ranges[id(child)][1] for child in node.Children]
+                tip_ranges[id(node)] = (bounds[0], bounds[-1])
+                if len(bounds) > 2:
+                    spans.append((bounds, distances[id(node)]))
+            else:
+                tip_ranges[id(node)] = (len(all_tips), len(all_tips)+1)
+                all_tips.append(node)
+
+        if endpoints is None:
+            tip_order = all_tips
+            ordered = all_tips
+        else:
+            tip_order = endpoints
+            # renumber the wanted tips, still in postorder
+            positions = [tip_ranges[id(tip)][0] for tip in endpoints]
+            wanted = [False] * (len(all_tips) + 1)
+            for position in positions:
+                wanted[position] = True
+            renumbered = [0]
+            for is_wanted in wanted[:-1]:
+                renumbered.append(renumbered[-1] + is_wanted)
+            spans = [([renumbered[b] for b in bounds], distance)
+                    for (bounds, distance) in spans]
+            ordered = [tip for (tip, is_wanted) in zip(all_tips, wanted)
+                    if is_wanted]
+            if condensed or filename is not None:
+                tip_order = ordered
+        tip_distances = array([distances[id(tip)] for tip in ordered], float)
+
+        num_tips = len(ordered)
+        if condensed:
+            shape = (num_tips * (num_tips-1) // 2,)
+        else:
+            shape = (num_tips, num_tips)
+        if filename is None:
+            result = zeros(shape, dtype)
+        else:
+            result = memmap(filename, dtype=dtype, mode='w+', shape=shape)
+
+        if condensed or filename is not None:
+            # a block of rows at a time, to bound the memory used
+            chunk = max(1, 2**22 // max(num_tips, 1))
+        else:
+            chunk = max(num_tips, 1)
+        for first in range(0, num_tips, chunk):
+            last = min(first + chunk, num_tips)
+            if not condensed:
+                _fill_tip_distances(result[first:last], first, last, spans,
+                        tip_distances)
+                continue
+            rows = empty((last-first, num_tips), float)
+            _fill_tip_distances(rows, first, last, spans, tip_distances)
+            for i in range(first, last):
+                # the upper triangle, row by row
+                offset = i * num_tips - i * (i+1) // 2
+                result[offset:offset+num_tips-i-1] = rows[i-first, i+1:]
+
+        if tip_order is not ordered:
+            order = [renumbered[position] for position in positions]
+            result = result.take(order, 0).take(order, 1)
+        if filename is not None:
+            result.flush()
+        return result, tip_order
+
+    def tipToTipDistances(self, default_length=1, dtype=float,
+            condensed=False, filename=None):
         """Returns distance matrix between all pairs of tips, and a tip order.
-            
-        Warning: .__start and .__stop added to self and its descendants.
 
         tip_order contains the actual node objects, not their names (may be
-        confusing in some cases).
+        confusing in some cases).  Nodes without a Length attribute, or
+        with a Length of None, count as default_length.
+
+        dtype: for the result, eg: numpy.float32 to halve its size.
+        condensed: if True return only the upper triangle, row by row, in
+            a 1D array (the order used by scipy.spatial.distance).
+        filename: if given, the result is a numpy.memmap backed by this
+            file, for matrices too big to keep in memory.
         """
-        ## linearize the tips in postorder.
-        # .__start, .__stop compose the slice in tip_order.
-        tip_order = list(self.tips())
-        for i, tip in enumerate(tip_order):
-            tip.__start, tip.__stop = i, i+1
-
-        num_tips = len(tip_order)
-        result = zeros((num_tips, num_tips), float) #tip by tip matrix
-        tipdistances = zeros((num_tips), float) #distances from tip to curr node
-
-        def update_result(): 
-        # set tip_tip distance between tips of different child
-            for child1, child2 in comb(node.Children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    for tip2 in range(child2.__start, child2.__stop):
-                        result[tip1,tip2] = \
-                            tipdistances[tip1] + tipdistances[tip2]
-
-        for node in self.traverse(self_before=False, self_after=True):
-            if not node.Children:
-                continue
-            ## subtree with solved child wedges
-            starts, stops = [], [] #to calc ._start and ._stop for curr node
-            for child in node.Children:
-                if hasattr(child, 'Length') and child.Length is not None:
-                    child_len = child.Length
-                else:
-                    child_len = default_length
-                tipdistances[child.__start : child.__stop] += child_len
-                starts.append(child.__start); stops.append(child.__stop)
-            node.__start, node.__stop = min(starts), max(stops)
-            ## update result if nessessary
-            if len(node.Children) > 1: #not single child
-                update_result()
-        return result+result.T, tip_order 
+        return self._tipToTipDistances(None, default_length, dtype,
+                condensed, filename)
 
     def compareByTipDistances(self, other, dist_f=distance_from_r):
         """Compares self to other using tip-to-tip distance matrices.
@@ -2012,65 +2293,26 @@ class PhyloNode(TreeNode):
         (root_dists, endpoint_dists) = self._getDistances(endpoints)
         return endpoint_dists
 
-    def tipToTipDistances(self, endpoints=None, default_length=1):
+    def tipToTipDistances(self, endpoints=None, default_length=1,
+            dtype=float, condensed=False, filename=None):
         """Returns distance matrix between all pairs of tips, and a tip order.
-            
-        Warning: .__start and .__stop added to self and its descendants.
 
         tip_order contains the actual node objects, not their names (may be
         confusing in some cases).
-        """
-        all_tips = self.tips()
-        if endpoints is None:
-            tip_order = list(all_tips)
-        else:
-             if isinstance(endpoints[0], PhyloNode):
-                tip_order = endpoints
-             else:
-                tip_order = [self.getNodeMatchingName(n) for n in endpoints]
 
-        ## linearize all tips in postorder
-        # .__start, .__stop compose the slice in tip_order.
-        for i, node in enumerate(all_tips):
-            node.__start, node.__stop = i, i+1
-        
-        # the result map provides index in the result matrix
-        result_map = dict([(n.__start,i) for i,n in enumerate(tip_order)])
-        num_all_tips = len(all_tips) # total number of tips
-        num_tips = len(tip_order) # total number of tips in result
-        result = zeros((num_tips, num_tips), float) # tip by tip matrix
-        tipdistances = zeros((num_all_tips), float) # dist from tip to curr node
-
-        def update_result():
-        # set tip_tip distance between tips of different child
-            for child1, child2 in comb(node.Children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    if tip1 not in result_map:
-                        continue
-                    res_tip1 = result_map[tip1]
-                    for tip2 in range(child2.__start, child2.__stop):
-                        if tip2 not in result_map:
-                            continue
-                        result[res_tip1,result_map[tip2]] = \
-                            tipdistances[tip1] + tipdistances[tip2]
-
-        for node in self.traverse(self_before=False, self_after=True):
-            if not node.Children:
-                continue
-            ## subtree with solved child wedges
-            starts, stops = [], [] #to calc ._start and ._stop for curr node
-            for child in node.Children:
-                if hasattr(child, 'Length') and child.Length is not None:
-                    child_len = child.Length
-                else:
-                    child_len = default_length
-                tipdistances[child.__start : child.__stop] += child_len
-                starts.append(child.__start); stops.append(child.__stop)
-            node.__start, node.__stop = min(starts), max(stops)
-            ## update result if nessessary
-            if len(node.Children) > 1: #not single child
-                update_result()
-        return result+result.T, tip_order
+        endpoints: the tips, or their names, to include.  The tip_order
+            follows endpoints, except with condensed or filename, when it
+            follows the tree so the result can be made a block at a time.
+        dtype: for the result, eg: numpy.float32 to halve its size.
+        condensed: if True return only the upper triangle, row by row, in
+            a 1D array (the order used by scipy.spatial.distance).
+        filename: if given, the result is a numpy.memmap backed by this
+            file, for matrices too big to keep in memory.
+        """
+        if endpoints is not None and not isinstance(endpoints[0], PhyloNode):
+            endpoints = [self.getNodeMatchingName(n) for n in endpoints]
+        return self._tipToTipDistances(endpoints, default_length, dtype,
+                condensed, filename)
 
     def compareByTipDistances(self, other, sample=None, dist_f=distance_from_r,\
             shuffle_f=shuffle):
@@ -2162,4 +2404,14 @@ class TreeBuilder(object):
                 )
         self._known_edges[id(node)] = node
         return node
+
+    def createParsedEdge(self, children, name, params):
+        """Callback for the fast newick parser.  Same result as createEdge
+        but, for TreeNode and PhyloNode trees, made with fromNewChildren.
+        The children must be new parentless nodes."""
+        if self.TreeNodeClass not in (TreeNode, PhyloNode):
+            return self.createEdge(children, name, params)
+        return self.TreeNodeClass.fromNewChildren(children,
+                Name=self._unique_name(name), Params=params,
+                NameLoaded=name is not None)
     
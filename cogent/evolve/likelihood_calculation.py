@@ -14,11 +14,12 @@ Float = numpy.core.numerictypes.sctype2char(float)
 
 from cogent.recalculation.definition import CalculationDefn, _FuncDefn, \
         CalcDefn, ProbabilityParamDefn, NonParamDefn, SumDefn, CallDefn, \
-        ParallelSumDefn
+        ParallelSumDefn, SelectForDimension
 
 from cogent.evolve.likelihood_tree import LikelihoodTreeEdge
 from cogent.evolve.simulate import argpick
 from cogent.maths.markov import SiteClassTransitionMatrix
+from cogent.util import parallel
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -64,6 +65,86 @@ class PartialLikelihoodProductDefnFixedMotif(PartialLikelihoodProductDefn):
         return result
     
 
+class BatchedPartialLikelihoodProductDefn(_PartialLikelihoodDefn):
+    # Partial likelihoods for all the bins at once, shape (bin, uniq, motif)
+    name = "plh"
+    recycling = True
+    
+    def setup(self, edge_name, batch_size):
+        self.edge_name = edge_name
+        self.batch_size = batch_size
+    
+    def calc(self, recycled_result, fixed_motif, lh_edge, *child_likelihoods):
+        if recycled_result is None:
+            recycled_result = lh_edge.makeBatchedPartialLikelihoodsArray(
+                    self.batch_size)
+        result = lh_edge.sumBatchedInputLikelihoodsR(
+                recycled_result, *child_likelihoods)
+        if fixed_motif not in [None, -1]:
+            for motif in range(result.shape[-1]):
+                if motif != fixed_motif:
+                    result[..., motif] = 0.0
+        return result
+    
+
+class BatchedRootLikelihoodDefn(CalculationDefn):
+    # Stacked per-bin site pattern likelihoods, from which SelectForDimension
+    # can provide the usual 'lh' value for each bin.
+    name = "blh"
+    
+    def setup(self, bin_names):
+        self.bin_names = bin_names
+    
+    def calc(self, plhs, mprobs):
+        return numpy.einsum('bum,bm->bu', plhs, mprobs)
+    
+
+class ScaledPartialLikelihoodProductDefn(_PartialLikelihoodDefn):
+    # Single precision partial likelihoods with per site pattern exponents,
+    # see LikelihoodTreeEdge.sumScaledInputLikelihoodsR
+    name = "plh"
+    recycling = True
+    
+    def setup(self, edge_name, dtype):
+        self.edge_name = edge_name
+        self.dtype = dtype
+    
+    def calc(self, recycled_result, fixed_motif, lh_edge, *child_likelihoods):
+        if recycled_result is None:
+            recycled_result = lh_edge.makeScaledPartialLikelihoodsArrays(
+                    self.dtype)
+        result = lh_edge.sumScaledInputLikelihoodsR(
+                recycled_result, *child_likelihoods)
+        if fixed_motif not in [None, -1]:
+            for motif in range(result[0].shape[-1]):
+                if motif != fixed_motif:
+                    result[0][:, motif] = 0.0
+        return result
+    
+
+def as_single(lhs):
+    return (numpy.asarray(lhs, numpy.float32), None)
+
+def single(psub):
+    return numpy.asarray(psub, numpy.float32)
+
+def scaled_inner(plh, psub):
+    (lhs, exponents) = plh
+    return (numpy.inner(lhs, psub), exponents)
+
+def unscaled_inner(plh, mprobs):
+    # Back to the usual double precision root likelihoods
+    (lhs, exponents) = plh
+    return numpy.ldexp(numpy.inner(lhs.astype(Float), mprobs), exponents)
+
+def stack_bins(*values):
+    return numpy.array(values)
+
+def batched_inner(plhs, psubs):
+    # numpy.inner(plh, psub) for every bin with one stacked matmul.  A leaf
+    # has the same likelihoods for all bins so is broadcast.
+    return numpy.matmul(plhs, numpy.swapaxes(psubs, -1, -2))
+
 class LhtEdgeLookupDefn(CalculationDefn):
     name = 'col_index'
     
@@ -101,6 +182,61 @@ def makePartialLikelihoodDefns(edge, lht, psubs, fixed_motifs):
     
     return plh
 
+def makeScaledPartialLikelihoodDefns(edge, lht, psubs, fixed_motifs,
+        root=True):
+    kw = {'edge_name':edge.Name}
+    
+    if edge.istip():
+        plh = LeafPartialLikelihoodDefn(lht, **kw)
+        plh = CalcDefn(as_single, name='sequence32')(plh)
+    else:
+        lht_edge = LhtEdgeLookupDefn(lht, **kw)
+        children = []
+        for child in edge.Children:
+            child_plh = makeScaledPartialLikelihoodDefns(child, lht, psubs,
+                    fixed_motifs, root=False)
+            psub = psubs.selectFromDimension('edge', child.Name)
+            psub = CalcDefn(single, name='psubs32')(psub)
+            child_plh = CalcDefn(scaled_inner, name='inner')(child_plh, psub)
+            children.append(child_plh)
+        
+        fixed_motif = fixed_motifs.selectFromDimension('edge', edge.Name)
+        # The root product in double precision, as a star tree's root can
+        # have many children, and so a wide range of values in each row.
+        if root:
+            dtype = numpy.float64
+        else:
+            dtype = numpy.float32
+        plh = ScaledPartialLikelihoodProductDefn(
+                fixed_motif, lht_edge, *children, dtype=dtype, **kw)
+    
+    return plh
+
+def makeBatchedPartialLikelihoodDefns(edge, lht, psubs, fixed_motifs,
+        bin_names):
+    kw = {'edge_name':edge.Name}
+    
+    if edge.istip():
+        plh = LeafPartialLikelihoodDefn(lht, **kw)
+    else:
+        lht_edge = LhtEdgeLookupDefn(lht, **kw)
+        children = []
+        for child in edge.Children:
+            child_plh = makeBatchedPartialLikelihoodDefns(child, lht, psubs,
+                    fixed_motifs, bin_names)
+            psub = psubs.selectFromDimension('edge', child.Name)
+            psub = CalcDefn(stack_bins, name='bpsubs')(
+                    *psub.acrossDimension('bin', bin_names))
+            child_plh = CalcDefn(batched_inner)(child_plh, psub)
+            children.append(child_plh)
+        
+        fixed_motif = fixed_motifs.selectFromDimension('edge', edge.Name)
+        plh = BatchedPartialLikelihoodProductDefn(
+                fixed_motif, lht_edge, *children,
+                **dict(kw, batch_size=len(bin_names)))
+    
+    return plh
+
 def recursive_lht_build(edge, leaves):
     if edge.istip():
         lhe = leaves[edge.Name]
@@ -124,11 +260,21 @@ class LikelihoodTreeDefn(CalculationDefn):
 class LikelihoodTreeAlignmentSplitterDefn(CalculationDefn):
     name = 'local_lht'
     def calc(self, parallel_context, lht):
+        if isinstance(parallel.getContext(),
+                parallel.MultiprocessingParallelContext):
+            # Pool workers sent this can attach to the same arrays
+            lht = lht.shareMemory()
         return lht.parallelShare(parallel_context)
     
 
 def makeTotalLogLikelihoodDefn(tree, leaves, psubs, mprobs, bprobs, bin_names,
-        locus_names, sites_independent):
+        locus_names, sites_independent, batched=False, precision=None):
+    
+    if precision not in [None, 'double', 'single']:
+        raise ValueError("precision must be 'double' or 'single', not %r"
+                % precision)
+    if precision == 'single' and batched:
+        raise ValueError("batched bins can't be used with single precision")
     
     fixed_motifs = NonParamDefn('fixed_motif', ['edge'])
     
@@ -138,7 +284,25 @@ def makeTotalLogLikelihoodDefn(tree, leaves, psubs, mprobs, bprobs, bin_names,
     parallel_context = NonParamDefn('parallel_context')
     lht = LikelihoodTreeAlignmentSplitterDefn(parallel_context, lht)
     
-    plh = makePartialLikelihoodDefns(tree, lht, psubs, fixed_motifs)
+    root_mprobs = mprobs.selectFromDimension('edge', 'root')
+    if batched and len(bin_names) > 1:
+        # One pruning pass with arrays stacked across all the bins rather
+        # than a separate pass per bin.
+        plh = makeBatchedPartialLikelihoodDefns(tree, lht, psubs,
+                fixed_motifs, bin_names)
+        root_mprobs = CalcDefn(stack_bins, name='bmprobs')(
+                *root_mprobs.acrossDimension('bin', bin_names))
+        lh = BatchedRootLikelihoodDefn(plh, root_mprobs, bin_names=bin_names)
+        lh = SelectForDimension(lh, 'bin', name='lh')
+    elif precision == 'single':
+        # Pruning in float32 with scaling, but the root likelihoods and
+        # everything after them in float64.
+        plh = makeScaledPartialLikelihoodDefns(tree, lht, psubs,
+                fixed_motifs)
+        lh = CalcDefn(unscaled_inner, name='lh')(plh, root_mprobs)
+    else:
+        plh = makePartialLikelihoodDefns(tree, lht, psubs, fixed_motifs)
+        lh = CalcDefn(numpy.inner, name='lh')(plh, root_mprobs)
     
     # After the root partial likelihoods have been calculated it remains to
     # sum over the motifs, local sites, other sites (ie: cpus), bins and loci.
@@ -147,8 +311,6 @@ def makeTotalLogLikelihoodDefn(tree, leaves, psubs, mprobs, bprobs, bin_names,
     # be interleaved first, otherwise summing over the CPUs is done last to
     # minimise inter-CPU communicaton.
     
-    root_mprobs = mprobs.selectFromDimension('edge', 'root')
-    lh = CalcDefn(numpy.inner, name='lh')(plh, root_mprobs)
     if len(bin_names) > 1:
         if sites_independent:
             site_pattern = CalcDefn(BinnedSiteDistribution, name='bdist')(
@@ -6,7 +6,10 @@ from cogent.core.alignment import Alignment
 from cogent.util.dict_array import DictArrayTemplate
 from cogent.evolve.simulate import AlignmentEvolver, randomSequence
 from cogent.util import parallel, table
-from cogent.recalculation.definition import ParameterController
+from cogent.recalculation.definition import ParameterController, \
+        ProductDefn, SelectForDimension
+from cogent.evolve.substitution_calculation import PsubsDefn
+from cogent.recalculation.calculation import OptPar
 from cogent.maths.matrix_logarithm import is_generator_unique
 
 from cogent.util.warning import discontinued, deprecated
@@ -40,6 +43,95 @@ class LikelihoodFunction(ParameterController):
     def getLogLikelihood(self):
         return self.getFinalResult()
     
+    def getAnalyticGradient(self):
+        """Derivatives of the log likelihood with respect to the edge
+        length and rate OptPars, from the pruning algorithm, for use by
+        Calculator.gradient.  None if the psubs aren't simply exp(Q*t)
+        or the bins form an HMM."""
+        defn_for = self.defn_for
+        psubs = defn_for.get('psubs')
+        if not isinstance(psubs, PsubsDefn) or 'dpsubs' in defn_for or \
+                'bin_switch' in defn_for or not defn_for.get('local_lht') or \
+                not defn_for.get('lh'):
+            return None
+        (Qd, distance) = psubs.args
+        lht = defn_for['local_lht']
+        lh = defn_for['lh']
+        if isinstance(lh, SelectForDimension):
+            # batched bins, so the root mprobs are stacked
+            root_mprobs = lh.arg.args[1].args
+        else:
+            root_mprobs = [lh.args[1]] * len(self.bin_names)
+        bprobs = defn_for.get('bprobs')
+        if isinstance(distance, ProductDefn):
+            factors = distance.args
+            consumers = distance
+        else:
+            factors = [distance]
+            consumers = psubs
+        edge_names = [edge.Name for edge in
+                self._tree.getEdgeVector(include_root=False)]
+        
+        def analytic_gradient(calc):
+            def cell_for(defn, scope):
+                return calc.results_by_id[id(defn)][defn.outputOrdinalFor(scope)]
+            def value_of(defn, scope):
+                return calc._getCurrentCellValue(cell_for(defn, scope))
+            
+            result = {}
+            analytic = set()
+            for locus in self.locus_names:
+                root = value_of(lht, {'locus':locus})
+                total = 0.0
+                all_derivs = []
+                for (b, bin) in enumerate(self.bin_names):
+                    scopes = dict((name, {'edge':name, 'bin':bin,
+                            'locus':locus}) for name in edge_names)
+                    psub_values = dict((name, value_of(psubs, scope))
+                            for (name, scope) in list(scopes.items()))
+                    Qs = dict((name, value_of(Qd, scope).Q)
+                            for (name, scope) in list(scopes.items()))
+                    mprobs = value_of(root_mprobs[b],
+                            {'bin':bin, 'locus':locus})
+                    (lhs, derivs) = root.getDistanceDerivatives(
+                            psub_values, Qs, mprobs)
+                    if bprobs is not None:
+                        bprob = value_of(bprobs, {'locus':locus})[b]
+                        lhs = lhs * bprob
+                        for name in derivs:
+                            derivs[name] = derivs[name] * bprob
+                    total = total + lhs
+                    all_derivs.append((scopes, derivs))
+                weights = numpy.where(root.counts > 0, root.counts / total, 0.0)
+                for (scopes, derivs) in all_derivs:
+                    for name in edge_names:
+                        scope = scopes[name]
+                        g = numpy.inner(weights, derivs[name])
+                        analytic.add(cell_for(consumers, scope).rank)
+                        values = [value_of(f, scope) for f in factors]
+                        for (i, factor) in enumerate(factors):
+                            cell = cell_for(factor, scope)
+                            if not isinstance(cell, OptPar):
+                                continue
+                            partial = numpy.product(values[:i] + values[i+1:])
+                            result[cell.rank] = result.get(cell.rank, 0.0) + \
+                                    g * partial
+            if root.comm is not None:
+                ranks = sorted(result)
+                totals = root.comm.allreduce(
+                        numpy.array([result[r] for r in ranks]))
+                result = dict(list(zip(ranks, totals)))
+            
+            # OptPars with other consequences must be left to the
+            # finite difference code.
+            for rank in list(result.keys()):
+                clients = calc._cells[rank].clients
+                if [c for c in clients if c.rank not in analytic]:
+                    del result[rank]
+            return result
+        
+        return analytic_gradient
+    
     def getPsubForEdge(self, name, **kw):
         """returns the substitution probability matrix for the named edge"""
         try:
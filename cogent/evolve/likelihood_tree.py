@@ -5,6 +5,7 @@ Each leaf holds a sequence.  Used by a likelihood function."""
 
 from cogent.util.modules import importVersionedModule, ExpectedImportError
 from cogent.util.parallel import MPI
+from cogent.util import shared_array
 from cogent import LoadTable
 
 import numpy
@@ -105,8 +106,8 @@ class _LikelihoodTreeEdge(object):
         U = len(self.uniq) - 1 # Gap column
         (size, rank) = (comm.Get_size(), comm.Get_rank())
         (share, remainder) = divmod(U, size)
-        if share == 0:
-            return self # not enough to share
+        # If share is 0 some CPUs get only the gap column, which is
+        # better than them all doing all the columns
         share_sizes = [share+1]*remainder + [share]*(size-remainder)
         assert sum(share_sizes) == U
         (lo,hi) = [sum(share_sizes[:i]) for i in (rank, rank+1)]
@@ -163,6 +164,20 @@ class _LikelihoodTreeEdge(object):
         else:
             return G
     
+    def shareMemory(self):
+        """Move the arrays of this edge and all those below it into shared
+        memory, so that pickling it (eg: for a multiprocessing worker)
+        doesn't copy them"""
+        children = [child.shareMemory() for (index, child)
+                in self._indexed_children]
+        self.indexes = [shared_array.share(index) for index in self.indexes]
+        self._indexed_children = list(zip(self.indexes, children))
+        self.index = shared_array.share(self.index)
+        self.uniq = shared_array.share(self.uniq)
+        self.counts = shared_array.share(self.counts)
+        self.ambig = shared_array.share(self.ambig)
+        return self
+    
     def getEdge(self, name):
         if self.edge_name == name:
             return self
@@ -181,12 +196,118 @@ class _LikelihoodTreeEdge(object):
         self.sumInputLikelihoodsR(result, *likelihoods)
         return result
 
+    def makeBatchedPartialLikelihoodsArray(self, batch_size):
+        return numpy.ones([batch_size] + self.shape, self.float_type)
+    
+    def sumBatchedInputLikelihoodsR(self, result, *likelihoods):
+        # As sumInputLikelihoodsR but with an extra leading dimension
+        # (eg: bins) on the result and on each of the child likelihoods.
+        result[:] = 1.0
+        for (i, index) in enumerate(self.indexes):
+            result *= numpy.take(likelihoods[i], index, -2)
+        return result
+    
+    # Single precision partial likelihoods are pairs of arrays: float32
+    # likelihoods, with rows scaled up by powers of 2 where they would
+    # otherwise underflow, and the base 2 exponents to undo that.
+    
+    # Rows with a max below this get rescaled.  Low enough to be rare, high
+    # enough that the product of a few more children can't underflow.
+    SCALING_THRESHOLD = 2.0 ** -32
+    
+    def makeScaledPartialLikelihoodsArrays(self, dtype=numpy.float32):
+        return (numpy.ones(self.shape, dtype),
+                numpy.zeros(self.shape[:1], self.integer_type))
+    
+    def sumScaledInputLikelihoodsR(self, result, *likelihoods):
+        # As sumInputLikelihoodsR, but rescaling as needed.  Leaves have
+        # None for their exponents.
+        (result, exponents) = result
+        result[:] = 1.0
+        exponents[:] = 0
+        for (i, (index, (lhs, lh_exponents))) in enumerate(
+                zip(self.indexes, likelihoods)):
+            result *= numpy.take(lhs, index, 0)
+            if lh_exponents is not None:
+                exponents += numpy.take(lh_exponents, index)
+            if i % 4 == 3 or i == len(likelihoods) - 1:
+                self._rescale(result, exponents)
+        return (result, exponents)
+    
+    def _rescale(self, result, exponents):
+        maxes = result.max(axis=-1)
+        small = numpy.flatnonzero(maxes < self.SCALING_THRESHOLD)
+        if len(small):
+            (mantissas, shifts) = numpy.frexp(maxes[small])
+            # beyond float32 range, so better left subnormal
+            shifts = numpy.maximum(shifts, -125)
+            result[small] *= numpy.ldexp(
+                    numpy.float32(1.0), -shifts)[:, numpy.newaxis]
+            exponents[small] += shifts
+    
     def asLeaf(self, likelihoods):
         (self, likelihoods) = self.parallelReconstructColumns(likelihoods)
         assert len(likelihoods) == len(self.counts)
         return LikelihoodTreeLeaf(likelihoods, likelihoods, 
                 self.counts, self.index, self.edge_name, self.alphabet, None)
 
+    # For analytic gradients
+
+    def getDistanceDerivatives(self, psubs, rate_matrices, mprobs):
+        """Likelihood of each site pattern of this (root) edge, and the
+        derivative of those likelihoods with respect to the distance
+        along each edge, from one inside and one outside pass of the
+        pruning algorithm.  'psubs' and 'rate_matrices' are dicts keyed
+        by edge name.  Returns (likelihoods, {edge_name:derivatives})"""
+        inside = {}
+        below = {}
+        plh = self._insidePass(psubs, inside, below)
+        likelihoods = numpy.inner(plh, mprobs)
+        outside = numpy.empty(plh.shape, plh.dtype)
+        outside[:] = mprobs
+        derivatives = {}
+        self._outsidePass(outside, None, psubs, rate_matrices, inside,
+                below, derivatives)
+        return (likelihoods, derivatives)
+
+    def _insidePass(self, psubs, inside, below):
+        # inside: partial likelihoods at the bottom of each edge
+        # below: the same evolved up to the top of the edge
+        child_likelihoods = []
+        for (index, child) in self._indexed_children:
+            name = child.edge_name
+            if isinstance(child, _LikelihoodTreeEdge):
+                plh = child._insidePass(psubs, inside, below)
+            else:
+                plh = child.input_likelihoods
+            inside[name] = plh
+            below[name] = numpy.inner(plh, psubs[name])
+            child_likelihoods.append(below[name])
+        return self.sumInputLikelihoods(*child_likelihoods)
+
+    def _outsidePass(self, outside, cols, psubs, rate_matrices, inside, below,
+            derivatives):
+        # 'outside' has one row per root site pattern, 'cols' maps those
+        # onto the site patterns of this edge, None meaning this is the root.
+        if cols is None:
+            child_cols = list(self.indexes)
+        else:
+            child_cols = [index[cols] for index in self.indexes]
+        for (i, (index, child)) in enumerate(self._indexed_children):
+            parent_side = outside.copy()
+            for (j, (other_index, other)) in enumerate(self._indexed_children):
+                if j != i:
+                    parent_side *= below[other.edge_name][child_cols[j]]
+            name = child.edge_name
+            dpsub = numpy.dot(rate_matrices[name], psubs[name])
+            dbelow = numpy.inner(inside[name], dpsub)
+            derivatives[name] = numpy.sum(
+                    parent_side * dbelow[child_cols[i]], axis=-1)
+            if isinstance(child, _LikelihoodTreeEdge):
+                child._outsidePass(numpy.dot(parent_side, psubs[name]),
+                        child_cols[i], psubs, rate_matrices, inside, below,
+                        derivatives)
+
 class _PyLikelihoodTreeEdge(_LikelihoodTreeEdge):
     # Should be a subclass of regular tree edge?
 
@@ -317,6 +438,15 @@ class LikelihoodTreeLeaf(object):
         self.shape = likelihoods.shape
         self.ambig = numpy.sum(self.input_likelihoods, axis=-1)
     
+    def shareMemory(self):
+        """Move the large arrays into shared memory, so that pickling
+        this leaf doesn't copy them"""
+        self.input_likelihoods = shared_array.share(self.input_likelihoods)
+        self.index = shared_array.share(self.index)
+        self.counts = shared_array.share(self.counts)
+        self.ambig = shared_array.share(self.ambig)
+        return self
+    
     def backward(self):
         index = numpy.array(self.index[::-1,...])
         result = self.__class__(self.uniq, self.input_likelihoods, self.counts, 
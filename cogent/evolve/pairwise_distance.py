@@ -1,9 +1,12 @@
 
-from numpy import log, zeros, float64, int32, array, sqrt, dot, diag, eye
+from numpy import log, zeros, float32, float64, int32, uint8, array, sqrt, \
+        dot, diag, eye, arange, where, trace, einsum, errstate, isnan, nan, \
+        empty, ndindex
 from numpy.linalg import det, norm, inv, LinAlgError
 
 from cogent import DNA, RNA, LoadTable
 from cogent.util.progress_display import display_wrap
+from cogent.util.shared_array import share
 
 __author__ = "Gavin Huttley, Yicheng Zhu and Ben Kaehler"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -215,6 +218,175 @@ def _logdet(matrix, use_tk_adjustment=True):
 
     return total, p, d_xy, var
 
+# The same statistics for a stack of diversity matrices, shape (..., k, k),
+# at once.  Invalid results are nan rather than None.
+
+def _invalid_to_nan(invalid, *stats):
+    for stat in stats:
+        stat[invalid] = nan
+    return stats
+
+def _jc69_from_matrices(matrices):
+    """computes JC69 stats from an array of diversity matrices"""
+    total = matrices.sum(axis=(-2, -1))
+    diffs = total - trace(matrices, axis1=-2, axis2=-1)
+    with errstate(divide='ignore', invalid='ignore'):
+        p = diffs / total
+        factor = (1 - (4 / 3) * p)
+        dist = -3.0 * log(factor) / 4
+        var = p * (1 - p) / (factor * factor * total)
+    invalid = (total == 0) | ~(p < 0.75)
+    return _invalid_to_nan(invalid, total, p, dist, var)
+
+def _tn93_from_matrices(matrices, freqs, pur_indices, pyr_indices,
+        pur_coords, pyr_coords, tv_coords):
+    """computes TN93 stats from an array of diversity matrices.  As for
+    _tn93_from_matrix, freqs is ignored."""
+    total = matrices.sum(axis=(-2, -1))
+    flat = matrices.reshape(matrices.shape[:-2] + (-1,))
+    with errstate(divide='ignore', invalid='ignore'):
+        freqs = (matrices.sum(axis=-2) + matrices.sum(axis=-1)) / \
+                (2 * total[..., None])
+        p = flat[..., pur_coords + pyr_coords + tv_coords].sum(axis=-1) / total
+        
+        freq_purs = freqs[..., pur_indices].sum(axis=-1)
+        prod_purs = freqs[..., pur_indices].prod(axis=-1)
+        freq_pyrs = freqs[..., pyr_indices].sum(axis=-1)
+        prod_pyrs = freqs[..., pyr_indices].prod(axis=-1)
+        
+        pur_ts_diffs = flat[..., pur_coords].sum(axis=-1) / total
+        pyr_ts_diffs = flat[..., pyr_coords].sum(axis=-1) / total
+        tv_diffs = flat[..., tv_coords].sum(axis=-1) / total
+        
+        coeff1 = 2 * prod_purs / freq_purs
+        coeff2 = 2 * prod_pyrs / freq_pyrs
+        coeff3 = 2 * (freq_purs * freq_pyrs - \
+                (prod_purs * freq_pyrs / freq_purs) -\
+                (prod_pyrs * freq_purs / freq_pyrs))
+        
+        term1 = 1 - pur_ts_diffs / coeff1 - tv_diffs / (2*freq_purs)
+        term2 = 1 - pyr_ts_diffs / coeff2 - tv_diffs / (2*freq_pyrs)
+        term3 = 1 - tv_diffs / (2 * freq_purs * freq_pyrs)
+        
+        dist = -coeff1 * log(term1) - coeff2 * log(term2) - \
+                coeff3 * log(term3)
+        v1 = 1 / term1
+        v2 = 1 / term2
+        v3 = 1 / term3
+        v4 = (coeff1 * v1 / (2 * freq_purs)) + \
+             (coeff2 * v2 / (2 * freq_pyrs)) + \
+             (coeff3 * v3 / (2 * freq_purs * freq_pyrs))
+        var = v1**2 * pur_ts_diffs + v2**2 * pyr_ts_diffs + \
+              v4**2 * tv_diffs - \
+              (v1 * pur_ts_diffs + v2 * pyr_ts_diffs + v4 * tv_diffs)**2
+        var /= total
+    
+    invalid = (total == 0) | (term1 <= 0) | (term2 <= 0) | (term3 <= 0)
+    return _invalid_to_nan(invalid, total, p, dist, var)
+
+def _logdetcommon_matrices(matrices):
+    total = matrices.sum(axis=(-2, -1))
+    diffs = total - trace(matrices, axis1=-2, axis2=-1)
+    r = matrices.shape[-1]
+    diagonal = arange(r)
+    
+    frequency = matrices.astype(float64)
+    states = frequency[..., diagonal, diagonal]
+    frequency[..., diagonal, diagonal] = where(states == 0, 0.5, states)
+    frequency /= frequency.sum(axis=(-2, -1))[..., None, None]
+    
+    dets = det(frequency)
+    with errstate(divide='ignore', invalid='ignore'):
+        p = diffs / total
+    invalid = (total == 0) | (diffs == 0) | ~(dets > 0)
+    # so that inv() can't fail on the ones we'll discard anyway
+    frequency[invalid] = eye(r) / r
+    M_matrix = inv(frequency)**2
+    freqs = [frequency.sum(axis=axis) for axis in (-2, -1)]
+    var_term = einsum('...ij,...ji->...', M_matrix, frequency)
+    return invalid, total, p, dets, freqs, var_term
+
+def _paralinear_matrices(matrices):
+    """the paralinear distances from an array of diversity matrices"""
+    (invalid, total, p, dets, freqs, var_term) = \
+            _logdetcommon_matrices(matrices)
+    r = matrices.shape[-1]
+    with errstate(divide='ignore', invalid='ignore'):
+        d_xy = - log(dets / sqrt((freqs[0] * freqs[1]).prod(axis=-1))) / r
+        var = (var_term - (1 / sqrt(freqs[0]*freqs[1])).sum(axis=-1)) / \
+                (r**2 * total)
+    return _invalid_to_nan(invalid, total, p, d_xy, var)
+
+def _logdet_matrices(matrices, use_tk_adjustment=True):
+    """the LogDet distances from an array of diversity matrices"""
+    (invalid, total, p, dets, freqs, var_term) = \
+            _logdetcommon_matrices(matrices)
+    r = matrices.shape[-1]
+    with errstate(divide='ignore', invalid='ignore'):
+        if use_tk_adjustment:
+            coeff = (((freqs[0] + freqs[1])**2).sum(axis=-1)/4 - 1) / (r - 1)
+            d_xy = coeff * log(dets / sqrt((freqs[0] * freqs[1]).prod(
+                    axis=-1)))
+            var = empty(d_xy.shape)
+            var.fill(nan)
+        else:
+            d_xy = - log(dets) / r - log(r)
+            var = ( var_term / r**2 - 1 ) / total
+    return _invalid_to_nan(invalid, total, p, d_xy, var)
+
+def get_state_indicators(indexed_seqs, dim):
+    """returns a (sequence, state, position) array of 1s where the sequence
+    has that state, so that every invalid position is all 0s"""
+    (num_seqs, length) = indexed_seqs.shape
+    # exact counts from the BLAS products, see get_diversity_matrices
+    assert length < 2**24, length
+    result = zeros((num_seqs, dim, length), float32)
+    for state in range(dim):
+        result[:, state, :] = (indexed_seqs == state)
+    return result
+
+def get_diversity_matrices(indexed_seqs, dim, start, end, block_length=None):
+    """returns the diversity matrices of sequences start:end vs sequences
+    start: as an array of shape (end-start, num_seqs-start, dim, dim)
+    
+    Arguments:
+        - indexed_seqs: a (sequence, position) array of state indices,
+          anything not in range(dim) being invalid
+        - block_length: number of positions to make indicators for at
+          once, by default enough for as many bytes as the counts
+    """
+    (num_seqs, length) = indexed_seqs.shape
+    counts = zeros(((end-start)*dim, (num_seqs-start)*dim), float64)
+    if block_length is None:
+        # float32 indicators the size of the float64 counts, and never so
+        # few positions that each product is mostly overhead
+        block_length = max(256, 2 * counts.size // counts.shape[1])
+    block_length = max(1, min(block_length, 2**24-1))
+    for offset in range(0, length, block_length):
+        indicators = get_state_indicators(
+                indexed_seqs[start:, offset:offset+block_length], dim)
+        cols = indicators.reshape((num_seqs-start)*dim, -1)
+        rows = cols[:(end-start)*dim]
+        # the counts within a block are exact, then summed as float64
+        counts += dot(rows, cols.T)
+    counts = counts.reshape(end-start, dim, num_seqs-start, dim)
+    return counts.transpose(0, 2, 1, 3)
+
+def _per_pair_matrices(func, matrices, *args):
+    """applies the one pair func to each of an array of diversity matrices,
+    returning arrays of the stats as a batch_func does"""
+    stats = empty((4,) + matrices.shape[:-2], float64)
+    for index in ndindex(*matrices.shape[:-2]):
+        values = func(matrices[index], *args)
+        stats[(slice(None),) + index] = [
+                nan if value is None else value for value in values]
+    return stats
+
+def _row_offset(i, num_seqs):
+    """index of the (i, i+1) pair in a condensed array of the pairs i < j,
+    which are in row order"""
+    return i * num_seqs - i * (i + 1) // 2
+
 try:
     from ._pairwise_distance import \
         _fill_diversity_matrix as fill_diversity_matrix
@@ -240,7 +412,8 @@ class _PairwiseDistance(object):
         self.moltype = moltype
         self.char_to_indices = get_moltype_index_array(moltype)
         self._dim = len(list(moltype))
-        self._dists = None
+        self._stats = None
+        self._block_size = None
         
         self.Names = None
         self.IndexedSeqs = None
@@ -254,7 +427,7 @@ class _PairwiseDistance(object):
         assert type(alignment.MolType) == type(self.moltype), \
             'Alignment does not have correct MolType'
         
-        self._dists = {}
+        self._stats = None
         self.Names = alignment.Names[:]
         indexed_seqs = []
         for name in self.Names:
@@ -268,40 +441,107 @@ class _PairwiseDistance(object):
     def func():
         pass # over ride in subclasses
     
+    # over ride in subclasses, the func for arrays of matrices.  Without it
+    # func is applied to each matrix in turn.
+    batch_func = None
+    
     @display_wrap
-    def run(self, alignment=None, ui=None):
-        """computes the pairwise distances"""
+    def run(self, alignment=None, block_size=None, ui=None):
+        """computes the pairwise distances.  The diversity matrices for a
+        block of sequences against all the others are made at once, and
+        the blocks are shared among the processes of the current parallel
+        context.  Only the distances are kept, the other statistics are
+        computed when first asked for.
+        
+        Arguments:
+            - block_size: number of sequences per block, by default enough
+              for 16M diversity matrix elements
+        """
         if alignment is not None:
             self._convert_seqs_to_indices(alignment)
         
-        matrix = zeros((self._dim, self._dim), float64)
-        done = 0.0
-        to_do = (len(self.Names) * len(self.Names) - 1) / 2
-        for i in range(len(self.Names)-1):
-            name_1 = self.Names[i]
-            s1 = self.IndexedSeqs[i]
-            for j in range(i+1, len(self.Names)):
-                name_2 = self.Names[j]
-                ui.display('%s vs %s' % (name_1, name_2), done / to_do )
-                done += 1
-                matrix.fill(0)
-                s2 = self.IndexedSeqs[j]
-                fill_diversity_matrix(matrix, s1, s2)
-                total, p, dist, var = self.func(matrix, *self._func_args)
-                self._dists[(name_1, name_2)] = (total, p, dist, var)
-                self._dists[(name_2, name_1)] = (total, p, dist, var)
+        self._block_size = block_size
+        self._stats = {}
+        self._calc_stats([2], ui)
+    
+    @display_wrap
+    def _calc_other_stats(self, ui=None):
+        self._calc_stats([stat for stat in range(4)
+                if stat not in self._stats], ui)
+    
+    def _calc_stats(self, wanted, ui):
+        """adds the wanted stats to self._stats, each as a condensed array
+        of the pairs i < j"""
+        num_seqs = len(self.Names)
+        block_size = self._block_size
+        if block_size is None:
+            block_size = 2**24 // (self._dim * self._dim * num_seqs)
+        block_size = max(1, block_size)
+        # invalid states as dim, so small alphabets fit in a byte each
+        dim = self._dim
+        indexed_seqs = where(self.IndexedSeqs < 0, dim, self.IndexedSeqs)
+        indexed_seqs = share(indexed_seqs.astype([uint8, int32][dim > 255]))
+        func = self.func
+        batch_func = self.batch_func
+        func_args = self._func_args
+        
+        def _one_block(start):
+            end = min(start + block_size, num_seqs)
+            matrices = get_diversity_matrices(indexed_seqs, dim, start, end)
+            if batch_func is None:
+                block_stats = _per_pair_matrices(func, matrices, *func_args)
+            else:
+                block_stats = batch_func(matrices, *func_args)
+            return (start, end, [block_stats[stat] for stat in wanted])
         
+        stats = [empty(num_seqs * (num_seqs-1) // 2, float64)
+                for stat in wanted]
+        starts = list(range(0, num_seqs, block_size))
+        labels = ['%s...' % self.Names[start] for start in starts]
+        for (start, end, block_stats) in ui.imap(_one_block, starts,
+                labels=labels):
+            for i in range(start, end):
+                offset = _row_offset(i, num_seqs)
+                for (stat, values) in zip(stats, block_stats):
+                    stat[offset:offset+num_seqs-i-1] = values[i-start,
+                            i-start+1:]
+        self._stats.update(list(zip(wanted, stats)))
+    
+    def getDistanceArray(self):
+        """returns the distances as a 2D array with rows and columns in the
+        order of Names, nan where the distance couldn't be computed"""
+        if self._stats is None:
+            return None
+        num_seqs = len(self.Names)
+        dists = self._stats[2]
+        result = zeros((num_seqs, num_seqs), float64)
+        for i in range(num_seqs):
+            offset = _row_offset(i, num_seqs)
+            row = dists[offset:offset+num_seqs-i-1]
+            result[i, i+1:] = row
+            result[i+1:, i] = row
+        return result
+    
+    def _get_stat(self, stat, i, j):
+        if stat not in self._stats:
+            self._calc_other_stats()
+        if i > j:
+            (i, j) = (j, i)
+        val = self._stats[stat][_row_offset(i, len(self.Names)) + j - i - 1]
+        if isnan(val):
+            return None
+        return float(val)
     
     def getPairwiseDistances(self):
         """returns a 2D dictionary of pairwise distances."""
-        if self._dists is None:
+        if self._stats is None:
             return None
         dists = {}
-        for name_1 in self.Names:
-            for name_2 in self.Names:
+        for (i, name_1) in enumerate(self.Names):
+            for (j, name_2) in enumerate(self.Names):
                 if name_1 == name_2:
                     continue
-                val = self._dists[(name_1, name_2)][2]
+                val = self._get_stat(2, i, j)
                 dists[(name_1, name_2)] = val
                 dists[(name_2, name_1)] = val
         
@@ -309,16 +549,16 @@ class _PairwiseDistance(object):
     
     def _get_stats(self, stat, transform=None, **kwargs):
         """returns a table for the indicated statistics"""
-        if self._dists is None:
+        if self._stats is None:
             return None
         rows = []
-        for row_name in self.Names:
+        for (i, row_name) in enumerate(self.Names):
             row = [row_name]
-            for col_name in self.Names:
+            for (j, col_name) in enumerate(self.Names):
                 if row_name == col_name:
                     row.append('')
                     continue
-                val = self._dists[(row_name, col_name)][stat]
+                val = self._get_stat(stat, i, j)
                 if transform is not None:
                     val = transform(val)
                 row.append(val)
@@ -376,6 +616,7 @@ class JC69Pair(_NucleicSeqPair):
         """states: the valid sequence states"""
         super(JC69Pair, self).__init__(*args, **kwargs)
         self.func = _jc69_from_matrix
+        self.batch_func = _jc69_from_matrices
     
 
 class TN93Pair(_NucleicSeqPair):
@@ -401,6 +642,7 @@ class TN93Pair(_NucleicSeqPair):
         self.tv_coords = [i * 4 + j for i, j in self.tv_coords]
         
         self.func = _tn93_from_matrix
+        self.batch_func = _tn93_from_matrices
         self._func_args = [self._freqs, self.pur_indices,
             self.pyr_indices, self.pur_coords,
             self.pyr_coords, self.tv_coords]
@@ -415,6 +657,7 @@ class LogDetPair(_PairwiseDistance):
         """
         super(LogDetPair, self).__init__(*args, **kwargs)
         self.func = _logdet
+        self.batch_func = _logdet_matrices
         self._func_args = [use_tk_adjustment]
     
     def run(self, use_tk_adjustment=None, *args, **kwargs):
@@ -428,3 +671,4 @@ class ParalinearPair(_PairwiseDistance):
     def __init__(self, *args, **kwargs):
         super(ParalinearPair, self).__init__(*args, **kwargs)
         self.func = _paralinear
+        self.batch_func = _paralinear_matrices
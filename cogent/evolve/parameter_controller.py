@@ -158,6 +158,13 @@ class _LikelihoodParameterController(_LF):
     def setExpm(self, expm):
         assert expm in ['pade', 'either', 'eigen', 'checked'], expm
         self.setParamRule('expm', is_constant=True, value=expm)
+    
+    def setExpmCacheBytes(self, cache_bytes):
+        """Memory each calculator may use to keep exponentiators and psubs
+        it might need again, 0 for no caching"""
+        assert cache_bytes >= 0, cache_bytes
+        self.setParamRule('expm_cache_bytes', is_constant=True,
+                value=cache_bytes)
 
     def makeCalculator(self, *args, **kw):
         if args:
@@ -325,7 +332,8 @@ class AlignmentLikelihoodFunction(_LikelihoodParameterController):
         except KeyError:
             pass
     
-    def makeLikelihoodDefn(self, sites_independent=True, discrete_edges=None):
+    def makeLikelihoodDefn(self, sites_independent=True, discrete_edges=None,
+            batched=False, precision=None):
         defns = self.model.makeParamControllerDefns(bin_names=self.bin_names)
         if discrete_edges is not None:
             from .discrete_markov import PartialyDiscretePsubsDefn
@@ -334,7 +342,7 @@ class AlignmentLikelihoodFunction(_LikelihoodParameterController):
         return likelihood_calculation.makeTotalLogLikelihoodDefn(
             self.tree, defns['align'], defns['psubs'], defns['word_probs'],
             defns['bprobs'], self.bin_names, self.locus_names,
-            sites_independent)
+            sites_independent, batched, precision)
     
     def setAlignment(self, aligns, motif_pseudocount=None):
         """set the alignment to be used for computing the likelihood."""
@@ -375,6 +383,10 @@ class SequenceLikelihoodFunction(_LikelihoodParameterController):
                 with_indel_params=with_indel_params, kn=kn)
     
     def setSequences(self, seqs, locus=None):
+        self.setPogs(self.makePogs(seqs), locus=locus)
+    
+    def makePogs(self, seqs):
+        """The sequences as alignables, by name"""
         leaves = {}
         for (name, seq) in list(seqs.items()):
             # if has uniq, probably already a likelihood tree leaf obj already
@@ -385,15 +397,20 @@ class SequenceLikelihoodFunction(_LikelihoodParameterController):
             leaf = AlignableSeq(leaf)
             leaves[name] = leaf
             assert name != "root", "'root' is a reserved name."
-        self.setPogs(leaves, locus=locus)
+        return leaves
     
     def setPogs(self, leaves, locus=None):
         with self.updatesPostponed():
             for (name, pog) in list(leaves.items()):
                 self.setParamRule('leaf', edge=name, value=pog, is_constant=True)
-            if self.mprobs_from_alignment:
-                counts = numpy.sum([pog.leaf.getMotifCounts()
-                    for pog in list(leaves.values())], 0)
-                mprobs = counts/(1.0*sum(counts))
-                self.setMotifProbs(mprobs, locus=locus, is_constant=True, auto=True)
+            self.setMotifProbsFromPogs(leaves, locus=locus)
+    
+    def setMotifProbsFromPogs(self, leaves, locus=None):
+        """Motif probs from the sequences, if they are to come from the data,
+        without making the sequences the input to the calculation"""
+        if self.mprobs_from_alignment:
+            counts = numpy.sum([pog.leaf.getMotifCounts()
+                for pog in list(leaves.values())], 0)
+            mprobs = counts/(1.0*sum(counts))
+            self.setMotifProbs(mprobs, locus=locus, is_constant=True, auto=True)
     
@@ -7,7 +7,8 @@ from cogent.recalculation.definition import PositiveParamDefn, RatioParamDefn, \
         NonParamDefn, CallDefn, SelectForDimension, \
         GammaDefn, WeightedPartitionDefn, CalcDefn
 from cogent.maths.matrix_exponentiation import PadeExponentiator, \
-        FastExponentiator, CheckedExponentiator, LinAlgError
+        FastExponentiator, CheckedExponentiator, ExponentiatorCache, \
+        CachedExponentiator, LinAlgError
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -45,7 +46,15 @@ class SubstitutionParameterDefn(RatioParamDefn):
 class ExpDefn(CalculationDefn):
     name = 'exp'
     
-    def calc(self, expm):
+    def calc(self, expm, cache_bytes):
+        # cache_bytes is the memory for keeping the exponentiators and
+        # psubs which might be needed again, 0 for no caching.
+        make_exponentiator = self._calc(expm)
+        if cache_bytes == 0:
+            return make_exponentiator
+        return ExponentiatorCache(make_exponentiator, cache_bytes)
+    
+    def _calc(self, expm):
         (allow_eigen, check_eigen, allow_pade) = {
             'eigen': (True, False, False),
             'checked': (True, True, False),
@@ -72,5 +81,40 @@ class ExpDefn(CalculationDefn):
                     return PadeExponentiator(Q)
             _both.given_expm_warning = False
             return _both
+    
 
+class QdDefn(CalculationDefn):
+    """Rate matrix prepared for exponentiation, ie: exp(Q).  When a Q
+    changes the psubs for every edge using it need recalculating, so
+    each cell passes the current lengths, as reported by the PsubsDefn
+    cells, to the ExponentiatorCache which then calculates all of them
+    in one go."""
+    
+    name = 'Qd'
+    
+    def makeCalcFunction(self):
+        last = [None]
+        def qd(exp, Q):
+            if not isinstance(exp, ExponentiatorCache):
+                return exp(Q)
+            hint = None
+            if last[0] is not None:
+                hint = sorted(set(last[0].ts.values()))
+            last[0] = exp(Q, hint)
+            return last[0]
+        return qd
+    
 
+class PsubsDefn(CalculationDefn):
+    """P(t) for one edge, ie: Qd(distance)"""
+    
+    name = 'psubs'
+    
+    def makeCalcFunction(self):
+        slot = object()  # identifies this cell to CachedExponentiators
+        def psub(expm, distance):
+            if isinstance(expm, CachedExponentiator):
+                return expm(distance, slot)
+            return expm(distance)
+        return psub
+    
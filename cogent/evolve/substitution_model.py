@@ -39,13 +39,15 @@ from cogent.core import moltype
 from cogent.evolve import parameter_controller, predicate, motif_prob_model
 from cogent.evolve.substitution_calculation import (
     SubstitutionParameterDefn as ParamDefn,
-    RateDefn, LengthDefn, ProductDefn, CallDefn, CalcDefn,
-    PartitionDefn, NonParamDefn, AlignmentAdaptDefn, ExpDefn,
+    RateDefn, LengthDefn, ProductDefn, CalcDefn,
+    PartitionDefn, NonParamDefn, AlignmentAdaptDefn, ExpDefn, QdDefn,
+    PsubsDefn,
     ConstDefn, GammaDefn, MonotonicDefn, SelectForDimension,
     WeightedPartitionDefn)
 from cogent.evolve.discrete_markov import PsubMatrixDefn
 from cogent.evolve.likelihood_tree import makeLikelihoodTreeLeaf
 from cogent.maths.optimisers import ParameterOutOfBoundsError
+from cogent.maths.matrix_exponentiation import ExponentiatorCache
 import collections
 
 __author__ = "Peter Maxwell, Gavin Huttley and Andrew Butterfield"
@@ -240,7 +242,7 @@ class _SubstitutionModel(object):
 
     def makeLikelihoodFunction(self, tree, motif_probs_from_align=None,
             optimise_motif_probs=None, aligned=True, expm=None, digits=None,
-            space=None, **kw):
+            space=None, expm_cache_bytes=None, **kw):
 
         if motif_probs_from_align is None:
             motif_probs_from_align = self.motif_probs_from_align
@@ -268,6 +270,8 @@ class _SubstitutionModel(object):
             expm = self._default_expm_setting
         if expm is not None:
             result.setExpm(expm)
+        if expm_cache_bytes is not None:
+            result.setExpmCacheBytes(expm_cache_bytes)
 
         if digits or space:
             result.setTablesFormat(digits=digits, space=space)
@@ -502,8 +506,10 @@ class _ContinuousSubstitutionModel(_SubstitutionModel):
         """Diagonalized Q, ie: rate matrix prepared for exponentiation"""
         Q = CalcDefn(self.calcQ, name='Q')(word_probs, mprobs_matrix, *rate_params)
         expm = NonParamDefn('expm')
-        exp = ExpDefn(expm)
-        Qd = CallDefn(exp, Q, name='Qd')
+        cache_bytes = NonParamDefn('expm_cache_bytes',
+                default=ExponentiatorCache.default_max_bytes)
+        exp = ExpDefn(expm, cache_bytes)
+        Qd = QdDefn(exp, Q)
         return Qd
 
     def _makeBinParamDefn(self, edge_par_name, bin_par_name, bprob_defn):
@@ -559,7 +565,7 @@ class _ContinuousSubstitutionModel(_SubstitutionModel):
 
     def makeContinuousPsubDefn(self, word_probs, mprobs_matrix, distance, rate_params):
         Qd = self.makeQdDefn(word_probs, mprobs_matrix, rate_params)
-        P = CallDefn(Qd, distance, name='psubs')
+        P = PsubsDefn(Qd, distance)
         return P
 
 
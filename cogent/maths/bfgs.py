@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""A quasi-Newton local optimiser for functions which can supply their
+own gradient, eg: a Calculator with an analytic_gradient.
+"""
+
+import numpy, math
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell", "Gavin Huttley"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+class BoundedBFGS(object):
+    """BFGS with a backtracking line search.  Bounds are handled by
+    projection: a parameter sitting on a bound with its gradient pointing
+    out of the box is held fixed for that step.  Like the other local
+    optimisers this maximises, and copes with -inf for invalid input."""
+
+    def __init__(self, max_iterations=None):
+        self.max_iterations = max_iterations
+
+    def maximise(self, function, xopt, gradient, bounds=None,
+            show_remaining=None, max_restarts=None, tolerance=None):
+        if max_restarts is None:
+            max_restarts = 0
+        if tolerance is None:
+            tolerance = 1e-6
+        x = numpy.array(xopt, float)
+        if len(x) == 0:
+            return x
+        if bounds is None:
+            bounds = (None, None)
+        (lower, upper) = bounds
+        if lower is None:
+            lower = -numpy.inf
+        if upper is None:
+            upper = numpy.inf
+        lower = numpy.zeros(x.shape) + lower
+        upper = numpy.zeros(x.shape) + upper
+        x = numpy.clip(x, lower, upper)
+
+        fval_last = -numpy.inf
+        for i in range(max_restarts + 1):
+            (x, fval) = self._maximise(function, x, gradient, lower, upper,
+                    tolerance, show_remaining)
+            if abs(fval - fval_last) < tolerance:
+                break
+            fval_last = fval
+        return x
+
+    def _maximise(self, function, x, gradient, lower, upper, tolerance,
+            show_remaining):
+        N = len(x)
+        max_iterations = self.max_iterations or 200 * N
+        fval = function(x)
+        g = gradient(x)
+        evals = 1
+        H = numpy.identity(N)  # approx. inverse Hessian of -function
+        scaled = False
+        for iteration in range(max_iterations):
+            stuck = ((x <= lower) & (g < 0)) | ((x >= upper) & (g > 0))
+            g_free = numpy.where(stuck, 0.0, g)
+            if not g_free.any():
+                break
+            direction = numpy.dot(H, g_free)
+            direction[stuck] = 0.0
+            if numpy.dot(direction, g_free) <= 0.0:
+                H = numpy.identity(N)
+                scaled = False
+                direction = g_free
+            fresh = not scaled
+            if fresh:
+                # First step of the unscaled method: keep it modest
+                alpha = min(1.0, 1.0 / numpy.max(numpy.abs(direction)))
+            else:
+                alpha = 1.0
+
+            # Backtracking (Armijo) line search along the projected path
+            while alpha > 1e-12:
+                x_new = numpy.clip(x + alpha * direction, lower, upper)
+                step = x_new - x
+                f_new = function(x_new)
+                evals += 1
+                if f_new >= fval + 1e-4 * numpy.dot(g, step):
+                    break
+                alpha *= 0.5
+            else:
+                if fresh:
+                    break
+                H = numpy.identity(N)
+                scaled = False
+                continue
+
+            g_new = gradient(x_new)
+            y = g - g_new
+            sy = numpy.dot(step, y)
+            if sy > 1e-10:
+                if not scaled:
+                    H = H * sy / numpy.dot(y, y)
+                    scaled = True
+                rho = 1.0 / sy
+                A = numpy.identity(N) - rho * numpy.outer(step, y)
+                H = numpy.dot(A, numpy.dot(H, A.T)) + \
+                        rho * numpy.outer(step, step)
+            delta = f_new - fval
+            (x, fval, g) = (x_new, f_new, g_new)
+            if show_remaining:
+                remaining = math.log(max(abs(delta)/tolerance, 1.0))
+                show_remaining(remaining, fval, delta, evals)
+            if delta < tolerance:
+                if fresh:
+                    break
+                # Could be converged, or could be a poor Hessian estimate
+                # (eg: after a bound became active), so retry from scratch.
+                H = numpy.identity(N)
+                scaled = False
+        return (x, fval)
+
@@ -11,6 +11,7 @@
 # Taylor     instant        very slow
 
 from cogent.util.modules import importVersionedModule, ExpectedImportError
+from collections import OrderedDict
 import warnings
 import numpy
 from numpy.linalg import inv, eig, solve, LinAlgError
@@ -31,6 +32,10 @@ class _Exponentiator(object):
     def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, repr(self.Q))
     
+    def stacked(self, ts):
+        """P(t) for each of 'ts', as one array of shape (len(ts), k, k)"""
+        return numpy.array([self(t) for t in ts])
+    
 
 class EigenExponentiator(_Exponentiator):
     """A matrix ready for fast exponentiation.  P=exp(Q*t)"""
@@ -52,6 +57,17 @@ class EigenExponentiator(_Exponentiator):
         result = numpy.maximum(result, 0.0)
         return result
     
+    def stacked(self, ts):
+        # The same as __call__ for each t, but all in one matrix product
+        ts = numpy.asarray(ts, float)
+        exp_roots = numpy.exp(numpy.multiply.outer(ts, self.roots))
+        result = numpy.matmul(self.evT * exp_roots[:, numpy.newaxis, :],
+                self.evI.T)
+        if result.dtype.kind == "c":
+            result = numpy.asarray(result.real)
+        result = numpy.maximum(result, 0.0)
+        return result
+    
 
 def SemiSymmetricExponentiator(motif_probs, Q):
     """Like EigenExponentiator, but more numerically stable and
@@ -161,3 +177,138 @@ def CheckedExponentiator(Q):
 def RobustExponentiator(Q):
     return PadeExponentiator(Q)
 
+
+
+class CachedExponentiator(object):
+    """What an ExponentiatorCache gives for one Q.  P(t) comes from the
+    cache if it is there, otherwise from the exponentiator for Q, which
+    itself comes from the cache if it can.  The first P(t) which has to
+    be calculated is calculated along with P for each of the 'hint'
+    lengths, in one stacked() call.  'ts' has the latest length used by
+    each caller, as identified by the 'slot' argument."""
+    
+    __slots__ = ['cache', 'key', 'Q', 'hint', 'ts', '_exponentiator']
+    
+    def __init__(self, cache, key, Q, hint=None):
+        self.cache = cache
+        self.key = key
+        self.Q = Q
+        self.hint = hint
+        self.ts = {}
+        self._exponentiator = None
+    
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, repr(self.Q))
+    
+    def getExponentiator(self):
+        if self._exponentiator is None:
+            self._exponentiator = self.cache._getExponentiator(
+                    self.key, self.Q)
+        return self._exponentiator
+    
+    def __call__(self, t=1.0, slot=None):
+        t = float(t)
+        self.ts[slot] = t
+        return self.cache._getPsub(self, t)
+    
+    def stacked(self, ts):
+        return numpy.array([self(t) for t in ts])
+    
+
+class ExponentiatorCache(object):
+    """Wraps a function which makes exponentiators, eg: FastExponentiator,
+    so that an exponentiator for each Q is only made once, and P(t) for
+    each t only calculated once.  Edges which share a rate matrix can then
+    share its eigendecomposition, and a rate matrix or length which the
+    optimiser revisits is found again rather than recalculated.
+    
+    The least recently used entries are discarded to keep the arrays held
+    under 'max_bytes'.  Returned arrays are read-only as they are shared.
+    """
+    
+    default_max_bytes = 2**25
+    
+    def __init__(self, make_exponentiator, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = self.default_max_bytes
+        self.make_exponentiator = make_exponentiator
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self.exponentiator_hits = self.exponentiator_misses = 0
+        self.psub_hits = self.psub_misses = 0
+    
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__,
+                getattr(self.make_exponentiator, '__name__',
+                    repr(self.make_exponentiator)))
+    
+    def __call__(self, Q, hint=None):
+        """An exponentiator for Q.  'hint' is an optional list of lengths
+        it is likely to be used with"""
+        Q = numpy.asarray(Q)
+        key = (Q.shape, Q.dtype.str, Q.tobytes())
+        return CachedExponentiator(self, key, Q, hint)
+    
+    def getStats(self):
+        """Dictionary of the hit and miss counts and memory used"""
+        return dict(exponentiator_hits=self.exponentiator_hits,
+                exponentiator_misses=self.exponentiator_misses,
+                psub_hits=self.psub_hits, psub_misses=self.psub_misses,
+                nbytes=self.nbytes, entries=len(self._entries))
+    
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+    
+    def _lookup(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._entries[key] = entry  # now most recently used
+            return entry[0]
+        return None
+    
+    def _store(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            (old_key, (old_value, old_nbytes)) = self._entries.popitem(
+                    last=False)
+            self.nbytes -= old_nbytes
+    
+    def _getExponentiator(self, key, Q):
+        exponentiator = self._lookup(('Q', key))
+        if exponentiator is None:
+            self.exponentiator_misses += 1
+            exponentiator = self.make_exponentiator(Q)
+            nbytes = sum(getattr(exponentiator, attr).nbytes for attr in
+                    ['Q', 'roots', 'ev', 'evT', 'evI']
+                    if hasattr(exponentiator, attr))
+            self._store(('Q', key), exponentiator, nbytes)
+        else:
+            self.exponentiator_hits += 1
+        return exponentiator
+    
+    def _getPsub(self, cached, t):
+        key = ('P', cached.key, t)
+        P = self._lookup(key)
+        if P is not None:
+            self.psub_hits += 1
+            return P
+        self.psub_misses += 1
+        ts = [t]
+        if cached.hint:
+            ts.extend(u for u in cached.hint if u != t and
+                    ('P', cached.key, u) not in self._entries)
+            cached.hint = None
+        if len(ts) == 1:
+            Ps = [numpy.asarray(cached.getExponentiator()(t))]
+        else:
+            Ps = cached.getExponentiator().stacked(ts)
+        for (u, P) in zip(ts, Ps):
+            P.flags.writeable = False
+            self._store(('P', cached.key, u), P, P.nbytes)
+        return Ps[0]
+    
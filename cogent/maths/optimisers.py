@@ -5,13 +5,16 @@
 """
 
 from cogent.util import progress_display as UI
-from .simannealingoptimiser import SimulatedAnnealing
+from cogent.util import checkpointing
+from .simannealingoptimiser import SimulatedAnnealing, AnnealingRun
 from .scipy_optimisers import DownhillSimplex, Powell
+from .bfgs import BoundedBFGS
 import warnings
 import numpy
 
 GlobalOptimiser = SimulatedAnnealing
 LocalOptimiser = Powell
+GradientOptimiser = BoundedBFGS
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -42,13 +45,46 @@ class MaximumEvaluationsReached(Exception):
     pass
     
 
+class LocalOptimisationCheckpoint(object):
+    """The best input found so far by the local optimiser, and the count
+    of evaluations so far, which are what a restarted optimisation needs
+    to carry on from where an interrupted one stopped."""
+    
+    def __init__(self, x, fval, evals, conditions):
+        self.x = x
+        self.fval = fval
+        self.evals = evals
+        self.conditions = conditions
+        self.recording = False
+    
+    def checkSameConditions(self, conditions):
+        for name in set(self.conditions) | set(conditions):
+            if self.conditions.get(name) != conditions.get(name):
+                raise ValueError('Checkpoint file ignored - %s different' %
+                        name)
+    
+    def checkFunction(self, f, xopt, checkpointing_filename):
+        if len(xopt) != len(self.x):
+            raise ValueError(
+                "Number of parameters in checkpoint file '%s' (%s) " \
+                "don't match current function (%s)" % (
+                    checkpointing_filename, len(self.x), len(xopt)))
+        then = self.fval
+        now = f(self.x)
+        if not numpy.allclose(now, then, 1e-8):
+            raise ValueError(
+                "Function to optimise doesn't match checkpoint file " \
+                "'%s': F=%s now, %s in file." % (
+                    checkpointing_filename, now, then))
+    
+
 # The following functions are used to wrap the optimised function to
 # adapt it to the optimiser in various ways.  They can be combined.
 
-def limited_use(f, max_evaluations=None):
+def limited_use(f, max_evaluations=None, evals=0):
     if max_evaluations is None:
         max_evaluations = numpy.inf
-    evals = [0]
+    evals = [evals]
     best_fval = [-numpy.inf]
     best_x = [None]
     def wrapped_f(x):
@@ -65,6 +101,25 @@ def limited_use(f, max_evaluations=None):
         return best_fval[0], best_x[0], evals[0]
     return get_best, wrapped_f
 
+def checkpointed_function(f, checkpointer, checkpoint):
+    """Returns a function that keeps 'checkpoint' up to date with the best
+    input so far, and once checkpoint.recording is set saves it every
+    checkpointer.interval seconds"""
+    
+    def _wrapper(x):
+        checkpoint.evals += 1
+        fval = f(x)
+        if fval > checkpoint.fval:
+            checkpoint.x = x.copy()
+            checkpoint.fval = fval
+        if checkpoint.recording:
+            msg = "Number of function evaluations = %d; current F = %s" % (
+                    checkpoint.evals, checkpoint.fval)
+            checkpointer.record(checkpoint, msg)
+        return fval
+    
+    return _wrapper
+
 def bounded_function(f, lower_bounds, upper_bounds):
     """Returns a function that raises an exception on out-of-bounds input 
     rather than bothering the real function with invalid input.  
@@ -108,26 +163,55 @@ def minimise(f, *args, **kw):
 def maximise(f, xinit, bounds=None, local=None, filename=None, interval=None,
         max_restarts=None, max_evaluations=None, limit_action='warn',
         tolerance=1e-6, global_tolerance=1e-1, ui=None,
-        return_eval_count=False,
+        return_eval_count=False, gradient=None,
         **kw):
     """Find input values that optimise this function.
     'local' controls the choice of optimiser, the default being to run
     both the global and local optimisers. 'filename' and 'interval'
-    control checkpointing.  Unknown keyword arguments get passed on to
-    the global optimiser.
+    control checkpointing, and if 'filename' exists the optimisation
+    resumes from it, skipping the global optimisation if that had
+    finished.  If a 'gradient' function is supplied the local
+    optimisation uses it, calling it as gradient(x, f) where f is the
+    function to use for any evaluations of its own, so that they count
+    towards max_evaluations and the checkpoint.  Unknown keyword
+    arguments get passed on to the global optimiser.
     """
     do_global = (not local) or local is None
     do_local = local or local is None
     
     assert limit_action in ['ignore', 'warn', 'raise', 'error']
-    (get_best, f) = limited_use(f, max_evaluations)
 
     x = numpy.array(xinit, float)
     multidimensional_input = x.shape != ()
     if not multidimensional_input:
         x = numpy.atleast_1d(x)
     
+    checkpointer = checkpointing.Checkpointer(filename, interval)
+    checkpoint = None
+    if checkpointer.available():
+        saved = checkpointer.load(noisy=False)
+        if isinstance(saved, LocalOptimisationCheckpoint):
+            if checkpointer.noisy:
+                print("RESUMING from file '%s'" % checkpointer.filename)
+            checkpoint = saved
+            checkpoint.checkSameConditions(kw)
+            checkpoint.checkFunction(f, x, filename)
+            x = checkpoint.x.copy()
+            do_global = False
+        elif isinstance(saved, AnnealingRun):
+            # the global optimiser will resume from it
+            checkpoint = LocalOptimisationCheckpoint(
+                    None, -numpy.inf, saved.state.NFCNEV, dict(kw))
+    if checkpoint is None:
+        checkpoint = LocalOptimisationCheckpoint(
+                None, -numpy.inf, 0, dict(kw))
+    if filename is not None:
+        f = checkpointed_function(f, checkpointer, checkpoint)
+    (get_best, f) = limited_use(f, max_evaluations, checkpoint.evals)
+    
+    box = (None, None)
     if bounds is not None:
+        box = bounds
         (upper, lower) = bounds
         if upper is not None or lower is not None:
             if upper is None: upper = numpy.inf
@@ -140,6 +224,7 @@ def maximise(f, xinit, bounds=None, local=None, filename=None, interval=None,
     if not numpy.isfinite(fval):
         raise ValueError("Initial parameter values must evaluate to a finite value, not %s. %s" % (fval, x))
     
+    counted_f = f
     f = bounds_exception_catching_function(f)
     
     try:
@@ -167,11 +252,24 @@ def maximise(f, xinit, bounds=None, local=None, filename=None, interval=None,
 
         # Local optimisation
         if do_local:
+            if filename is not None:
+                # From now on the checkpoint file is for this stage
+                checkpoint.recording = True
+                checkpointer.record(checkpoint, always=True)
             callback = unsteadyProgressIndicator(ui.display, 'Local', gend, 1.0)
             #ui.display('local opt', 1.0-per_opt, per_opt)
-            opt = LocalOptimiser()
-            x = opt.maximise(f, x, tolerance=tolerance, 
-                    max_restarts=max_restarts, show_remaining=callback)
+            if gradient is None:
+                opt = LocalOptimiser()
+                x = opt.maximise(f, x, tolerance=tolerance, 
+                        max_restarts=max_restarts, show_remaining=callback)
+            else:
+                opt = GradientOptimiser()
+                g = lambda x: gradient(x, counted_f)
+                x = opt.maximise(f, x, g, bounds=box,
+                        tolerance=tolerance, max_restarts=max_restarts,
+                        show_remaining=callback)
+            if filename is not None:
+                checkpointer.record(checkpoint, always=True)
     finally:
         # ensure state of calculator reflects optimised result, or
         # partialy optimised result if exiting on an exception.
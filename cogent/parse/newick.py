@@ -195,3 +195,143 @@ def parse_string(text, constructor, **kw):
     assert not stack, stack
     assert len(nodes) ==  1, len(nodes)
     return nodes[0]
+
+# The fast parser below does the tokenising with one regular expression
+# (re.findall runs in C) rather than a Python loop over re.split pieces.
+# It only handles well-formed trees, raising TreeParseError on anything
+# parse_string would need to be forgiving about or explain, so callers
+# can fall back to parse_string for that.  Groups: punctuation, :length,
+# NHX comment, quoted label, quoted label, unquoted label, anything else.
+# Other [comments] match but capture nothing.
+_fast_token = re.compile(r"""\s*(?:
+    ([(),;])
+  | (:[ \t]*[^\s,():;\[\]'"]*)
+  | (\[&&NHX[^\]]*\])
+  | \[[^\]]*\]
+  | ('(?:[^'\n]|'')*')
+  | ("(?:[^"\n]|"")*")
+  | ([^\s,():;\[\]'"]+(?:[ \t]+[^\s,():;\[\]'"]+)*)
+  | (\S)
+  )""", re.X)
+
+def _nhx_attributes(comment, attributes):
+    """Adds the key=value pairs of an [&&NHX:...] comment to attributes"""
+    for field in comment[6:-1].split(':'):
+        if not field:
+            continue
+        (key, sep, value) = field.partition('=')
+        if not sep:
+            raise TreeParseError('Bad NHX field "%s"' % field)
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        attributes[key] = value
+
+def fast_parse_string(text, constructor, underscore_unmunge=False):
+    """Parses a Newick or NHX format string, calling
+    constructor(children, name, attributes) like parse_string.
+    
+    Quicker than parse_string but less forgiving: unquoted labels can't
+    contain quotes or line breaks.  Raises TreeParseError for anything it
+    can't handle, without parse_string's detailed messages.  NHX comments
+    ([&&NHX:key=value:...]) become attributes, numeric values as floats.
+    Other comments are discarded.  Parsing stops at the first ';'.
+    """
+    if "(" not in text and ";" not in text and text.strip():
+        raise TreeParseError('Not a Newick tree: "%s"' % text[:10])
+    stack = []
+    nodes = []
+    children = name = None
+    attributes = {}
+    for (punct, length, nhx, squoted, dquoted, label, bad) in \
+            _fast_token.findall(text):
+        if punct:
+            if punct == '(':
+                if children is not None or name is not None or attributes:
+                    raise TreeParseError('Unexpected "(" in %s' % text[:30])
+                stack.append(nodes)
+                nodes = []
+                continue
+            nodes.append(constructor(children, name, attributes))
+            children = name = None
+            attributes = {}
+            if punct == ')':
+                if not stack:
+                    raise TreeParseError('Unbalanced ")"')
+                children = nodes
+                nodes = stack.pop()
+            elif punct == ';':
+                break
+            elif not stack:
+                raise TreeParseError('"," outside of any subtree')
+        elif length:
+            if 'length' in attributes:
+                raise TreeParseError('Two lengths for one node')
+            try:
+                attributes['length'] = float(length[1:])
+            except ValueError:
+                raise TreeParseError("Can't convert length '%s'" % length[1:])
+        elif nhx:
+            _nhx_attributes(nhx, attributes)
+        elif bad:
+            raise TreeParseError('Unexpected "%s"' % bad)
+        elif label or squoted or dquoted:
+            if name is not None or attributes:
+                raise TreeParseError('Unexpected label "%s"' %
+                        (label or squoted or dquoted))
+            if label:
+                if underscore_unmunge and '_' in label:
+                    label = label.replace('_', ' ')
+                name = label
+            else:
+                quote = (squoted or dquoted)[0]
+                name = (squoted or dquoted)[1:-1].replace(quote*2, quote)
+    else:
+        nodes.append(constructor(children, name, attributes))
+    if stack:
+        raise TreeParseError('Text ended inside a subtree')
+    assert len(nodes) == 1, len(nodes)
+    return nodes[0]
+
+# ';' inside quotes or comments doesn't end a tree
+_statement_pieces = re.compile(
+        r"""'(?:[^'\n]|'')*'?|"(?:[^"\n]|"")*"?|\[[^\]]*\]?|;""")
+_closing = {"'": "'", '"': '"', '[': ']'}
+
+def newick_statements(infile, chunk_size=2**20):
+    """Yields the text of each ';' terminated tree in infile, an open file
+    or other iterable of strings, reading chunk_size characters at a time
+    if it has a read method.  Memory use depends on the largest tree,
+    not the size of the file.  Text after the last ';' is yielded too
+    unless it is blank."""
+    if hasattr(infile, 'read'):
+        chunks = iter(lambda: infile.read(chunk_size), '')
+    else:
+        chunks = infile
+    pending = []
+    tail = ''
+    for chunk in chunks:
+        text = tail + chunk
+        tail = ''
+        start = 0
+        for match in _statement_pieces.finditer(text):
+            piece = match.group()
+            if piece == ';':
+                pending.append(text[start:match.end()])
+                statement = ''.join(pending)
+                pending = []
+                start = match.end()
+                if statement.strip(' \t\r\n;'):
+                    yield statement
+            elif match.end() == len(text) and (len(piece) == 1 or
+                    piece[-1] != _closing[piece[0]]):
+                # a quoted label or comment which may continue in the next
+                # chunk, so don't look for ';' in it yet
+                tail = text[match.start():]
+                text = text[:match.start()]
+                break
+        pending.append(text[start:])
+    statement = ''.join(pending) + tail
+    if statement.strip():
+        yield statement
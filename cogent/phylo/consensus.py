@@ -1,10 +1,9 @@
 #! /usr/bin/env python
 """This module implements methods for generating consensus trees from a list of trees"""
 from collections import defaultdict
-from itertools import product
 import warnings
 
-from cogent.core.tree import TreeBuilder
+from cogent.core.tree import TreeBuilder, make_tip_index
 from cogent import LoadTree
 
 __author__ = "Matthew Wakefield"
@@ -22,7 +21,8 @@ def majorityRule(trees, strict=False):
     """Determines the consensus tree from a list of rooted trees using the 
      majority rules method of Margush and McMorris 1981
     Arguments:
-        - trees: A list of cogent.evolve.tree objects
+        - trees: A list or iterator, like that from
+          tree_collection.iterTrees, of cogent.evolve.tree objects
         - strict: A boolean flag for strict majority rule tree
           construction when true only nodes occurring >50% will be used
           when false the highest scoring < 50% node will be used if
@@ -32,7 +32,7 @@ def majorityRule(trees, strict=False):
     Returns:
         a list of cogent.evolve.tree objects
     """
-    trees = [(1, tree) for tree in trees]
+    trees = ((1, tree) for tree in trees)
     return weightedMajorityRule(trees, strict, "count", method='rooted')
 
 def weightedMajorityRule(weighted_trees, strict=False, attr='support',
@@ -42,7 +42,8 @@ def weightedMajorityRule(weighted_trees, strict=False, attr='support',
     (2006).
 
     Args:
-        weighted_trees: A reverse ordered list of (weight, tree) tuples.
+        weighted_trees: A reverse ordered list, or other iterable, of
+            (weight, tree) tuples.
         strict: Discard splits or clusters with consensus weight <= 0.5.
         attr: Edge parameter in which to store consensus weight.
         method: 'unrooted' or 'rooted': treat the trees as if they were such.
@@ -68,17 +69,31 @@ def weightedMajorityRule(weighted_trees, strict=False, attr='support',
     else:
         raise ValueError('method must be "rooted" or "unrooted"')
 
+def _bitsToNames(bits, names):
+    """Returns the frozenset of names[i] for each bit i set in bits"""
+    result = []
+    i = 0
+    while bits:
+        if bits & 1:
+            result.append(names[i])
+        bits >>= 1
+        i += 1
+    return frozenset(result)
+
 def weightedRootedMajorityRule(weighted_trees, strict=False, attr="support"):
     """See documentation for weightedMajorityRule"""
+    # Clades are int bitsets over a tip index which grows as new tip names
+    # turn up, see TreeNode.cladeBits
+    tip_index = {}
     cladecounts = {}
     edgelengths = {}
     total = 0
     for (weight, tree) in weighted_trees:
         total += weight
-        edges = tree.getEdgeVector()
-        for edge in edges:
-            tips = edge.getTipNames(includeself=True)
-            tips = frozenset(tips)
+        for name in tree.getTipNames():
+            if name not in tip_index:
+                tip_index[name] = len(tip_index)
+        for (edge, tips) in tree.cladeBits(tip_index):
             if tips not in cladecounts:
                 cladecounts[tips] = 0
             cladecounts[tips] += weight
@@ -87,6 +102,7 @@ def weightedRootedMajorityRule(weighted_trees, strict=False, attr="support"):
                 edgelengths[tips] += length
             else:
                 edgelengths[tips] = length
+    clade_weights = cladecounts
     cladecounts = [(count, clade) for (clade, count) in list(cladecounts.items())]
     cladecounts.sort()
     cladecounts.reverse()
@@ -99,19 +115,29 @@ def weightedRootedMajorityRule(weighted_trees, strict=False, attr="support"):
                 break
     
     # Remove conflicts
-    accepted_clades = set()
-    counts = {}
+    accepted = []
     for (count, clade) in cladecounts:
-        for accepted_clade in accepted_clades:
-            if clade.intersection(accepted_clade) and not (
-                    clade.issubset(accepted_clade) or
-                    clade.issuperset(accepted_clade)):
-                        break
+        for accepted_clade in accepted:
+            shared = clade & accepted_clade
+            if shared and shared != clade and shared != accepted_clade:
+                break
         else:
-            accepted_clades.add(clade)
-            counts[clade] = count
-            weighted_length = edgelengths[clade]
-            edgelengths[clade] = weighted_length and weighted_length / count
+            accepted.append(clade)
+    
+    # Back to sets of names for building the tree
+    names = [None] * len(tip_index)
+    for (name, i) in list(tip_index.items()):
+        names[i] = name
+    accepted_clades = set()
+    counts = {}
+    lengths = {}
+    for clade_bits in accepted:
+        clade = _bitsToNames(clade_bits, names)
+        accepted_clades.add(clade)
+        counts[clade] = count = clade_weights[clade_bits]
+        weighted_length = edgelengths[clade_bits]
+        lengths[clade] = weighted_length and weighted_length / count
+    edgelengths = lengths
     
     nodes = {}
     queue = []
@@ -149,48 +175,68 @@ def weightedRootedMajorityRule(weighted_trees, strict=False, attr="support"):
 def weightedUnrootedMajorityRule(weighted_trees, strict=False, attr='support'):
     """See documentation for weightedMajorityRule. All trees must have the same
     tips"""
-    # Calculate raw split lengths and weights
+    # Calculate raw split lengths and weights.  Splits are int bitsets over
+    # the tips of the first tree, see TreeNode.splitBits
     split_weights = defaultdict(float)
     split_lengths = defaultdict(float)
-    tips = None
+    tip_index = None
+    weights = []
     for (weight, tree) in weighted_trees:
-        for split, params in list(getSplits(tree).items()):
+        weights.append(weight)
+        if len(tree.Children) < 3:
+            warnings.warn(
+                'tree is rooted - will return splits for unrooted tree')
+        # Check that all trees have the same taxa
+        tip_names = tree.getTipNames()
+        if tip_index is None:
+            tip_index = make_tip_index(tip_names)
+        try:
+            if len(tip_names) != len(tip_index):
+                raise KeyError
+            splits = tree.splitBits(tip_index)
+        except KeyError:
+            raise NotImplementedError('all trees must have the same taxa')
+        for split, length in list(splits.items()):
             split_weights[split] += weight
-            if params['length'] is None:
+            if length is None or split_lengths[split] is None:
                 split_lengths[split] = None
             else:
-                split_lengths[split] += weight * params['length']
-        # Check that all trees have the same taxa
-        if tips is None:
-            tips = frozenset.union(*split)
-        elif tips != frozenset.union(*split):
-            raise NotImplementedError('all trees must have the same taxa')
+                split_lengths[split] += weight * length
     
     # Normalise split lengths by split weight and split weights by total weight
     for split in split_lengths:
         if not split_lengths[split] is None:
             split_lengths[split] /= split_weights[split]
-    total_weight = sum(w for w, t in weighted_trees[::-1])
+    total_weight = sum(weights[::-1])
     weighted_splits = [(w / total_weight, s) for s, w in list(split_weights.items())]
     weighted_splits.sort(reverse=True)
 
-    # Remove conflicts and any with support < 50% if strict
-    accepted_splits = {}
+    # Remove conflicts and any with support < 50% if strict.  Neither side
+    # of either split has the first tip, so they are compatible if one
+    # side of each is disjoint or one contains the other
+    accepted_splits = []
     for weight, split in weighted_splits:
         if strict and weight <= 0.5:
             break
 
-        for accepted_split in accepted_splits:
-            for s, a in product(split, accepted_split):
-                if s.isdisjoint(a):
-                    break
-            else:
+        for (accepted_split, params) in accepted_splits:
+            shared = split & accepted_split
+            if shared and shared != split and shared != accepted_split:
                 break
         else:
-            accepted_splits[split] = \
-                    {attr : weight, 'length' : split_lengths[split]}
+            accepted_splits.append((split,
+                    {attr : weight, 'length' : split_lengths[split]}))
     
-    return [getTree(accepted_splits)]
+    # Back to pairs of sets of names for getTree
+    names = [None] * len(tip_index)
+    for (name, i) in list(tip_index.items()):
+        names[i] = name
+    all_tips = (1 << len(names)) - 1
+    accepted = {}
+    for (split, params) in accepted_splits:
+        accepted[frozenset([_bitsToNames(split, names),
+                _bitsToNames(all_tips ^ split, names)])] = params
+    return [getTree(accepted)]
 
 def getSplits(tree):
     """Return a dict keyed by the splits equivalent to the tree.
@@ -3,6 +3,7 @@
 """
 from warnings import warn
 from itertools import combinations
+import hashlib, pickle, sqlite3
 
 from cogent.util import parallel, table, warning, progress_display as UI
 from cogent.maths.stats.util import Numbers
@@ -49,13 +50,110 @@ def get_pairwise_distance_from_triad(data, summary_function="mean"):
     
     return pairwise_stats
 
+def _seq_hash(seq):
+    return hashlib.sha1(str(seq).encode('utf-8')).hexdigest()
+
+def _simple(value):
+    # Attribute values which repr() the same way in every process
+    if isinstance(value, (tuple, list)):
+        return all(_simple(v) for v in value)
+    return value is None or isinstance(value, (bool, int, float, str))
+
+def get_settings_key(submodel, *settings):
+    """returns a digest identifying a substitution model and any other
+    settings which affect the results of fitting it"""
+    attrs = sorted((name, value) for (name, value) in vars(submodel).items()
+            if _simple(value))
+    description = repr((str(submodel), attrs, getattr(submodel,
+            'motif_probs', None), settings))
+    return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+class PairResultStore(object):
+    """Estimates for sets of sequences (pairs or triples) kept in an SQLite
+    file.  Keyed by the settings and the sequences themselves rather than
+    their names, so results can be reused by later runs on a different,
+    eg: larger, collection."""
+    
+    def __init__(self, filename, block_size=100):
+        """Arguments:
+            - block_size: number of results written in each transaction,
+              as committing each one means waiting for the disk
+        """
+        self.filename = filename
+        self.block_size = block_size
+        self._connect()
+    
+    def _connect(self):
+        self._db = sqlite3.connect(self.filename)
+        self._db.execute('CREATE TABLE IF NOT EXISTS results '
+                '(settings TEXT, seqs TEXT, result BLOB, '
+                'PRIMARY KEY (settings, seqs))')
+        self._db.commit()
+        self._uncommitted = 0
+    
+    def __getstate__(self):
+        # workers get the filename, not the connection
+        return (self.filename, self.block_size)
+    
+    def __setstate__(self, state):
+        (self.filename, self.block_size) = state
+        self._connect()
+    
+    def _key(self, seq_hashes):
+        # Sequences in a canonical order, and where each input one went
+        order = sorted(range(len(seq_hashes)), key=seq_hashes.__getitem__)
+        return (','.join(seq_hashes[i] for i in order), order)
+    
+    def get(self, settings, seq_hashes, names):
+        """The stored result for these sequences, with 'names' in place of
+        the sequence positions, or None"""
+        (seqs, order) = self._key(seq_hashes)
+        row = self._db.execute('SELECT result FROM results '
+                'WHERE settings=? AND seqs=?', (settings, seqs)).fetchone()
+        if row is None:
+            return None
+        result = pickle.loads(row[0])
+        for (param, value) in list(result.items()):
+            if isinstance(value, dict):
+                result[param] = dict((names[order[i]], v)
+                        for (i, v) in value.items())
+        return result
+    
+    def put(self, settings, seq_hashes, names, result):
+        (seqs, order) = self._key(seq_hashes)
+        positions = dict((names[j], i) for (i, j) in enumerate(order))
+        result = dict(result)
+        for (param, value) in list(result.items()):
+            if isinstance(value, dict):
+                result[param] = dict((positions[name], v)
+                        for (name, v) in value.items())
+        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)',
+                (settings, seqs, sqlite3.Binary(data)))
+        self._uncommitted += 1
+        if self._uncommitted >= self.block_size:
+            self.commit()
+    
+    def commit(self):
+        """Write any results put since the last commit to the file"""
+        self._db.commit()
+        self._uncommitted = 0
+    
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+    
+    def close(self):
+        self.commit()
+        self._db.close()
+    
+
 class EstimateDistances(object):
     """Base class used for estimating pairwise distances between sequences.
     Can also estimate other parameters from pairs."""
     
     def __init__(self, seqs, submodel, threeway=False, motif_probs = None,
                 do_pair_align=False, rigorous_align=False, est_params=None,
-                modify_lf=None):
+                modify_lf=None, store=None):
         """Arguments:
             - seqs: an Alignment or SeqCollection instance with > 1 sequence
             - submodel: substitution model object Predefined models can
@@ -75,6 +173,11 @@ class EstimateDistances(object):
               function (with alignment set) and modifies it. Can be used to
               configure local_params, set bounds, optimise using a restriction
               for faster performance.
+            - store: a PairResultStore, or the name of an SQLite file for
+              one.  Results already in it, from any earlier run with the
+              same sequences and settings, are reused, and only missing
+              pairs (or triples) are estimated.  A modify_lf function is
+              identified only by its name.
         
         Note: Unless you know a priori your alignment will be flush ended
         (meaning no sequence has terminal gaps) it is advisable to construct a
@@ -106,6 +209,10 @@ class EstimateDistances(object):
         self._param_ests = {}
         self._est_params = list(est_params or [])
         
+        if isinstance(store, str):
+            store = PairResultStore(store)
+        self._store = store
+        
         self._run = False # a flag indicating whether estimation completed
         # whether we're on the master CPU or not
         self._on_master_cpu = parallel.getCommunicator().Get_rank() == 0
@@ -208,15 +315,51 @@ class EstimateDistances(object):
         else:
             combination_aligns = get_name_combinations(self._seq_collection.Names, 2)
             desc = "pair "
+        
+        if self._store is not None:
+            settings = self._getSettingsKey(dist_opt_args, aln_opt_args)
+            seq_hashes = dict((name, _seq_hash(seq)) for (name, seq) in
+                    self._seq_collection.NamedSeqs.items())
+            todo = []
+            for comp in combination_aligns:
+                value = self._store.get(settings,
+                        [seq_hashes[n] for n in comp], comp)
+                if value is None:
+                    todo.append(comp)
+                else:
+                    self._param_ests[comp] = value
+            combination_aligns = todo
+        
         labels = [desc + ','.join(names) for names in combination_aligns]
                             
         def _one_alignment(comp):
             result = self._doset(comp, dist_opt_args, aln_opt_args)
             return (comp, result)
         
-        for (comp, value) in ui.imap(_one_alignment, combination_aligns,
-                labels=labels):
-            self._param_ests[comp] = value
+        try:
+            for (comp, value) in ui.imap(_one_alignment, combination_aligns,
+                    labels=labels):
+                self._param_ests[comp] = value
+                if self._store is not None and self._on_master_cpu:
+                    self._store.put(settings, [seq_hashes[n] for n in comp],
+                            comp, value)
+        finally:
+            # including those done before any interruption
+            if self._store is not None and self._on_master_cpu:
+                self._store.commit()
+    
+    def _getSettingsKey(self, dist_opt_args, aln_opt_args):
+        modify_lf = self._modify_lf
+        if modify_lf is not None:
+            modify_lf = '%s.%s' % (modify_lf.__module__,
+                    getattr(modify_lf, '__qualname__', modify_lf.__name__))
+        motif_probs = self._motif_probs
+        if isinstance(motif_probs, dict):
+            motif_probs = sorted(motif_probs.items())
+        return get_settings_key(self._sm, self._threeway, self._do_pair_align,
+                self._rigorous_align, self._est_params, motif_probs,
+                modify_lf, sorted(dist_opt_args.items()),
+                sorted(aln_opt_args.items()))
     
     def getPairwiseParam(self, param, summary_function="mean"):
         """Return the pairwise statistic estimates as a dictionary keyed by
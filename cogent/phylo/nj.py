@@ -269,13 +269,157 @@ def gnj(dists, keep=None, dkeep=0, ui=None):
     return ScoredTreeCollection(result)
 
 
+class _RowMinima(object):
+    """The smallest distance in each row of the active part of a distance
+    matrix, taken separately over columns in each of a few bins by row sum.
+    Their join scores are bounded by the bin's largest row sum, so an
+    outlying row sum only weakens one bin's bound."""
+    
+    def __init__(self, d, r, num_bins):
+        self.d = d
+        self.num_bins = num_bins
+        N = len(d)
+        self.bins = numpy.zeros(N, int)
+        self.mins = numpy.empty([N, num_bins])
+        self.args = numpy.empty([N, num_bins], int)
+        self.rebin(r, N)
+    
+    def rebin(self, r, L):
+        self.L = L
+        self.edges = numpy.percentile(r[:L],
+                numpy.linspace(0, 100, self.num_bins+1)[1:-1])
+        self.bins[:L] = numpy.searchsorted(self.edges, r[:L])
+        self.update(numpy.ones([L, self.num_bins], bool))
+    
+    def update(self, stale):
+        # Rescan the rows of each bin which have lost their minimum
+        L = len(stale)
+        for b in range(self.num_bins):
+            rows = numpy.flatnonzero(stale[:, b])
+            if not len(rows):
+                continue
+            cols = numpy.flatnonzero(self.bins[:L] == b)
+            if len(cols):
+                sub = self.d[rows[:, numpy.newaxis], cols]
+                arg = numpy.argmin(sub, axis=1)
+                self.args[rows, b] = cols[arg]
+                self.mins[rows, b] = sub[numpy.arange(len(rows)), arg]
+            else:
+                self.args[rows, b] = -1
+                self.mins[rows, b] = numpy.inf
+    
+    def lowerBounds(self, r, L):
+        """For each row i, a lower bound on (L-2)*d[i,j] - r[i] - r[j]"""
+        bins = self.bins[:L]
+        r_max = numpy.array([r[:L][bins == b].max() if (bins == b).any()
+                else -numpy.inf for b in range(self.num_bins)])
+        return ((L-2) * self.mins[:L] - r_max).min(axis=1) - r[:L]
+    
+    def join(self, i, j, new_dists, new_r, last):
+        """Column i replaced by new_dists, column j by column last"""
+        (L, args) = (last + 1, self.args)
+        stale = numpy.zeros([L, self.num_bins], bool)
+        for b in set([self.bins[i], self.bins[j]]):
+            stale[:, b] = (args[:L, b] == i) | (args[:L, b] == j)
+        b = self.bins[i] = numpy.searchsorted(self.edges, new_r)
+        closer = new_dists < self.mins[:L, b]
+        self.mins[:L, b][closer] = new_dists[closer]
+        args[:L, b][closer] = i
+        if j != last:
+            for a in [self.bins, self.mins, args, stale]:
+                a[j] = a[last]
+        args[:last][args[:last] == last] = j
+        stale[i] = True
+        self.update(stale[:last])
+    
+
+@UI.display_wrap
+def nj_from_array(names, d, ui=None):
+    """The neighbour joining tree, as from gnj(keep=1), but working in place
+    on one dense distance matrix and not building each join score matrix in
+    full.  Instead each row's smallest distances give lower bounds on its
+    best join score, and only rows which could beat the best join found so
+    far are scored, as in RapidNJ (Simonsen et al. 2008).
+    
+    Arguments:
+        - names: the tip names, in the order of d's rows and columns
+        - d: a square 2D array of distances
+    """
+    N = len(names)
+    if N < 3:
+        raise ValueError('need at least 3 sequences, not %s' % N)
+    d = numpy.array(d, float)
+    assert d.shape == (N, N), d.shape
+    builder = TreeBuilder()
+    nodes = [builder.createEdge([], name, {}) for name in names]
+    
+    # The L active nodes are always the first L rows and columns, so when
+    # one goes the last takes its place.  Row sums are updated rather than
+    # recalculated.
+    d[numpy.diag_indices(N)] = 0.0
+    r = d.sum(axis=1)
+    d[numpy.diag_indices(N)] = numpy.inf
+    minima = _RowMinima(d, r, num_bins=min(16, N))
+    
+    for L in range(N, 3, -1):
+        if L % 100 == 0:
+            ui.display('%s nodes' % L, progress=1.0 - (float(L) / N) ** 2)
+        if L < minima.L * 3 // 4:
+            minima.rebin(r, L)
+        D = d[:L, :L]
+        r_L = r[:L]
+        
+        # Best join is the minimum of (L-2)*d[i,j] - r[i] - r[j]
+        bound = minima.lowerBounds(r, L)
+        i = numpy.argmin(bound)
+        best = ((L-2) * D[i] - r_L[i] - r_L).min()
+        rows = numpy.flatnonzero(bound <= best)
+        scores = (L-2) * D[rows] - r_L[rows, numpy.newaxis] - r_L
+        (row, j) = numpy.unravel_index(numpy.argmin(scores), scores.shape)
+        (i, j) = sorted([rows[row], j])
+        
+        # Branch lengths from i and j to new node
+        ij_dist_diff = (r[i]-r[j]) / (L-2.0)
+        left_length = 0.5 * (D[i,j] + ij_dist_diff)
+        right_length = 0.5 * (D[i,j] - ij_dist_diff)
+        nodes[i].Length = max(0.0, left_length)
+        nodes[j].Length = max(0.0, right_length)
+        nodes[i] = builder.createEdge([nodes[i], nodes[j]], None, {})
+        
+        # Store new node at i
+        new_dists = 0.5 * (D[i] + D[j] - D[i,j])
+        new_dists[i] = new_dists[j] = 0.0
+        r_L -= D[i] + D[j] - new_dists
+        r[i] = new_dists.sum()
+        new_dists[i] = new_dists[j] = numpy.inf
+        D[:, i] = new_dists
+        D[i, :] = new_dists
+        
+        # Eliminate j
+        last = L - 1
+        if j != last:
+            D[j, :] = D[last, :]
+            D[:, j] = D[:, last]
+            D[j, j] = numpy.inf
+            r[j] = r[last]
+            nodes[j] = nodes[last]
+        nodes.pop()
+        minima.join(i, j, new_dists, r[i], last)
+    
+    D = d[:3, :3].copy()
+    D[numpy.diag_indices(3)] = 0.0
+    lengths = numpy.sum(D, axis=0) - numpy.sum(D)/4
+    for (node, length) in zip(nodes, lengths):
+        node.Length = max(0.0, length)
+    return builder.createEdge(nodes, 'root', {})
+
+
 def nj(dists, no_negatives=True):
     """Arguments:
         - dists: dict of (name1, name2): distance
         - no_negatives: negative branch lengths will be set to 0
     """
     assert no_negatives, "no_negatives=False is deprecated"
-    (result,) = gnj(dists, keep=1)
-    (score, tree) = result
-    return tree
+    (names, d) = distanceDictTo2D(dists)
+    return nj_from_array(names, d)
 
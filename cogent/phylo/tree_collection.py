@@ -1,5 +1,6 @@
 from numpy import exp, log
 from . import consensus
+from cogent.parse.newick import newick_statements
 
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2015, The Cogent Project"
@@ -133,3 +134,23 @@ def LoadTrees(filename):
         trees.append((lnL, tree))
     trees.sort(reverse=True)
     return klass(trees)
+
+def iterTrees(infile, underscore_unmunge=False):
+    """Yields the trees in a file of ';' terminated Newick trees, such as
+    bootstrap or MCMC samples, one at a time.  infile can be a filename or
+    an open file.  Only one tree is held in memory, so for example
+    consensus.majorityRule(iterTrees(filename)) works on files too big to
+    load."""
+    from cogent import LoadTree
+    if isinstance(infile, str):
+        infile = open(infile)
+        close = True
+    else:
+        close = False
+    try:
+        for treestring in newick_statements(infile):
+            yield LoadTree(treestring=treestring,
+                    underscore_unmunge=underscore_unmunge)
+    finally:
+        if close:
+            infile.close()
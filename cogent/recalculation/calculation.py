@@ -2,9 +2,10 @@
 
 import numpy
 Float = numpy.core.numerictypes.sctype2char(float)
-import time, warnings
+import time, warnings, weakref, pickle, json
 from cogent.maths.solve import find_root
 from cogent.util import parallel
+from cogent.util.table import Table
 from cogent.maths.optimisers import maximise, ParameterOutOfBoundsError
 
 
@@ -28,6 +29,25 @@ __status__ = "Production"
 class CalculationInterupted(Exception):
     pass
 
+def _calcTypeName(cell):
+    # The class of the Defn which made an EvaluatedCell, or failing that
+    # the name of its function.
+    owner = getattr(cell.calc, '__self__', None)
+    if owner is not None:
+        return type(owner).__name__
+    name = getattr(cell.calc, '__name__', '<lambda>')
+    if name == '<lambda>':
+        return cell.name
+    return name
+
+def _nbytes(value):
+    # Memory used by a cell value, as far as it is made of numpy arrays
+    if isinstance(value, numpy.ndarray):
+        return value.nbytes
+    elif isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
 class OptPar(object):
     """One parameter, as seen by the optimiser, eg: length of one edge.
     An OptPar reports changes to the ParameterValueSet for its parameter.
@@ -73,6 +93,10 @@ class OptPar(object):
     def transformToOptimiser(self, value):
         return value
     
+    def getDerivativeFromOptimiser(self, value):
+        # d(param value)/d(optimiser value), for the chain rule
+        return 1.0
+    
 
 class LogOptPar(OptPar):
     # For ratios, optimiser sees log(param value).  Conversions to/from
@@ -88,6 +112,9 @@ class LogOptPar(OptPar):
         except OverflowError:
             raise OverflowError('log(%s)' % value)
     
+    def getDerivativeFromOptimiser(self, value):
+        return numpy.exp(value)
+    
 
 class EvaluatedCell(object):
     __slots__ = ['client_ranks', 'rank', 'calc', 'args', 'is_constant',
@@ -161,14 +188,51 @@ class ConstCell(object):
         self.clients.append(client)
     
 
+_FORKING = {}
+
+def _columnWorker(key, conn, comm, comm_cells):
+    # Main loop of a worker process forked by Calculator._startColumnWorkers
+    calc = _FORKING.pop(key)
+    calc._setCommunicator(comm, comm_cells)
+    conn.send((True, comm.local))
+    while True:
+        try:
+            changes = conn.recv()
+        except EOFError:
+            break
+        if changes is None:
+            break
+        try:
+            calc.change(changes)
+        except Exception as detail:
+            try:
+                pickle.dumps(detail)
+            except Exception:
+                detail = ArithmeticError(repr(detail))
+            conn.send((False, detail))
+        else:
+            conn.send((True, comm.local))
+
+def _stopColumnWorkers(connections, workers):
+    for conn in connections:
+        try:
+            conn.send(None)
+            conn.close()
+        except (IOError, OSError):
+            pass
+    for worker in workers:
+        worker.join()
+
 class Calculator(object):
     """A complete hierarchical function with N evaluation steps to call
     for each change of inputs.  Made by a ParameterController."""
     
     def __init__(self, cells, defns, remaining_parallel_context=None,
-                overall_parallel_context=None, trace=None, with_undo=True):
+                overall_parallel_context=None, trace=None, with_undo=True,
+                analytic_gradient=None, column_processes=None):
         if trace is None:
             trace = TRACE_DEFAULT
+        self.analytic_gradient = analytic_gradient
         self.overall_parallel_context = overall_parallel_context
         self.remaining_parallel_context = remaining_parallel_context
         self.with_undo = with_undo
@@ -233,12 +297,90 @@ class Calculator(object):
         self.elapsed_time = 0.0
         self.evaluations = 0
         self.setTracing(trace)
+        self.setProfiling(False)
         self.optimised = False
+        
+        self.column_comm = None
+        if column_processes is not None and column_processes > 1:
+            self._startColumnWorkers(column_processes)
+    
+    # Splitting the alignment columns between worker processes forked from
+    # this one, the local alternative to MPI.  Each process has its own copy
+    # of the calculator with a different 'parallel_context' communicator.
+    # The parent relays every change() to the workers and the parallel_sum
+    # cell adds up the results.
+    
+    def _startColumnWorkers(self, size):
+        comm_cells = [cell for cell in self._cells
+                if isinstance(cell, ConstCell) and
+                cell.name == 'parallel_context' and
+                cell.value.Get_size() == 1]
+        summing = [cell for cell in self._cells if
+                getattr(cell, 'name', None) == 'parallel_sum']
+        if not comm_cells or not summing:
+            return  # eg: bin HMM, which needs all the columns
+        import multiprocessing
+        if multiprocessing.current_process().daemon:
+            return  # eg: in a Pool worker, which can't have children
+        fork = multiprocessing.get_context('fork')
+        connections = []
+        workers = []
+        # The workers find this calculator here rather than via their
+        # Process objects, which would otherwise keep it alive.
+        _FORKING[id(self)] = self
+        try:
+            for rank in range(1, size):
+                (parent_end, child_end) = fork.Pipe()
+                comm = parallel.ForkedCommunicator(rank, size)
+                worker = fork.Process(target=_columnWorker,
+                        args=(id(self), child_end, comm, comm_cells))
+                worker.daemon = True
+                worker.start()
+                child_end.close()
+                connections.append(parent_end)
+                workers.append(worker)
+        finally:
+            del _FORKING[id(self)]
+        self.column_comm = parallel.ForkedCommunicator(0, size, connections)
+        self.column_comm.pending = True  # their initial values
+        self._serial_comm = (comm_cells[0].value, comm_cells)
+        self._setCommunicator(self.column_comm, comm_cells)
+        self._column_workers = weakref.finalize(
+                self, _stopColumnWorkers, connections, workers)
+    
+    def _setCommunicator(self, comm, comm_cells):
+        # Swap communicators and recalculate everything as array sizes
+        # depend on the share of columns.
+        for cell in comm_cells:
+            cell.value = comm
+            for data in self.cell_values:
+                data[cell.rank] = comm
+        for cell in self._cells:
+            if isinstance(cell, EvaluatedCell):
+                if cell.recycled:
+                    for data in self.cell_values:
+                        data[cell.rank] = None
+                    self.spare[cell.rank] = None
+                with parallel.parallel_context(self.remaining_parallel_context):
+                    cell.prime(self.cell_values)
+    
+    def close(self):
+        """Stop any worker processes.  The calculator remains usable,
+        calculating all the columns itself."""
+        if self.column_comm is not None:
+            self._column_workers()
+            self.column_comm = None
+            self._setCommunicator(*self._serial_comm)
     
-    def _graphviz(self):
+    def _graphviz(self, profile=False):
         """A string in the 'dot' graph description language used by the
-        program 'Graphviz'.  One box per cell, grouped by Defn."""
+        program 'Graphviz'.  One box per cell, grouped by Defn.  With
+        'profile' each box also shows its share of the time spent while
+        profiling, and the more time the redder the box."""
         
+        if profile:
+            assert self.profiling, 'call setProfiling() first'
+            total = sum(self._profile_times) or 1.0
         lines = ['digraph G {\n rankdir = LR\n ranksep = 1\n']
         evs = []
         for cell in self._cells:
@@ -256,6 +398,7 @@ class Calculator(object):
         for name in evs:
             all_const = True
             some_const = False
+            fraction = 0.0
             enodes = [name.replace('edge', 'QQQ')]
             for cell in nodes[name]:
                 value = self._getCurrentCellValue(cell)
@@ -263,23 +406,35 @@ class Calculator(object):
                     label = '%5.2e' % value
                 else:
                     label = '[]'
+                if profile:
+                    cell_fraction = self._profile_times[cell.rank] / total
+                    if cell_fraction >= 0.0005:
+                        label += ' %.1f%%' % (100 * cell_fraction)
+                    fraction += cell_fraction
                 label = '<%s> %s' % (cell.rank, label)
                 enodes.append(label)
                 all_const = all_const and cell.is_constant
                 some_const = some_const or cell.is_constant
+            if profile and fraction >= 0.0005:
+                enodes[0] += ' %.1f%%' % (100 * fraction)
             enodes = '|'.join(enodes)
             colour = ['', ' fillcolor=gray90, style=filled,'][some_const]
             colour = [colour, ' fillcolor=gray, style=filled,'][all_const]
+            if profile and fraction >= 0.01:
+                # HSV red, saturated in proportion to the time taken
+                colour = ' fillcolor="0.0 %.3f 1.0", style=filled,' % (
+                        min(1.0, 0.1 + fraction))
             lines.append('"%s" [shape = "record",%s label="%s"];' %
                     (name, colour, enodes))
         lines.extend(edges)
         lines.append('}')
         return '\n'.join(lines).replace('edge', 'egde').replace('QQQ', 'edge')
     
-    def graphviz(self, keep=False):
+    def graphviz(self, keep=False, profile=False):
         """Use Graphviz to display a graph representing the inner workings of
         the calculator.  Leaves behind a temporary file (so that Graphviz can
-        redraw it with different settings) unless 'keep' is False"""
+        redraw it with different settings) unless 'keep' is False.
+        'profile' highlights where the time went, see setProfiling()"""
         
         import tempfile, os, sys
         
@@ -291,7 +446,7 @@ class Calculator(object):
         if not os.path.exists(GRAPHVIZ):
             raise RuntimeError('%s not present' % GRAPHVIZ)
         
-        text = self._graphviz()
+        text = self._graphviz(profile)
         
         fn = tempfile.mktemp(prefix="calc_", suffix=".dot")
         f = open(fn, 'w')
@@ -305,12 +460,49 @@ class Calculator(object):
             time.sleep(5)
             os.remove(fn)
     
-    def optimise(self, **kw):
+    def optimise(self, use_gradient=False, **kw):
         x = self.getValueArray()
         bounds = self.getBoundsVectors()
+        if use_gradient:
+            kw['gradient'] = self.gradient
         maximise(self, x, bounds, **kw)
         self.optimised = True
     
+    def gradient(self, values, function=None, delta=1e-6):
+        """Derivatives of the output with respect to each of the optimiser
+        'values'.  Those of the OptPars covered by self.analytic_gradient
+        are calculated directly, the rest by forward differences.  Those
+        evaluations are made with 'function', by default self, so that an
+        optimiser can count them."""
+        
+        if function is None:
+            function = self.testoptparvector
+        values = numpy.array(values, Float)
+        f0 = self.testoptparvector(values)
+        known = {}
+        if self.analytic_gradient is not None:
+            known = self.analytic_gradient(self)
+        result = numpy.zeros([len(self.opt_pars)], Float)
+        for (i, opt_par) in enumerate(self.opt_pars):
+            if opt_par.rank in known:
+                result[i] = known[opt_par.rank] * \
+                        opt_par.getDerivativeFromOptimiser(values[i])
+                continue
+            step = delta * max(1.0, abs(values[i]))
+            if values[i] + step > opt_par.getOptimiserBounds()[1]:
+                step = -step
+            x = values.copy()
+            x[i] = values[i] + step
+            try:
+                f1 = function(x)
+            except (ParameterOutOfBoundsError, ArithmeticError):
+                step = -step
+                x[i] = values[i] + step
+                f1 = function(x)
+            result[i] = (f1 - f0) / step
+            self.change([(i, values[i])])
+        return result
+    
     def setTracing(self, trace=False):
         """With 'trace' true every evaluated is printed.  Useful for profiling
         and debugging."""
@@ -347,6 +539,72 @@ class Calculator(object):
                 print('-' * width, '|', end=' ')
             print()
     
+    def setProfiling(self, profile=True):
+        """With 'profile' true the time taken by and the number of calls
+        to each cell are added up, ready for getProfile().  Turning it on
+        again starts new totals."""
+        
+        self.profiling = profile
+        if profile:
+            self._profile_times = [0.0] * len(self._cells)
+            self._profile_calls = [0] * len(self._cells)
+    
+    def getProfile(self, by='type'):
+        """A Table of the time spent in, and memory allocated by, the
+        calculations since setProfiling() was called.  'by' can be 'type'
+        for one row per Defn class, 'name' for one per Defn or 'cell'.
+        Memory is estimated from the size of the current values, and
+        recycled cells count as allocating only once."""
+        
+        rows = self._getProfileRows(by)
+        header = {'cell': ['rank', 'name', 'type'], 'name': ['name', 'type'],
+                'type': ['type']}[by] + ['cells', 'calls', 'time',
+                'percent', 'bytes', 'allocated']
+        rows = [[row[k] for k in header] for row in rows]
+        result = Table(header=header, rows=rows, title='Calculator profile')
+        result.setColumnFormat('time', '%.4f')
+        result.setColumnFormat('percent', '%.1f')
+        return result
+    
+    def getProfileJSON(self, by='type'):
+        """The getProfile() totals as a JSON list of objects"""
+        return json.dumps(self._getProfileRows(by))
+    
+    def _getProfileRows(self, by):
+        assert self.profiling, 'call setProfiling() first'
+        assert by in ['type', 'name', 'cell'], by
+        total = sum(self._profile_times) or 1.0
+        rows = []
+        index = {}
+        for cell in self._cells:
+            if not isinstance(cell, EvaluatedCell):
+                continue
+            type_name = _calcTypeName(cell)
+            key = {'cell': cell.rank, 'name': cell.name,
+                    'type': type_name}[by]
+            if key not in index:
+                row = {'type': type_name, 'cells': 0, 'calls': 0,
+                        'time': 0.0, 'percent': 0.0, 'bytes': 0,
+                        'allocated': 0}
+                if by != 'type':
+                    row['name'] = cell.name
+                if by == 'cell':
+                    row['rank'] = cell.rank
+                index[key] = row
+                rows.append(row)
+            row = index[key]
+            calls = self._profile_calls[cell.rank]
+            nbytes = _nbytes(self._getCurrentCellValue(cell))
+            row['cells'] += 1
+            row['calls'] += calls
+            row['time'] += self._profile_times[cell.rank]
+            row['percent'] += 100.0 * self._profile_times[cell.rank] / total
+            row['bytes'] += nbytes
+            row['allocated'] += nbytes * [calls, min(calls, 1)][
+                    bool(cell.recycled)]
+        rows.sort(key=lambda row: -row['time'])
+        return rows
+    
     def getValueArray(self):
         """This being a caching function, you can ask it for its current
         input!  Handy for initialising the optimiser."""
@@ -408,6 +666,8 @@ class Calculator(object):
         self.evaluations += 1
         assert parallel.getContext() is self.overall_parallel_context, (
             parallel.getContext(), self.overall_parallel_context)
+        if self.column_comm is not None:
+            self.column_comm.send(changes)
         
         # If ALL of the changes made in the last step are reversed in this step
         # then it is safe to undo them first, taking advantage of the 1-deep
@@ -458,6 +718,8 @@ class Calculator(object):
             try:
                 if self.trace:
                     self.tracingUpdate(changes, program, data)
+                elif self.profiling:
+                    self.profilingUpdate(program, data)
                 else:
                     self.plainUpdate(program, data)
                 
@@ -478,6 +740,8 @@ class Calculator(object):
                 raise exception
             
             finally:
+                if self.column_comm is not None:
+                    self.column_comm.finish()
                 self.elapsed_time += time.time() - t0
         
         return self.cell_values[self._switch][-1]
@@ -510,6 +774,24 @@ class Calculator(object):
             cell.reportError(detail, data)
             raise CalculationInterupted(cell, detail)
     
+    def profilingUpdate(self, program, data):
+        # Does the same thing as plainUpdate, but also adds up the time
+        # taken by each cell.
+        times = self._profile_times
+        calls = self._profile_calls
+        now = time.time
+        try:
+            for cell in program:
+                t0 = now()
+                data[cell.rank] = cell.calc(*[data[a] for a in cell.arg_ranks])
+                times[cell.rank] += now() - t0
+                calls[cell.rank] += 1
+        except ParameterOutOfBoundsError as detail:
+            raise CalculationInterupted(cell, detail)
+        except ArithmeticError as detail:
+            cell.reportError(detail, data)
+            raise CalculationInterupted(cell, detail)
+    
     def tracingUpdate(self, changes, program, data):
         # Does the same thing as plainUpdate, but also produces lots of
         # output showing how long each step of the calculation takes.
@@ -73,7 +73,8 @@ import numpy
 # classes from calculation.py
 
 from .calculation import EvaluatedCell, OptPar, LogOptPar, ConstCell
-from .scope import _NonLeafDefn, _LeafDefn, _Defn, ParameterController
+from .scope import _NonLeafDefn, _LeafDefn, _Defn, ParameterController, \
+        nullor
 from .setting import Var, ConstVal
 
 from cogent.util.dict_array import DictArrayTemplate
@@ -495,7 +496,8 @@ class SelectForDimension(_Defn):
             pos = self.arg.bin_names.index(scope[self.dimension])
             self.assignments[scope_t] = (input_num, pos)
         self._update_from_assignments()
-        self.values = [self.arg.values[i][p] for (i,p) in self.uniq]
+        select = nullor(self.name, self._select)
+        self.values = [select(self.arg.values[i], p) for (i,p) in self.uniq]
     
     def _select(self, arg, p):
         return arg[p]
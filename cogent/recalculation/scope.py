@@ -711,9 +711,12 @@ class ParameterController(object):
             assert dropoff > 0, dropoff
             def callback(defn, posn):
                 lc = self.makeCalculator(variable=defn.uniq[posn])
-                assert len(lc.opt_pars) == 1, lc.opt_pars
-                opt_par = lc.opt_pars[0]
-                return lc._getCurrentCellInterval(opt_par, dropoff, xtol)
+                try:
+                    assert len(lc.opt_pars) == 1, lc.opt_pars
+                    opt_par = lc.opt_pars[0]
+                    return lc._getCurrentCellInterval(opt_par, dropoff, xtol)
+                finally:
+                    lc.close()
         return callback
     
     @contextmanager
@@ -753,10 +756,18 @@ class ParameterController(object):
         self.updateIntermediateValues([defn])
         
     def measureEvalsPerSecond(self, *args, **kw):
-        return self.makeCalculator().measureEvalsPerSecond(*args, **kw)
+        lc = self.makeCalculator()
+        try:
+            return lc.measureEvalsPerSecond(*args, **kw)
+        finally:
+            lc.close()
     
-    def setupParallelContext(self, parallel_split=None):
+    def setupParallelContext(self, parallel_split=None, column_processes=None):
+        """Without MPI, 'column_processes' > 1 has the calculators made
+        for optimisation share out the work between that many processes
+        forked from this one."""
         self.overall_parallel_context = parallel.getContext()
+        self.column_processes = column_processes
         with parallel.split(parallel_split) as parallel_context:
             parallel_context = parallel_context.getCommunicator()
             self.remaining_parallel_context = parallel.getContext()
@@ -774,10 +785,24 @@ class ParameterController(object):
             input_soup[id(defn)] = outputs
         if calculatorClass is None:
             calculatorClass = Calculator
+        if variable is None:
+            kw.setdefault('column_processes',
+                    getattr(self, 'column_processes', None))
+        if kw.get('column_processes', None) and kw['column_processes'] > 1:
+            # analytic gradients would need the workers too
+            kw.setdefault('analytic_gradient', None)
+        kw.setdefault('analytic_gradient', self.getAnalyticGradient())
         kw['overall_parallel_context'] = self.overall_parallel_context
         kw['remaining_parallel_context'] = self.remaining_parallel_context
         return calculatorClass(cells, input_soup, **kw)
     
+    def getAnalyticGradient(self):
+        """A function which, given a Calculator made by this controller,
+        returns {OptPar rank: derivative of the final result with respect to
+        that OptPar}, or None.  Subclasses which know the structure of their
+        calculation can override this to speed up Calculator.gradient"""
+        return None
+    
     def updateFromCalculator(self, calc):
         changed = []
         for defn in list(self.defn_for.values()):
@@ -796,8 +821,10 @@ class ParameterController(object):
         """Find input values that optimise this function.
         'local' controls the choice of optimiser, the default being to run
         both the global and local optimisers. 'filename' and 'interval'
-        control checkpointing.  Unknown keyword arguments get passed on to
-        the optimiser(s)."""
+        control checkpointing, and an optimisation which was interrupted
+        resumes from 'filename' if it exists.  'use_gradient' selects a
+        gradient-based local optimiser.  Unknown keyword arguments get
+        passed on to the optimiser(s)."""
         return_calculator = kw.pop('return_calculator', False) # only for debug
         for n in ['local', 'filename', 'interval', 'max_evaluations', 
                 'tolerance', 'global_tolerance']:
@@ -806,7 +833,7 @@ class ParameterController(object):
         try:
             lc.optimise(**kw)
         except MaximumEvaluationsReached as detail:
-            evals = detail[0]
+            evals = detail.args[0]
             err_msg = 'FORCED EXIT from optimiser after %s evaluations' % evals
             if limit_action == 'ignore':
                 pass
@@ -816,12 +843,16 @@ class ParameterController(object):
                 raise ArithmeticError(err_msg)    
         finally:
             self.updateFromCalculator(lc)
+            lc.close()
         if return_calculator:
             return lc
     
     def graphviz(self, **kw):
         lc = self.makeCalculator()
-        return lc.graphviz(**kw)
+        try:
+            return lc.graphviz(**kw)
+        finally:
+            lc.close()
         
 
 
@@ -24,11 +24,14 @@ class Checkpointer(object):
     def available(self):
         return self.filename is not None and os.path.exists(self.filename)
     
-    def load(self):
+    def load(self, noisy=None):
         assert self.filename is not None, 'check .available() first'
-        print("RESUMING from file '%s'" % self.filename)
-        f = open(self.filename)
-        obj = pickle.load(f)
+        if noisy is None:
+            noisy = self.noisy
+        if noisy:
+            print("RESUMING from file '%s'" % self.filename)
+        with open(self.filename, 'rb') as f:
+            obj = pickle.load(f)
         self.last_time = time.time()
         return obj
     
@@ -42,7 +45,11 @@ class Checkpointer(object):
                 print("CHECKPOINTING to file '%s'" % self.filename)
                 if msg is not None:
                     print(msg)
-            f = open(self.filename, 'w')
-            pickle.dump(obj, f)
+            # Write then rename so that being killed part way through
+            # leaves the previous checkpoint intact.
+            tmp_filename = self.filename + '.tmp'
+            with open(tmp_filename, 'wb') as f:
+                pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filename, self.filename)
             self.last_time = now
     
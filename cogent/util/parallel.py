@@ -1,12 +1,19 @@
 #!/usr/bin/env python
 
-import os, sys
+import os, sys, time, pickle, types, hashlib, tempfile
+import collections
+import weakref
 from contextlib import contextmanager
 import warnings
 import threading
 import multiprocessing
 import multiprocessing.pool
 
+try:
+    import cloudpickle
+except ImportError:
+    cloudpickle = None
+
 __author__ = "Peter Maxwell"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
 __credits__ = ["Andrew Butterfield", "Peter Maxwell", "Gavin Huttley",
@@ -41,6 +48,69 @@ class _FakeCommunicator(object):
 
 FAKE_MPI_COMM = _FakeCommunicator()
 
+class ForkedCommunicator(object):
+    """Just enough of an MPI communicator for one calculation to be split
+    between a process and workers forked from it, eg: the alignment
+    columns of a likelihood function.  The parent (rank 0) sends each
+    request to the workers with send(), and its allreduce() adds their
+    replies to its own value.  Until the next request the same replies
+    are reused, eg: by the parent recalculating its own copy of a value
+    the workers have already sent.  A worker's allreduce() just keeps its
+    value to be sent as its reply.
+    
+    Only Get_rank, Get_size and allreduce (summing) are provided, as the
+    workers only ever reply to the parent."""
+    
+    def __init__(self, rank, size, connections=()):
+        self.rank = rank
+        self.size = size
+        self.connections = list(connections)
+        self.pending = False
+        self.local = None
+        self.others = None
+    
+    def Get_rank(self):
+        return self.rank
+    
+    def Get_size(self):
+        return self.size
+    
+    def send(self, request):
+        for conn in self.connections:
+            conn.send(request)
+        self.pending = True
+    
+    def _receive(self):
+        replies = [conn.recv() for conn in self.connections]
+        self.pending = False
+        for (ok, value) in replies:
+            if not ok:
+                raise value
+        return [value for (ok, value) in replies]
+    
+    def finish(self):
+        """Discard any replies not used by allreduce(), eg: because
+        the parent's own calculation failed"""
+        if self.pending:
+            try:
+                self._receive()
+            except Exception:
+                pass
+    
+    def allreduce(self, value, op=None):
+        assert op is None, op
+        self.local = value
+        if self.pending:
+            self.others = None
+            for other in self._receive():
+                if self.others is None:
+                    self.others = other
+                else:
+                    self.others = self.others + other
+        if self.others is not None:
+            value = value + self.others
+        return value
+
 class _FakeMPI(object):
     # required MPI module constants
     SUM = MAX = DOUBLE = 'fake'
@@ -207,6 +277,189 @@ class MultiprocessingParallelContext(ParallelContext):
         pool.close()
 
 
+# Helping PersistentMultiprocessingParallelContext ship functions to workers
+# which are already running.  Each function is pickled once, to a file, and
+# tasks carry only its name.  Workers keep the most recently used ones,
+# keyed by a digest of their pickle so that a key is never reused for
+# a different function.
+_WORKER_FUNCTIONS = collections.OrderedDict()
+_MAX_WORKER_FUNCTIONS = 32
+class _SerialisedFunction(object):
+    """A function pickled to a file, read at most once per worker process
+    while it remains among the recently used ones"""
+    def __init__(self, key, path):
+        self.key = key
+        self.path = path
+    def __call__(self, *args, **kw):
+        try:
+            func = _WORKER_FUNCTIONS.pop(self.key)
+        except KeyError:
+            with open(self.path, 'rb') as f:
+                func = pickle.load(f)
+            while len(_WORKER_FUNCTIONS) >= _MAX_WORKER_FUNCTIONS:
+                _WORKER_FUNCTIONS.popitem(last=False)
+        _WORKER_FUNCTIONS[self.key] = func
+        return func(*args, **kw)
+
+def _remove_files(paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _pickles_by_name(f):
+    """True for functions and classes which pickle as a reference to
+    where they are defined, so are fine to send to workers as they are."""
+    if not isinstance(f, (types.FunctionType, types.BuiltinFunctionType,
+            type)):
+        return False
+    module = getattr(f, '__module__', None)
+    if module in (None, '__main__') or module not in sys.modules:
+        # The workers' copy of __main__ is from when they started,
+        # so may not have it.
+        return False
+    name = getattr(f, '__qualname__', f.__name__)
+    if '<' in name:
+        return False
+    obj = sys.modules[module]
+    for part in name.split('.'):
+        obj = getattr(obj, part, None)
+    return obj is f
+
+class _TimedCall(object):
+    """Returns the time spent in the worker alongside each result"""
+    def __init__(self, func):
+        self.func = func
+    def __call__(self, arg):
+        t0 = time.time()
+        result = self.func(arg)
+        return (time.time() - t0, result)
+
+class PersistentMultiprocessingParallelContext(MultiprocessingParallelContext):
+    """Like MultiprocessingParallelContext but keeps one multiprocessing.Pool
+    for all imap calls, so the cost of starting worker processes is paid
+    once rather than per call.  
+    Each new function is pickled once, by cloudpickle, to a file which
+    each worker reads once.  Without cloudpickle, functions that can't be
+    pickled are registered and the pool restarted so that the new workers
+    inherit them, which is no worse than a fresh pool per call.
+    The workers don't themselves do any nested parallelism.
+    
+    Timings of recent calls are kept in .stats, see getStats()"""
+    
+    max_stats = 1000
+    
+    def __init__(self, size=None):
+        MultiprocessingParallelContext.__init__(self, size)
+        self._pool = None
+        self._inherited = {}
+        # digest -> file of recently shipped functions
+        self._shipped = collections.OrderedDict()
+        weakref.finalize(self, _remove_files, self._shipped.values())
+        self.restarts = 0
+        self.startup_time = 0.0
+        self.stats = []
+    
+    def split(self, jobs):
+        assert jobs > 0
+        if jobs == 1:
+            return (NONE, self)
+        else:
+            return (self, NONE)
+    
+    def _initWorkerProcess(self):
+        MultiprocessingParallelContext._initWorkerProcess(self)
+        CONTEXT.stack = []
+        CONTEXT.top = NONE
+    
+    def _getPool(self):
+        if self._pool is None:
+            t0 = time.time()
+            self._pool = multiprocessing.Pool(self.size, self._initWorkerProcess)
+            self.startup_time += time.time() - t0
+        return self._pool
+    
+    def _shippable(self, f):
+        if _pickles_by_name(f):
+            return f
+        try:
+            if cloudpickle is not None:
+                data = cloudpickle.dumps(f)
+            elif getattr(f, '__module__', None) == '__main__':
+                raise pickle.PicklingError(f)
+            else:
+                data = pickle.dumps(f)
+        except Exception:
+            pass
+        else:
+            key = hashlib.sha1(data).hexdigest()
+            path = self._shipped.pop(key, None)
+            if path is None:
+                (fd, path) = tempfile.mkstemp(prefix='cogent_',
+                        suffix='.function')
+                with os.fdopen(fd, 'wb') as out:
+                    out.write(data)
+                while len(self._shipped) >= _MAX_WORKER_FUNCTIONS:
+                    _remove_files([self._shipped.popitem(last=False)[1]])
+            self._shipped[key] = path
+            return _SerialisedFunction(key, path)
+        key = id(f)
+        if self._inherited.get(key) is not f:
+            # Workers can only get it from their parent at startup.
+            # Keeping a reference also stops the id from being reused.
+            if self._pool is not None:
+                self.close(wait=False)
+                self.restarts += 1
+            self._inherited[key] = _FUNCTIONS[key] = f
+        return PicklableAndCallable(key)
+    
+    def imap(self, f, s, chunksize=1):
+        t0 = time.time()
+        g = _TimedCall(self._shippable(f))
+        pool = self._getPool()
+        compute_time = 0.0
+        count = 0
+        try:
+            for (elapsed, result) in pool.imap(g, s, chunksize=chunksize):
+                compute_time += elapsed
+                count += 1
+                yield result
+        finally:
+            wall_time = time.time() - t0
+            self.stats.append({
+                'tasks': count,
+                'wall_time': wall_time,
+                'compute_time': compute_time,
+                'overhead': max(0.0, wall_time - compute_time / self.size)})
+            del self.stats[:-self.max_stats]
+    
+    def getStats(self):
+        """Per imap call: number of tasks, wall time, total time spent in
+        the function by the workers and 'overhead', the part of the wall
+        time not accounted for by the workers' share of that computation
+        (scheduling, pickling and idle workers)."""
+        return list(self.stats)
+    
+    def close(self, wait=True):
+        """Shut down the worker processes.  A later imap call will
+        start new ones."""
+        if self._pool is not None:
+            self._pool.close()
+            if wait:
+                self._pool.join()
+            self._pool = None
+        for key in self._inherited:
+            _FUNCTIONS.pop(key, None)
+        self._inherited.clear()
+        _remove_files(self._shipped.values())
+        self._shipped.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class ContextStack(threading.local):
     """This singleton object holds the current and enclosing parallel contexts."""
     
@@ -287,8 +540,15 @@ split = CONTEXT.split
 imap = CONTEXT.imap
 map = CONTEXT.map
 
-def use_multiprocessing(cpus=None):
-    CONTEXT.setInitial(MultiprocessingParallelContext(cpus))
+def use_multiprocessing(cpus=None, persistent=False):
+    """Use a pool of 'cpus' worker processes.  If 'persistent' the same
+    worker processes are reused by every parallel map."""
+    if persistent:
+        context = PersistentMultiprocessingParallelContext(cpus)
+    else:
+        context = MultiprocessingParallelContext(cpus)
+    CONTEXT.setInitial(context)
+    return context
 
 def sync_random(r):
     # Only matters with MPI
@@ -182,7 +182,7 @@ class ProgressContext(object):
             count = len(items)
         if start is None:
             start = 0.0
-        step = (end-start) / count
+        step = (end-start) / max(count, 1)
         if labels:
             assert len(labels) == count
         elif count == 1:
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Numpy arrays which other processes can use without a copy.
+
+The array data lives in a memory mapped file, on a RAM backed filesystem
+where there is one, so pickling a SharedArray, eg: to send it to a
+multiprocessing worker, only sends the name of the file.  The receiving
+process maps the same memory, copy-on-write, rather than unpickling a
+copy of the data.
+"""
+
+import os, tempfile
+import weakref
+import numpy
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell", "Gavin Huttley"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+def _default_dir():
+    # /dev/shm is memory rather than disk on Linux
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return None
+
+def _remove(path, pid):
+    # Only the process which made the file removes it, not forked copies.
+    if os.getpid() == pid and os.path.exists(path):
+        os.remove(path)
+
+class SharedArray(numpy.memmap):
+    """A memory mapped array which pickles as a reference to its file.
+    Views and slices of it pickle as ordinary arrays."""
+
+    def __array_finalize__(self, obj):
+        numpy.memmap.__array_finalize__(self, obj)
+        self._shared_path = getattr(obj, '_shared_path', None)
+        self._shared_base = getattr(obj, '_shared_base', None)
+
+    def _isWhole(self):
+        return (self._shared_path is not None and
+                self.__array_interface__['data'][0] == self._shared_base and
+                self.flags.c_contiguous)
+
+    def __reduce__(self):
+        if self._isWhole():
+            return (attach, (self._shared_path, self.dtype.str, self.shape))
+        return numpy.array(self).__reduce__()
+
+    def __array_wrap__(self, arr, context=None):
+        # Results of calculations are ordinary arrays, as for numpy.memmap
+        arr = numpy.ndarray.__array_wrap__(self, arr, context)
+        if self is arr or type(self) is not SharedArray:
+            return arr
+        if arr.shape == ():
+            return arr[()]
+        return arr.view(numpy.ndarray)
+
+
+def _mapped(path, dtype, shape, mode):
+    result = SharedArray(path, dtype=dtype, mode=mode, shape=shape)
+    result._shared_path = path
+    result._shared_base = result.__array_interface__['data'][0]
+    return result
+
+def attach(path, dtype, shape):
+    """The SharedArray in file 'path', private copy-on-write pages if this
+    process writes to it"""
+    return _mapped(path, numpy.dtype(dtype), tuple(shape), 'c')
+
+def share(array, dir=None):
+    """A SharedArray copy of 'array'.  The file is removed when this
+    process no longer needs it, so later attach()es will fail but existing
+    ones remain valid."""
+    if isinstance(array, SharedArray) and array._isWhole():
+        return array
+    array = numpy.ascontiguousarray(array)
+    if array.size == 0:
+        return array
+    if dir is None:
+        dir = _default_dir()
+    (fd, path) = tempfile.mkstemp(prefix='cogent_', suffix='.array', dir=dir)
+    os.close(fd)
+    result = _mapped(path, array.dtype, array.shape, 'w+')
+    result[...] = array
+    result.flush()
+    weakref.finalize(result, _remove, path, os.getpid())
+    return result
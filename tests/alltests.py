@@ -63,6 +63,7 @@ def suite():
         'test_core.test_alphabet',
         'test_core.test_alignment',
         'test_core.test_annotation',
+        'test_core.test_array_tree',
         'test_core.test_bitvector',
         'test_core.test_core_standalone',
         'test_core.test_features.rst',
@@ -70,6 +71,7 @@ def suite():
         'test_core.test_genetic_code',
         'test_core.test_info',
         'test_core.test_location',
+        'test_core.test_mapped_alignment',
         'test_core.test_maps',
         'test_core.test_moltype',
         'test_core.test_profile',
@@ -97,6 +99,7 @@ def suite():
         'test_maths.test_fit_function',
         'test_maths.test_geometry',
         'test_maths.test_matrix_logarithm',
+        'test_maths.test_matrix_exponentiation',
         'test_maths.test_matrix_exponential_integration',
         'test_maths.test_period',
         'test_maths.test_matrix.test_distance',
@@ -193,7 +196,9 @@ def suite():
         'test_util.test_dict2d',
         'test_util.test_misc',
         'test_util.test_organizer',
+        'test_util.test_parallel',
         'test_util.test_recode_alignment',
+        'test_util.test_shared_array',
         'test_util.test_table.rst',
         'test_util.test_transform',
         ]
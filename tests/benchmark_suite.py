@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+"""Times the hot paths of likelihood, alignment, distance, UniFrac and parser
+code on synthetic data, keeping a JSON history so that slow downs between
+versions get noticed.
+
+Typical use, before and after an upgrade:
+
+    python benchmark_suite.py --size medium --history bench.json
+
+Each run appends a record to the history and compares it with the median of
+earlier runs of the same size on the same host, listing any benchmark that
+got slower, evaluated fewer calculations per second, or used more memory by
+more than the threshold.  The exit status is 1 if there were regressions.
+"""
+
+import json
+import optparse
+import os
+import platform
+import random
+import socket
+import sys
+import time
+
+import numpy
+
+import cogent
+from cogent import LoadTree, DNA
+from cogent.evolve.models import HKY85
+from cogent.align.align import classic_align_pairwise, make_dna_scoring_dict
+from cogent.phylo.distance import EstimateDistances
+from cogent.maths.unifrac.fast_unifrac import fast_unifrac
+from cogent.parse.fasta import MinimalFastaParser
+from cogent.seqsim.tree import RandomTree
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+    import resource
+
+__author__ = "Gavin Huttley"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell", "Gavin Huttley"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Development"
+
+# taxa and length: the simulated alignment used by the likelihood benchmarks
+# pair_length: length of each sequence for the pairwise Viterbi alignment
+# distance_taxa: how many of the sequences EstimateDistances is run on
+# tips, samples: tree size and number of environments for fast_unifrac
+# fasta_seqs, fasta_length: the FASTA file parsed
+# newick_tips: the tree parsed
+SIZES = {
+    'small': dict(taxa=5, length=300, pair_length=150, distance_taxa=4,
+        tips=100, samples=5, fasta_seqs=200, fasta_length=300,
+        newick_tips=500),
+    'medium': dict(taxa=10, length=1000, pair_length=500, distance_taxa=6,
+        tips=1000, samples=10, fasta_seqs=2000, fasta_length=1000,
+        newick_tips=5000),
+    'large': dict(taxa=20, length=5000, pair_length=1500, distance_taxa=10,
+        tips=5000, samples=20, fasta_seqs=10000, fasta_length=2000,
+        newick_tips=50000),
+    }
+
+# fractional change counted as a regression, for each measurement
+DEFAULT_THRESHOLD = 0.2
+
+# measurements for which bigger is better
+HIGHER_IS_BETTER = ['evals_per_sec']
+
+def random_tree(num_tips, seed):
+    """Returns a random PhyloNode tree with tips named s0, s1... and random
+    branch lengths, generated by the seqsim breakpoint model."""
+    numpy.random.seed(seed)
+    rng = random.Random(seed)
+    tree = RandomTree(num_tips)
+    for (i, tip) in enumerate(tree.tips()):
+        tip.Name = 's%s' % i
+    for node in tree.iterNontips(include_self=False):
+        node.Name = None
+    for node in tree.traverse(self_before=False, self_after=True):
+        if node is not tree:
+            node.Length = round(rng.uniform(0.01, 0.2), 4)
+    return LoadTree(treestring=tree.getNewick(with_distances=True))
+
+def simulated_lf(taxa, length, seed):
+    """Returns an HKY85 likelihood function with an alignment simulated on a
+    random tree attached."""
+    tree = random_tree(taxa, seed)
+    lf = HKY85().makeLikelihoodFunction(tree)
+    lf.setParamRule('kappa', init=4.0)
+    aln = lf.simulateAlignment(sequence_length=length,
+        random_series=random.Random(seed))
+    lf.setAlignment(aln)
+    return lf
+
+def random_dna(length, rng):
+    return ''.join([rng.choice('ACGT') for i in range(length)])
+
+class SyntheticData(object):
+    """Lazily generated, cached inputs for one benchmark size."""
+
+    def __init__(self, size, seed=1):
+        self.size = size
+        self.params = SIZES[size]
+        self.seed = seed
+        self._cache = {}
+
+    def _get(self, name, make):
+        if name not in self._cache:
+            self._cache[name] = make()
+        return self._cache[name]
+
+    def getLikelihoodFunction(self):
+        p = self.params
+        return self._get('lf',
+            lambda: simulated_lf(p['taxa'], p['length'], self.seed))
+
+    def getAlignment(self):
+        return self.getLikelihoodFunction().getParamValue('alignment')
+
+    def getSeqPair(self):
+        def make():
+            rng = random.Random(self.seed)
+            length = self.params['pair_length']
+            seq1 = random_dna(length, rng)
+            # a diverged copy: substitutions and some short indels
+            seq2 = []
+            for c in seq1:
+                r = rng.random()
+                if r < 0.02:
+                    continue
+                elif r < 0.04:
+                    seq2.append(random_dna(rng.randint(1, 3), rng))
+                elif r < 0.2:
+                    c = rng.choice('ACGT')
+                seq2.append(c)
+            return (DNA.makeSequence(seq1, 'a'),
+                    DNA.makeSequence(''.join(seq2), 'b'))
+        return self._get('pair', make)
+
+    def getUniFracInput(self):
+        def make():
+            rng = random.Random(self.seed)
+            tree = random_tree(self.params['tips'], self.seed)
+            samples = ['env%s' % i for i in range(self.params['samples'])]
+            envs = {}
+            for name in tree.getTipNames():
+                chosen = rng.sample(samples, rng.randint(1, len(samples)))
+                envs[name] = dict([(s, rng.randint(1, 10)) for s in chosen])
+            return (tree, envs)
+        return self._get('unifrac', make)
+
+    def getFastaLines(self):
+        def make():
+            rng = random.Random(self.seed)
+            lines = []
+            for i in range(self.params['fasta_seqs']):
+                lines.append('>seq%s\n' % i)
+                seq = random_dna(self.params['fasta_length'], rng)
+                lines.extend([seq[j:j+60]+'\n' for j in range(0, len(seq), 60)])
+            return lines
+        return self._get('fasta', make)
+
+    def getNewick(self):
+        return self._get('newick', lambda: random_tree(
+            self.params['newick_tips'], self.seed).getNewick(
+                with_distances=True))
+
+
+# Each benchmark takes a SyntheticData and returns a function to time.
+# Building the data is not part of the timing.
+
+def bench_lf_optimise(data):
+    lf = data.getLikelihoodFunction()
+    # every repeat starts from the same parameter values
+    start = lf.makeCalculator()
+    def run():
+        lf.updateFromCalculator(start)
+        lf.optimise(local=True, max_evaluations=200, show_progress=False,
+            limit_action='ignore')
+    return run
+
+def bench_calculator_change(data):
+    calc = data.getLikelihoodFunction().makeCalculator()
+    x = calc.getValueArray()
+    def run():
+        for j in range(5):
+            for (i, v) in enumerate(x):
+                calc.change([(i, v*1.01)])
+                calc.change([(i, v)])
+    return run
+
+def bench_viterbi(data):
+    (seq1, seq2) = data.getSeqPair()
+    S = make_dna_scoring_dict(10, -1, -8)
+    def run():
+        classic_align_pairwise(seq1, seq2, S, 10, 2, local=False,
+            return_alignment=False)
+    return run
+
+def bench_estimate_distances(data):
+    aln = data.getAlignment()
+    aln = aln.takeSeqs(aln.Names[:data.params['distance_taxa']])
+    def run():
+        d = EstimateDistances(aln, submodel=HKY85())
+        d.run(show_progress=False)
+    return run
+
+def bench_fast_unifrac(data):
+    (tree, envs) = data.getUniFracInput()
+    def run():
+        fast_unifrac(tree, envs, modes=['distance_matrix'])
+    return run
+
+def bench_fasta_parser(data):
+    lines = data.getFastaLines()
+    def run():
+        for (label, seq) in MinimalFastaParser(lines):
+            pass
+    return run
+
+def bench_newick_parser(data):
+    newick = data.getNewick()
+    def run():
+        LoadTree(treestring=newick)
+    return run
+
+def evals_per_sec(data):
+    """evaluations per second of the likelihood calculator"""
+    lf = data.getLikelihoodFunction()
+    return lf.measureEvalsPerSecond(time_limit=1.0)
+
+# (name, benchmark, {extra measurement name: function of data})
+BENCHMARKS = [
+    ('LikelihoodFunction.optimise', bench_lf_optimise, {}),
+    ('Calculator.change', bench_calculator_change,
+        {'evals_per_sec': evals_per_sec}),
+    ('PairHMM.getViterbiPath', bench_viterbi, {}),
+    ('EstimateDistances.run', bench_estimate_distances, {}),
+    ('fast_unifrac', bench_fast_unifrac, {}),
+    ('MinimalFastaParser', bench_fasta_parser, {}),
+    ('newick parser', bench_newick_parser, {}),
+    ]
+
+def wall_time(run, repeats):
+    """Returns the best of repeats wall times for run()"""
+    times = []
+    for i in range(repeats):
+        t0 = time.time()
+        run()
+        times.append(time.time() - t0)
+    return min(times)
+
+def peak_memory(run):
+    """Returns the peak memory in bytes allocated by run().  Without
+    tracemalloc this is the process's peak resident size so far, which
+    can't go down from one benchmark to the next."""
+    if tracemalloc is None:
+        run()
+        scale = [1024, 1][sys.platform == 'darwin']
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_benchmarks(size, names=None, repeats=3, seed=1, show_progress=True):
+    """Returns {benchmark name: {measurement: value}} for the benchmarks
+    named (default all) on data of size."""
+    data = SyntheticData(size, seed)
+    results = {}
+    for (name, bench, extras) in BENCHMARKS:
+        if names and name not in names:
+            continue
+        if show_progress:
+            sys.stderr.write('%s...\n' % name)
+        run = bench(data)
+        result = {'wall_time': wall_time(run, repeats),
+                'peak_memory': peak_memory(run)}
+        for (measure, f) in list(extras.items()):
+            result[measure] = f(data)
+        results[name] = result
+    return results
+
+def load_history(filename):
+    if not os.path.exists(filename):
+        return []
+    with open(filename) as infile:
+        return json.load(infile)
+
+def save_history(filename, history):
+    with open(filename, 'w') as outfile:
+        json.dump(history, outfile, indent=1, sort_keys=True)
+
+def make_record(size, results, seed):
+    return {'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'cogent_version': cogent.__version__,
+            'numpy_version': numpy.__version__,
+            'python_version': platform.python_version(),
+            'host': socket.gethostname(),
+            'size': size, 'seed': seed, 'results': results}
+
+def find_regressions(history, record, threshold=DEFAULT_THRESHOLD,
+        window=5):
+    """Returns a list of (benchmark, measurement, baseline, value) for
+    measurements in record worse by more than threshold (a fraction) than
+    the median of the last window comparable records in history."""
+    comparable = [r for r in history if r['size'] == record['size']
+            and r['host'] == record['host'] and r['seed'] == record['seed']]
+    comparable = comparable[-window:]
+    regressions = []
+    for (name, result) in sorted(record['results'].items()):
+        for (measure, value) in sorted(result.items()):
+            previous = [r['results'][name][measure] for r in comparable
+                    if measure in r['results'].get(name, {})]
+            if not previous:
+                continue
+            baseline = numpy.median(previous)
+            if measure in HIGHER_IS_BETTER:
+                worse = value < baseline * (1 - threshold)
+            else:
+                worse = value > baseline * (1 + threshold)
+            if worse:
+                regressions.append((name, measure, baseline, value))
+    return regressions
+
+def format_results(results):
+    template = '%-30s %12s %14s %14s'
+    lines = [template % ('benchmark', 'wall (s)', 'peak mem (kB)',
+            'evals/sec')]
+    for (name, result) in sorted(results.items()):
+        if 'evals_per_sec' in result:
+            evals = '%.1f' % result['evals_per_sec']
+        else:
+            evals = ''
+        lines.append(template % (name, '%.4f' % result['wall_time'],
+            '%d' % (result['peak_memory'] // 1024), evals))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('-s', '--size', choices=sorted(SIZES), default='small',
+        help='size of synthetic data: small, medium or large [%default]')
+    parser.add_option('-H', '--history', default='benchmark_history.json',
+        help='JSON file of previous results, appended to [%default]')
+    parser.add_option('-b', '--benchmark', action='append', dest='names',
+        help='run only this benchmark, may be repeated')
+    parser.add_option('-r', '--repeats', type='int', default=3,
+        help='take the best of this many timings [%default]')
+    parser.add_option('-t', '--threshold', type='float',
+        default=DEFAULT_THRESHOLD,
+        help='fractional change counted as a regression [%default]')
+    parser.add_option('--seed', type='int', default=1,
+        help='random seed for the synthetic data [%default]')
+    parser.add_option('-n', '--no-save', action='store_true', default=False,
+        help="don't add this run to the history")
+    (opts, args) = parser.parse_args(argv)
+
+    results = run_benchmarks(opts.size, opts.names, opts.repeats, opts.seed)
+    record = make_record(opts.size, results, opts.seed)
+    history = load_history(opts.history)
+    regressions = find_regressions(history, record, opts.threshold)
+    if not opts.no_save:
+        history.append(record)
+        save_history(opts.history, history)
+
+    print(format_results(results))
+    if regressions:
+        print()
+        print('REGRESSIONS (median of previous runs -> this run):')
+        for (name, measure, baseline, value) in regressions:
+            print('  %s %s: %.4g -> %.4g' % (name, measure, baseline, value))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,7 +4,7 @@
 from cogent.util.unit_test import TestCase, main
 from cogent.align.algorithm import ScoreCell, MatchScorer, equality_scorer,\
     default_gap, default_gap_symbol, ScoreMatrix, NeedlemanWunschMatrix, \
-    SmithWatermanMatrix, nw_align, sw_align
+    SmithWatermanMatrix, nw_align, sw_align, nw_align_many, sw_align_many
 from copy import copy, deepcopy
 
 __author__ = "Jeremy Widmann"
@@ -278,6 +278,53 @@ class NwAlignTests(TestCase):
         self.assertEqual(second,'-CAGU')
         self.assertEqual(score,1)
 
+    def test_nw_align_same_as_matrix(self):
+        """nw_align should agree with NeedlemanWunschMatrix"""
+        for seq1, seq2 in [('ACGU','CAGU'), ('AAGGCU','AGU'), ('U','GGAC'),
+                ('GGACUU','')]:
+            m = NeedlemanWunschMatrix(seq1, seq2)
+            self.assertEqual(nw_align(seq1, seq2, return_score=True),
+                (m.alignment(), m.MaxScore[0]))
+
+    def test_nw_align_affine(self):
+        """nw_align should join gaps when opening them is costly"""
+        scorer = MatchScorer(2, -1)
+        (first,second),score = nw_align('ACGTTGCA','ACGTCA', scorer, -1,
+            return_score=True)
+        self.assertEqual(score, 10)
+        (first,second),score = nw_align('ACGTTGCA','ACGTCA', scorer, -5,
+            return_score=True, gap_extend=-1)
+        self.assertEqual((first,second), ('ACGTTGCA','ACGT--CA'))
+        self.assertEqual(score, 6)
+        self.assertRaises(ValueError, nw_align, 'AC', 'A', scorer, -1,
+            gap_extend=-2)
+
+    def test_nw_align_dict(self):
+        """nw_align should accept a dict of scores keyed by pairs"""
+        S = {}
+        for a in 'ACGT':
+            for b in 'ACGT':
+                S[a,b] = [-2, 3][a==b]
+        (first,second),score = nw_align('ACGT','AGT', S, -4,
+            return_score=True)
+        self.assertEqual((first,second), ('ACGT','A-GT'))
+        self.assertEqual(score, 5)
+
+    def test_nw_align_list(self):
+        """nw_align should keep the class of the sequences"""
+        self.assertEqual(nw_align([1,2,3],[1,3]), ([1,2,3],[1,'-',3]))
+
+    def test_nw_align_many(self):
+        """nw_align_many should give the same results as nw_align"""
+        targets = ['CAGU', 'ACGU', '', 'GGAUCCA', 'U']
+        for kw in [{}, dict(gap=-3, gap_extend=-1)]:
+            expect = [nw_align('ACGUA', t, return_score=True, **kw)
+                for t in targets]
+            self.assertEqual(nw_align_many('ACGUA', targets,
+                return_score=True, **kw), expect)
+            self.assertEqual(list(nw_align_many('ACGUA', targets,
+                score_only=True, **kw)), [score for (a, score) in expect])
+
 class SwAlignTests(TestCase):
     """Tests for sw_align function.
     """
@@ -294,6 +341,33 @@ class SwAlignTests(TestCase):
         self.assertEqual(first,'GU')
         self.assertEqual(second,'GU')
         self.assertEqual(score,2)
+
+    def test_sw_align_same_as_matrix(self):
+        """sw_align should agree with SmithWatermanMatrix"""
+        for seq1, seq2 in [('ACGU','CAGU'), ('AAGGCU','UAGGU'), ('U','GGAC'),
+                ('GGACUU','')]:
+            m = SmithWatermanMatrix(seq1, seq2)
+            self.assertEqual(sw_align(seq1, seq2, return_score=True),
+                (m.alignment(), m.MaxScore[0]))
+
+    def test_sw_align_affine(self):
+        """sw_align should score gaps as gap + (length-1) * gap_extend"""
+        scorer = MatchScorer(3, -3)
+        (first,second),score = sw_align('TTACGTTTGCAGG','CCACGTGCACC',
+            scorer, -4, return_score=True, gap_extend=-1)
+        self.assertEqual((first,second), ('ACGTTTGCA','ACG--TGCA'))
+        self.assertEqual(score, 16)
+
+    def test_sw_align_many(self):
+        """sw_align_many should give the same results as sw_align"""
+        targets = ['CAGU', 'ACGU', '', 'GGAUCCA', 'U', 'CCCC']
+        for kw in [{}, dict(gap=-3, gap_extend=-1)]:
+            expect = [sw_align('ACGUA', t, return_score=True, **kw)
+                for t in targets]
+            self.assertEqual(sw_align_many('ACGUA', targets,
+                return_score=True, **kw), expect)
+            self.assertEqual(list(sw_align_many('ACGUA', targets,
+                score_only=True, **kw)), [score for (a, score) in expect])
 #run if called from command-line
 if __name__ == "__main__":
     main()
@@ -3,12 +3,14 @@
 from cogent import DNA, LoadSeqs
 from cogent.align.align import classic_align_pairwise, make_dna_scoring_dict,\
         local_pairwise, global_pairwise
+from cogent.align.pairwise import Band
 from cogent.evolve.models import HKY85
 import cogent.evolve.substitution_model
 dna_model = cogent.evolve.substitution_model.Nucleotide(
         model_gaps=False, equal_motif_probs=True)
 
 import cogent.align.progressive
+from cogent.util import parallel
 
 import unittest
 
@@ -102,6 +104,38 @@ class AlignmentTestCase(unittest.TestCase):
         self.assertEqual(str(hit).lower(), 'cac')
 
 
+class BandedAlignmentTestCase(unittest.TestCase):
+    def test_band(self):
+        """Band rows should follow the anchors and cover the corners"""
+        band = Band((8, 12), [(3, 5)], width=1)
+        self.assertEqual(list(band.lows), [0, 0, 2, 4, 5, 7, 8, 10])
+        self.assertEqual(list(band.highs), [4, 6, 7, 9, 10, 11, 11, 12])
+        self.assertEqual(band.getCellCount(), 34)
+        self.assertEqual(band.getTrackWidth(), 6)
+        self.assertEqual(Band.fromDiagonal((8, 12), 1, 2).anchors,
+                ((1, 3), (6, 8)))
+        self.assertEqual(band.backward().backward(), band)
+    
+    def test_banded_same_as_full(self):
+        """A band wide enough for the best path should not change it"""
+        S = make_dna_scoring_dict(10, -1, -8)
+        for local in [False, True]:
+            (full, score) = classic_align_pairwise(seq1, seq2, S, 10, 2,
+                    local, return_score=True)
+            for band in [Band.fromDiagonal((23, 22), 3, -3), 4]:
+                (banded, banded_score) = classic_align_pairwise(seq1, seq2,
+                        S, 10, 2, local, return_score=True, band=band)
+                self.assertEqual(banded.todict(), full.todict())
+                self.assertAlmostEqual(banded_score, score)
+    
+    def test_narrow_band(self):
+        """Alignments can't leave the band"""
+        S = make_dna_scoring_dict(10, -1, -8)
+        a = classic_align_pairwise(seq1, seq2, S, 10, 2, False,
+                band=Band.fromDiagonal((23, 22), 0, 0))
+        self.assertTrue(matchedColumns(a) < 15)
+    
+
 class UnalignedPairTestCase(unittest.TestCase):
     def test_forward(self):
         tree = cogent.LoadTree(tip_names='AB')
@@ -242,6 +276,34 @@ class HirschbergTestCase(MultipleAlignmentTestCase):
         return result
 
 
+
+class ParallelSubtreesTestCase(MultipleAlignmentTestCase):
+    # Force use of the round-by-round subtree scheduler
+    
+    def _make_aln(self, orig, **kw):
+        kw['parallel_subtrees'] = True
+        return MultipleAlignmentTestCase._make_aln(self, orig, **kw)
+    
+    def test_process_pool(self):
+        """sibling subtrees aligned by a process pool"""
+        seqs = dict((n, DNA.makeSequence(s)) for (n, s) in [
+            ('A', 'aaaccggacattacgtgcgta'),
+            ('B', 'aaacgggacattacgtgcgta'),
+            ('C', 'ccggtcaggttacgtacgtt'),
+            ('D', 'ccggtcaggttacgtacgttaa')])
+        tree = cogent.LoadTree(treestring="((A:.1,B:.1):.1,(C:.1,D:.1):.1)")
+        serial = cogent.align.progressive.TreeAlign(dna_model, seqs,
+                tree=tree, show_progress=False)[0]
+        context = parallel.PersistentMultiprocessingParallelContext(2)
+        try:
+            with parallel.parallel_context(context):
+                aln = cogent.align.progressive.TreeAlign(dna_model, seqs,
+                        tree=tree, show_progress=False)[0]
+        finally:
+            context.close()
+        self.assertEqual(aln.todict(), serial.todict())
+        self.assertEqual(context.getStats()[0]['tasks'], 2)
+
     
 if __name__ == '__main__':
     unittest.main()
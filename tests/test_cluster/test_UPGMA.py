@@ -6,7 +6,8 @@ from numpy import array
 import numpy
 Float = numpy.core.numerictypes.sctype2char(float)
 from cogent.cluster.UPGMA import find_smallest_index, condense_matrix, \
-        condense_node_order, UPGMA_cluster, inputs_from_dict2D, upgma
+        condense_node_order, UPGMA_cluster, inputs_from_dict2D, upgma, \
+        condensed_from_square, linkage_cluster
 from cogent.util.dict2d import Dict2D
 
 __author__ = "Rob Knight"
@@ -130,6 +131,33 @@ class UPGMATests(TestCase):
         self.assertEqual(str(tree), \
                 '(((a:0.5,b:0.5):1.75,c:2.25):5.875,(d:1.0,e:1.0):7.125);')
 
+    def test_condensed_from_square(self):
+        """condensed_from_square returns the upper triangle row by row"""
+        self.assertEqual(condensed_from_square(self.matrix_zeros),
+                [1, 4, 20, 22, 5, 21, 23, 10, 12, 2])
+    
+    def test_linkage_cluster(self):
+        """linkage_cluster clusters square or condensed arrays"""
+        names = list('abcde')
+        # wpgma is what UPGMA_cluster actually does
+        self.assertEqual(str(linkage_cluster(self.matrix_zeros, names,
+                'wpgma')), str(upgma(self.pairwise_distances)))
+        condensed = condensed_from_square(self.matrix_zeros)
+        for (method, expect) in [
+                ('upgma', '(((a:0.5,b:0.5)edge.1:1.75,c:2.25)edge.0:6.75,'
+                    '(d:1.0,e:1.0)edge.2:8.0)root;'),
+                ('single', '(((a:0.5,b:0.5)edge.1:1.5,c:2.0)edge.0:3.0,'
+                    '(d:1.0,e:1.0)edge.2:4.0)root;'),
+                ('complete', '(((a:0.5,b:0.5)edge.1:2.0,c:2.5)edge.0:9.0,'
+                    '(d:1.0,e:1.0)edge.2:10.5)root;')]:
+            self.assertEqual(str(linkage_cluster(self.matrix_zeros, names,
+                    method)), expect)
+            self.assertEqual(str(linkage_cluster(condensed, names,
+                    method)), expect)
+        self.assertRaises(ValueError, linkage_cluster, condensed, names,
+                'centroid')
+        self.assertRaises(ValueError, linkage_cluster, condensed, names[:4])
+
     def test_inputs_from_dict2D(self):
         """inputs_from_dict2D makes an array object and PhyloNode list"""
         matrix = [('1', '2', 0.86), ('2', '1', 0.86), \
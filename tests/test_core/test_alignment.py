@@ -1540,7 +1540,36 @@ class AlignmentTests(AlignmentBaseTests, TestCase):
         self.assertEqual(result[1].todict(), {'seq3': 'CGTAC', 'seq2': 'CGTAC', 'seq1': 'CGTAC'})
         self.assertEqual(result[2].todict(), {'seq3': 'GTACG', 'seq2': 'GTACG', 'seq1': 'GTACG'})
         self.assertEqual(result[3].todict(), {'seq3': 'TACGT', 'seq2': 'TACGT', 'seq1': 'TACGT'})
- 
+
+    def test_views(self):
+        """slices and takePositions should share the original sequences"""
+        aln = self.Class({'a': 'AC-GTACGT', 'b': 'ACCGT--GT'}, MolType=DNA)
+        seq = aln.getSeq('a')
+        for view in [aln[2:7], aln.takePositions([2, 3, 4, 5, 6]),
+                aln.takePositions([0, 1, 7, 8], negate=True)]:
+            self.assertTrue(view.NamedSeqs['a'].data is seq)
+            self.assertEqual(view.todict(), {'a': '-GTAC', 'b': 'CGT--'})
+            # getSeq gives only the part of the sequence in the view
+            view_seq = view.getSeq('a')
+            self.assertEqual(str(view_seq), 'GTAC')
+            self.assertTrue(view.getSeq('a') is view_seq)
+            self.assertEqual(view.todict(), {'a': '-GTAC', 'b': 'CGT--'})
+        self.assertEqual(str(aln.takePositions(range(0, 9, 3)).getSeq('b')),
+                'AG')
+        self.assertEqual(str(aln.rc()[1:5].getSeq('a')), 'CGTA')
+        self.assertTrue(aln.rc().getSeq('a') is seq)
+        self.assertEqual(str(seq), 'ACGTACGT')
+        aligned = aln.NamedSeqs['b'][1:8][2:6]
+        self.assertEqual(aligned._slice is not None, True)
+        self.assertEqual(len(aligned), 4)
+        self.assertEqual(str(aligned), 'GT--')
+        self.assertEqual(aligned._slice, None)
+        self.assertEqual(aln.takePositions([8, 0, -2]).todict(),
+                {'a': 'TAG', 'b': 'TAG'})
+        self.assertRaises(IndexError, aln.takePositions, [9])
+        self.assertEqual(aln.omitGapPositions(0).todict(),
+                {'a': 'ACGTGT', 'b': 'ACGTGT'})
+
     def test_withGapsFrom(self):
         """withGapsFrom should overwrite with gaps."""
         gapless   = self.Class({'seq1': 'TCG', 'seq2': 'TCG'})
@@ -1758,6 +1787,8 @@ class DenseAlignmentSpecificTests(TestCase):
         a2 = self.a2
         self.assertEqual(a2[1], ['B','E'])
         self.assertEqual(a2[1:], [['B','E'],['C','F']])
+        self.assertEqual(a2[::-2], [['C','F'],['A','D']])
+        self.assertEqual(a2[-1], ['C','F'])
 
     def test_getSubAlignment(self):
         """DenseAlignment getSubAlignment should get requested part of alignment."""
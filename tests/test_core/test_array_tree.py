@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""Tests of the array-backed tree, checked against PhyloNode.
+"""
+from cogent import LoadTree
+from cogent.core.array_tree import ArrayTree
+from cogent.core.tree import TreeError
+from cogent.util.unit_test import TestCase, main
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Peter Maxwell"
+__email__ = "pm67nz@gmail.com"
+__status__ = "Production"
+
+def _names(node_list):
+    return [n.Name if n.NameLoaded else None for n in node_list]
+
+class ArrayTreeTests(TestCase):
+    """Tests of ArrayTree"""
+
+    def setUp(self):
+        self.newick = \
+            "((a:1.0,b:2.0)x:0.5,(c:3.0,(d:1.0,e:4.0)y:2.0,f:1.0)z:1.0,g:7.0)r;"
+        self.phylo = LoadTree(treestring=self.newick)
+        self.tree = ArrayTree.fromNewick(self.newick)
+
+    def test_init(self):
+        """nodes must be in postorder with the root last"""
+        tree = ArrayTree([2, 2, -1], [1, None, None], ['a', 'b', None])
+        self.assertEqual(tree.getNewick(with_distances=True), '(a:1.0,b);')
+        self.assertEqual(list(tree.sizes), [1, 1, 3])
+        self.assertRaises(TreeError, ArrayTree, [-1, 0], [1, 1], [None]*2)
+        self.assertRaises(TreeError, ArrayTree, [2, 2], [1, 1], [None]*2)
+        # 1 can't be a child of 3 when 2 is a child of 4
+        self.assertRaises(TreeError, ArrayTree, [2, 3, 4, 4, -1],
+                [None]*5, [None]*5)
+        self.assertRaises(ValueError, self.tree.parents.__setitem__, 0, 3)
+
+    def test_conversion(self):
+        """converting to and from PhyloNode keeps the tree"""
+        from_phylo = ArrayTree.fromPhyloNode(self.phylo)
+        self.assertEqual(from_phylo.getNames(), self.tree.getNames())
+        self.assertEqual(list(from_phylo.parents), list(self.tree.parents))
+        self.assertEqual(from_phylo.getNewick(with_distances=True),
+                self.newick)
+        back = self.tree.toPhyloNode()
+        self.assertEqual(back.getNewick(with_distances=True), self.newick)
+        self.assertTrue(back.sameTopology(self.phylo))
+        self.assertEqual(back.getNodeMatchingName('e').Parent.Name, 'y')
+
+    def test_getNewick(self):
+        """getNewick escapes names and lengths like TreeNode.getNewick"""
+        newick = "(('a b':1,'c_d':2,\"e'f\"),g)h;"
+        array = ArrayTree.fromNewick(newick)
+        phylo = LoadTree(treestring=newick)
+        for with_distances in [False, True]:
+            self.assertEqual(array.getNewick(with_distances),
+                    phylo.getNewick(with_distances))
+        self.assertEqual(array.getNewick(semicolon=False),
+                phylo.getNewick(semicolon=False))
+        self.assertEqual(str(self.tree), self.newick)
+
+    def test_structure(self):
+        """parents, children, names and lengths are available by index"""
+        tree = self.tree
+        e = tree.getNodeIndex('e')
+        self.assertEqual(tree.getName(tree.getParent(e)), 'y')
+        self.assertEqual([tree.getName(n) for n in tree.ancestors(e)],
+                ['y', 'z', 'r'])
+        self.assertEqual([tree.getName(n) for n in tree.children(tree.root)],
+                ['x', 'z', 'g'])
+        self.assertEqual(tree.getParent(tree.root), None)
+        self.assertEqual(tree.getLength(e), 4.0)
+        self.assertEqual(tree.getLength(tree.root), None)
+        self.assertTrue(tree.isTip(e))
+        self.assertFalse(tree.isTip(tree.root))
+        self.assertTrue(tree.isRoot(tree.root))
+        self.assertEqual(tree.getTipCount(), 7)
+        self.assertRaises(TreeError, tree.getNodeIndex, 'q')
+
+    def test_traverse(self):
+        """traverse visits nodes in the same order as TreeNode.traverse"""
+        for self_before in [True, False]:
+            for self_after in [True, False]:
+                for include_self in [True, False]:
+                    expected = _names(self.phylo.traverse(self_before,
+                            self_after, include_self))
+                    got = [self.tree.getName(n) for n in self.tree.traverse(
+                            self_before, self_after, include_self)]
+                    self.assertEqual(got, expected)
+        z = self.tree.getNodeIndex('z')
+        self.assertEqual([self.tree.getName(n) for n in
+                self.tree.traverse(self_before=True, node=z)],
+                ['z', 'c', 'y', 'd', 'e', 'f'])
+
+    def test_tips(self):
+        """tips are in postorder"""
+        self.assertEqual(self.tree.getTipNames(), self.phylo.getTipNames())
+        z = self.tree.getNodeIndex('z')
+        self.assertEqual(self.tree.getTipNames(z), ['c', 'd', 'e', 'f'])
+
+    def test_lastCommonAncestor(self):
+        """lastCommonAncestor works on node indices"""
+        tree = self.tree
+        node = tree.getNodeIndex
+        for (first, second, expected) in [('d', 'e', 'y'), ('d', 'f', 'z'),
+                ('a', 'f', 'r'), ('y', 'e', 'y'), ('g', 'g', 'g')]:
+            lca = tree.lastCommonAncestor(node(first), node(second))
+            self.assertEqual(tree.getName(lca), expected)
+
+    def test_getSubTree(self):
+        """getSubTree matches TreeNode.getSubTree"""
+        for names in [['a', 'b', 'c'], ['d', 'e'], ['x', 'g'],
+                ['c', 'd', 'f', 'g']]:
+            for keep_root in [False, True]:
+                self.assertEqual(self.tree.getSubTree(names,
+                        keep_root=keep_root).getNewick(with_distances=True),
+                    self.phylo.getSubTree(names,
+                        keep_root=keep_root).getNewick(with_distances=True))
+        rooted = "((a:1,b:2)x:0.5,((c:3,d:1)y:2,e:1)z:1);"
+        phylo = LoadTree(treestring=rooted)
+        sub = ArrayTree.fromNewick(rooted).getSubTree(['a', 'c', 'e'])
+        self.assertEqual(sub.getNewick(with_distances=True),
+                phylo.getSubTree(['a', 'c', 'e']).getNewick(
+                    with_distances=True))
+        self.assertRaises(ValueError, self.tree.getSubTree, ['a', 'q'])
+        self.assertEqual(self.tree.getSubTree(['a', 'b', 'q'],
+                ignore_missing=True).getTipNames(), ['a', 'b'])
+        self.assertRaises(TreeError, self.tree.getSubTree, ['a'])
+        self.assertRaises(TreeError, self.tree.getSubTree, ['q'],
+                ignore_missing=True)
+
+    def test_tipToTipDistances(self):
+        """tipToTipDistances matches PhyloNode.tipToTipDistances"""
+        expected, phylo_tips = self.phylo.tipToTipDistances()
+        got, tips = self.tree.tipToTipDistances()
+        self.assertFloatEqual(got, expected)
+        self.assertEqual([self.tree.getName(t) for t in tips],
+                [t.Name for t in phylo_tips])
+        endpoints = ['e', 'a', 'g']
+        expected, phylo_tips = self.phylo.tipToTipDistances(endpoints)
+        got, tips = self.tree.tipToTipDistances(endpoints)
+        self.assertFloatEqual(got, expected)
+        self.assertEqual([self.tree.getName(t) for t in tips], endpoints)
+        no_lengths = ArrayTree.fromNewick("((a,b),c);")
+        got, tips = no_lengths.tipToTipDistances(default_length=2)
+        self.assertFloatEqual(got, [[0, 4, 6], [4, 0, 6], [6, 6, 0]])
+
+    def test_nbytes(self):
+        """a large tree takes tens of bytes per node"""
+        newick = 't0:0.5'
+        for i in range(1, 1000):
+            newick = '(%s,t%s:0.5):0.1' % (newick, i)
+        tree = ArrayTree.fromNewick(newick + ';')
+        self.assertEqual(len(tree), 1999)
+        self.assertTrue(tree.nbytes < 40 * len(tree))
+
+if __name__ == '__main__':
+    main()
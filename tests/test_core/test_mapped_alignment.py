@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Tests of alignments stored in memory mapped files, checked against
+DenseAlignment.
+"""
+import os
+from tempfile import mktemp
+from numpy import array
+from cogent.core.alignment import DenseAlignment
+from cogent.core.mapped_alignment import MappedDenseAlignment, \
+        write_mapped_alignment, load_mapped_alignment
+from cogent.core.moltype import DNA, PROTEIN
+from cogent.util.unit_test import TestCase, main
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Peter Maxwell"
+__email__ = "pm67nz@gmail.com"
+__status__ = "Production"
+
+class MappedDenseAlignmentTests(TestCase):
+    """Tests of MappedDenseAlignment"""
+
+    def setUp(self):
+        self.filename = mktemp(suffix='.aln')
+        self.seqs = [('a', 'ACGT-ACGTN'), ('b', 'AC-TTACGTA'),
+                ('c', 'RCGTAACG-A'), ('d', 'ACGTAACCTA')]
+        write_mapped_alignment(self.filename, self.seqs, MolType=DNA)
+        self.aln = load_mapped_alignment(self.filename)
+        self.dense = DenseAlignment(self.seqs, MolType=DNA)
+
+    def tearDown(self):
+        del self.aln
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def assertSameAlignment(self, observed, expected):
+        self.assertEqual(observed.Names, expected.Names)
+        self.assertEqual(observed.Alphabet, expected.Alphabet)
+        self.assertEqual(array(observed.ArraySeqs), expected.ArraySeqs)
+
+    def test_load(self):
+        """a loaded alignment should match the DenseAlignment"""
+        self.assertTrue(isinstance(self.aln, MappedDenseAlignment))
+        self.assertEqual(self.aln.MolType, DNA)
+        self.assertEqual(self.aln.SeqLen, 10)
+        self.assertSameAlignment(self.aln, self.dense)
+        self.assertEqual(self.aln.ArrayPositions, self.dense.ArrayPositions)
+        # rewriting a DenseAlignment gives the same file
+        filename = mktemp(suffix='.aln')
+        try:
+            write_mapped_alignment(filename, self.dense)
+            self.assertEqual(open(filename, 'rb').read(),
+                    open(self.filename, 'rb').read())
+        finally:
+            os.remove(filename)
+
+    def test_write_errors(self):
+        """writing should refuse bad sequences"""
+        filename = self.filename
+        self.assertRaises(ValueError, write_mapped_alignment, filename,
+                [('a', 'ACGT'), ('b', 'ACG')], MolType=DNA)
+        self.assertRaises(ValueError, write_mapped_alignment, filename, [],
+                MolType=DNA)
+        self.assertRaises(KeyError, write_mapped_alignment, filename,
+                [('a', 'ACGU')], MolType=DNA)
+        open(filename, 'w').write('>a\nACGT\n')
+        self.assertRaises(ValueError, load_mapped_alignment, filename)
+
+    def test_other_alphabets(self):
+        """protein and the plain DNA alphabet should round trip"""
+        seqs = {'x': 'MKV-W', 'y': 'MRVLW'}
+        write_mapped_alignment(self.filename, seqs, MolType=PROTEIN)
+        aln = load_mapped_alignment(self.filename)
+        self.assertSameAlignment(aln, DenseAlignment(seqs, MolType=PROTEIN))
+        alphabet = DNA.Alphabets.Base
+        write_mapped_alignment(self.filename, {'x': 'ACGT'}, Alphabet=alphabet)
+        self.assertEqual(load_mapped_alignment(self.filename).Alphabet,
+                alphabet)
+
+    def test_slicing(self):
+        """slices should be MappedDenseAlignments of those positions"""
+        for item in [slice(2, 7), slice(1, None, 3), slice(None, None, -1),
+                slice(8, 2, -2), slice(-3, None)]:
+            sliced = self.aln[item]
+            self.assertTrue(isinstance(sliced, MappedDenseAlignment))
+            expected = DenseAlignment([(name, seq[item])
+                    for (name, seq) in self.seqs], MolType=DNA)
+            self.assertSameAlignment(sliced, expected)
+        self.assertSameAlignment(self.aln[2:9][1:5:2],
+                self.dense.getSubAlignment(pos=[3, 5]))
+        self.assertEqual(self.aln[0], list('AARA'))
+        self.assertEqual(self.aln[-1], list('NAAA'))
+        self.assertEqual(self.aln[2:][2], list('-TAA'))
+        self.assertRaises(IndexError, self.aln.__getitem__, 10)
+
+    def test_takeSeqs(self):
+        """takeSeqs should give a MappedDenseAlignment of those seqs"""
+        taken = self.aln.takeSeqs(['c', 'a'])
+        self.assertTrue(isinstance(taken, MappedDenseAlignment))
+        self.assertSameAlignment(taken, self.dense.getSubAlignment([2, 0]))
+        self.assertSameAlignment(taken[3:], self.dense.getSubAlignment([2, 0],
+                pos=range(3, 10)))
+        self.assertEqual(taken.takeSeqs(['a']).Names, ['a'])
+        self.assertEqual(self.aln.takeSeqs(['a', 'b'], negate=True).Names,
+                ['c', 'd'])
+        self.assertEqual(self.aln.takeSeqs([]), {})
+        self.assertRaises(KeyError, taken.takeSeqs, ['b'])
+
+    def test_getSubAlignment(self):
+        """getSubAlignment should match DenseAlignment.getSubAlignment"""
+        view = self.aln.takeSeqs(['d', 'b', 'a'])[1:]
+        dense = self.dense.getSubAlignment([3, 1, 0], pos=range(1, 10))
+        for kw in [{}, {'seqs': [2, 0]}, {'pos': [0, 4, 5]},
+                {'seqs': [1], 'pos': [2, 3], 'invert_seqs': True,
+                'invert_pos': True}]:
+            sub = view.getSubAlignment(**kw)
+            self.assertFalse(isinstance(sub, MappedDenseAlignment))
+            self.assertSameAlignment(sub, dense.getSubAlignment(**kw))
+
+    def test_positions(self):
+        """iterPositions and columnFreqs should read the positions"""
+        expected = [list(col) for col in zip(*[s for (n, s) in self.seqs])]
+        self.assertEqual(list(self.aln.iterPositions()), expected)
+        self.assertEqual(self.aln.Positions, expected)
+        self.assertEqual(list(self.aln.iterPositions([3, 0])),
+                [expected[3], expected[0]])
+        view = self.aln.takeSeqs(['b', 'a'])[::2]
+        self.assertEqual(list(view.iterPositions()),
+                [[col[1], col[0]] for col in expected[::2]])
+        freqs = self.aln.columnFreqs()
+        self.assertEqual(len(freqs), 10)
+        self.assertEqual(freqs[0], {'A': 3, 'R': 1})
+        self.assertEqual(freqs, self.dense.columnFreqs())
+
+    def test_derived(self):
+        """other methods should give ordinary DenseAlignments"""
+        copied = self.aln.copy()
+        self.assertEqual(type(copied), DenseAlignment)
+        self.assertSameAlignment(copied, self.dense)
+
+if __name__ == '__main__':
+    main()
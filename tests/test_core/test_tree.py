@@ -4,11 +4,15 @@
 
 from copy import copy, deepcopy
 from cogent import LoadTree
-from cogent.core.tree import TreeNode, PhyloNode, TreeError
+from cogent.core.tree import TreeNode, PhyloNode, TreeError, TreeBuilder, \
+    make_tip_index
+from cogent.parse.newick import TreeParseError
 from cogent.parse.tree import DndParser
 from cogent.maths.stats.test import correlation
 from cogent.util.unit_test import TestCase, main
-from numpy import array, arange
+from numpy import array, arange, float32, triu_indices, memmap
+from tempfile import mktemp
+import os
 
 __author__ = "Rob Knight"
 __copyright__ = "Copyright 2007-2012, The Cogent Project"
@@ -136,6 +140,22 @@ class TreeNodeTests(TestCase):
         self.assertEqual(u[2].Name, 'z')
         self.assertEqual(len(u), 3)
 
+    def test_fromNewChildren(self):
+        """fromNewChildren should make the same node as the constructor"""
+        for cls in [TreeNode, PhyloNode]:
+            children = [cls(Name=n) for n in 'xyz']
+            u = cls.fromNewChildren(children, Name='abc', NameLoaded=False)
+            expect = cls(Name='abc', NameLoaded=False,
+                    Children=[cls(Name=n) for n in 'xyz'])
+            self.assertEqual(type(u), cls)
+            self.assertEqual((u.Name, u.NameLoaded, u.params),
+                    (expect.Name, expect.NameLoaded, expect.params))
+            self.assertEqual(u.Children, children)
+            for child in children:
+                self.assertTrue(child.Parent is u)
+            self.assertEqual(len(cls.fromNewChildren(Name='a')), 0)
+        self.assertEqual(PhyloNode.fromNewChildren().Length, None)
+
     def test_str(self):
         """TreeNode str should give Newick-style representation"""
         #note: name suppressed if None
@@ -963,6 +983,37 @@ class TreeNodeTests(TestCase):
 
         u = TreeNode('a', Children=[t])
 
+    def test_buildIndex(self):
+        """buildIndex should give the same answers until the tree changes"""
+        nodes, tree = self.TreeNode, self.TreeRoot
+        all_nodes = list(tree.traverse())
+        expected = [[n.lastCommonAncestor(m) for m in all_nodes]
+            for n in all_nodes]
+        tree.buildIndex()
+        self.assertEqual([[n.lastCommonAncestor(m) for m in all_nodes]
+            for n in all_nodes], expected)
+        self.assertTrue(tree.getNodeMatchingName('g') is nodes['g'])
+        self.assertTrue(nodes['c'].getNodeMatchingName('g') is nodes['g'])
+        self.assertRaises(TreeError, nodes['c'].getNodeMatchingName, 'h')
+        # renamed nodes are still found, by searching
+        nodes['g'].Name = 'gg'
+        self.assertTrue(tree.getNodeMatchingName('gg') is nodes['g'])
+        self.assertRaises(TreeError, tree.getNodeMatchingName, 'g')
+        # changes to the tree discard the index
+        new = TreeNode(Name='new')
+        nodes['g'].append(new)
+        self.assertFalse(tree._index.valid)
+        self.assertTrue(new.lastCommonAncestor(nodes['d']) is nodes['c'])
+        self.assertTrue(tree.getNodeMatchingName('new') is new)
+        tree.buildIndex()
+        self.assertTrue(new.lastCommonAncestor(nodes['d']) is nodes['c'])
+        nodes['f'].Parent = nodes['b']
+        self.assertTrue(new.lastCommonAncestor(nodes['d']) is nodes['b'])
+        # unindexed nodes are handled the old way
+        tree.buildIndex()
+        self.assertEqual(new.lastCommonAncestor(TreeNode()), None)
+        self.assertEqual(tree.copy()._index, None)
+
     def test_separation(self):
         """TreeNode separation should return correct number of edges"""
         nodes, tree = self.TreeNode, self.TreeRoot
@@ -1111,6 +1162,40 @@ class TreeNodeTests(TestCase):
         result = self.t.compareBySubsets(self.TreeRoot)
         self.assertEqual(result, 1)
 
+    def test_cladeBits(self):
+        """cladeBits should give each clade as an int bitset"""
+        t = LoadTree(treestring='((a,b)x,(c,(d,e)y)z)root;')
+        index = make_tip_index(t.getTipNames())
+        self.assertEqual(index, {'a':0, 'b':1, 'c':2, 'd':3, 'e':4})
+        self.assertEqual([(n.Name, b) for (n, b) in t.cladeBits(index)],
+            [('a',1), ('b',2), ('x',3), ('c',4), ('d',8), ('e',16),
+            ('y',24), ('z',28), ('root',31)])
+        self.assertEqual(t.subsetBits(index), frozenset([3, 24, 28]))
+        self.assertRaises(KeyError, t.cladeBits, {'a':0})
+
+    def test_splitBits(self):
+        """splitBits should give each unrooted split once, without the
+        first tip"""
+        t = LoadTree(treestring='((a:1,b:2)x:3,(c:4,(d:5,e:6)y:7)z:8)root;')
+        index = make_tip_index(t.getTipNames())
+        self.assertEqual(t.splitBits(index),
+            {30:1.0, 2:2.0, 28:11.0, 4:4.0, 8:5.0, 16:6.0, 24:7.0})
+        u = LoadTree(treestring='(a,b,((c,d),e));')
+        self.assertEqual(u.splitBits(index),
+            {30:None, 2:None, 4:None, 8:None, 16:None, 12:None, 28:None})
+
+    def test_robinsonFoulds(self):
+        """robinsonFoulds should count the splits in only one tree"""
+        t1 = LoadTree(treestring='((a,b),(c,(d,e)));')
+        t2 = LoadTree(treestring='(a,b,((c,d),e));')
+        t3 = LoadTree(treestring='(a,(b,c),(d,e));')
+        self.assertEqual(t1.robinsonFoulds(t1), 0)
+        self.assertEqual(t1.robinsonFoulds(t2), 2)
+        self.assertEqual(t1.robinsonFoulds(t3), 2)
+        self.assertEqual(t1.robinsonFoulds(t2, proportion=True), 0.5)
+        self.assertRaises(TreeError, t1.robinsonFoulds,
+            LoadTree(treestring='(a,b,(c,x));'))
+
 
 class PhyloNodeTests(TestCase):
     """Tests of phylogeny-specific methods."""
@@ -1316,6 +1401,12 @@ class PhyloNodeTests(TestCase):
         obs = self.t.tipToTipDistances(endpoints=nodes)
         self.assertEqual(obs, exp)
 
+        # condensed results follow the tree's tip order
+        dist, tips = self.t.tipToTipDistances(endpoints=['M','H','G'],
+            condensed=True)
+        self.assertEqual([t.Name for t in tips], ['H','G','M'])
+        self.assertEqual(dist, array([2.0,6.7,6.7]))
+
     def test_prune(self):
         """prune should reconstruct correct topology and Lengths of tree."""
         tree = DndParser('((a:3,((c:1):1):1):2);',constructor=PhyloNode)
@@ -1535,6 +1626,26 @@ class Test_tip_tip_distances_array(Test_tip_tip_distances_I, TestCase):
         self.assertEqual(dist, tree_one_child_dist)
         self.assertEqual(tips, tree_one_child_tips)
 
+    def test_output_options(self):
+        """tip_to_tip should give float32, condensed and memmap results"""
+        dist, tips = self.root_std.tipToTipDistances(dtype=float32)
+        self.assertEqual(dist.dtype, float32)
+        self.assertFloatEqual(dist, tree_std_dist)
+        dist, tips = self.root_std.tipToTipDistances(condensed=True)
+        n = len(tips)
+        self.assertEqual(dist, array(tree_std_dist)[triu_indices(n, 1)])
+        filename = mktemp(suffix='.dat')
+        try:
+            dist, tips = self.root_std.tipToTipDistances(filename=filename)
+            self.assertTrue(isinstance(dist, memmap))
+            self.assertEqual(array(dist), tree_std_dist)
+            del dist
+            dist = memmap(filename, dtype=float, mode='r', shape=(n, n))
+            self.assertEqual(array(dist), tree_std_dist)
+            del dist
+        finally:
+            os.remove(filename)
+
 # for use with testing iterative copy method
 def comb_tree(num_leaves):
     """Returns a comb node_class tree."""
@@ -1580,6 +1691,41 @@ class TreeInterfaceForLikelihoodFunction(TestCase):
         tree = self._maketree(nasty)
         tidied = tree.getNewick(with_distances=1)
         self.assertEqual(tidied, nice)
+
+    def test_fast_parser(self):
+        """the fast newick parser should match the original"""
+        from cogent.parse.newick import parse_string, fast_parse_string
+        for treestring in [self.default_newick+';', "(a,b,(c,d)[x]);",
+                "( (A :1.0,'B (b)': 2) [com\nment]pair:3,'longer name''s':4)"
+                "dash_ed;", "((a b,'',\"q\"):1e-3,,c_d);", "a;", ""]:
+            for unmunge in [False, True]:
+                expect = parse_string(treestring, TreeBuilder().createEdge,
+                        underscore_unmunge=unmunge)
+                got = fast_parse_string(treestring,
+                        TreeBuilder().createParsedEdge,
+                        underscore_unmunge=unmunge)
+                self.assertEqual(
+                    [(e.Name, e.NameLoaded, e.params) for e in
+                        got.postorder()],
+                    [(e.Name, e.NameLoaded, e.params) for e in
+                        expect.postorder()])
+                self.assertTrue(got.Parent is None)
+                for edge in got.postorder(include_self=False):
+                    self.assertTrue(edge in edge.Parent.Children)
+        # NHX comments become parameters
+        tree = self._maketree(
+            "((A:1[&&NHX:S=human:B=95],B:2)ab[&&NHX:B=80],C);")
+        self.assertEqual(tree.getNodeMatchingName('A').params,
+            {'length':1.0, 'S':'human', 'B':95.0})
+        self.assertEqual(tree.getNodeMatchingName('ab').params,
+            {'length':None, 'B':80.0})
+        # what it can't parse is passed to the original parser
+        for bad in ["(a,b", "(a,b));", "(a:x,b);", "(a'b,c);"]:
+            self.assertRaises(TreeParseError, fast_parse_string, bad,
+                TreeBuilder().createParsedEdge)
+        self.assertEqual(self._maketree("(a'b,c);").getTipNames(),
+            ["a'b", 'c'])
+        self.assertRaises(TreeParseError, self._maketree, "(a,b")
     
     # Likelihood Function Interface
     
@@ -16,15 +16,18 @@ warnings.filterwarnings("ignore", "Motif probs overspecified")
 warnings.filterwarnings("ignore", "Model not reversible")
 warnings.filterwarnings("ignore", "Ignoring tree edge lengths")
 
-import os
-from numpy import ones, dot
+import os, pickle
+import multiprocessing
+from numpy import ones, dot, log, isfinite
 
-from cogent.evolve import substitution_model, predicate
+from cogent.evolve import substitution_model, predicate, likelihood_tree
 from cogent import DNA, LoadSeqs, LoadTree
 from cogent.util.unit_test import TestCase, main
-from cogent.maths.matrix_exponentiation import PadeExponentiator as expm
+from cogent.util import parallel, shared_array
+from cogent.maths.matrix_exponentiation import PadeExponentiator as expm, \
+        ExponentiatorCache
 from cogent.maths.stats.information_criteria import aic, bic
-from cogent.evolve.models import JTT92
+from cogent.evolve.models import JTT92, HKY85, CNFGTR
 
 Nucleotide = substitution_model.Nucleotide
 MotifChange = predicate.MotifChange
@@ -84,6 +87,10 @@ def getposition(motif1, motif2):
     ndiffs, position = numdiffs_position(motif1, motif2)
     return position
 
+def _leaf_array_file(lht):
+    array = lht.getEdge('Human').input_likelihoods
+    return (os.getpid(), getattr(array, '_shared_path', None))
+
 ##############################################################
 # funcs for testing the monomer weighted substitution matrices
 _root_probs = lambda x: dict([(n1+n2, p1*p2) \
@@ -396,6 +403,220 @@ motif  mprobs
         lf.setAlignment(self.data)
         result = lf.reconstructAncestralSeqs()
     
+    def test_batched_bins(self):
+        """stacking the bins into one calculation shouldn't change results"""
+        results = []
+        for batched in [False, True]:
+            lf = self.submodel.makeLikelihoodFunction(self.tree,
+                    bins=['low', 'high'], batched=batched)
+            lf.setParamRule('beta', bin='low', value=0.1)
+            lf.setParamRule('beta', bin='high', value=10.0)
+            lf.setParamRule('bprobs', value=[0.3, 0.7])
+            lf.setAlignment(self.data)
+            results.append((lf.getLogLikelihood(),
+                    lf.getParamValue('lh', bin='high'),
+                    lf.getBinProbs().array,
+                    lf.reconstructAncestralSeqs()['edge.0'].array))
+        for (unbatched, batched) in zip(*results):
+            self.assertFloatEqual(batched, unbatched)
+        
+        for sites_independent in [True, False]:
+            lf = self.submodel.makeLikelihoodFunction(self.tree, bins=2,
+                    sites_independent=sites_independent)
+            lf.setAlignment(self.data)
+            lnL = lf.getLogLikelihood()
+            lf = self.submodel.makeLikelihoodFunction(self.tree, bins=2,
+                    sites_independent=sites_independent, batched=True)
+            lf.setAlignment(self.data)
+            self.assertFloatEqual(lf.getLogLikelihood(), lnL)
+    
+    def _singleVsDouble(self, submodel, tree, aln, **kw):
+        results = []
+        for precision in ['double', 'single']:
+            lf = submodel.makeLikelihoodFunction(tree, precision=precision,
+                    **kw)
+            lf.setAlignment(aln)
+            results.append(lf.getLogLikelihood())
+        return results
+    
+    def test_single_precision(self):
+        """float32 pruning should agree with double to ~float32 accuracy"""
+        results = []
+        for precision in ['double', 'single']:
+            lf = self.submodel.makeLikelihoodFunction(self.tree,
+                    bins=['low', 'high'], precision=precision)
+            lf.setParamRule('beta', bin='low', value=0.1)
+            lf.setParamRule('beta', bin='high', value=10.0)
+            lf.setParamRule('bprobs', value=[0.3, 0.7])
+            lf.setAlignment(self.data)
+            results.append((lf.getLogLikelihood(),
+                    lf.getParamValue('lh', bin='high'),
+                    lf.getBinProbs().array,
+                    lf.reconstructAncestralSeqs()['edge.0'].array))
+        for (double, single) in zip(*results):
+            self.assertFloatEqual(single, double, eps=1e-5)
+        
+        self.assertRaises(ValueError, self.submodel.makeLikelihoodFunction,
+                self.tree, precision='half')
+        self.assertRaises(ValueError, self.submodel.makeLikelihoodFunction,
+                self.tree, bins=2, batched=True, precision='single')
+    
+    def test_single_precision_rescaling(self):
+        """float32 pruning should agree with double when rows get rescaled"""
+        cases = [
+            (self.submodel, self.data, {'bins': 2}),
+            (HKY85(), self.data, {}),
+            (HKY85(ordered_param='rate', distribution='gamma'), self.data,
+                    {'bins': 4}),
+            (JTT92(), self.data.getTranslation(), {}),
+            (CNFGTR(), self.data, {})]
+        # With a threshold above 1 every row of every edge gets rescaled
+        edge_type = likelihood_tree._LikelihoodTreeEdge
+        threshold = edge_type.SCALING_THRESHOLD
+        edge_type.SCALING_THRESHOLD = 2.0
+        try:
+            for (submodel, aln, kw) in cases:
+                (double, single) = self._singleVsDouble(
+                        submodel, self.tree, aln, **kw)
+                self.assertFloatEqual(single, double, eps=1e-5)
+        finally:
+            edge_type.SCALING_THRESHOLD = threshold
+        
+        # A ladder tree of 100 long branches makes every site's likelihood
+        # far below the float32 range.
+        names = ['s%s' % i for i in range(100)]
+        treestring = names[0]
+        for name in names[1:]:
+            treestring = '(%s:2.0,%s:2.0)' % (treestring, name)
+        tree = LoadTree(treestring=treestring + ';')
+        submodel = HKY85()
+        lf = submodel.makeLikelihoodFunction(tree)
+        lf.setParamRule('kappa', value=4.0)
+        lf.setAlignment(LoadSeqs(data=[(n, 'ACGT') for n in names],
+                moltype=DNA))
+        aln = lf.simulateAlignment(50, seed=1)
+        (double, single) = self._singleVsDouble(submodel, tree, aln)
+        self.assertTrue(double < 50 * log(2.0 ** -149))
+        self.assertFloatEqual(single, double, eps=1e-5)
+        # which needed the rescaling
+        edge_type.SCALING_THRESHOLD = 0.0
+        try:
+            (double, single) = self._singleVsDouble(submodel, tree, aln)
+        finally:
+            edge_type.SCALING_THRESHOLD = threshold
+        self.assertFalse(isfinite(single))
+    
+    def test_shared_memory_lht(self):
+        """a likelihood tree in shared memory pickles without its arrays"""
+        lf = self._makeLikelihoodFunction()
+        self._setLengthsAndBetas(lf)
+        lnL = lf.getLogLikelihood()
+        lht = lf.getParamValue('lht')
+        size = len(pickle.dumps(lht))
+        lht.shareMemory()
+        data = pickle.dumps(lht)
+        self.assertTrue(len(data) < size)
+        copy = pickle.loads(data)
+        names = [e.Name for e in self.tree.getEdgeVector(include_root=False)]
+        psubs = dict((n, lf.getPsubForEdge(n).array) for n in names)
+        Qs = dict((n, lf.getRateMatrixForEdge(n).array) for n in names)
+        mprobs = lf.getMotifProbs().array
+        (lhs, derivs) = copy.getDistanceDerivatives(psubs, Qs, mprobs)
+        self.assertFloatEqual(copy.getLogSumAcrossSites(lhs), lnL)
+    
+    def test_shared_memory_lht_pool(self):
+        """pool workers sent a likelihood tree attach to its arrays"""
+        with parallel.PersistentMultiprocessingParallelContext(2) as context:
+            with parallel.parallel_context(context):
+                lf = self._makeLikelihoodFunction()
+                lht = lf.getParamValue('lht')
+                leaf = lht.getEdge('Human')
+                self.assertTrue(isinstance(leaf.input_likelihoods,
+                        shared_array.SharedArray))
+                results = parallel.map(_leaf_array_file, [lht, lht])
+        for (pid, path) in results:
+            self.assertNotEqual(pid, os.getpid())
+            self.assertEqual(path, leaf.input_likelihoods._shared_path)
+        # not without a pool
+        lht = self._makeLikelihoodFunction().getParamValue('lht')
+        self.assertFalse(isinstance(lht.getEdge('Human').input_likelihoods,
+                shared_array.SharedArray))
+    
+    def test_column_processes(self):
+        """columns split between forked processes give the same lnL"""
+        lf = self._makeLikelihoodFunction()
+        calc = lf.makeCalculator()
+        x = calc.getValueArray()
+        self.assertTrue(len(x) > 5)
+        xs = [x]
+        for i in range(len(x)):
+            x2 = list(x)
+            x2[i] += 0.05
+            xs.append(x2)
+        xs.append(x)  # an undo of the last change
+        expected = [calc(x) for x in xs]
+        self.assertEqual(calc.column_comm, None)
+        lf.setupParallelContext(column_processes=3)
+        calc = lf.makeCalculator()
+        try:
+            self.assertTrue(calc.column_comm is not None)
+            self.assertFloatEqual([calc(x) for x in xs], expected)
+        finally:
+            calc.close()
+        # and once closed, without them
+        self.assertEqual(multiprocessing.active_children(), [])
+        self.assertFloatEqual([calc(x) for x in xs[1:]], expected[1:])
+        
+        # only when asked for, and never from daemonic pool workers
+        def columns_split(column_processes):
+            lf = self._makeLikelihoodFunction()
+            self._setLengthsAndBetas(lf)
+            lf.setupParallelContext(column_processes=column_processes)
+            calc = lf.makeCalculator()
+            forked = calc.column_comm is not None
+            calc.close()
+            return forked
+        pool = parallel.MultiprocessingParallelContext(2)
+        with parallel.parallel_context(pool):
+            self.assertEqual(columns_split(None), False)
+        self.assertEqual(columns_split(2), True)
+        self.assertEqual(list(pool.imap(columns_split, [2, 2])),
+                [False, False])
+        
+        # calculators made for one-off uses stop their workers
+        lf = self._makeLikelihoodFunction()
+        self._setLengthsAndBetas(lf)
+        lf.setupParallelContext(column_processes=2)
+        lf.measureEvalsPerSecond(time_limit=0.05)
+        self.assertEqual(multiprocessing.active_children(), [])
+    
+    def test_expm_cache(self):
+        """edges share one eigendecomposition, and revisited lengths hit"""
+        lf = self._makeLikelihoodFunction()
+        lf.setParamRule('beta', is_constant=True)
+        calc = lf.makeCalculator()
+        cache = lf.getParamValue('exp')
+        self.assertEqual(cache.exponentiator_misses, 1)
+        x = calc.getValueArray()
+        for sweep in range(2):
+            for i in range(len(x)):
+                x2 = list(x)
+                x2[i] += 0.1
+                calc(x2)
+            if sweep == 0:
+                misses = cache.psub_misses
+        self.assertEqual(cache.psub_misses, misses)
+        self.assertEqual(cache.exponentiator_misses, 1)
+        self.assertTrue(cache.psub_hits > 0)
+        # the cache size is an option of the likelihood function
+        lf = self.submodel.makeLikelihoodFunction(self.tree,
+                expm_cache_bytes=2**20)
+        self.assertEqual(lf.getParamValue('exp').max_bytes, 2**20)
+        lf = self.submodel.makeLikelihoodFunction(self.tree,
+                expm_cache_bytes=0)
+        self.assertFalse(isinstance(lf.getParamValue('exp'),
+                ExponentiatorCache))
+    
     def test_likely_ancestral(self):
         """excercising the most likely ancestral sequences"""
         likelihood_function = self._makeLikelihoodFunction()
@@ -623,6 +844,63 @@ motif    mprobs
         lf.setAlignment(self.data)
         self.assertRaises(Exception, lf.getRateMatrixForEdge, 'NineBande')
     
+    def _numericGradient(self, calc, delta=1e-5):
+        x = calc.getValueArray()
+        result = []
+        for i in range(len(x)):
+            (xa, xb) = (x[:], x[:])
+            xa[i] += delta
+            xb[i] -= delta
+            result.append((calc(xa) - calc(xb)) / (2*delta))
+        calc(x)
+        return result
+    
+    def test_analytic_gradient(self):
+        """analytic lnL gradient should match finite differences"""
+        lf = self._makeLikelihoodFunction()
+        self.assertTrue(lf.getAnalyticGradient() is not None)
+        calc = lf.makeCalculator()
+        self.assertFloatEqual(calc.gradient(calc.getValueArray()),
+                self._numericGradient(calc), eps=1e-4)
+        # with rate heterogeneity, some of it analytic via the bin rates
+        lf = self.submodel.makeLikelihoodFunction(self.tree, bins=2)
+        lf.setParamRule('bprobs', init=[0.3, 0.7])
+        lf.setAlignment(self.data)
+        calc = lf.makeCalculator()
+        self.assertFloatEqual(calc.gradient(calc.getValueArray()),
+                self._numericGradient(calc), eps=1e-4)
+    
+    def test_gradient_evaluations(self):
+        """finite differences are evaluated with the function supplied"""
+        lf = self._makeLikelihoodFunction()
+        calc = lf.makeCalculator()
+        x = calc.getValueArray()
+        calls = []
+        def f(values):
+            calls.append(values)
+            return calc(values)
+        numeric = len(calc.opt_pars) - len(calc.analytic_gradient(calc))
+        self.assertTrue(numeric > 0)
+        self.assertFloatEqual(calc.gradient(x, f), calc.gradient(x))
+        self.assertEqual(len(calls), numeric)
+        self.assertEqual(list(calc.getValueArray()), list(x))
+    
+    def test_no_analytic_gradient(self):
+        """discrete Markov models have no analytic gradient"""
+        dm = substitution_model.DiscreteSubstitutionModel(DNA.Alphabet)
+        lf = dm.makeLikelihoodFunction(self.tree)
+        lf.setAlignment(self.data)
+        self.assertEqual(lf.getAnalyticGradient(), None)
+    
+    def test_optimise_with_gradient(self):
+        """gradient optimisation should reach the same optimum"""
+        lf = self._makeLikelihoodFunction()
+        lf.optimise(local=True, show_progress=False)
+        expect = lf.getLogLikelihood()
+        lf = self._makeLikelihoodFunction()
+        lf.optimise(local=True, use_gradient=True, show_progress=False)
+        self.assertFloatEqual(lf.getLogLikelihood(), expect, eps=1e-4)
+    
     def test_make_discrete_markov(self):
         """lf ignores tree lengths if a discrete Markov model"""
         t = LoadTree(treestring='(a:0.4,b:0.3,(c:0.15,d:0.2)edge.0:0.1)root;')
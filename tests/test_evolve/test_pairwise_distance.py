@@ -9,7 +9,7 @@ numpy.seterr(invalid='ignore')
 from cogent.util.unit_test import TestCase, main
 from cogent import LoadSeqs, DNA, RNA, PROTEIN
 from cogent.evolve.pairwise_distance import get_moltype_index_array, \
-    seq_to_indices, _fill_diversity_matrix, \
+    seq_to_indices, _fill_diversity_matrix, get_diversity_matrices, \
     _jc69_from_matrix, JC69Pair, _tn93_from_matrix, TN93Pair, LogDetPair, \
     ParalinearPair
 from cogent.evolve._pairwise_distance import \
@@ -350,6 +350,86 @@ class TestPair(TestCase):
                 paralinear_calc.Dists[1,1], eps=1e-3)
         self.assertFloatEqual(paralinear_calc.Variances[1,1], 
                 logdet_calc.Variances[1,1], eps=1e-3)
+    
+    def test_all_pairs_vs_one_pair(self):
+        """the all pairs calculation matches the one pair functions"""
+        data = [('s1', 'ACGTACGTACGTTAGC'),
+                ('s2', 'GTGTACGTACGTAAGC'),
+                ('s3', 'ACGTAGGTTCGT-AGC'),
+                ('s4', 'ACGTACGTACGTTAGC'),
+                ('s5', 'TTGAACG-AGGTCAGN'),
+                ('s6', '----------------')]
+        aln = LoadSeqs(data=data, moltype=DNA)
+        for calc in [JC69Pair(DNA, alignment=aln),
+                TN93Pair(DNA, alignment=aln),
+                LogDetPair(moltype=DNA, alignment=aln),
+                LogDetPair(moltype=DNA, alignment=aln,
+                    use_tk_adjustment=False),
+                ParalinearPair(moltype=DNA, alignment=aln)]:
+            calc.run(show_progress=False, block_size=4)
+            dists = calc.getPairwiseDistances()
+            array = calc.getDistanceArray()
+            for (i, name_1) in enumerate(calc.Names):
+                for (j, name_2) in enumerate(calc.Names):
+                    if i == j:
+                        continue
+                    matrix = numpy.zeros((4, 4), float)
+                    _fill_diversity_matrix(matrix, calc.IndexedSeqs[i],
+                            calc.IndexedSeqs[j])
+                    expect = calc.func(matrix, *calc._func_args)
+                    for (stat, value) in enumerate(expect):
+                        got = calc._get_stat(stat, i, j)
+                        if value is None:
+                            self.assertEqual(got, None)
+                        else:
+                            self.assertFloatEqual(got, value)
+                    self.assertEqual(dists[name_1, name_2], expect[2])
+                    if expect[2] is None:
+                        self.assertTrue(numpy.isnan(array[i, j]))
+                    else:
+                        self.assertFloatEqual(array[i, j], expect[2])
+    
+    def test_stats_on_request(self):
+        """only distances are kept by run, and a func alone is enough"""
+        class OnlyFuncPair(JC69Pair):
+            def __init__(self, *args, **kwargs):
+                super(OnlyFuncPair, self).__init__(*args, **kwargs)
+                self.batch_func = None
+        
+        data = [('s1', 'ACGTACGTACGTTAGC'),
+                ('s2', 'GTGTACGTACGTAAGC'),
+                ('s3', 'ACGTAGGTTCGT-AGC'),
+                ('s4', '----------------')]
+        aln = LoadSeqs(data=data, moltype=DNA)
+        expect = JC69Pair(DNA, alignment=aln)
+        expect.run(show_progress=False)
+        calc = OnlyFuncPair(DNA, alignment=aln)
+        calc.run(show_progress=False, block_size=3)
+        self.assertEqual(list(calc._stats.keys()), [2])
+        self.assertEqual(calc.getPairwiseDistances(),
+                expect.getPairwiseDistances())
+        self.assertEqual(str(calc.Lengths), str(expect.Lengths))
+        self.assertEqual(sorted(calc._stats.keys()), [0, 1, 2, 3])
+        self.assertEqual(str(calc.Variances), str(expect.Variances))
+    
+    def test_diversity_matrices_in_blocks(self):
+        """diversity matrices summed over blocks of positions are the same"""
+        aln = LoadSeqs(data=[('s1', 'ACGTACGTAC-N'), ('s2', 'GTGTACGTTCGT'),
+                ('s3', 'ACCTAGGTTCGA')], moltype=DNA)
+        calc = JC69Pair(DNA, alignment=aln)
+        indexed_seqs = numpy.where(calc.IndexedSeqs < 0, 4, calc.IndexedSeqs)
+        expect = numpy.zeros((3, 3, 4, 4), float)
+        for i in range(3):
+            for j in range(3):
+                _fill_diversity_matrix(expect[i, j], calc.IndexedSeqs[i],
+                        calc.IndexedSeqs[j])
+        for block_length in [None, 1, 5, 12, 100]:
+            matrices = get_diversity_matrices(indexed_seqs, 4, 0, 3,
+                    block_length=block_length)
+            self.assertEqual(matrices, expect)
+            matrices = get_diversity_matrices(indexed_seqs, 4, 1, 2,
+                    block_length=block_length)
+            self.assertEqual(matrices, expect[1:2, 1:])
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+"""Unit tests for the matrix exponentiators and their cache.
+"""
+import numpy
+from cogent.util.unit_test import TestCase, main
+from cogent.maths.matrix_exponentiation import FastExponentiator, \
+        PadeExponentiator, ExponentiatorCache
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell", "Gavin Huttley"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+def rate_matrix(kappa):
+    Q = numpy.ones([4, 4])
+    Q[0, 2] = Q[2, 0] = Q[1, 3] = Q[3, 1] = kappa
+    Q -= numpy.diag(Q.sum(axis=1))
+    return Q / 3.0
+
+class StackedTests(TestCase):
+    def test_stacked(self):
+        """stacked P(t) are the same as one at a time"""
+        Q = rate_matrix(2.0)
+        ts = [0.0, 0.1, 0.5, 2.0]
+        for expm in [FastExponentiator(Q), PadeExponentiator(Q)]:
+            Ps = expm.stacked(ts)
+            self.assertEqual(Ps.shape, (4, 4, 4))
+            for (t, P) in zip(ts, Ps):
+                self.assertFloatEqual(P, expm(t))
+    
+
+class ExponentiatorCacheTests(TestCase):
+    def test_same_results(self):
+        """cached P(t) are those of the wrapped exponentiator"""
+        cache = ExponentiatorCache(FastExponentiator)
+        Q = rate_matrix(2.0)
+        for t in [0.0, 0.1, 1.5]:
+            self.assertFloatEqual(cache(Q)(t), PadeExponentiator(Q)(t))
+    
+    def test_counts(self):
+        """one eigendecomposition per Q, one calculation per (Q, t)"""
+        cache = ExponentiatorCache(FastExponentiator)
+        for kappa in [2.0, 3.0, 2.0]:
+            expm = cache(rate_matrix(kappa))
+            for t in [0.1, 0.2, 0.1]:
+                expm(t)
+        stats = cache.getStats()
+        self.assertEqual(stats['exponentiator_misses'], 2)
+        self.assertEqual(stats['psub_misses'], 4)
+        self.assertEqual(stats['psub_hits'], 5)
+    
+    def test_hint(self):
+        """the hinted lengths are calculated along with the first miss"""
+        cache = ExponentiatorCache(FastExponentiator)
+        first = cache(rate_matrix(2.0))
+        for (slot, t) in enumerate([0.1, 0.2, 0.3]):
+            first(t, slot)
+        first(0.25, 1)
+        hint = sorted(set(first.ts.values()))
+        self.assertEqual(hint, [0.1, 0.25, 0.3])
+        expm = cache(rate_matrix(3.0), hint)
+        misses = cache.psub_misses
+        for t in hint:
+            self.assertFloatEqual(expm(t), FastExponentiator(expm.Q)(t))
+        self.assertEqual(cache.psub_misses, misses + 1)
+    
+    def test_shared_results_read_only(self):
+        """returned arrays can't be changed by one user for another"""
+        cache = ExponentiatorCache(FastExponentiator)
+        P = cache(rate_matrix(2.0))(0.5)
+        self.assertRaises(ValueError, P.__setitem__, (0, 0), 1.0)
+    
+    def test_memory_cap(self):
+        """least recently used entries go to keep under max_bytes"""
+        cache = ExponentiatorCache(FastExponentiator, max_bytes=1000)
+        expm = cache(rate_matrix(2.0))
+        for i in range(20):
+            expm(i / 10.0)
+        self.assertTrue(0 < cache.nbytes <= 1000)
+        misses = cache.psub_misses
+        expm(1.9)
+        self.assertEqual(cache.psub_misses, misses)
+        expm(0.0)
+        self.assertEqual(cache.psub_misses, misses + 1)
+        cache.clear()
+        self.assertEqual(cache.nbytes, 0)
+    
+
+if __name__ == '__main__':
+    main()
@@ -72,6 +72,13 @@ class OptimiserTestCase(TestCase):
         # Global minimum not the nearest one
         self._test_optimisation(local=True, target=2)
     
+    def test_local_gradient(self):
+        # Supplying a gradient uses the quasi-Newton local optimiser
+        gradient = lambda x, f: -0.1 * (12*x**3 + 24*x**2 - 96*x)
+        self._test_optimisation(local=True, target=2, gradient=gradient)
+        self._test_optimisation(local=True, target=2, gradient=gradient,
+                bounds=([0.0],[10.0]), xinit=8.0)
+    
     def test_limited(self):
         self.assertRaises(MaximumEvaluationsReached, 
             self._test_optimisation, max_evaluations=5)
@@ -98,6 +105,31 @@ class OptimiserTestCase(TestCase):
         if os.path.exists(filename):
             os.remove(filename)
     
+    def test_resume_local(self):
+        """an interrupted local optimisation resumes from its checkpoint"""
+        filename = 'checkpoint_local.tmp.pickle'
+        if os.path.exists(filename):
+            os.remove(filename)
+        (f, last, evals) = MakeF()
+        def interrupted_f(x):
+            if evals[0] >= 20:
+                raise KeyboardInterrupt
+            return f(x)
+        try:
+            self.assertRaises(KeyboardInterrupt, quiet, maximise,
+                    interrupted_f, [1.0], ([-10, 10]), local=True,
+                    filename=filename, interval=0)
+            self.assertTrue(os.path.exists(filename))
+            (f, last, evals) = MakeF()
+            (x, e) = quiet(maximise, f, [1.0], ([-10, 10]), local=True,
+                    filename=filename, interval=0, return_eval_count=True)
+            self.assertFloatEqual(x, [2.0], eps=1e-4)
+            # evaluations before the interruption still count
+            self.assertTrue(e > evals[0])
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+    
 
 if __name__ == '__main__':
     main()
@@ -1,15 +1,16 @@
 #! /usr/bin/env python
-import unittest, os
+import unittest, os, tempfile
 import warnings
 from numpy import log, exp
 warnings.filterwarnings('ignore', 'Not using MPI as mpi4py not found')
 
-from cogent.phylo.distance import EstimateDistances
-from cogent.phylo.nj import nj, gnj
+from cogent.phylo.distance import EstimateDistances, PairResultStore
+from cogent.phylo.nj import nj, gnj, nj_from_array
+from cogent.phylo.util import distanceDictTo2D
 from cogent.phylo.least_squares import wls
 from cogent import LoadSeqs, LoadTree
 from cogent.phylo.tree_collection import LogLikelihoodScoredTreeCollection,\
-    WeightedTreeCollection, LoadTrees, ScoredTreeCollection
+    WeightedTreeCollection, LoadTrees, ScoredTreeCollection, iterTrees
 from cogent.evolve.models import JC69, HKY85, F81
 from cogent.phylo.consensus import majorityRule, weightedMajorityRule, \
         getSplits, getTree
@@ -130,6 +131,25 @@ class ConsensusTests(unittest.TestCase):
         self.assertEqual(len(outtrees), 1)
         self.assertTrue(outtrees[0].sameTopology(Tree("(c,d,(a,b));")))
 
+    def test_iterTrees(self):
+        """iterTrees should stream trees from a file, for consensus"""
+        from io import StringIO
+        from cogent.parse.newick import newick_statements
+        text = ''.join([str(t)+'\n' for t in self.rooted_trees])
+        text += "('x;y',[;]z);"
+        # splitting the text into small chunks shouldn't change the trees
+        self.assertEqual(list(newick_statements(StringIO(text), 7)),
+            list(newick_statements([text])))
+        trees = list(iterTrees(StringIO(text)))
+        self.assertEqual(len(trees), len(self.rooted_trees)+1)
+        self.assertEqual(trees[-1].getTipNames(), ['x;y', 'z'])
+        for (got, expect) in zip(trees, self.rooted_trees):
+            self.assertTrue(got.sameTopology(expect))
+        outtrees = majorityRule(iterTrees(StringIO(text[:text.rindex('(')])),
+            strict=True)
+        self.assertEqual(len(outtrees), 1)
+        self.assertTrue(outtrees[0].sameTopology(Tree("(c,d,(a,b));")))
+
     def test_get_tree_get_splits(self):
         """getTree should provide a reciprocal map of getSplits"""
         tree = LoadTree(filename=os.path.join(data_path,"murphy.tree"))
@@ -229,6 +249,18 @@ class TreeReconstructionTests(unittest.TestCase):
         reconstructed = nj(self.dists)
         self.assertTreeDistancesEqual(self.tree, reconstructed)
         
+    def test_nj_from_array(self):
+        """nj_from_array should agree with gnj on a larger tree"""
+        tree = LoadTree(treestring='(((a:1,b:2):3,(c:2,d:1):1):2,'
+                '((e:4,f:1):1,(g:2,(h:1,i:3):2):1):1,((j:3,k:1):2,l:5):1)')
+        dists = tree.getDistances()
+        (names, d) = distanceDictTo2D(dists)
+        reconstructed = nj_from_array(names, d)
+        self.assertTreeDistancesEqual(tree, reconstructed)
+        ((score, gnj_tree),) = gnj(dists, keep=1)
+        self.assertTrue(reconstructed.sameTopology(gnj_tree))
+        self.assertRaises(ValueError, nj_from_array, names[:2], d[:2,:2])
+        
     def test_gnj(self):
         """testing gnj"""
         results = gnj(self.dists, keep=1)
@@ -410,6 +442,75 @@ class DistancesTests(unittest.TestCase):
         for pair in expect:
             for param in expect[pair]:
                 self.assertAlmostEqual(got[pair][param], expect[pair][param])
+    
+    def test_EstimateDistances_store(self):
+        """only pairs missing from the store are estimated"""
+        filename = tempfile.mktemp(suffix='.sqlite')
+        fitted = []
+        def count_fits(lf):
+            fitted.append(tuple(lf.tree.getTipNames()))
+            return lf
+        try:
+            al = self.al.takeSeqs(['a', 'b', 'c'])
+            d = EstimateDistances(al, HKY85(), est_params=['kappa'],
+                    modify_lf=count_fits, store=filename)
+            d.run()
+            self.assertEqual(len(fitted), 3)
+            first = d.getAllParamValues()
+            
+            # a new sequence, and the old ones renamed and reordered
+            al = LoadSeqs(data={'z':'GTACGTACGTTC', 'e':'GTACGTACTGGT',
+                    'y':'GTACGTACGATC', 'x':'GTACGTACGTAC'})
+            d = EstimateDistances(al, HKY85(), est_params=['kappa'],
+                    modify_lf=count_fits, store=filename)
+            d.run()
+            self.assertEqual(len(fitted), 6)
+            self.assertEqual(len(d._store), 6)
+            got = d.getAllParamValues()
+            self.assertEqual(len(got), 6)
+            renamed = {'a':'y', 'b':'x', 'c':'z'}
+            for ((n1, n2), value) in list(first.items()):
+                key = (renamed[n1], renamed[n2])
+                if key not in got:
+                    key = key[::-1]
+                self.assertEqual(got[key], value)
+            
+            # different settings aren't reused
+            d = EstimateDistances(al, JC69(), modify_lf=count_fits,
+                    store=filename)
+            d.run()
+            self.assertEqual(len(fitted), 12)
+            
+            # triples, with the per sequence lengths kept with the right ones
+            d = EstimateDistances(al, JC69(), threeway=True, store=filename)
+            d.run()
+            expect = d.getAllParamValues()
+            d = EstimateDistances(al, JC69(), threeway=True, store=filename)
+            d._doset = None
+            d.run()
+            self.assertEqual(d.getAllParamValues(), expect)
+        finally:
+            remove_files([filename], error_on_missing=False)
+    
+    def test_PairResultStore_blocks(self):
+        """results are committed a block at a time, and at the end"""
+        filename = tempfile.mktemp(suffix='.sqlite')
+        try:
+            store = PairResultStore(filename, block_size=2)
+            reader = PairResultStore(filename)
+            names = ('a', 'b')
+            for (i, seqs) in enumerate([['s1', 's2'], ['s1', 's3'],
+                    ['s2', 's3']]):
+                store.put('settings', seqs, names, {'length': i})
+            self.assertEqual(len(store), 3)
+            self.assertEqual(len(reader), 2)
+            store.close()
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(reader.get('settings', ['s3', 's2'], names),
+                    {'length': 2})
+            reader.close()
+        finally:
+            remove_files([filename], error_on_missing=False)
 
 if __name__ == '__main__':
     unittest.main()
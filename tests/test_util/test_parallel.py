@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+"""Unit tests for the parallel contexts.
+"""
+import os, pickle
+from functools import partial
+from cogent.util.unit_test import TestCase, main
+from cogent.util import parallel
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell", "Gavin Huttley"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+def get_pid(x):
+    return os.getpid()
+
+class PersistentPoolTests(TestCase):
+    def setUp(self):
+        self.context = parallel.PersistentMultiprocessingParallelContext(2)
+
+    def tearDown(self):
+        self.context.close()
+
+    def _map(self, f, s):
+        with parallel.parallel_context(self.context):
+            return parallel.map(f, s)
+
+    def test_reuses_workers(self):
+        """one set of worker processes serves many map calls"""
+        pids = set()
+        for i in range(5):
+            pids.update(self._map(get_pid, list(range(10))))
+        self.assertTrue(os.getpid() not in pids)
+        self.assertTrue(len(pids) <= 2)
+        self.assertEqual(self.context.restarts, 0)
+
+    def test_local_functions(self):
+        """functions defined in a local scope can be mapped"""
+        for n in [2, 3]:
+            def f(x):
+                return x * n
+            self.assertEqual(self._map(f, list(range(6))),
+                    [x * n for x in range(6)])
+            # same function again doesn't need new workers
+            restarts = self.context.restarts
+            self.assertEqual(self._map(f, [1, 2]), [n, 2*n])
+            self.assertEqual(self.context.restarts, restarts)
+
+    def test_shipped_functions(self):
+        """each function is written once, tasks only name it, and workers
+        only keep the recent ones"""
+        for f in [abs, os.path.join]:
+            self.assertTrue(self.context._shippable(f) is f)
+        for n in range(5):
+            f = lambda x, n=n: x + n
+            self.assertEqual(self._map(f, [1, 2]), [1+n, 2+n])
+        if parallel.cloudpickle is not None:
+            self.assertEqual(self.context.restarts, 0)
+        big = partial(max, *range(10000))
+        shipped = self.context._shippable(big)
+        self.assertTrue(len(pickle.dumps(shipped)) < 1000)
+        self.assertEqual(self._map(big, [1, 10**5]), [9999, 10**5])
+        
+        limit = parallel._MAX_WORKER_FUNCTIONS
+        fs = [self.context._shippable(partial(max, i))
+                for i in range(limit + 5)]
+        self.assertEqual(len(set(f.key for f in fs)), len(fs))
+        self.assertEqual(len(self.context._shipped), limit)
+        # this process standing in for a worker
+        cache = parallel._WORKER_FUNCTIONS
+        cache.clear()
+        self.assertEqual([f(3) for f in fs[-5:]], [limit, limit+1,
+                limit+2, limit+3, limit+4])
+        self.assertEqual(list(cache), [f.key for f in fs[-5:]])
+        # a hit makes it the most recent
+        fs[-5](0)
+        self.assertEqual(list(cache)[-1], fs[-5].key)
+        paths = list(self.context._shipped.values())
+        self.context.close()
+        self.assertFalse([p for p in paths if os.path.exists(p)])
+    
+    def test_stats(self):
+        """each map call is timed"""
+        self._map(abs, [-1, -2, -3])
+        self._map(abs, [-4, -5])
+        stats = self.context.getStats()
+        self.assertEqual([s['tasks'] for s in stats], [3, 2])
+        for s in stats:
+            self.assertTrue(s['wall_time'] >= s['overhead'] >= 0.0)
+
+    def test_close(self):
+        """a closed context starts new workers when next used"""
+        self._map(abs, [-1])
+        self.context.close()
+        self.assertEqual(self._map(abs, [-1, -2]), [1, 2])
+
+
+if __name__ == '__main__':
+    main()
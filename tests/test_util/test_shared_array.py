@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""Unit tests for arrays in shared memory.
+"""
+import os, pickle, gc
+import numpy
+from cogent.util.unit_test import TestCase, main
+from cogent.util.shared_array import share, attach, SharedArray
+
+__author__ = "Peter Maxwell"
+__copyright__ = "Copyright 2007-2012, The Cogent Project"
+__credits__ = ["Peter Maxwell", "Gavin Huttley"]
+__license__ = "GPL"
+__version__ = "1.5.3-dev"
+__maintainer__ = "Gavin Huttley"
+__email__ = "gavin.huttley@anu.edu.au"
+__status__ = "Production"
+
+class SharedArrayTests(TestCase):
+    def setUp(self):
+        self.array = numpy.arange(20000.0).reshape([100, 200])
+
+    def test_pickle(self):
+        """pickles as a reference to the shared data, not a copy"""
+        shared = share(self.array)
+        data = pickle.dumps(shared)
+        self.assertTrue(len(data) < 1000)
+        copy = pickle.loads(data)
+        self.assertTrue(isinstance(copy, SharedArray))
+        self.assertEqual(copy, self.array)
+        # and again, as from one worker to another
+        self.assertEqual(pickle.loads(pickle.dumps(copy)), self.array)
+
+    def test_attach(self):
+        """attach() maps the data of a shared array by its file"""
+        shared = share(self.array)
+        copy = attach(shared._shared_path, shared.dtype.str, shared.shape)
+        self.assertTrue(isinstance(copy, SharedArray))
+        self.assertEqual(copy, self.array)
+        shared[1, 1] = -1.0
+        shared.flush()
+        self.assertEqual(copy[1, 1], -1.0)
+
+    def test_views(self):
+        """non-contiguous views pickle as ordinary arrays"""
+        shared = share(self.array)
+        view = shared[:, ::2]
+        self.assertEqual(pickle.loads(pickle.dumps(view)), self.array[:, ::2])
+        self.assertFalse(isinstance(shared.sum(axis=0), SharedArray))
+
+    def test_copy_on_write(self):
+        """changes in an attached copy are private"""
+        shared = share(self.array)
+        copy = pickle.loads(pickle.dumps(shared))
+        copy[0, 0] = -1.0
+        self.assertEqual(shared[0, 0], 0.0)
+
+    def test_cleanup(self):
+        """the file goes when the sharing process no longer needs it"""
+        shared = share(self.array)
+        path = shared._shared_path
+        self.assertTrue(os.path.exists(path))
+        del shared
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_dtypes(self):
+        """integer and empty arrays are also handled"""
+        index = numpy.array([3, 1, 2], int)
+        shared = share(index)
+        self.assertEqual(pickle.loads(pickle.dumps(shared)), index)
+        self.assertEqual(share(numpy.zeros([0])).shape, (0,))
+
+
+if __name__ == '__main__':
+    main()